@@ -0,0 +1,35 @@
+"""Composite index on step_answers (user_id, step_id)
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+Objetivo:
+- Apoiar a validação de sequência das trilhas (routers/trail_endpoints),
+  que busca de uma vez os step_ids respondidos por um founder
+
+Risco: BAIXO (índice apenas, sem alteração de dados)
+Rollback: Simples - dropa o índice
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Cria índice composto (user_id, step_id)"""
+    op.create_index(
+        'ix_step_answers_user_step',
+        'step_answers',
+        ['user_id', 'step_id'],
+    )
+
+
+def downgrade():
+    """Remove índice composto"""
+    op.drop_index('ix_step_answers_user_step', table_name='step_answers')
@@ -0,0 +1,56 @@
+"""Create progress_summaries table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+Objetivo:
+- Resumo materializado do progresso por (founder, tipo, trilha/template),
+  mantido na mesma transação que grava respostas (services/progress_summary)
+- Dados existentes: o startup preenche a tabela quando está vazia
+  (ou scripts/rebuild_progress_summaries.py)
+
+Risco: BAIXO (tabela nova)
+Rollback: Simples - dropa a tabela
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Cria progress_summaries"""
+    op.create_table(
+        'progress_summaries',
+        sa.Column('id', sa.Integer(), nullable=False, autoincrement=True),
+        sa.Column('user_id', sa.String(100), nullable=False),
+        sa.Column('trail_id', sa.String(100), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False, server_default='trail'),
+        sa.Column('answered_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('progress_percent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('current_step_id', sa.String(100), nullable=True),
+        sa.Column('step_states', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # trail_id guarda Trail.id ou template_id: kind faz parte da chave
+    op.create_index(
+        'uq_progress_summary_user_kind_trail',
+        'progress_summaries',
+        ['user_id', 'kind', 'trail_id'],
+        unique=True
+    )
+
+
+def downgrade():
+    """Remove progress_summaries"""
+    op.drop_index('uq_progress_summary_user_kind_trail', table_name='progress_summaries')
+    op.drop_table('progress_summaries')
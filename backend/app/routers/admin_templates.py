@@ -120,10 +120,8 @@ def get_snapshot(template_id: int, db: Session = Depends(get_db), _admin=Depends
     if not td:
         raise HTTPException(status_code=404, detail="Template não encontrado")
     path = td.snapshot_path
-    import gzip, json
     try:
-        with gzip.open(path, "rt", encoding="utf-8") as f:
-            data = json.load(f)
+        data = TemplateStorageService().load_snapshot(path, file_hash=td.file_hash_sha256)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao ler snapshot: {e}")
     return data
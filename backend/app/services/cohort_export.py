@@ -0,0 +1,507 @@
+"""
+Cohort Export - XLSX de todos os founders de uma organização/ciclo
+==================================================================
+
+RESPONSABILIDADE:
+Exportar a trilha de todos os founders de um ciclo em um único job:
+poucas queries em lote, workbooks renderizados em pool de processos e
+um .zip montado em streaming no download.
+
+POR QUE:
+O admin chamava /admin/users/{user_id}/trails/{trail_id}/export/xlsx
+uma vez por founder (N requisições × 3 queries × render no event loop).
+
+ARQUITETURA:
+- load_cohort(): memberships + trilha + steps + respostas em lote
+  (resultado picklable, agrupado por founder)
+- render_founder_workbook(): parte CPU-bound, roda no pool e grava o
+  .xlsx direto no diretório do job (escrita atômica)
+- CohortExportJobManager: pool + progresso + registro dos jobs
+- iter_cohort_zip(): zip gerado em blocos a partir dos arquivos prontos
+
+RETOMADA:
+O diretório do job é determinístico por (organização, ciclo, trilha) e
+guarda um manifest.json com a chave de conteúdo de cada founder
+(services/export_cache.trail_export_key: trilha, etapas e respostas). Um
+novo submit do mesmo cohort (inclusive após restart da API) só renderiza
+os founders que faltam, cujas respostas mudaram ou todos, se as etapas
+da trilha mudaram.
+
+CONFIGURAÇÃO (ENV):
+- COHORT_EXPORT_PATH: diretório de trabalho (default: exports/cohorts)
+- COHORT_EXPORT_EXECUTOR: "process" (default) ou "thread"
+- COHORT_EXPORT_WORKERS: tamanho do pool (default: 4)
+"""
+
+from __future__ import annotations
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from services.export_cache import trail_export_key
+
+logger = logging.getLogger(__name__)
+
+COHORT_EXPORT_PATH = os.getenv("COHORT_EXPORT_PATH", "exports/cohorts")
+COHORT_EXPORT_EXECUTOR = os.getenv("COHORT_EXPORT_EXECUTOR", "process")
+COHORT_EXPORT_WORKERS = int(os.getenv("COHORT_EXPORT_WORKERS", "4"))
+MAX_RETAINED_JOBS = 50
+ZIP_CHUNK_SIZE = 64 * 1024
+# Limite de parâmetros do SQLite por IN (...)
+_IN_BATCH = 500
+
+
+class CohortExportError(Exception):
+    """Cohort sem trilha/founders (status HTTP associado)"""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def cohort_key(organization_id: int, cycle_id: int, trail_id: str) -> str:
+    """Id determinístico do job (mesmo cohort → mesmo diretório)"""
+    raw = f"{organization_id}:{cycle_id}:{trail_id}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+# ======================================================
+# Carga em lote - executa no processo da API
+# ======================================================
+def load_cohort(db, organization_id: int, cycle_id: int, trail_id: str) -> Dict[str, Any]:
+    """
+    Carrega trilha, steps e respostas de todos os founders do ciclo
+
+    4 queries no total (independente do número de founders, exceto pelos
+    lotes de IN com mais de 500 ids).
+
+    Returns:
+        Dict picklable: trail, steps (dicts ordenados) e founders
+        [{user_id, name, company_name, answers_by_step}]
+
+    Raises:
+        CohortExportError: trilha inexistente ou ciclo sem founders
+    """
+    from db.models import Membership, StepAnswer, StepSchema, Trail, User
+
+    trail = db.query(Trail).filter(Trail.id == trail_id).first()
+    if not trail:
+        raise CohortExportError(404, "Trilha não encontrada")
+
+    members = (
+        db.query(User.id, User.name, User.company_name)
+        .join(Membership, Membership.user_id == User.id)
+        .filter(
+            Membership.organization_id == organization_id,
+            Membership.cycle_id == cycle_id,
+            Membership.role == "founder",
+            Membership.status == "active",
+        )
+        .order_by(User.company_name, User.name)
+        .all()
+    )
+    if not members:
+        raise CohortExportError(404, "Nenhum founder ativo neste ciclo")
+
+    steps = (
+        db.query(StepSchema)
+        .filter(StepSchema.trail_id == trail_id)
+        .order_by(StepSchema.order)
+        .all()
+    )
+
+    user_ids = [m.id for m in members]
+    answers: Dict[str, Dict[str, Dict]] = {user_id: {} for user_id in user_ids}
+    for start in range(0, len(user_ids), _IN_BATCH):
+        rows = (
+            db.query(StepAnswer.user_id, StepAnswer.step_id, StepAnswer.answers)
+            .filter(
+                StepAnswer.trail_id == trail_id,
+                StepAnswer.user_id.in_(user_ids[start:start + _IN_BATCH]),
+            )
+            .all()
+        )
+        for user_id, step_id, step_answers in rows:
+            answers[user_id][step_id] = step_answers or {}
+
+    return {
+        "trail": {"id": trail.id, "name": trail.name},
+        "steps": [
+            {
+                "step_id": s.step_id,
+                "step_name": s.step_name,
+                "description": s.description,
+                "schema": s.schema,
+            }
+            for s in steps
+        ],
+        "founders": [
+            {
+                "user_id": m.id,
+                "name": m.name,
+                "company_name": m.company_name,
+                "answers_by_step": answers[m.id],
+            }
+            for m in members
+        ],
+    }
+
+
+# ======================================================
+# Render (CPU-bound) - executa no pool
+# ======================================================
+def render_founder_workbook(
+    trail: Dict[str, Any],
+    steps: List[Dict[str, Any]],
+    answers_by_step: Dict[str, Dict],
+    output_path: str,
+) -> int:
+    """
+    Renderiza o XLSX de um founder (mesmo layout do export individual)
+
+    Grava em arquivo temporário + rename: um job interrompido nunca deixa
+    um .xlsx pela metade que a retomada confundiria com um pronto.
+
+    Returns:
+        Tamanho do arquivo em bytes
+    """
+    from services.xlsx_exporter import generate_xlsx
+
+    stream = generate_xlsx(
+        SimpleNamespace(**trail),
+        [SimpleNamespace(**s) for s in steps],
+        answers_by_step,
+    )
+    data = stream.getvalue()
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, output_path)
+    return len(data)
+
+
+def _founder_file(user_id: str) -> str:
+    """Nome do .xlsx no diretório do job (user_id pode ter qualquer caractere)"""
+    return f"{hashlib.sha256(user_id.encode('utf-8')).hexdigest()[:16]}.xlsx"
+
+
+def _archive_name(founder: Dict[str, Any]) -> str:
+    label = founder.get("company_name") or founder.get("name") or founder["user_id"]
+    safe = "".join(c if c.isalnum() or c in " -_." else "_" for c in label).strip() or "founder"
+    return f"{safe[:60]}_{founder['user_id']}.xlsx"
+
+
+# ======================================================
+# Zip em streaming
+# ======================================================
+class _ZipSink:
+    """Destino sem seek para o zipfile: acumula e é drenado pelo gerador"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> Iterator[bytes]:
+        if self._buffer:
+            yield bytes(self._buffer)
+            self._buffer.clear()
+
+
+def iter_cohort_zip(files: List[Dict[str, str]], chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Gera o .zip do cohort em blocos (memória ~ chunk_size)
+
+    Os .xlsx já são zip/deflate: entram como ZIP_STORED.
+
+    Args:
+        files: [{"path": arquivo em disco, "arcname": nome dentro do zip}]
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        for entry in files:
+            with open(entry["path"], "rb") as src, archive.open(entry["arcname"], "w") as dest:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dest.write(block)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
+
+
+# ======================================================
+# Jobs
+# ======================================================
+@dataclass
+class CohortExportJob:
+    job_id: str
+    organization_id: int
+    cycle_id: int
+    trail_id: str
+    work_dir: Path
+    status: str = "queued"          # queued → running → succeeded | failed
+    total: int = 0
+    rendered: int = 0
+    reused: int = 0
+    failed: List[Dict[str, str]] = field(default_factory=list)
+    files: List[Dict[str, str]] = field(default_factory=list, repr=False)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[Dict[str, Any]] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def completed(self) -> int:
+        return self.rendered + self.reused + len(self.failed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "organization_id": self.organization_id,
+            "cycle_id": self.cycle_id,
+            "trail_id": self.trail_id,
+            "progress": {
+                "total": self.total,
+                "completed": self.completed,
+                "rendered": self.rendered,
+                "reused": self.reused,
+                "failed": len(self.failed),
+                "percent": round(100 * self.completed / self.total, 1) if self.total else 0.0,
+            },
+            "failures": self.failed,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+def _read_manifest(work_dir: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        return json.loads((work_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_manifest(work_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    tmp_path = work_dir / "manifest.json.tmp"
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, work_dir / "manifest.json")
+
+
+def _load_with_new_session(organization_id: int, cycle_id: int, trail_id: str) -> Dict[str, Any]:
+    from db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return load_cohort(db, organization_id, cycle_id, trail_id)
+    finally:
+        db.close()
+
+
+class CohortExportJobManager:
+    """
+    Pool de render + registro de jobs de export por cohort
+
+    Um único manager por processo da API (ver get_cohort_export_manager).
+    """
+
+    def __init__(
+        self,
+        base_dir: str | Path = COHORT_EXPORT_PATH,
+        executor_kind: str = COHORT_EXPORT_EXECUTOR,
+        max_workers: int = COHORT_EXPORT_WORKERS,
+    ):
+        self.base_dir = Path(base_dir)
+        self.executor_kind = executor_kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+        self._jobs: "OrderedDict[str, CohortExportJob]" = OrderedDict()
+        self._tasks: set = set()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cohort-export"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def submit(self, organization_id: int, cycle_id: int, trail_id: str) -> CohortExportJob:
+        """
+        Cria (ou retoma) o job do cohort e agenda a execução em background
+
+        Se já existe um job em andamento para o mesmo cohort, ele é
+        devolvido em vez de iniciar outro.
+        """
+        job_id = cohort_key(organization_id, cycle_id, trail_id)
+        current = self._jobs.get(job_id)
+        if current is not None and not current.done.is_set():
+            return current
+
+        job = CohortExportJob(
+            job_id=job_id,
+            organization_id=organization_id,
+            cycle_id=cycle_id,
+            trail_id=trail_id,
+            work_dir=self.base_dir / job_id,
+        )
+        self._jobs.pop(job_id, None)
+        self._jobs[job_id] = job
+        self._prune()
+
+        task = asyncio.get_running_loop().create_task(self._run_job(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run_job(self, job: CohortExportJob) -> None:
+        try:
+            job.status = "running"
+            job.started_at = time.time()
+            cohort = await run_in_threadpool(
+                _load_with_new_session, job.organization_id, job.cycle_id, job.trail_id
+            )
+            await self._render_cohort(job, cohort)
+            job.status = "succeeded"
+            logger.info(
+                f"✅ Export do cohort concluído: {job.job_id} "
+                f"({job.rendered} renderizados, {job.reused} reaproveitados, {len(job.failed)} falhas)"
+            )
+        except CohortExportError as e:
+            job.status = "failed"
+            job.error = {"status_code": e.status_code, "detail": e.detail}
+            logger.error(f"❌ Export do cohort falhou: {job.job_id}: {e.detail}")
+        except Exception as e:
+            job.status = "failed"
+            job.error = {"status_code": 500, "detail": str(e)}
+            logger.error(f"❌ Export do cohort falhou: {job.job_id}: {e}", exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    async def _render_one(self, founder: Dict[str, Any], cohort: Dict[str, Any], output_path: Path):
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(
+                self.executor, render_founder_workbook,
+                cohort["trail"], cohort["steps"], founder["answers_by_step"], str(output_path),
+            )
+        except Exception as e:
+            return founder, None, e
+        return founder, size, None
+
+    async def _render_cohort(self, job: CohortExportJob, cohort: Dict[str, Any]) -> None:
+        job.work_dir.mkdir(parents=True, exist_ok=True)
+        manifest = _read_manifest(job.work_dir)
+        founders = cohort["founders"]
+        job.total = len(founders)
+
+        # Mesma chave do export individual: trilha + etapas + respostas
+        trail = SimpleNamespace(**cohort["trail"])
+        steps = [SimpleNamespace(**s) for s in cohort["steps"]]
+
+        renders = []
+        for founder in founders:
+            user_id = founder["user_id"]
+            founder["content_key"] = trail_export_key(trail, steps, founder["answers_by_step"])
+            entry = manifest.get(user_id)
+            if (
+                entry
+                and entry.get("content_key") == founder["content_key"]
+                and (job.work_dir / entry["file"]).exists()
+            ):
+                job.reused += 1
+                continue
+
+            renders.append(self._render_one(founder, cohort, job.work_dir / _founder_file(user_id)))
+
+        for render in asyncio.as_completed(renders):
+            founder, size, error = await render
+            user_id = founder["user_id"]
+            if error is not None:
+                job.failed.append({"user_id": user_id, "detail": str(error)})
+                manifest.pop(user_id, None)
+                logger.warning(f"⚠️ Export do founder {user_id} falhou: {error}")
+                continue
+
+            manifest[user_id] = {
+                "content_key": founder["content_key"],
+                "file": _founder_file(user_id),
+                "size_bytes": size,
+            }
+            job.rendered += 1
+            # Manifest a cada founder: um restart retoma daqui
+            await run_in_threadpool(_write_manifest, job.work_dir, manifest)
+
+        job.files = [
+            {"path": str(job.work_dir / manifest[f["user_id"]]["file"]), "arcname": _archive_name(f)}
+            for f in founders
+            if f["user_id"] in manifest
+        ]
+
+    def get(self, job_id: str) -> Optional[CohortExportJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[CohortExportJob]:
+        """Long-poll: aguarda até `timeout` segundos pelo fim do job."""
+        job = self.get(job_id)
+        if job is None or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def _prune(self) -> None:
+        """Descarta jobs finalizados mais antigos além do limite (arquivos ficam para retomada)."""
+        while len(self._jobs) > MAX_RETAINED_JOBS:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.done.is_set():
+                break
+            del self._jobs[oldest_id]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_manager: Optional[CohortExportJobManager] = None
+
+
+def get_cohort_export_manager() -> CohortExportJobManager:
+    """Manager singleton por processo (dependency FastAPI)."""
+    global _manager
+    if _manager is None:
+        _manager = CohortExportJobManager()
+        atexit.register(_manager.shutdown)
+    return _manager
@@ -25,8 +25,71 @@ import hashlib
 import logging
 from typing import Dict, Any, List, Optional, Set, Tuple
 
+from app.services.template_snapshot import cell_style
+
 logger = logging.getLogger(__name__)
 
+_COORDINATE = re.compile(r"[A-Z]+\d+")
+_COORDINATE_PARTS = re.compile(r"([A-Z]+)(\d+)")
+
+
+class ValidationIndex:
+    """
+    Índice das data validations de uma sheet
+    
+    Mantém a semântica textual do detector (`rng in str(sqref)`, primeira
+    validation que casa vence), mas responde coordenadas simples em O(1):
+    um substring "B12" só ocorre em um sqref como sufixo de letras +
+    prefixo de dígitos de alguma coordenada dele.
+    """
+    
+    def __init__(self, validations: List[Dict]):
+        self._entries: List[Tuple[str, Optional[str]]] = [
+            (str(dv.get("sqref")), dv.get("type"))
+            for dv in validations
+            if dv.get("sqref")
+        ]
+        self._coordinate_hits: Dict[str, int] = {}
+        for position, (sqref, _) in enumerate(self._entries):
+            for letters, digits in _COORDINATE_PARTS.findall(sqref):
+                for start in range(len(letters)):
+                    for end in range(1, len(digits) + 1):
+                        self._coordinate_hits.setdefault(letters[start:] + digits[:end], position)
+    
+    def _first_match(self, rng: str) -> Optional[int]:
+        if _COORDINATE.fullmatch(rng):
+            return self._coordinate_hits.get(rng)
+        # Ranges (A1:B2) são poucos: busca textual direta
+        for position, (sqref, _) in enumerate(self._entries):
+            if rng in sqref:
+                return position
+        return None
+    
+    def has_validation(self, rng: str) -> bool:
+        return self._first_match(rng) is not None
+    
+    def validation_type(self, rng: str) -> Optional[str]:
+        position = self._first_match(rng)
+        return self._entries[position][1] if position is not None else None
+
+
+class SheetIndex:
+    """
+    Índice por sheet usado na detecção
+    
+    Substitui as buscas lineares em `cells` (coordenada → célula, mantendo
+    a primeira ocorrência) e nas data validations.
+    """
+    
+    def __init__(self, cells: List[Dict], validations: List[Dict]):
+        self.cells: Dict[str, Dict] = {}
+        for cell in cells:
+            self.cells.setdefault(cell.get("coordinate"), cell)
+        self.validations = ValidationIndex(validations)
+    
+    def get(self, coord: str) -> Optional[Dict]:
+        return self.cells.get(coord)
+
 
 class FillableFieldCandidate:
     """
@@ -90,6 +153,10 @@ class FillableAreaDetector:
         r"demo",
     ]
     
+    def __init__(self):
+        # Tabela de estilos do snapshot streaming (snapshot["styles"])
+        self._styles: List[Dict[str, Any]] = []
+    
     def detect(self, snapshot: Dict[str, Any]) -> List[FillableFieldCandidate]:
         """
         Detecta áreas preenchíveis no snapshot
@@ -102,6 +169,7 @@ class FillableAreaDetector:
         """
         candidates: List[FillableFieldCandidate] = []
         sheets = snapshot.get("sheets", [])
+        self._styles = snapshot.get("styles") or []
         
         for s_index, sheet in enumerate(sheets):
             name = sheet.get("name")
@@ -110,13 +178,12 @@ class FillableAreaDetector:
             validations = sheet.get("data_validations", [])
             
             logger.info(f"Analisando sheet '{name}': {len(cells)} células, {len(merged)} merged")
+            index = SheetIndex(cells, validations)
             
             # 1. Processar merged ranges primeiro (prioridade)
             processed_coords: Set[str] = set()
             for rng in merged:
-                candidate = self._analyze_merged_range(
-                    rng, cells, validations, name, s_index
-                )
+                candidate = self._analyze_merged_range(rng, index, name, s_index)
                 if candidate:
                     candidates.append(candidate)
                     # Marcar coordenadas como processadas
@@ -129,9 +196,7 @@ class FillableAreaDetector:
                 if coord in processed_coords:
                     continue
                 
-                candidate = self._analyze_single_cell(
-                    cell, cells, validations, name, s_index
-                )
+                candidate = self._analyze_single_cell(cell, index, name, s_index)
                 if candidate:
                     candidates.append(candidate)
                     processed_coords.add(coord)
@@ -146,8 +211,7 @@ class FillableAreaDetector:
     def _analyze_merged_range(
         self,
         rng: str,
-        cells: List[Dict],
-        validations: List[Dict],
+        index: SheetIndex,
         sheet_name: str,
         sheet_index: int
     ) -> Optional[FillableFieldCandidate]:
@@ -159,7 +223,7 @@ class FillableAreaDetector:
         """
         # Buscar primeira célula do range
         first_coord = rng.split(":")[0]
-        cell = next((c for c in cells if c.get("coordinate") == first_coord), None)
+        cell = index.get(first_coord)
         
         if not cell:
             return None
@@ -169,13 +233,14 @@ class FillableAreaDetector:
             return None
         
         # Label: buscar próximo
-        label = self._find_label_near_coordinate(first_coord, cells)
+        label = self._find_label_near_coordinate(first_coord, index)
         
         # Example value: capturar do range se existir
-        example = self._extract_example_from_cells(self._expand_range(rng), cells)
+        coords = self._expand_range(rng)
+        example = self._extract_example_from_cells(coords, index)
         
         # Tipo inferido
-        inferred_type = self._infer_type(cell, rng, validations)
+        inferred_type = self._infer_type(cell, rng, index.validations)
         
         # Phase
         phase = self._infer_phase(sheet_name, label)
@@ -186,9 +251,9 @@ class FillableAreaDetector:
         # Metadata
         metadata = {
             "is_merged": True,
-            "has_validation": self._range_has_validation(rng, validations),
+            "has_validation": index.validations.has_validation(rng),
             "detection_method": "merged_range",
-            "cell_count": len(self._expand_range(rng)),
+            "cell_count": len(coords),
         }
         
         return FillableFieldCandidate(
@@ -206,8 +271,7 @@ class FillableAreaDetector:
     def _analyze_single_cell(
         self,
         cell: Dict,
-        cells: List[Dict],
-        validations: List[Dict],
+        index: SheetIndex,
         sheet_name: str,
         sheet_index: int
     ) -> Optional[FillableFieldCandidate]:
@@ -223,7 +287,7 @@ class FillableAreaDetector:
         coord = cell.get("coordinate")
         
         # Label
-        label = self._find_label_near_coordinate(coord, cells)
+        label = self._find_label_near_coordinate(coord, index)
         
         # Example
         value = cell.get("value")
@@ -232,7 +296,7 @@ class FillableAreaDetector:
             example = None  # Não usar exemplos como valor
         
         # Tipo
-        inferred_type = self._infer_type(cell, coord, validations)
+        inferred_type = self._infer_type(cell, coord, index.validations)
         
         # Phase
         phase = self._infer_phase(sheet_name, label)
@@ -243,7 +307,7 @@ class FillableAreaDetector:
         # Metadata
         metadata = {
             "is_merged": False,
-            "has_validation": self._cell_has_validation(coord, validations),
+            "has_validation": index.validations.has_validation(coord),
             "detection_method": "single_cell",
             "data_type": cell.get("data_type"),
         }
@@ -275,14 +339,14 @@ class FillableAreaDetector:
             return False
         
         # Estilo
-        style = cell.get("style", {})
+        style = cell_style(cell, self._styles)
         font = style.get("font", {})
         fill = style.get("fill", {})
         
         # Título: bold + tamanho grande + fundo colorido
         is_title = (
             font.get("bold") and
-            font.get("size", 0) >= 14 and
+            (font.get("size") or 0) >= 14 and
             self._has_colored_fill(fill)
         )
         if is_title:
@@ -321,7 +385,7 @@ class FillableAreaDetector:
     def _find_label_near_coordinate(
         self,
         coord: str,
-        cells: List[Dict]
+        index: SheetIndex
     ) -> Optional[str]:
         """
         Busca label mais próximo (acima ou à esquerda)
@@ -342,7 +406,7 @@ class FillableAreaDetector:
                 break
             
             target_coord = self._build_coordinate(r, col)
-            match = next((c for c in cells if c.get("coordinate") == target_coord), None)
+            match = index.get(target_coord)
             
             if match:
                 val = match.get("value")
@@ -360,7 +424,7 @@ class FillableAreaDetector:
                     break
                 
                 target_coord = self._build_coordinate(row, c)
-                match = next((cell for cell in cells if cell.get("coordinate") == target_coord), None)
+                match = index.get(target_coord)
                 
                 if match:
                     val = match.get("value")
@@ -376,7 +440,7 @@ class FillableAreaDetector:
         self,
         cell: Dict,
         cell_range: str,
-        validations: List[Dict]
+        validations: ValidationIndex
     ) -> str:
         """
         Infere tipo semântico do campo
@@ -390,38 +454,38 @@ class FillableAreaDetector:
         6. Default -> text_short
         """
         # 1. Validation list (maior prioridade)
-        if self._range_has_validation(cell_range, validations):
-            val_type = self._get_validation_type(cell_range, validations)
+        if validations.has_validation(cell_range):
+            val_type = validations.validation_type(cell_range)
             if val_type and val_type.lower() in ("list", "listvalid"):
-                logger.debug(f"  -> Tipo 'choice' inferido por validation list")
+                logger.debug("  -> Tipo 'choice' inferido por validation list")
                 return "choice"
         
         # 2. Format de data
         fmt = cell.get("number_format", "").lower() if cell.get("number_format") else ""
         if any(x in fmt for x in ["dd", "mm", "yy", "date", "time"]):
-            logger.debug(f"  -> Tipo 'date' inferido por number_format: {fmt}")
+            logger.debug("  -> Tipo 'date' inferido por number_format: %s", fmt)
             return "date"
         
         # 3. Range grande = text_long (para merged cells)
         if ":" in cell_range:
             area = self._compute_range_area(cell_range)
             if area >= 4:
-                logger.debug(f"  -> Tipo 'text_long' inferido por área de merged cell: {area}")
+                logger.debug("  -> Tipo 'text_long' inferido por área de merged cell: %s", area)
                 return "text_long"
         
         # 4. Data type numérico
         dt = cell.get("data_type")
         if dt in ("n", "f"):
-            logger.debug(f"  -> Tipo 'number' inferido por data_type: {dt}")
+            logger.debug("  -> Tipo 'number' inferido por data_type: %s", dt)
             return "number"
         
         # 5. Currency format
         if fmt and any(x in fmt for x in ["$", "€", "currency", "accounting"]):
-            logger.debug(f"  -> Tipo 'number' inferido por formato currency")
+            logger.debug("  -> Tipo 'number' inferido por formato currency")
             return "number"
         
         # Default
-        logger.debug(f"  -> Tipo 'text_short' (padrão)")
+        logger.debug("  -> Tipo 'text_short' (padrão)")
         return "text_short"
         
         # Range grande = text_long
@@ -518,37 +582,17 @@ class FillableAreaDetector:
     def _extract_example_from_cells(
         self,
         coords: List[str],
-        cells: List[Dict]
+        index: SheetIndex
     ) -> Optional[str]:
         """Extrai exemplo de um grupo de células"""
         for coord in coords:
-            cell = next((c for c in cells if c.get("coordinate") == coord), None)
+            cell = index.get(coord)
             if cell:
                 val = cell.get("value")
                 if val and len(str(val)) < 50 and not self._is_example_text(str(val)):
                     return str(val)
         return None
 
-    def _range_has_validation(self, rng: str, validations: List[Dict]) -> bool:
-        """Verifica se range tem validation"""
-        for dv in validations:
-            sqref = dv.get("sqref")
-            if sqref and rng in str(sqref):
-                return True
-        return False
-
-    def _cell_has_validation(self, coord: str, validations: List[Dict]) -> bool:
-        """Verifica se célula tem validation"""
-        return self._range_has_validation(coord, validations)
-
-    def _get_validation_type(self, rng: str, validations: List[Dict]) -> Optional[str]:
-        """Retorna tipo de validation"""
-        for dv in validations:
-            sqref = dv.get("sqref")
-            if sqref and rng in str(sqref):
-                return dv.get("type")
-        return None
-
     def _compute_range_area(self, rng: str) -> int:
         """Calcula área de um range"""
         if ":" not in rng:
@@ -0,0 +1,416 @@
+"""
+Ingestion Jobs - Processamento de uploads XLSX fora do event loop
+=================================================================
+
+RESPONSABILIDADE:
+Executar o pipeline FCJ (snapshot → validação → detecção → storage) em um
+pool de processos, com API assíncrona de jobs (submit → poll/long-poll).
+
+POR QUE:
+O endpoint de upload é `async`, mas extract/detect são CPU-bound. Rodando
+no event loop, um workbook grande congela todas as outras requisições do
+worker por segundos.
+
+ARQUITETURA:
+- process_workbook(): parte CPU-bound, roda no pool (entrada/saída picklable)
+- register_result(): persistência no banco, roda no processo da API
+  (Session não é picklable) via threadpool
+- find_ingested(): dedup por hash - a mesma versão já ingerida é devolvida
+  sem passar pelo pipeline
+- IngestionJobManager: pool + limite de parses simultâneos + registro dos jobs
+
+CONFIGURAÇÃO (ENV):
+- TEMPLATE_INGESTION_EXECUTOR: "process" (default) ou "thread"
+- TEMPLATE_INGESTION_WORKERS: tamanho do pool (default: 2)
+- TEMPLATE_MAX_CONCURRENT_PARSES: parses simultâneos (default: 2)
+- TEMPLATE_SYNC_MAX_BYTES: arquivos até este tamanho usam o caminho síncrono
+  (default: 262144 = 256KB)
+"""
+
+from __future__ import annotations
+import asyncio
+import atexit
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from app.services.snapshot_cache import get_snapshot_cache
+from core.profiling import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+INGESTION_EXECUTOR = os.getenv("TEMPLATE_INGESTION_EXECUTOR", "process")
+INGESTION_WORKERS = int(os.getenv("TEMPLATE_INGESTION_WORKERS", "2"))
+MAX_CONCURRENT_PARSES = int(os.getenv("TEMPLATE_MAX_CONCURRENT_PARSES", "2"))
+SYNC_MAX_BYTES = int(os.getenv("TEMPLATE_SYNC_MAX_BYTES", str(256 * 1024)))
+MAX_RETAINED_JOBS = 200
+
+
+class IngestionError(Exception):
+    """Erro do pipeline com status HTTP associado (picklable)"""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# ======================================================
+# Pipeline (CPU-bound) - executa no pool
+# ======================================================
+def process_workbook(
+    content: bytes, filename: str, cycle: str, file_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Etapas CPU-bound do pipeline FCJ
+
+    `file_hash`: SHA-256 já calculado na leitura do upload (senão é
+    calculado aqui), para o arquivo ser hasheado uma vez só.
+
+    Returns:
+        Dict picklable com storage, stats, validation_report e fields
+        (fields com template_id="pending")
+
+    Raises:
+        IngestionError: snapshot inválido / incompleto
+    """
+    from app.services.template_snapshot import (
+        TemplateSnapshotService, validate_snapshot, SnapshotLoadError, SnapshotValidationError
+    )
+    from app.services.fillable_detector import FillableAreaDetector
+    from app.services.template_storage import TemplateStorageService
+    from app.services.template_registry import TemplateRegistry
+
+    started = time.perf_counter()
+
+    # 1. Extrair snapshot
+    try:
+        snapshot, assets = TemplateSnapshotService().extract(content)
+    except SnapshotLoadError as e:
+        raise IngestionError(400, f"Arquivo Excel inválido: {str(e)}")
+    except SnapshotValidationError as e:
+        raise IngestionError(422, f"Snapshot incompleto: {str(e)}")
+
+    # 2. Validar snapshot (auto-check)
+    validation_report = validate_snapshot(snapshot)
+    if not validation_report["valid"]:
+        raise IngestionError(500, {
+            "message": "Snapshot INVÁLIDO - extração incompleta",
+            "errors": validation_report["errors"],
+        })
+
+    # 3. Detectar fillable areas
+    candidates = FillableAreaDetector().detect(snapshot)
+
+    # 4. Persistir storage
+    registry = TemplateRegistry()
+    file_hash = file_hash or registry.compute_file_hash(content)
+    template_key = registry.compute_template_key(filename, cycle)
+
+    save_result = TemplateStorageService().save(
+        file_name=filename,
+        file_bytes=content,
+        snapshot_dict=snapshot,
+        assets=assets,
+        template_key=template_key,
+        cycle=cycle,
+        file_hash=file_hash,
+    )
+
+    # 5. Stats
+    fields = [c.to_dict(template_id="pending") for c in candidates]
+    stats = registry.compute_stats(snapshot, fields)
+
+    return {
+        "template_key": template_key,
+        "cycle": cycle,
+        "file_hash_sha256": file_hash,
+        "paths": save_result["paths"],
+        "stats": stats,
+        "validation_report": validation_report,
+        "fields": fields,
+        "processing_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+# ======================================================
+# Registro no banco - executa no processo da API
+# ======================================================
+def register_result(db, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Persiste o resultado do pipeline (TemplateDefinition + fields)
+
+    Returns:
+        Relatório final do upload (mesmo formato do endpoint síncrono)
+    """
+    from app.services.template_registry import TemplateRegistry
+
+    registry = TemplateRegistry()
+    try:
+        td = registry.upsert_template_definition(
+            db=db,
+            template_key=result["template_key"],
+            cycle=result["cycle"],
+            file_hash=result["file_hash_sha256"],
+            original_path=result["paths"]["original_path"],
+            snapshot_path=result["paths"]["snapshot_path"],
+            assets_manifest_path=result["paths"].get("assets_manifest_path"),
+            stats=result["stats"],
+        )
+
+        fields_final = [{**f, "template_id": str(td.id)} for f in result["fields"]]
+        registry.replace_fields_for_template(db=db, template_id=td.id, fields=fields_final)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # O snapshot foi regravado no worker (ProcessPoolExecutor): a invalidação
+    # feita por TemplateStorageService.save lá não alcança o cache da API
+    get_snapshot_cache().invalidate(result["file_hash_sha256"])
+
+    return {
+        "message": "Template FCJ ingested successfully",
+        "template_id": td.id,
+        "template_key": result["template_key"],
+        "cycle": result["cycle"],
+        "file_hash_sha256": result["file_hash_sha256"],
+        "paths": result["paths"],
+        "stats": result["stats"],
+        "validation_report": result["validation_report"],
+        "fields_count": len(fields_final),
+    }
+
+
+def find_ingested(db, template_key: str, cycle: str, file_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Relatório da versão já ingerida para (template_key, cycle, file_hash)
+
+    Só vale como dedup se os arquivos ainda estão no storage; caso
+    contrário o pipeline roda de novo e regrava tudo.
+
+    Returns:
+        Relatório no formato do upload (deduplicated=True, com os fields
+        registrados) ou None
+    """
+    from app.services.template_registry import TemplateRegistry
+    from app.services.template_storage import TemplateStorageService
+
+    registry = TemplateRegistry()
+    td = registry.find_template_definition(db, template_key, cycle, file_hash)
+    if td is None or not TemplateStorageService().exists(template_key, cycle, file_hash):
+        return None
+
+    stored = registry.get_template_with_fields(db, td.id)
+    template = stored["template"]
+    return {
+        "message": "Template FCJ already ingested",
+        "deduplicated": True,
+        "template_id": td.id,
+        "template_key": template_key,
+        "cycle": cycle,
+        "file_hash_sha256": file_hash,
+        "paths": {
+            "original_path": template["original_path"],
+            "snapshot_path": template["snapshot_path"],
+            "assets_manifest_path": template["assets_manifest_path"],
+        },
+        "stats": template["stats"],
+        "validation_report": None,
+        "fields_count": len(stored["fields"]),
+        "fields": stored["fields"],
+    }
+
+
+def _register_with_new_session(result: Dict[str, Any]) -> Dict[str, Any]:
+    from db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return register_result(db, result)
+    finally:
+        db.close()
+
+
+# ======================================================
+# Jobs
+# ======================================================
+@dataclass
+class IngestionJob:
+    job_id: str
+    filename: str
+    cycle: str
+    size_bytes: int
+    file_hash: Optional[str] = field(default=None, repr=False)
+    status: str = "queued"          # queued → running → succeeded | failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "filename": self.filename,
+            "cycle": self.cycle,
+            "size_bytes": self.size_bytes,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class IngestionJobManager:
+    """
+    Pool de parsing + limite de concorrência + registro de jobs
+
+    Um único manager por processo da API (ver get_job_manager).
+    """
+
+    def __init__(
+        self,
+        executor_kind: str = INGESTION_EXECUTOR,
+        max_workers: int = INGESTION_WORKERS,
+        max_concurrent: int = MAX_CONCURRENT_PARSES,
+    ):
+        self.executor_kind = executor_kind
+        self.max_workers = max(1, max_workers)
+        self.max_concurrent = max(1, max_concurrent)
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: set = set()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="template-ingestion"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run_pipeline(
+        self, content: bytes, filename: str, cycle: str, file_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Executa o pipeline CPU-bound no pool, respeitando o limite de parses."""
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, process_workbook, content, filename, cycle, file_hash
+            )
+
+    async def ingest(
+        self, content: bytes, filename: str, cycle: str, db=None, file_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Pipeline completo aguardando o resultado (caminho síncrono)."""
+        if len(content) <= SYNC_MAX_BYTES:
+            # Arquivo pequeno: sem custo de serialização para o pool
+            result = await run_in_threadpool(process_workbook, content, filename, cycle, file_hash)
+        else:
+            result = await self.run_pipeline(content, filename, cycle, file_hash)
+
+        if db is not None:
+            return await run_in_threadpool(register_result, db, result)
+        return await run_in_threadpool(_register_with_new_session, result)
+
+    def submit(
+        self, content: bytes, filename: str, cycle: str, file_hash: Optional[str] = None
+    ) -> IngestionJob:
+        """Cria um job e agenda a execução em background."""
+        job = IngestionJob(
+            job_id=uuid.uuid4().hex,
+            filename=filename,
+            cycle=cycle,
+            size_bytes=len(content),
+            file_hash=file_hash,
+        )
+        self._jobs[job.job_id] = job
+        self._prune()
+
+        task = asyncio.get_running_loop().create_task(self._run_job(job, content))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run_job(self, job: IngestionJob, content: bytes) -> None:
+        try:
+            async with self.semaphore:
+                job.status = "running"
+                job.started_at = time.time()
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.executor, process_workbook, content, job.filename, job.cycle, job.file_hash
+                )
+
+            job.result = await run_in_threadpool(_register_with_new_session, result)
+            job.status = "succeeded"
+            logger.info(f"✅ Job de ingestão concluído: {job.job_id} ({job.filename})")
+        except IngestionError as e:
+            job.status = "failed"
+            job.error = {"status_code": e.status_code, "detail": e.detail}
+            logger.error(f"❌ Job de ingestão falhou: {job.job_id}: {e.detail}")
+        except Exception as e:
+            job.status = "failed"
+            job.error = {"status_code": 500, "detail": str(e)}
+            logger.error(f"❌ Job de ingestão falhou: {job.job_id}: {e}", exc_info=True)
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[IngestionJob]:
+        """Long-poll: aguarda até `timeout` segundos pelo fim do job."""
+        job = self.get(job_id)
+        if job is None or timeout <= 0:
+            return job
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def _prune(self) -> None:
+        """Descarta jobs finalizados mais antigos além do limite."""
+        while len(self._jobs) > MAX_RETAINED_JOBS:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.done.is_set():
+                break
+            del self._jobs[oldest_id]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_manager: Optional[IngestionJobManager] = None
+
+
+def get_job_manager() -> IngestionJobManager:
+    """Manager singleton por processo (dependency FastAPI)."""
+    global _manager
+    if _manager is None:
+        _manager = IngestionJobManager()
+        atexit.register(_manager.shutdown)
+    return _manager
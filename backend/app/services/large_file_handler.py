@@ -2,16 +2,17 @@
 ✅ AJUSTE 4: Suporte Robusto a Arquivos Grandes
 
 Funcionalidades:
-- Upload em streaming (sem carregar tudo em memória)
+- Upload em streaming (sem carregar tudo em memória), com SHA-256
+  calculado durante a leitura
 - Limite configurável via env
 - Validação explícita com erro HTTP 413
-- Compressão de snapshot (gzip)
+- Compressão de snapshot (codec configurável, ver snapshot_codec.py)
 - Liberação de memória pós-processamento
 """
 
 import os
-import gzip
 import io
+import hashlib
 import logging
 from typing import Tuple, Optional
 from pathlib import Path
@@ -106,7 +107,10 @@ class MemoryEfficientSnapshot:
     @staticmethod
     def compress_snapshot(snapshot_dict: dict) -> bytes:
         """
-        Comprime snapshot para gzip (reduz tamanho)
+        Comprime snapshot (reduz tamanho)
+        
+        Serializa direto no compressor, sem montar a string JSON inteira;
+        encoding/compressão seguem TEMPLATE_SNAPSHOT_* (snapshot_codec).
         
         Args:
             snapshot_dict: Snapshot completo
@@ -114,23 +118,16 @@ class MemoryEfficientSnapshot:
         Returns:
             Bytes comprimido
         """
-        import json
-        
-        # Serializar
-        json_str = json.dumps(snapshot_dict, ensure_ascii=False)
-        json_bytes = json_str.encode("utf-8")
+        from app.services.snapshot_codec import resolve_codec
         
-        # Comprimir
         compressed = io.BytesIO()
-        with gzip.GzipFile(fileobj=compressed, mode="wb") as gz:
-            gz.write(json_bytes)
-        
+        raw_size = resolve_codec().write(snapshot_dict, compressed)
         compressed_bytes = compressed.getvalue()
         
         logger.info(
             f"✓ Snapshot comprimido: "
-            f"{len(json_bytes) / 1024:.1f}KB → {len(compressed_bytes) / 1024:.1f}KB "
-            f"(razão: {100 - (len(compressed_bytes) / len(json_bytes) * 100):.0f}%)"
+            f"{raw_size / 1024:.1f}KB → {len(compressed_bytes) / 1024:.1f}KB "
+            f"(razão: {100 - (len(compressed_bytes) / max(raw_size, 1) * 100):.0f}%)"
         )
         
         return compressed_bytes
@@ -138,7 +135,7 @@ class MemoryEfficientSnapshot:
     @staticmethod
     def decompress_snapshot(compressed_bytes: bytes) -> dict:
         """
-        Descomprime snapshot
+        Descomprime snapshot (qualquer codec, inclusive gzip JSON antigo)
         
         Args:
             compressed_bytes: Bytes comprimido
@@ -146,15 +143,9 @@ class MemoryEfficientSnapshot:
         Returns:
             Dicionário de snapshot
         """
-        import json
-        
-        with gzip.GzipFile(fileobj=io.BytesIO(compressed_bytes), mode="rb") as gz:
-            json_bytes = gz.read()
+        from app.services.snapshot_codec import decode_snapshot
         
-        json_str = json_bytes.decode("utf-8")
-        snapshot_dict = json.loads(json_str)
-        
-        return snapshot_dict
+        return decode_snapshot(compressed_bytes)
 
 
 class StreamingFileProcessor:
@@ -164,6 +155,36 @@ class StreamingFileProcessor:
     Permite processar arquivos grandes sem carregar tudo em memória.
     """
     
+    CHUNK_SIZE = 1024 * 1024
+    
+    @staticmethod
+    async def read_upload_hashed(upload, max_size_bytes: int) -> Tuple[bytes, str]:
+        """
+        Lê o upload em blocos calculando o SHA-256 no caminho
+        
+        Para de ler assim que passa de `max_size_bytes` (o conteúdo
+        devolvido fica maior que o limite e a validação de tamanho
+        responde 413 sem consumir o resto do arquivo).
+        
+        Args:
+            upload: UploadFile (o Starlette já faz spool em disco)
+            max_size_bytes: Tamanho máximo permitido
+        
+        Returns:
+            (conteúdo, sha256_hex)
+        """
+        digest = hashlib.sha256()
+        chunks = []
+        total = 0
+        while total <= max_size_bytes:
+            chunk = await upload.read(StreamingFileProcessor.CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            chunks.append(chunk)
+            total += len(chunk)
+        return b"".join(chunks), digest.hexdigest()
+    
     @staticmethod
     def process_upload_stream(
         file_bytes: bytes,
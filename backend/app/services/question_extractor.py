@@ -16,11 +16,14 @@ Modelo semântico:
 
 from __future__ import annotations
 import re
+import bisect
 import hashlib
 import logging
 from typing import Dict, Any, List, Optional, Tuple, Set
 from dataclasses import dataclass
 
+from app.services.template_snapshot import cell_style
+
 logger = logging.getLogger(__name__)
 
 
@@ -144,6 +147,8 @@ class QuestionExtractor:
     
     def __init__(self):
         self.logger = logger
+        # Tabela de estilos do snapshot streaming (snapshot["styles"])
+        self._styles: List[Dict[str, Any]] = []
     
     def extract(self, snapshot: Dict[str, Any]) -> Tuple[List[Question], Dict[str, Any]]:
         """
@@ -168,6 +173,7 @@ class QuestionExtractor:
         }
         
         sheets = snapshot.get("sheets", [])
+        self._styles = snapshot.get("styles") or []
         global_order = 0
         
         # ✅ Iterar EXATAMENTE na ordem das sheets
@@ -242,8 +248,13 @@ class QuestionExtractor:
         
         # 2. Identificar seções (títulos destacados)
         sections = self._identify_sections(cells_sorted)
+        section_lookup = self._build_section_lookup(sections)
         self.logger.info(f"    Seções identificadas: {len(sections)}")
         
+        # Índices para busca de respostas: linhas por coluna + merged por coluna
+        columns = self._build_column_index(cells_sorted)
+        merged_lookup = self._build_merged_lookup(merged_cells)
+        
         # 3. Identificar perguntas e associar a respostas
         questions = []
         sheet_order = 0
@@ -259,7 +270,7 @@ class QuestionExtractor:
                 continue
             
             # Encontrar seção que contém esta pergunta
-            section = self._find_section_for_cell(row, sections)
+            section = self._find_section_for_cell(row, sections, section_lookup)
             section_name = section.get("name") if section else None
             section_index = section.get("index") if section else -1
             
@@ -267,8 +278,8 @@ class QuestionExtractor:
             answer_range = self._find_answer_block(
                 question_row=row,
                 question_col=col,
-                cells_sorted=cells_sorted,
-                merged_cells=merged_cells
+                columns=columns,
+                merged_lookup=merged_lookup
             )
             
             if not answer_range:
@@ -305,8 +316,8 @@ class QuestionExtractor:
             sheet_order += 1
             
             self.logger.debug(
-                f"      📝 [{sheet_order}] {value[:50][:50]}... "
-                f"@ {coord} → {answer_range}"
+                "      📝 [%s] %s... @ %s → %s",
+                sheet_order, value[:50], coord, answer_range,
             )
         
         return questions
@@ -329,9 +340,9 @@ class QuestionExtractor:
             return False
         
         # Verificar se é título (muito grande + bold)
-        style = cell.get("style", {})
+        style = cell_style(cell, self._styles)
         font = style.get("font", {})
-        if font.get("size", 0) >= 14 and font.get("bold"):
+        if (font.get("size") or 0) >= 14 and font.get("bold"):
             # Pode ser título, não pergunta
             # A menos que tenha palavra-chave de pergunta
             pass
@@ -366,12 +377,12 @@ class QuestionExtractor:
             
             # Ou: grande + bold + cor
             if not is_section:
-                style = cell.get("style", {})
+                style = cell_style(cell, self._styles)
                 font = style.get("font", {})
                 fill = style.get("fill", {})
                 
                 is_section = (
-                    font.get("size", 0) >= 14 and
+                    (font.get("size") or 0) >= 14 and
                     font.get("bold") and
                     fill.get("fgColor")  # tem cor
                 )
@@ -393,25 +404,124 @@ class QuestionExtractor:
         
         return sections
     
+    def _build_section_lookup(
+        self,
+        sections: List[Dict[str, Any]]
+    ) -> Tuple[List[int], Optional[int]]:
+        """row_start de cada seção + posição da primeira seção com row_end=0"""
+        starts = [section["row_start"] for section in sections]
+        first_open = next(
+            (idx for idx, section in enumerate(sections) if not section.get("row_end")),
+            None
+        )
+        return starts, first_open
+    
     def _find_section_for_cell(
         self,
         row: int,
-        sections: List[Dict[str, Any]]
+        sections: List[Dict[str, Any]],
+        section_lookup: Optional[Tuple[List[int], Optional[int]]] = None
     ) -> Optional[Dict[str, Any]]:
-        """Encontra seção que contém esta célula"""
+        """
+        Encontra seção que contém esta célula
         
-        for section in sections:
-            if (section.get("row_start") <= row <= (section.get("row_end") or 9999)):
-                return section
+        Seções vêm ordenadas por row_start: a candidata é a última que começa
+        até `row` (bisect). Uma seção com row_end=0 (duas seções na linha 1)
+        vale até a linha 9999 e tem precedência, como na busca linear; a
+        primeira delas vem pré-calculada em section_lookup.
+        """
+        if not sections:
+            return None
+        if section_lookup is None:
+            section_lookup = self._build_section_lookup(sections)
+        section_starts, first_open = section_lookup
+        
+        position = bisect.bisect_right(section_starts, row) - 1
+        if position < 0:
+            return None
+        
+        if first_open is not None and first_open < position and row <= 9999:
+            return sections[first_open]
+        
+        section = sections[position]
+        if row <= (section.get("row_end") or 9999):
+            return section
+        return None
+    
+    def _build_column_index(
+        self,
+        cells_sorted: List[Dict]
+    ) -> Dict[int, Tuple[List[int], List[Dict]]]:
+        """column → (linhas ordenadas, células) preservando a ordem de leitura"""
+        columns: Dict[int, Tuple[List[int], List[Dict]]] = {}
+        for cell in cells_sorted:
+            rows, column_cells = columns.setdefault(cell.get("column"), ([], []))
+            rows.append(cell.get("row"))
+            column_cells.append(cell)
+        return columns
+    
+    def _build_merged_lookup(
+        self,
+        merged_cells: List[str]
+    ) -> Dict[int, Tuple[List[int], List[Tuple[int, str]]]]:
+        """
+        column → (row_start ordenados, [(row_end, range)])
         
+        Ranges mesclados não se sobrepõem no Excel: em cada coluna, a célula
+        pertence no máximo ao range com maior row_start <= row.
+        """
+        per_column: Dict[int, List[Tuple[int, int, str]]] = {}
+        for rng in merged_cells:
+            bounds = self._parse_range(rng)
+            if not bounds:
+                continue
+            r1, c1, r2, c2 = bounds
+            for col in range(c1, c2 + 1):
+                per_column.setdefault(col, []).append((r1, r2, rng))
+        
+        lookup = {}
+        for col, entries in per_column.items():
+            entries.sort()
+            lookup[col] = ([r1 for r1, _, _ in entries], [(r2, rng) for _, r2, rng in entries])
+        return lookup
+    
+    def _find_merged_range(
+        self,
+        row: int,
+        col: int,
+        merged_lookup: Dict[int, Tuple[List[int], List[Tuple[int, str]]]]
+    ) -> Optional[str]:
+        """Range mesclado que contém (row, col), se houver"""
+        entry = merged_lookup.get(col)
+        if not entry:
+            return None
+        starts, ranges = entry
+        position = bisect.bisect_right(starts, row) - 1
+        if position >= 0 and row <= ranges[position][0]:
+            return ranges[position][1]
         return None
     
+    def _parse_range(self, rng: str) -> Optional[Tuple[int, int, int, int]]:
+        """Parse 'A1:D3' (ou 'A1') -> (row_start, col_start, row_end, col_end)"""
+        parts = rng.replace("$", "").split(":")
+        bounds = []
+        for part in parts:
+            m = re.fullmatch(r"([A-Za-z]+)(\d+)", part.strip())
+            if not m:
+                return None
+            col = 0
+            for ch in m.group(1).upper():
+                col = col * 26 + (ord(ch) - 64)
+            bounds.append((int(m.group(2)), col))
+        (r1, c1), (r2, c2) = bounds[0], bounds[-1]
+        return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+    
     def _find_answer_block(
         self,
         question_row: int,
         question_col: int,
-        cells_sorted: List[Dict],
-        merged_cells: List[str]
+        columns: Dict[int, Tuple[List[int], List[Dict]]],
+        merged_lookup: Dict[int, Tuple[List[int], List[Tuple[int, str]]]]
     ) -> Optional[Dict[str, Any]]:
         """
         Encontra bloco de resposta correspondente à pergunta
@@ -421,31 +531,32 @@ class QuestionExtractor:
         - Procura à direita
         - Não pode conter fórmula
         """
+        entry = columns.get(question_col)
+        if not entry:
+            return None
+        rows, column_cells = entry
         
         # Procurar abaixo (mesma coluna, linhas seguintes)
-        for cell in cells_sorted:
+        for cell in column_cells[bisect.bisect_right(rows, question_row):]:
             row = cell.get("row")
-            col = cell.get("column")
             value = cell.get("value")
             
-            if row > question_row and col == question_col:
-                # Validar que é célula de resposta (vazia ou exemple)
-                if value is None or (isinstance(value, str) and len(value) < 100):
-                    # Expandir se for merged
-                    coord = cell.get("coordinate")
-                    for merged in merged_cells:
-                        if coord in merged:
-                            return {
-                                "range": merged,
-                                "row_start": row,
-                                "row_end": row,  # aprox
-                            }
-                    
+            # Validar que é célula de resposta (vazia ou exemple)
+            if value is None or (isinstance(value, str) and len(value) < 100):
+                # Expandir se for merged
+                merged = self._find_merged_range(row, question_col, merged_lookup)
+                if merged:
                     return {
-                        "range": coord,
+                        "range": merged,
                         "row_start": row,
-                        "row_end": row,
+                        "row_end": row,  # aprox
                     }
+                
+                return {
+                    "range": cell.get("coordinate"),
+                    "row_start": row,
+                    "row_end": row,
+                }
         
         return None
     
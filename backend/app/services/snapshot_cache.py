@@ -0,0 +1,143 @@
+"""
+Snapshot Cache - LRU de snapshots por hash do arquivo
+=====================================================
+
+RESPONSABILIDADE:
+Evitar ler, descomprimir e parsear o snapshot do disco a cada requisição.
+Guarda snapshots parseados e corpos de resposta já codificados (gzip),
+com orçamento de memória e descarte LRU.
+
+CHAVES:
+(file_hash_sha256, variante) - o conteúdo é endereçado pelo hash, então
+não há invalidação por tempo; TemplateStorageService.save invalida o hash
+quando regrava o snapshot.
+
+MEMÓRIA:
+Bytes contam pelo tamanho exato; snapshots parseados pelo tamanho do
+payload decodificado × PARSED_OVERHEAD (objetos Python ocupam bem mais
+que o JSON). Entradas maiores que o orçamento não são guardadas.
+
+Os objetos devolvidos são compartilhados entre requisições: não modificar.
+
+CONFIGURAÇÃO (ENV):
+- TEMPLATE_SNAPSHOT_CACHE_MB: orçamento de memória (default: 64; 0 desliga)
+"""
+
+from __future__ import annotations
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_MB = float(os.getenv("TEMPLATE_SNAPSHOT_CACHE_MB", "64"))
+PARSED_OVERHEAD = 6
+
+
+class SnapshotCache:
+    """LRU thread-safe com orçamento em bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(
+        self,
+        file_hash: str,
+        variant: Hashable,
+        loader: Callable[[], Tuple[Any, int]],
+    ) -> Any:
+        """
+        Valor em cache ou carregado por `loader`
+
+        Args:
+            loader: () → (valor, tamanho estimado em bytes)
+        """
+        value = self.get(file_hash, variant)
+        if value is not None:
+            return value
+
+        # Carrega fora do lock (I/O + parse); concorrentes podem carregar em dobro
+        value, size = loader()
+        self.put(file_hash, variant, value, size)
+        return value
+
+    def get(self, file_hash: str, variant: Hashable) -> Any:
+        """Valor em cache ou None (conta hit/miss)"""
+        key = (file_hash, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, file_hash: str, variant: Hashable, value: Any, size: int) -> None:
+        """Guarda `value` (não guarda entradas maiores que o orçamento)"""
+        key = (file_hash, variant)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, file_hash: str, stale: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """
+        Remove as variantes de um hash; retorna quantas saíram
+
+        Args:
+            stale: variant → bool; quando informado, só saem as variantes
+                para as quais retorna True
+        """
+        with self._lock:
+            keys = [
+                k for k in self._entries
+                if k[0] == file_hash and (stale is None or stale(k[1]))
+            ]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[SnapshotCache] = None
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    """Cache singleton por processo"""
+    global _cache
+    if _cache is None:
+        _cache = SnapshotCache(max_bytes=SNAPSHOT_CACHE_MB * 1024 * 1024)
+    return _cache
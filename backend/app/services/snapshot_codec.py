@@ -0,0 +1,266 @@
+"""
+Snapshot Codec - Codificação binária + compressão dos snapshots
+===============================================================
+
+RESPONSABILIDADE:
+Gravar/ler snapshots (tipicamente no formato colunar v2) com encoding e
+compressão configuráveis, escrevendo em streaming direto no compressor.
+
+ENCODINGS:
+- msgpack: binário compacto (requer `msgpack`)
+- json: compacto, orjson quando disponível (fallback: json)
+
+COMPRESSÕES:
+- zstd (requer `zstandard`), lz4 (requer `lz4`), gzip (stdlib)
+
+"auto" escolhe o melhor disponível (msgpack > json; zstd > lz4 > gzip).
+A leitura detecta compressão pelos magic bytes e encoding pelo primeiro
+byte, então arquivos antigos (.json.gz) continuam legíveis.
+
+STREAMING:
+O mapa de topo e a lista de sheets são escritos item a item no
+compressor; o maior bloco em memória é uma sheet serializada.
+
+CONFIGURAÇÃO (ENV):
+- TEMPLATE_SNAPSHOT_ENCODING: auto | msgpack | json (default: auto)
+- TEMPLATE_SNAPSHOT_COMPRESSION: auto | zstd | lz4 | gzip (default: auto)
+- TEMPLATE_SNAPSHOT_COMPRESSION_LEVEL: nível do compressor
+  (default: zstd 3, lz4 0, gzip 6)
+"""
+
+from __future__ import annotations
+import gzip
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack é opcional
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard é opcional
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - lz4 é opcional
+    lz4_frame = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ENCODING = os.getenv("TEMPLATE_SNAPSHOT_ENCODING", "auto")
+SNAPSHOT_COMPRESSION = os.getenv("TEMPLATE_SNAPSHOT_COMPRESSION", "auto")
+SNAPSHOT_COMPRESSION_LEVEL = os.getenv("TEMPLATE_SNAPSHOT_COMPRESSION_LEVEL")
+
+DEFAULT_LEVELS = {"zstd": 3, "lz4": 0, "gzip": 6}
+_EXTENSIONS = {"msgpack": "msgpack", "json": "json", "zstd": "zst", "lz4": "lz4", "gzip": "gz"}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_LZ4_MAGIC = b"\x04\x22\x4d\x18"
+
+_INSTALL_HINT = {
+    "msgpack": "msgpack",
+    "zstd": "zstandard",
+    "lz4": "lz4",
+}
+
+
+def available_encodings() -> list:
+    return (["msgpack"] if msgpack is not None else []) + ["json"]
+
+
+def available_compressions() -> list:
+    return (
+        (["zstd"] if zstandard is not None else [])
+        + (["lz4"] if lz4_frame is not None else [])
+        + ["gzip"]
+    )
+
+
+def _require(name: str) -> None:
+    available = available_encodings() + available_compressions()
+    if name not in available:
+        package = _INSTALL_HINT.get(name, name)
+        raise ImportError(f"{package} não instalado. Execute: pip install {package}")
+
+
+# ======================================================
+# Encoding
+# ======================================================
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value)
+        except TypeError:
+            pass  # ex.: inteiros > 64 bits; json da stdlib aceita
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _write_json(snapshot: Dict[str, Any], write: Callable[[bytes], Any]) -> None:
+    write(b"{")
+    for i, (key, value) in enumerate(snapshot.items()):
+        if i:
+            write(b",")
+        write(_json_dumps(key) + b":")
+        if key == "sheets" and isinstance(value, list):
+            write(b"[")
+            for j, sheet in enumerate(value):
+                if j:
+                    write(b",")
+                write(_json_dumps(sheet))
+            write(b"]")
+        else:
+            write(_json_dumps(value))
+    write(b"}")
+
+
+def _write_msgpack(snapshot: Dict[str, Any], write: Callable[[bytes], Any]) -> None:
+    packer = msgpack.Packer(use_bin_type=True)
+    write(packer.pack_map_header(len(snapshot)))
+    for key, value in snapshot.items():
+        write(packer.pack(key))
+        if key == "sheets" and isinstance(value, list):
+            write(packer.pack_array_header(len(value)))
+            for sheet in value:
+                write(packer.pack(sheet))
+        else:
+            write(packer.pack(value))
+
+
+# ======================================================
+# Codec
+# ======================================================
+@dataclass(frozen=True)
+class SnapshotCodec:
+    """Combinação encoding + compressão + nível"""
+    encoding: str
+    compression: str
+    level: int
+
+    @property
+    def suffix(self) -> str:
+        """Sufixo de arquivo, ex.: '.msgpack.zst'"""
+        return f".{_EXTENSIONS[self.encoding]}.{_EXTENSIONS[self.compression]}"
+
+    def _compressor(self, fileobj: BinaryIO):
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=self.level).stream_writer(fileobj, closefd=False)
+        if self.compression == "lz4":
+            return lz4_frame.LZ4FrameFile(fileobj, mode="wb", compression_level=self.level)
+        return gzip.GzipFile(fileobj=fileobj, mode="wb", compresslevel=self.level, mtime=0)
+
+    def write(self, snapshot: Dict[str, Any], fileobj: BinaryIO) -> int:
+        """
+        Serializa e comprime em streaming para `fileobj`
+
+        Returns:
+            Tamanho do payload antes da compressão (bytes)
+        """
+        raw_size = 0
+        with self._compressor(fileobj) as compressor:
+            def write(chunk: bytes) -> None:
+                nonlocal raw_size
+                raw_size += len(chunk)
+                compressor.write(chunk)
+
+            if self.encoding == "msgpack":
+                _write_msgpack(snapshot, write)
+            else:
+                _write_json(snapshot, write)
+        return raw_size
+
+    def encode(self, snapshot: Dict[str, Any]) -> bytes:
+        buffer = io.BytesIO()
+        self.write(snapshot, buffer)
+        return buffer.getvalue()
+
+
+def resolve_codec(
+    encoding: Optional[str] = None,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+) -> SnapshotCodec:
+    """
+    Codec a partir dos argumentos ou das variáveis de ambiente
+
+    Raises:
+        ValueError: encoding/compressão desconhecidos
+        ImportError: dependência opcional não instalada
+    """
+    encoding = (encoding or SNAPSHOT_ENCODING).lower()
+    compression = (compression or SNAPSHOT_COMPRESSION).lower()
+
+    if encoding == "auto":
+        encoding = available_encodings()[0]
+    if compression == "auto":
+        compression = available_compressions()[0]
+    if encoding not in ("msgpack", "json"):
+        raise ValueError(f"Encoding de snapshot desconhecido: {encoding}")
+    if compression not in DEFAULT_LEVELS:
+        raise ValueError(f"Compressão de snapshot desconhecida: {compression}")
+    _require(encoding)
+    _require(compression)
+
+    if level is None:
+        level = int(SNAPSHOT_COMPRESSION_LEVEL) if SNAPSHOT_COMPRESSION_LEVEL else DEFAULT_LEVELS[compression]
+    return SnapshotCodec(encoding=encoding, compression=compression, level=level)
+
+
+# ======================================================
+# Leitura
+# ======================================================
+def decompress(data: bytes) -> bytes:
+    """Remove a compressão (detectada pelos magic bytes); sem compressão → data"""
+    if data.startswith(_GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(_ZSTD_MAGIC):
+        _require("zstd")
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)).read()
+    if data.startswith(_LZ4_MAGIC):
+        _require("lz4")
+        return lz4_frame.decompress(data)
+    return data
+
+
+def decode_snapshot(data: bytes) -> Dict[str, Any]:
+    """Bytes de qualquer codec (detectado automaticamente) → snapshot"""
+    payload = decompress(data)
+    if payload.lstrip()[:1] in (b"{", b"["):
+        return _json_loads(payload)
+    _require("msgpack")
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+
+
+def write_snapshot(
+    snapshot: Dict[str, Any],
+    path: Union[str, Path],
+    codec: Optional[SnapshotCodec] = None,
+) -> int:
+    """Grava snapshot em `path`; retorna o tamanho antes da compressão"""
+    codec = codec or resolve_codec()
+    with open(path, "wb") as f:
+        return codec.write(snapshot, f)
+
+
+def read_snapshot(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return decode_snapshot(f.read())
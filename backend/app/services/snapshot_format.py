@@ -0,0 +1,194 @@
+"""
+Snapshot Format - Formato colunar (v2) dos snapshots de template
+================================================================
+
+RESPONSABILIDADE:
+Converter snapshots entre o formato de dicts por célula (o que
+TemplateSnapshotService.extract produz e o que detector/extractor consomem)
+e o formato colunar usado em disco e na API.
+
+FORMATO COLUNAR (snapshot_format = 2):
+- "styles": tabela de estilos interna ao workbook (um dict por estilo único)
+- "style_source": "inline" (cells com "style") ou "table" (cells com
+  "style_id", snapshot streaming) - usado para reconstruir o original
+- sheets[i]["cell_columns"] no lugar de sheets[i]["cells"]:
+    row, column, value, style_id, data_type, number_format: arrays paralelos
+    hyperlinks, comments: pares [índice, texto] (esparsos)
+    raw: pares [índice, célula] para células fora do padrão do extractor
+  coordinate, column_letter e formula são derivados de row/column/value.
+
+GARANTIAS:
+- from_columnar(to_columnar(s)) == s para qualquer snapshot
+- Snapshots sem "snapshot_format" são o formato de dicts (v1)
+"""
+
+from __future__ import annotations
+import json
+from typing import Any, Dict, List, Tuple
+
+from openpyxl.utils import get_column_letter
+
+FORMAT_KEY = "snapshot_format"
+COLUMNAR_FORMAT_VERSION = 2
+
+_CELL_KEYS = {
+    "coordinate", "row", "column", "column_letter", "value", "data_type",
+    "formula", "number_format", "hyperlink", "comment",
+}
+
+
+def is_columnar(snapshot: Dict[str, Any]) -> bool:
+    return snapshot.get(FORMAT_KEY) == COLUMNAR_FORMAT_VERSION
+
+
+def _formula(value: Any) -> Any:
+    return value if isinstance(value, str) and value.startswith("=") else None
+
+
+def _is_standard_cell(cell: Dict[str, Any], style_key: str) -> bool:
+    """Célula reconstruível a partir das colunas (mesmas regras do extractor)"""
+    if set(cell) != _CELL_KEYS | {style_key}:
+        return False
+    row, column = cell["row"], cell["column"]
+    if type(row) is not int or type(column) is not int or row < 1 or column < 1:
+        return False
+    letter = get_column_letter(column)
+    return (
+        cell["column_letter"] == letter
+        and cell["coordinate"] == f"{letter}{row}"
+        and cell["formula"] == _formula(cell["value"])
+    )
+
+
+class _StyleInterner:
+    """Estilos inline → tabela (deduplicados por conteúdo)"""
+
+    def __init__(self):
+        self.styles: List[Dict[str, Any]] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, style: Any) -> int:
+        key = json.dumps(style, sort_keys=True, default=str)
+        style_id = self._ids.get(key)
+        if style_id is None:
+            style_id = len(self.styles)
+            self.styles.append(style)
+            self._ids[key] = style_id
+        return style_id
+
+
+def to_columnar(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Snapshot em dicts (clássico ou streaming) → formato colunar v2
+
+    Snapshots já colunares são devolvidos sem alteração.
+    """
+    if is_columnar(snapshot):
+        return snapshot
+
+    table_source = "styles" in snapshot
+    style_key = "style_id" if table_source else "style"
+    interner = None if table_source else _StyleInterner()
+
+    columnar = {key: value for key, value in snapshot.items() if key not in ("sheets", "styles")}
+    columnar[FORMAT_KEY] = COLUMNAR_FORMAT_VERSION
+    columnar["style_source"] = "table" if table_source else "inline"
+    columnar["sheets"] = []
+
+    for sheet in snapshot.get("sheets", []):
+        columns = {
+            "row": [], "column": [], "value": [], "style_id": [],
+            "data_type": [], "number_format": [],
+            "hyperlinks": [], "comments": [], "raw": [],
+        }
+        for index, cell in enumerate(sheet.get("cells", [])):
+            if not _is_standard_cell(cell, style_key):
+                columns["raw"].append([index, cell])
+                for name in ("row", "column", "value", "style_id", "data_type", "number_format"):
+                    columns[name].append(None)
+                continue
+
+            columns["row"].append(cell["row"])
+            columns["column"].append(cell["column"])
+            columns["value"].append(cell["value"])
+            columns["data_type"].append(cell["data_type"])
+            columns["number_format"].append(cell["number_format"])
+            columns["style_id"].append(
+                cell["style_id"] if table_source else interner.intern(cell["style"])
+            )
+            if cell["hyperlink"] is not None:
+                columns["hyperlinks"].append([index, cell["hyperlink"]])
+            if cell["comment"] is not None:
+                columns["comments"].append([index, cell["comment"]])
+
+        columnar_sheet = {key: value for key, value in sheet.items() if key != "cells"}
+        columnar_sheet["cell_columns"] = columns
+        columnar["sheets"].append(columnar_sheet)
+
+    columnar["styles"] = snapshot["styles"] if table_source else interner.styles
+    return columnar
+
+
+def from_columnar(columnar: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Formato colunar v2 → snapshot em dicts, no mesmo formato de origem
+
+    Snapshots que não são colunares são devolvidos sem alteração.
+    """
+    if not is_columnar(columnar):
+        return columnar
+
+    styles = columnar.get("styles", [])
+    inline = columnar.get("style_source") == "inline"
+
+    snapshot = {
+        key: value for key, value in columnar.items()
+        if key not in (FORMAT_KEY, "style_source", "sheets", "styles")
+    }
+    snapshot["sheets"] = []
+
+    for sheet in columnar.get("sheets", []):
+        columns = sheet.get("cell_columns", {})
+        hyperlinks = dict(_pairs(columns.get("hyperlinks", [])))
+        comments = dict(_pairs(columns.get("comments", [])))
+        raw = dict(_pairs(columns.get("raw", [])))
+
+        cells = []
+        rows = columns.get("row", [])
+        for index, (row, column, value, style_id, data_type, number_format) in enumerate(zip(
+            rows, columns.get("column", []), columns.get("value", []), columns.get("style_id", []),
+            columns.get("data_type", []), columns.get("number_format", []),
+        )):
+            if index in raw:
+                cells.append(raw[index])
+                continue
+            letter = get_column_letter(column)
+            cell = {
+                "coordinate": f"{letter}{row}",
+                "row": row,
+                "column": column,
+                "column_letter": letter,
+                "value": value,
+                "data_type": data_type,
+                "formula": _formula(value),
+                "number_format": number_format,
+                "hyperlink": hyperlinks.get(index),
+                "comment": comments.get(index),
+            }
+            if inline:
+                cell["style"] = styles[style_id]
+            else:
+                cell["style_id"] = style_id
+            cells.append(cell)
+
+        dict_sheet = {key: value for key, value in sheet.items() if key != "cell_columns"}
+        dict_sheet["cells"] = cells
+        snapshot["sheets"].append(dict_sheet)
+
+    if not inline:
+        snapshot["styles"] = styles
+    return snapshot
+
+
+def _pairs(items: List[List[Any]]) -> List[Tuple[int, Any]]:
+    return [(index, value) for index, value in items]
@@ -83,6 +83,27 @@ class TemplateRegistry:
         
         return stats
 
+    def find_template_definition(
+        self,
+        db: Session,
+        template_key: str,
+        cycle: str,
+        file_hash: str
+    ):
+        """
+        Busca a versão registrada para (template_key, cycle, file_hash)
+        
+        Returns:
+            TemplateDefinition instance ou None
+        """
+        from ..models.template_definition import TemplateDefinition
+        
+        return db.query(TemplateDefinition).filter_by(
+            template_key=template_key,
+            cycle=cycle,
+            file_hash_sha256=file_hash
+        ).one_or_none()
+
     def upsert_template_definition(
         self,
         db: Session,
@@ -105,11 +126,7 @@ class TemplateRegistry:
         from ..models.template_definition import TemplateDefinition
         
         # Buscar existente
-        existing = db.query(TemplateDefinition).filter_by(
-            template_key=template_key,
-            cycle=cycle,
-            file_hash_sha256=file_hash
-        ).one_or_none()
+        existing = self.find_template_definition(db, template_key, cycle, file_hash)
         
         if existing:
             # Atualizar paths (caso tenha mudado)
@@ -156,10 +173,14 @@ class TemplateRegistry:
             fields: Lista de dicts com dados dos fields
         """
         from ..models.template_definition import FillableField
+        from services.progress_summary import delete_template_summaries
         
         # Delete existentes
         deleted = db.query(FillableField).filter_by(template_id=template_id).delete()
         
+        # Resumos de progresso descrevem as perguntas antigas
+        delete_template_summaries(db, template_id)
+        
         # Insert novos
         for f in fields:
             ff = FillableField(
@@ -13,22 +13,44 @@ GARANTIAS:
 - Versionamento de schema
 
 SCHEMA VERSION: 2.0 (completo com validação)
+
+MODO STREAMING (workbooks grandes):
+- Células lidas em read_only (iter_rows), só as fisicamente presentes
+- Merges, validações, dimensões e imagens vêm de um segundo load do
+  mesmo arquivo com o sheetData esvaziado (barato)
+- Estilos deduplicados em snapshot["styles"]; células referenciam
+  por "style_id" em vez de repetir o dict (ver cell_style/resolve_styles)
 """
 
 from __future__ import annotations
 import io
+import json
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from openpyxl import load_workbook
+from openpyxl.cell.cell import MergedCell
+from openpyxl.cell.read_only import EmptyCell
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, PatternFill, Border, Alignment, Protection
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.worksheet.datavalidation import DataValidation
 
+from services.ooxml import register_namespaces
+
 logger = logging.getLogger(__name__)
 
 SNAPSHOT_SCHEMA_VERSION = "2.0"
 
+# Arquivos a partir deste tamanho usam a extração streaming por padrão
+STREAMING_MIN_BYTES = int(os.getenv("TEMPLATE_SNAPSHOT_STREAMING_MIN_BYTES", str(2 * 1024 * 1024)))
+
+_SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_WORKSHEET_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+_CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+
 
 class SnapshotValidationError(Exception):
     """Erro crítico de validação de snapshot"""
@@ -40,17 +62,118 @@ class SnapshotLoadError(Exception):
     pass
 
 
+class StyleTable:
+    """
+    Tabela de estilos compartilhada do snapshot streaming
+    
+    Cada combinação de estilo do openpyxl é extraída uma única vez; estilos
+    com o mesmo conteúdo recebem o mesmo id.
+    """
+
+    def __init__(self, extract_style: Callable[[Any], Dict[str, Any]]):
+        self.styles: List[Dict[str, Any]] = []
+        self._extract_style = extract_style
+        self._by_key: Dict[Any, int] = {}
+        self._by_content: Dict[str, int] = {}
+
+    def id_for(self, key: Any, cell) -> int:
+        style_id = self._by_key.get(key)
+        if style_id is None:
+            style = self._extract_style(cell)
+            content = json.dumps(style, sort_keys=True, default=str)
+            style_id = self._by_content.get(content)
+            if style_id is None:
+                style_id = len(self.styles)
+                self.styles.append(style)
+                self._by_content[content] = style_id
+            self._by_key[key] = style_id
+        return style_id
+
+
+def cell_style(cell: Dict[str, Any], styles: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Estilo da célula, inline ("style") ou via tabela do snapshot ("style_id")"""
+    style = cell.get("style")
+    if style is not None:
+        return style
+    style_id = cell.get("style_id")
+    if style_id is not None and styles and 0 <= style_id < len(styles):
+        return styles[style_id]
+    return {}
+
+
+def resolve_styles(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Cópia do snapshot com estilos inline em cada célula (formato clássico)"""
+    styles = snapshot.get("styles")
+    if styles is None:
+        return snapshot
+    resolved = {key: value for key, value in snapshot.items() if key != "styles"}
+    resolved["sheets"] = []
+    for sheet in snapshot.get("sheets", []):
+        cells = []
+        for cell in sheet.get("cells", []):
+            inline = {key: value for key, value in cell.items() if key != "style_id"}
+            inline["style"] = cell_style(cell, styles)
+            cells.append(inline)
+        resolved["sheets"].append({**sheet, "cells": cells})
+    return resolved
+
+
+def _strip_sheet_cells(sheet_xml: bytes) -> bytes:
+    """
+    Remove as células do sheetData, mantendo as linhas (altura, hidden)
+    e os cantos de cada merge: o openpyxl monta as bordas do range a partir
+    da célula de origem e da célula inferior direita
+    """
+    register_namespaces(sheet_xml)
+    root = ET.fromstring(sheet_xml)
+    merge_anchors = {
+        corner.replace("$", "").upper()
+        for merge in root.iter(f"{{{_SHEET_MAIN_NS}}}mergeCell")
+        for corner in merge.get("ref", "").split(":")
+    }
+    sheet_data = root.find(f"{{{_SHEET_MAIN_NS}}}sheetData")
+    if sheet_data is not None:
+        for row in sheet_data:
+            row[:] = [c for c in row if c.get("r") in merge_anchors]
+    return ET.tostring(root, xml_declaration=True, encoding="UTF-8")
+
+
+def _layout_package(file_bytes: bytes) -> bytes:
+    """Mesmo .xlsx sem as células (para merges, validações, dimensões e imagens)"""
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        content_types = ET.fromstring(archive.read("[Content_Types].xml"))
+        sheet_parts = {
+            override.get("PartName", "").lstrip("/")
+            for override in content_types.iter(f"{{{_CONTENT_TYPES_NS}}}Override")
+            if override.get("ContentType") == _WORKSHEET_CONTENT_TYPE
+        }
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+            for info in archive.infolist():
+                data = archive.read(info.filename)
+                if info.filename in sheet_parts:
+                    data = _strip_sheet_cells(data)
+                package.writestr(info.filename, data)
+    return buffer.getvalue()
+
+
 class TemplateSnapshotService:
     """
     Serviço de extração completa de templates Excel
     """
 
-    def extract(self, file_bytes: bytes) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    def extract(
+        self,
+        file_bytes: bytes,
+        streaming: Optional[bool] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Extrai snapshot completo + assets de um arquivo Excel
         
         Args:
             file_bytes: Conteúdo binário do arquivo .xlsx
+            streaming: Força (True) ou desliga (False) a extração streaming;
+                None = automático a partir de STREAMING_MIN_BYTES
             
         Returns:
             Tuple com:
@@ -61,21 +184,13 @@ class TemplateSnapshotService:
             SnapshotLoadError: Se arquivo não puder ser carregado
             SnapshotValidationError: Se snapshot estiver incompleto
         """
-        # 1. Carregar workbook com segurança
-        try:
-            wb = load_workbook(
-                io.BytesIO(file_bytes),
-                data_only=False,
-                keep_vba=False
-            )
-        except Exception as e:
-            error_msg = f"Falha ao carregar arquivo XLSX: {str(e)}"
-            logger.error(error_msg)
-            raise SnapshotLoadError(error_msg) from e
+        if streaming is None:
+            streaming = len(file_bytes) >= STREAMING_MIN_BYTES
+        if streaming:
+            return self.extract_streaming(file_bytes)
         
-        # 2. Validar que workbook foi carregado corretamente
-        if not wb or not hasattr(wb, 'worksheets'):
-            raise SnapshotLoadError("Workbook inválido ou vazio")
+        # 1. Carregar workbook com segurança
+        wb = self._load(file_bytes)
         
         snapshot = {
             "schema_version": SNAPSHOT_SCHEMA_VERSION,
@@ -101,6 +216,113 @@ class TemplateSnapshotService:
         
         return snapshot, all_assets
 
+    def extract_streaming(self, file_bytes: bytes) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Extração para workbooks grandes (mesmo contrato de extract)
+        
+        - Células: read_only + iter_rows, só as fisicamente presentes
+          (não percorre max_row × max_col)
+        - Layout (merges, validações, dimensões, imagens, hyperlinks,
+          comentários): load normal do pacote sem células
+        - Estilos: snapshot["styles"] + "style_id" em cada célula
+        """
+        # 1. Dois passes leves sobre o mesmo arquivo
+        try:
+            layout_bytes = _layout_package(file_bytes)
+        except Exception as e:
+            error_msg = f"Falha ao carregar arquivo XLSX: {str(e)}"
+            logger.error(error_msg)
+            raise SnapshotLoadError(error_msg) from e
+        layout_wb = self._load(layout_bytes)
+        stream_wb = self._load(file_bytes, read_only=True)
+        
+        styles = StyleTable(self._extract_cell_style)
+        snapshot = {
+            "schema_version": SNAPSHOT_SCHEMA_VERSION,
+            "workbook": self._extract_workbook_props(layout_wb),
+            "styles": styles.styles,
+            "sheets": []
+        }
+        
+        all_assets = []
+        
+        # 2. Extrair cada sheet
+        try:
+            for layout_sheet, stream_sheet in zip(layout_wb.worksheets, stream_wb.worksheets):
+                try:
+                    sheet_data, sheet_assets = self._extract_sheet_layout(layout_sheet)
+                    sheet_data["cells"] = self._stream_cells(stream_sheet, layout_sheet, styles)
+                    snapshot["sheets"].append(sheet_data)
+                    all_assets.extend(sheet_assets)
+                except Exception as e:
+                    error_msg = f"Falha ao extrair sheet '{layout_sheet.title}': {str(e)}"
+                    logger.error(error_msg)
+                    raise SnapshotValidationError(error_msg) from e
+        finally:
+            stream_wb.close()
+        
+        # 3. Auto-validação obrigatória
+        self._validate_snapshot(snapshot)
+        
+        return snapshot, all_assets
+
+    def _load(self, file_bytes: bytes, read_only: bool = False):
+        """Carrega workbook com segurança"""
+        try:
+            wb = load_workbook(
+                io.BytesIO(file_bytes),
+                read_only=read_only,
+                data_only=False,
+                keep_vba=False
+            )
+        except Exception as e:
+            error_msg = f"Falha ao carregar arquivo XLSX: {str(e)}"
+            logger.error(error_msg)
+            raise SnapshotLoadError(error_msg) from e
+        
+        # Validar que workbook foi carregado corretamente
+        if not wb or not hasattr(wb, 'worksheets'):
+            raise SnapshotLoadError("Workbook inválido ou vazio")
+        return wb
+
+    def _stream_cells(self, stream_sheet, layout_sheet: Worksheet, styles: StyleTable) -> List[Dict[str, Any]]:
+        """
+        Células da sheet em ordem (row, col), com a mesma semântica do modo
+        normal: células de merges (origem com bordas do range + MergedCell)
+        e hyperlinks/comentários vêm do pass de layout
+        """
+        layout_cells = layout_sheet._cells
+        merge_anchors = {(rng.min_row, rng.min_col) for rng in layout_sheet.merged_cells.ranges}
+        cells = []
+        seen = set()
+        for row in stream_sheet.iter_rows():
+            for cell in row:
+                if cell.__class__ is EmptyCell:
+                    continue
+                key = (cell.row, cell.column)
+                seen.add(key)
+                layout_cell = layout_cells.get(key)
+                if isinstance(layout_cell, MergedCell) or key in merge_anchors:
+                    cells.append(self._extract_cell(
+                        layout_cell, style_id=styles.id_for(("layout", tuple(layout_cell._style)), layout_cell)
+                    ))
+                else:
+                    cells.append(self._extract_cell(
+                        cell,
+                        style_id=styles.id_for(("stream", cell._style_id), cell),
+                        links=layout_cell,
+                    ))
+        
+        # Células criadas só pelo layout (merges, hyperlinks, comentários)
+        for key, layout_cell in layout_cells.items():
+            if key not in seen:
+                cells.append(self._extract_cell(
+                    layout_cell, style_id=styles.id_for(("layout", tuple(layout_cell._style)), layout_cell)
+                ))
+        
+        cells.sort(key=lambda c: (c["row"], c["column"]))
+        return cells
+
     def _extract_workbook_props(self, wb) -> Dict[str, Any]:
         """Extrai propriedades do workbook"""
         return {
@@ -122,21 +344,7 @@ class TemplateSnapshotService:
         Returns:
             Tuple com (sheet_data, assets)
         """
-        sheet_data = {
-            "name": sheet.title,
-            "sheet_state": getattr(sheet, "sheet_state", "visible"),
-            "freeze_panes": self._extract_freeze_panes(sheet),
-            "page_setup": self._extract_page_setup(sheet),
-            "page_margins": self._extract_page_margins(sheet),
-            "row_dimensions": self._extract_row_dimensions(sheet),
-            "column_dimensions": self._extract_column_dimensions(sheet),
-            "merged_cells": [str(r) for r in sheet.merged_cells.ranges],
-            "cells": [],
-            "data_validations": self._extract_data_validations(sheet),
-            "conditional_formatting": self._extract_conditional_formatting(sheet),
-            "tables": self._extract_tables(sheet),
-            "images": [],
-        }
+        sheet_data, assets = self._extract_sheet_layout(sheet)
         
         # Extrair células (PRESERVAR ORDEM VERTICAL)
         # Usar ._cells.values() para obter células que foram modificadas
@@ -162,6 +370,26 @@ class TemplateSnapshotService:
                         self._has_style(cell)):
                         sheet_data["cells"].append(self._extract_cell(cell))
         
+        return sheet_data, assets
+
+    def _extract_sheet_layout(self, sheet: Worksheet) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Tudo da sheet exceto as células (cells fica vazio)"""
+        sheet_data = {
+            "name": sheet.title,
+            "sheet_state": getattr(sheet, "sheet_state", "visible"),
+            "freeze_panes": self._extract_freeze_panes(sheet),
+            "page_setup": self._extract_page_setup(sheet),
+            "page_margins": self._extract_page_margins(sheet),
+            "row_dimensions": self._extract_row_dimensions(sheet),
+            "column_dimensions": self._extract_column_dimensions(sheet),
+            "merged_cells": [str(r) for r in sheet.merged_cells.ranges],
+            "cells": [],
+            "data_validations": self._extract_data_validations(sheet),
+            "conditional_formatting": self._extract_conditional_formatting(sheet),
+            "tables": self._extract_tables(sheet),
+            "images": [],
+        }
+        
         # Extrair imagens
         assets = []
         if hasattr(sheet, "_images") and sheet._images:
@@ -206,21 +434,34 @@ class TemplateSnapshotService:
         except Exception:
             return False
 
-    def _extract_cell(self, cell) -> Dict[str, Any]:
-        """Extrai dados completos de uma célula"""
-        return {
+    def _extract_cell(self, cell, style_id: Optional[int] = None, links=None) -> Dict[str, Any]:
+        """
+        Extrai dados completos de uma célula
+        
+        Args:
+            style_id: id na tabela de estilos (modo streaming); None = estilo inline
+            links: célula de onde ler hyperlink/comentário (ReadOnlyCell não tem)
+        """
+        hyperlink = getattr(links if links is not None else cell, "hyperlink", None)
+        comment = getattr(links if links is not None else cell, "comment", None)
+        value = cell.value
+        data = {
             "coordinate": cell.coordinate,
             "row": cell.row,
             "column": cell.column,
             "column_letter": get_column_letter(cell.column),
-            "value": self._serialize_value(cell.value),
+            "value": self._serialize_value(value),
             "data_type": cell.data_type,
-            "formula": cell.value if isinstance(cell.value, str) and cell.value.startswith("=") else None,
+            "formula": value if isinstance(value, str) and value.startswith("=") else None,
             "number_format": cell.number_format,
-            "hyperlink": str(cell.hyperlink.target) if cell.hyperlink else None,
-            "comment": cell.comment.text if cell.comment else None,
-            "style": self._extract_cell_style(cell),
+            "hyperlink": str(hyperlink.target) if hyperlink else None,
+            "comment": comment.text if comment else None,
         }
+        if style_id is None:
+            data["style"] = self._extract_cell_style(cell)
+        else:
+            data["style_id"] = style_id
+        return data
 
     def _extract_cell_style(self, cell) -> Dict[str, Any]:
         """Extrai estilo completo da célula"""
@@ -395,11 +636,26 @@ class TemplateSnapshotService:
         return {
             "sheet_name": sheet_name,
             "index": index,
-            "anchor": str(img.anchor) if hasattr(img, "anchor") else None,
+            "anchor": self._serialize_anchor(img.anchor) if hasattr(img, "anchor") else None,
             "format": img.format if hasattr(img, "format") else None,
             "binary": img._data() if hasattr(img, "_data") else None,
         }
 
+    def _serialize_anchor(self, anchor: Any) -> Optional[str]:
+        """
+        Serializa âncora de imagem.
+
+        O repr() de OneCellAnchor/TwoCellAnchor quebra no openpyxl 3.1.2
+        (TypeError em __attrs__ + __elements__); nesse caso usa a célula de origem.
+        """
+        try:
+            return str(anchor)
+        except TypeError:
+            origin = getattr(anchor, "_from", None)
+            if origin is None:
+                return None
+            return f"{get_column_letter(origin.col + 1)}{origin.row + 1}"
+
     def _serialize_value(self, value: Any) -> Any:
         """Serializa valor para JSON"""
         if value is None:
@@ -494,16 +750,24 @@ class TemplateSnapshotService:
                     cell_required_keys = [
                         "coordinate", "row", "column", "column_letter",
                         "value", "data_type", "formula", "number_format",
-                        "hyperlink", "comment", "style"
+                        "hyperlink", "comment"
                     ]
                     
                     for key in cell_required_keys:
                         if key not in sample_cell:
                             errors.append(f"Sheet '{sheet_name}': célula sem campo '{key}'")
                     
-                    # Validar estilo completo
-                    if "style" in sample_cell and isinstance(sample_cell["style"], dict):
+                    # Estilo inline ou referência à tabela de estilos (modo streaming)
+                    if "style" in sample_cell:
                         style = sample_cell["style"]
+                    elif "style_id" in sample_cell:
+                        style = cell_style(sample_cell, snapshot.get("styles")) or None
+                    else:
+                        style = None
+                        errors.append(f"Sheet '{sheet_name}': célula sem campo 'style'")
+                    
+                    # Validar estilo completo
+                    if isinstance(style, dict):
                         style_keys = ["font", "fill", "border", "alignment", "protection"]
                         for key in style_keys:
                             if key not in style:
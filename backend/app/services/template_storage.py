@@ -12,7 +12,7 @@ ESTRUTURA:
     {cycle}/
       {hash}/
         original.xlsx
-        template.snapshot.json.gz
+        template.snapshot.{encoding}.{compression}   (ex.: .json.gz, .msgpack.zst)
         assets/
           image_0.png
           image_1.png
@@ -20,33 +20,46 @@ ESTRUTURA:
 
 GARANTIAS:
 - Idempotência por hash SHA-256
-- Compressão gzip de snapshots
+- Snapshots no formato colunar v2 (snapshot_format.py), codificados e
+  comprimidos em streaming (snapshot_codec.py); snapshots antigos
+  (dicts, .json.gz) continuam legíveis
+- Leituras de snapshot passam pelo LRU por hash (snapshot_cache.py)
 - Manifesto de assets
 - Paths absolutos retornados
 """
 
 from __future__ import annotations
 import os
-import gzip
 import json
 import hashlib
 import logging
+import re
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from app.services.snapshot_cache import PARSED_OVERHEAD, get_snapshot_cache
+from app.services.snapshot_codec import (
+    SnapshotCodec, decode_snapshot, decompress, resolve_codec, write_snapshot
+)
+from app.services.snapshot_format import from_columnar, is_columnar, to_columnar
+
 logger = logging.getLogger(__name__)
 
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
 
 class TemplateStorageService:
     """
     Serviço de armazenamento de templates
     """
     
-    def __init__(self, base_path: Optional[str] = None):
+    def __init__(self, base_path: Optional[str] = None, codec: Optional[SnapshotCodec] = None):
         """
         Args:
             base_path: Caminho base para storage. Se None, usa env ou default.
+            codec: Encoding/compressão dos snapshots. Se None, usa env (resolve_codec).
         """
+        self.codec = codec or resolve_codec()
         if base_path:
             self.base_path = Path(base_path)
         else:
@@ -71,6 +84,7 @@ class TemplateStorageService:
         assets: List[Dict[str, Any]],
         template_key: str,
         cycle: str,
+        file_hash: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Salva template completo com versionamento por hash
@@ -82,6 +96,7 @@ class TemplateStorageService:
             assets: Lista de assets (imagens)
             template_key: Chave do template
             cycle: Cycle FCJ
+            file_hash: SHA-256 já calculado pelo chamador (senão é calculado aqui)
             
         Returns:
             Dict com:
@@ -89,8 +104,8 @@ class TemplateStorageService:
             - hash: SHA-256 do arquivo
             - size: Tamanho em bytes
         """
-        # Computar hash
-        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        # Computar hash (upload já traz o SHA-256 calculado durante a leitura)
+        file_hash = file_hash or hashlib.sha256(file_bytes).hexdigest()
         
         # Estrutura de diretórios
         version_dir = self.base_path / template_key / cycle / file_hash
@@ -101,10 +116,10 @@ class TemplateStorageService:
         with open(original_path, "wb") as f:
             f.write(file_bytes)
         
-        # 2. Salvar snapshot compactado
-        snapshot_path = version_dir / "template.snapshot.json.gz"
-        with gzip.open(snapshot_path, "wt", encoding="utf-8") as f:
-            json.dump(snapshot_dict, f, indent=2, ensure_ascii=False)
+        # 2. Salvar snapshot compactado (colunar v2, escrito em streaming)
+        snapshot_path = version_dir / f"template.snapshot{self.codec.suffix}"
+        write_snapshot(to_columnar(snapshot_dict), snapshot_path, self.codec)
+        get_snapshot_cache().invalidate(file_hash)
         
         # 3. Salvar assets
         assets_dir = version_dir / "assets"
@@ -159,18 +174,78 @@ class TemplateStorageService:
             "assets_count": len(assets_manifest),
         }
 
-    def load_snapshot(self, snapshot_path: str) -> Dict[str, Any]:
+    def load_snapshot(
+        self,
+        snapshot_path: str,
+        columnar: bool = False,
+        file_hash: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
-        Carrega snapshot descompactado
+        Carrega snapshot descompactado (aceita formato em dicts e colunar v2,
+        qualquer codec de snapshot_codec)
         
         Args:
-            snapshot_path: Caminho absoluto do snapshot.json.gz
+            snapshot_path: Caminho absoluto do snapshot
+            columnar: Retorna no formato colunar v2 em vez de dicts por célula
+            file_hash: SHA-256 do template (chave do cache). Se None, usa o
+                diretório da versão quando ele é um hash
             
         Returns:
-            Snapshot dict
+            Snapshot dict (compartilhado pelo cache: não modificar)
+        """
+        def load():
+            data = Path(snapshot_path).read_bytes()
+            payload = decompress(data)
+            snapshot = decode_snapshot(payload)
+            snapshot = to_columnar(snapshot) if columnar else from_columnar(snapshot)
+            return snapshot, len(payload) * PARSED_OVERHEAD
+
+        cache_hash = self._cache_hash(snapshot_path, file_hash)
+        if cache_hash is None:
+            return load()[0]
+        return get_snapshot_cache().get_or_load(cache_hash, "columnar" if columnar else "cells", load)
+
+    def load_snapshot_gzip(
+        self,
+        snapshot_path: str,
+        columnar: bool = False,
+        file_hash: Optional[str] = None,
+    ) -> bytes:
+        """
+        Snapshot como JSON compacto em gzip, pronto para resposta HTTP
+        (Content-Encoding: gzip)
+        
+        Snapshots colunares gravados em json+gzip são devolvidos como estão
+        no disco, sem decode/re-encode.
         """
-        with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
-            return json.load(f)
+        def load():
+            data = Path(snapshot_path).read_bytes()
+            payload = decompress(data)
+            snapshot = decode_snapshot(payload)
+            if (
+                columnar and is_columnar(snapshot)
+                and data[:2] == b"\x1f\x8b"
+                and payload.lstrip()[:1] == b"{"
+            ):
+                body = data
+            else:
+                snapshot = to_columnar(snapshot) if columnar else from_columnar(snapshot)
+                body = resolve_codec("json", "gzip").encode(snapshot)
+            return body, len(body)
+
+        cache_hash = self._cache_hash(snapshot_path, file_hash)
+        if cache_hash is None:
+            return load()[0]
+        return get_snapshot_cache().get_or_load(
+            cache_hash, "columnar.json.gz" if columnar else "cells.json.gz", load
+        )
+
+    @staticmethod
+    def _cache_hash(snapshot_path: str, file_hash: Optional[str]) -> Optional[str]:
+        if file_hash:
+            return file_hash
+        version = Path(snapshot_path).parent.name
+        return version if _SHA256_RE.match(version) else None
 
     def exists(self, template_key: str, cycle: str, file_hash: str) -> bool:
         """
@@ -11,7 +11,9 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "app"))
 
-from app.services.fillable_detector import FillableAreaDetector, FillableFieldCandidate
+from app.services.fillable_detector import (
+    FillableAreaDetector, FillableFieldCandidate, SheetIndex, ValidationIndex
+)
 
 
 class TestFillableDetection:
@@ -294,5 +296,59 @@ class TestFieldStability:
         assert dict1["field_id"] == dict2["field_id"]
 
 
+class TestSheetIndex:
+    """Testes dos índices por sheet (mesma semântica das buscas lineares)"""
+    
+    def _textual_match(self, rng, validations):
+        """Semântica original: primeira validation cujo sqref contém o texto"""
+        return next((dv.get("type") for dv in validations if dv.get("sqref") and rng in str(dv["sqref"])), None)
+    
+    def test_coordinate_lookup_keeps_first_cell(self):
+        index = SheetIndex([{"coordinate": "A1", "value": 1}, {"coordinate": "A1", "value": 2}], [])
+        assert index.get("A1")["value"] == 1
+        assert index.get("B2") is None
+    
+    def test_validation_index_matches_textual_semantics(self):
+        validations = [
+            {"sqref": "A10:B12 AB3", "type": "whole"},
+            {"sqref": "C1 A1", "type": "list"},
+            {"sqref": None, "type": "date"},
+        ]
+        index = ValidationIndex(validations)
+        
+        probes = ["A1", "A10", "B1", "B12", "B3", "AB3", "C1", "C2", "A10:B12", "B12 AB3", "B2"]
+        for rng in probes:
+            assert index.validation_type(rng) == self._textual_match(rng, validations), rng
+            assert index.has_validation(rng) == any(
+                dv.get("sqref") and rng in dv["sqref"] for dv in validations
+            ), rng
+    
+    def test_large_sheet_detection_is_linear(self):
+        """Sheet com muitas células não deve degradar quadraticamente"""
+        
+        class CountingCell(dict):
+            """Célula que conta os acessos via .get (trabalho por célula)"""
+            reads = 0
+            
+            def get(self, *args):
+                CountingCell.reads += 1
+                return super().get(*args)
+        
+        def reads_per_cell(rows):
+            cells = []
+            for r in range(1, rows + 1):
+                cells.append(CountingCell(coordinate=f"A{r}", value=f"Pergunta {r}", style={}))
+                cells.append(CountingCell(coordinate=f"B{r}", value=None, style={}))
+            snapshot = {"sheets": [{"name": "Etapa", "cells": cells, "merged_cells": [],
+                                    "data_validations": [{"sqref": "B1:B5", "type": "list"}]}]}
+            CountingCell.reads = 0
+            candidates = FillableAreaDetector().detect(snapshot)
+            assert len(candidates) == rows * 2
+            return CountingCell.reads / len(cells)
+        
+        # 10x células: trabalho por célula constante (busca linear cresceria 10x)
+        assert reads_per_cell(5000) <= reads_per_cell(500) * 1.5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
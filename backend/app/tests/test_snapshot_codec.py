@@ -0,0 +1,117 @@
+"""
+Testes do codec de snapshots (encoding binário + compressão)
+============================================================
+
+Valida round trip, escrita em streaming, detecção automática do codec
+e leitura dos snapshots gzip JSON antigos
+"""
+
+import gzip
+import io
+import json
+
+import pytest
+
+from app.services import snapshot_codec
+from app.services.snapshot_codec import decode_snapshot, resolve_codec
+from app.services.snapshot_format import to_columnar
+from app.services.template_storage import TemplateStorageService
+
+
+def _snapshot(sheets=3):
+    cells = [
+        {
+            "coordinate": f"A{row}", "row": row, "column": 1, "column_letter": "A",
+            "value": f"Resposta {row}", "data_type": "s", "formula": None,
+            "number_format": "General", "hyperlink": None, "comment": None,
+            "style": {"font": {"name": "Arial", "size": 11.0, "bold": row % 2 == 0}},
+        }
+        for row in range(1, 200)
+    ]
+    return {
+        "schema_version": "2.0",
+        "workbook": {"sheetnames": [f"S{i}" for i in range(sheets)], "defined_names": {}},
+        "sheets": [{"name": f"S{i}", "merged_cells": ["B1:C2"], "cells": cells} for i in range(sheets)],
+    }
+
+
+class TestSnapshotCodec:
+    """Testes de SnapshotCodec / resolve_codec"""
+
+    def test_json_gzip_round_trip(self):
+        codec = resolve_codec("json", "gzip", level=1)
+        snapshot = to_columnar(_snapshot())
+
+        data = codec.encode(snapshot)
+
+        assert data.startswith(b"\x1f\x8b")
+        assert codec.suffix == ".json.gz"
+        assert decode_snapshot(data) == json.loads(json.dumps(snapshot))
+
+    def test_writes_in_chunks(self):
+        """Cada sheet vai para o compressor separadamente"""
+        codec = resolve_codec("json", "gzip")
+        chunks = []
+
+        class Recorder(io.BytesIO):
+            def write(self, data):
+                chunks.append(len(data))
+                return super().write(data)
+
+        raw_size = codec.write(_snapshot(sheets=5), Recorder())
+
+        expected = len(json.dumps(_snapshot(sheets=5), ensure_ascii=False, separators=(",", ":")).encode())
+        assert raw_size == expected
+        assert len(chunks) > 1
+
+    def test_reads_legacy_gzip_json(self):
+        snapshot = _snapshot()
+        buffer = io.BytesIO()
+        with gzip.open(buffer, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+        assert decode_snapshot(buffer.getvalue()) == snapshot
+
+    def test_unknown_codec(self):
+        with pytest.raises(ValueError):
+            resolve_codec("xml", "gzip")
+        with pytest.raises(ValueError):
+            resolve_codec("json", "brotli")
+
+    def test_missing_optional_dependency(self, monkeypatch):
+        monkeypatch.setattr(snapshot_codec, "msgpack", None)
+        monkeypatch.setattr(snapshot_codec, "zstandard", None)
+
+        with pytest.raises(ImportError):
+            resolve_codec("msgpack", "gzip")
+        with pytest.raises(ImportError):
+            resolve_codec("json", "zstd")
+        assert resolve_codec("auto", "auto").encoding == "json"
+
+    def test_level_from_env(self, monkeypatch):
+        monkeypatch.setattr(snapshot_codec, "SNAPSHOT_COMPRESSION_LEVEL", "9")
+        assert resolve_codec("json", "gzip").level == 9
+
+    @pytest.mark.parametrize("compression", ["zstd", "lz4", "gzip"])
+    def test_msgpack_round_trip(self, compression):
+        pytest.importorskip("msgpack")
+        if compression not in snapshot_codec.available_compressions():
+            pytest.skip(f"{compression} não instalado")
+
+        codec = resolve_codec("msgpack", compression)
+        snapshot = to_columnar(_snapshot())
+        assert decode_snapshot(codec.encode(snapshot)) == json.loads(json.dumps(snapshot))
+
+
+class TestStorageCodec:
+    """TemplateStorageService grava com o codec configurado"""
+
+    def test_save_uses_codec_suffix(self, tmp_path):
+        codec = resolve_codec("json", "gzip", level=1)
+        storage = TemplateStorageService(base_path=str(tmp_path), codec=codec)
+        snapshot = _snapshot()
+
+        result = storage.save("t.xlsx", b"PK", snapshot, [], "t", "2025")
+
+        assert result["paths"]["snapshot_path"].endswith("template.snapshot.json.gz")
+        assert storage.load_snapshot(result["paths"]["snapshot_path"]) == snapshot
@@ -17,7 +17,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "app"))
 from app.services.template_snapshot import (
     TemplateSnapshotService,
     validate_snapshot,
-    SnapshotValidationError
+    SnapshotValidationError,
+    cell_style,
+    resolve_styles,
 )
 
 
@@ -192,5 +194,81 @@ class TestSnapshotStats:
         assert stats["total_merged"] >= 1
 
 
+def _rich_workbook_bytes() -> bytes:
+    from openpyxl.comments import Comment
+    from openpyxl.styles import Border, Side
+    from openpyxl.worksheet.datavalidation import DataValidation
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Persona"
+    thin = Side(style="thin", color="FF000000")
+    ws["A1"] = "Título"
+    ws["A1"].font = Font(bold=True, size=16)
+    ws["A1"].fill = PatternFill("solid", fgColor="FF06B3C4")
+    ws["B3"] = "Nome:"
+    ws["C3"].border = Border(left=thin, top=thin)
+    ws["E4"].border = Border(right=thin, bottom=thin)
+    ws.merge_cells("C3:E4")
+    ws["A6"] = "Site"
+    ws["A6"].hyperlink = "https://example.com"
+    ws["B6"].comment = Comment("Preencha aqui", "FCJ")
+    ws.row_dimensions[2].height = 30
+    ws.column_dimensions["B"].width = 25
+    for row in range(10, 60):
+        ws.cell(row, 2, f"Resposta {row}").fill = PatternFill("solid", fgColor="FFFFF2CC")
+    dv = DataValidation(type="list", formula1='"Sim,Não"')
+    ws.add_data_validation(dv)
+    dv.add("D10:D20")
+
+    ws2 = wb.create_sheet("Mapa")
+    ws2["A1"] = "=SUM(1,2)"
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+class TestStreamingSnapshot:
+    """Testes do modo streaming (read_only + tabela de estilos)"""
+
+    def test_matches_classic_extraction(self):
+        """Com os estilos resolvidos, o snapshot é idêntico ao modo clássico"""
+        file_bytes = _rich_workbook_bytes()
+        service = TemplateSnapshotService()
+        classic, classic_assets = service.extract(file_bytes, streaming=False)
+        streamed, streamed_assets = service.extract(file_bytes, streaming=True)
+
+        assert "styles" in streamed
+        assert resolve_styles(streamed) == classic
+        assert len(streamed_assets) == len(classic_assets)
+
+    def test_cells_reference_style_table(self):
+        streamed, _ = TemplateSnapshotService().extract(_rich_workbook_bytes(), streaming=True)
+        cells = streamed["sheets"][0]["cells"]
+
+        assert all("style" not in c and "style_id" in c for c in cells)
+        answers = [c for c in cells if str(c["value"]).startswith("Resposta")]
+        assert len({c["style_id"] for c in answers}) == 1
+        assert len(streamed["styles"]) < len(cells)
+
+        title = next(c for c in cells if c["coordinate"] == "A1")
+        assert cell_style(title, streamed["styles"])["font"]["bold"] is True
+
+    def test_streaming_snapshot_is_valid(self):
+        streamed, _ = TemplateSnapshotService().extract(_rich_workbook_bytes(), streaming=True)
+        assert validate_snapshot(streamed)["valid"] is True
+
+        broken = {**streamed, "styles": []}
+        assert validate_snapshot(broken)["valid"] is False
+
+    def test_auto_mode_uses_size_threshold(self, monkeypatch):
+        from app.services import template_snapshot
+
+        monkeypatch.setattr(template_snapshot, "STREAMING_MIN_BYTES", 1)
+        snapshot, _ = TemplateSnapshotService().extract(_rich_workbook_bytes())
+        assert "styles" in snapshot
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+Testes do formato colunar de snapshot (v2)
+==========================================
+
+Valida conversão sem perda e leitura dos dois formatos no storage
+"""
+
+import gzip
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill
+
+from app.services.snapshot_format import (
+    COLUMNAR_FORMAT_VERSION,
+    from_columnar,
+    is_columnar,
+    to_columnar,
+)
+from app.services.template_snapshot import TemplateSnapshotService
+from app.services.template_storage import TemplateStorageService
+
+
+@pytest.fixture(scope="module")
+def workbook_bytes():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Persona"
+    ws["A1"] = "Título"
+    ws["A1"].font = Font(bold=True, size=16)
+    ws["A2"] = "=SUM(1,2)"
+    ws["A3"] = "Site"
+    ws["A3"].hyperlink = "https://example.com"
+    ws.merge_cells("B5:D6")
+    for row in range(10, 40):
+        ws.cell(row, 2, f"Resposta {row}").fill = PatternFill("solid", fgColor="FFFFF2CC")
+    wb.create_sheet("Mapa")["A1"] = "Mapa de Empatia"
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+class TestColumnarConversion:
+    """Testes de to_columnar/from_columnar"""
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_round_trip_is_lossless(self, workbook_bytes, streaming):
+        snapshot, _ = TemplateSnapshotService().extract(workbook_bytes, streaming=streaming)
+        columnar = json.loads(json.dumps(to_columnar(snapshot)))
+
+        assert is_columnar(columnar)
+        assert columnar["snapshot_format"] == COLUMNAR_FORMAT_VERSION
+        assert from_columnar(columnar) == snapshot
+
+    def test_styles_are_interned(self, workbook_bytes):
+        snapshot, _ = TemplateSnapshotService().extract(workbook_bytes, streaming=False)
+        columnar = to_columnar(snapshot)
+        columns = columnar["sheets"][0]["cell_columns"]
+
+        assert columnar["style_source"] == "inline"
+        assert len(columnar["styles"]) < len(columns["row"])
+        assert "cells" not in columnar["sheets"][0]
+        assert columns["hyperlinks"] == [[columns["row"].index(3), "https://example.com"]]
+
+    def test_nonstandard_cells_are_kept_verbatim(self):
+        snapshot = {
+            "schema_version": "2.0",
+            "workbook": {},
+            "sheets": [{"name": "S", "cells": [
+                {"coordinate": "A1", "row": 1, "column": 1, "value": "x", "extra": True},
+            ]}],
+        }
+        columnar = to_columnar(snapshot)
+
+        assert columnar["sheets"][0]["cell_columns"]["raw"]
+        assert from_columnar(columnar) == snapshot
+
+    def test_dict_snapshots_pass_through(self):
+        snapshot = {"schema_version": "2.0", "sheets": []}
+        assert from_columnar(snapshot) is snapshot
+        assert to_columnar(to_columnar(snapshot))["snapshot_format"] == COLUMNAR_FORMAT_VERSION
+
+
+class TestStorageFormats:
+    """TemplateStorageService grava v2 e lê os dois formatos"""
+
+    def test_save_writes_columnar(self, tmp_path, workbook_bytes):
+        storage = TemplateStorageService(base_path=str(tmp_path))
+        snapshot, assets = TemplateSnapshotService().extract(workbook_bytes, streaming=False)
+        result = storage.save("t.xlsx", workbook_bytes, snapshot, assets, "t", "2025")
+
+        with gzip.open(result["paths"]["snapshot_path"], "rt", encoding="utf-8") as f:
+            assert is_columnar(json.load(f))
+
+        assert storage.load_snapshot(result["paths"]["snapshot_path"]) == snapshot
+        assert is_columnar(storage.load_snapshot(result["paths"]["snapshot_path"], columnar=True))
+
+    def test_loads_legacy_dict_snapshot(self, tmp_path, workbook_bytes):
+        snapshot, _ = TemplateSnapshotService().extract(workbook_bytes, streaming=False)
+        path = tmp_path / "template.snapshot.json.gz"
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+
+        storage = TemplateStorageService(base_path=str(tmp_path))
+        assert storage.load_snapshot(str(path)) == snapshot
+        assert from_columnar(storage.load_snapshot(str(path), columnar=True)) == snapshot
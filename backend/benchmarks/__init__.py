@@ -0,0 +1,7 @@
+# backend/benchmarks/__init__.py
+"""
+Micro-benchmarks dos hot paths de processamento XLSX
+
+    cd backend
+    python -m benchmarks.suite --help
+"""
@@ -0,0 +1,129 @@
+# backend/benchmarks/snapshot_codecs.py
+"""
+Comparação dos codecs de snapshot contra o formato gravado antes
+
+- legacy:  snapshot em dicts, json.dump(indent=2) em gzip.open (nível 9)
+- demais:  formato colunar v2 + cada combinação encoding/compressão
+           disponível (snapshot_codec), no nível default
+
+Mede tamanho em disco, tempo de encode (serialização + compressão) e de
+decode (descompressão + parse), melhor de `repeat`. Uso:
+
+    cd backend
+    python -m benchmarks.snapshot_codecs                # Template Q1 + 10k células
+    python -m benchmarks.snapshot_codecs --sizes 100000 --no-q1
+"""
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import workbooks
+from benchmarks.suite import Q1_TEMPLATE
+
+
+def _best(fn: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best, 5), result
+
+
+def _legacy_encode(snapshot: Dict) -> bytes:
+    buffer = io.BytesIO()
+    with gzip.open(buffer, "wt", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2, ensure_ascii=False)
+    return buffer.getvalue()
+
+
+def _legacy_decode(data: bytes) -> Dict:
+    with gzip.open(io.BytesIO(data), "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_codecs(snapshot: Dict, repeat: int = 3) -> Dict[str, Dict]:
+    """
+    Returns:
+        {nome: {"size_bytes", "encode_s", "decode_s", "size_ratio"}}
+        (size_ratio relativo ao legacy; decode do formato colunar inclui
+        a volta para dicts)
+    """
+    from app.services.snapshot_codec import (
+        available_compressions, available_encodings, decode_snapshot, resolve_codec
+    )
+    from app.services.snapshot_format import from_columnar, to_columnar
+
+    results: Dict[str, Dict] = {}
+
+    encode_s, data = _best(lambda: _legacy_encode(snapshot), repeat)
+    decode_s, _ = _best(lambda: _legacy_decode(data), repeat)
+    results["legacy"] = {"size_bytes": len(data), "encode_s": encode_s, "decode_s": decode_s}
+
+    for encoding in available_encodings():
+        for compression in available_compressions():
+            codec = resolve_codec(encoding, compression)
+            encode_s, data = _best(lambda: codec.encode(to_columnar(snapshot)), repeat)
+            decode_s, _ = _best(lambda: from_columnar(decode_snapshot(data)), repeat)
+            name = f"{encoding}+{compression}:{codec.level}"
+            results[name] = {"size_bytes": len(data), "encode_s": encode_s, "decode_s": decode_s}
+
+    legacy_size = results["legacy"]["size_bytes"]
+    for entry in results.values():
+        entry["size_ratio"] = round(entry["size_bytes"] / legacy_size, 4)
+    return results
+
+
+def _snapshots(sizes: List[int], include_q1: bool) -> List[Tuple[str, Dict]]:
+    from app.services.template_snapshot import TemplateSnapshotService
+
+    inputs = [(f"{size}", workbooks.generate_workbook(size)) for size in sizes]
+    if include_q1 and Q1_TEMPLATE.exists():
+        inputs.append(("q1", Q1_TEMPLATE.read_bytes()))
+    return [
+        (label, TemplateSnapshotService().extract(file_bytes, streaming=False)[0])
+        for label, file_bytes in inputs
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara codecs de snapshot")
+    parser.add_argument("--sizes", default="10000", help="Tamanhos (células) separados por vírgula")
+    parser.add_argument("--no-q1", action="store_true", help="Não incluir Template Q1.xlsx")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Grava o relatório JSON neste caminho")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.ERROR)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print("🗜️  Codecs de snapshot")
+    report = {}
+    for label, snapshot in _snapshots(sizes, include_q1=not args.no_q1):
+        report[label] = compare_codecs(snapshot, args.repeat)
+        for name, entry in report[label].items():
+            print(
+                f"  {label:>7}  {name:<16} {entry['size_bytes'] / 1024:>9.1f} KB "
+                f"({entry['size_ratio']:>6.1%})  encode {entry['encode_s']:.4f}s  "
+                f"decode {entry['decode_s']:.4f}s"
+            )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
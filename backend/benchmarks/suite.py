@@ -0,0 +1,336 @@
+# backend/benchmarks/suite.py
+"""
+Micro-benchmarks dos hot paths de XLSX
+
+Estágios medidos (tempo e pico de memória via tracemalloc):
+- snapshot:   TemplateSnapshotService.extract (modo clássico)
+- snapshot_stream: TemplateSnapshotService.extract (modo streaming)
+- detect:     FillableAreaDetector.detect
+- questions:  QuestionExtractor.extract
+- positions:  ExcelTemplateParser.get_cell_position (amostra de células)
+- export:     TemplateDataService.export_to_excel (openpyxl)
+- export_patch: TemplateDataService.export_to_excel (patch via template pool)
+
+Entradas: workbooks gerados (100 → 100k células) e o `Template Q1.xlsx`.
+
+Os tempos são normalizados por uma calibração de CPU (workload fixo em
+Python puro), então o baseline pode ser comparado entre máquinas com
+alguma tolerância. Uso:
+
+    cd backend
+    python -m benchmarks.suite                         # compara com baseline.json
+    python -m benchmarks.suite --sizes 100,1000 --update-baseline
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks import workbooks
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+Q1_TEMPLATE = BACKEND_DIR.parent / "Template Q1.xlsx"
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000]
+STAGES = ["snapshot", "snapshot_stream", "detect", "questions", "positions", "export", "export_patch"]
+
+# Amostra de células para get_cell_position (o custo cresce com linha/coluna)
+MAX_POSITIONS = 2_000
+
+# Regressões abaixo destes valores absolutos são ruído
+MIN_TIME_DELTA_S = 0.005
+MIN_MEMORY_DELTA_MB = 1.0
+
+
+# ======================================================
+# Medição
+# ======================================================
+def calibrate() -> float:
+    """Workload fixo em Python puro; usado para normalizar tempos entre máquinas."""
+    rng = random.Random(1234)
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        data = [rng.random() for _ in range(200_000)]
+        data.sort()
+        index = {f"k{i}": v for i, v in enumerate(data[:50_000])}
+        sum(index[f"k{i}"] for i in range(0, 50_000, 3))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(fn: Callable[[], object], repeat: int = 1) -> Tuple[Dict, object]:
+    """
+    Mede tempo (melhor de `repeat`) e pico de memória (execução separada).
+
+    Returns:
+        ({"time_s", "peak_mb"}, resultado da última execução)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"time_s": round(best, 5), "peak_mb": round(peak / (1024 * 1024), 2)}, result
+
+
+# ======================================================
+# Estágios
+# ======================================================
+def _sample(items: List[str], limit: int) -> List[str]:
+    if len(items) <= limit:
+        return items
+    step = len(items) / limit
+    return [items[int(i * step)] for i in range(limit)]
+
+
+def bench_workbook(label: str, file_bytes: bytes, sheet_name: Optional[str],
+                   fields: Dict[str, str], coordinates: List[str],
+                   stages: List[str], repeat: int, workdir: Path) -> Dict[str, Dict]:
+    from app.services.fillable_detector import FillableAreaDetector
+    from app.services.question_extractor import QuestionExtractor
+    from app.services.template_snapshot import TemplateSnapshotService
+    from services.excel_template_parser import ExcelTemplateParser, FieldMetadata, FieldType, TemplateSchema
+    from services.template_manager import TemplateDataService
+
+    results: Dict[str, Dict] = {}
+    xlsx_path = workdir / f"{label}.xlsx"
+    xlsx_path.write_bytes(file_bytes)
+
+    stats, (snapshot, _assets) = measure(
+        lambda: TemplateSnapshotService().extract(file_bytes, streaming=False), repeat
+    )
+    if "snapshot" in stages:
+        results["snapshot"] = stats
+
+    if "snapshot_stream" in stages:
+        results["snapshot_stream"], _ = measure(
+            lambda: TemplateSnapshotService().extract(file_bytes, streaming=True), repeat
+        )
+
+    if "detect" in stages:
+        results["detect"], _ = measure(lambda: FillableAreaDetector().detect(snapshot), repeat)
+
+    if "questions" in stages:
+        def questions():
+            # O extractor é estrito (ValueError em abas sem perguntas, ex.: diagramas
+            # do Q1); por aba, para medir o custo de todas as abas mesmo assim.
+            extracted = []
+            for sheet in snapshot["sheets"]:
+                try:
+                    extracted.extend(QuestionExtractor().extract({**snapshot, "sheets": [sheet]})[0])
+                except ValueError:
+                    pass
+            return extracted
+
+        results["questions"], _ = measure(questions, repeat)
+
+    sheet_name = sheet_name or snapshot["sheets"][0]["name"]
+
+    if "positions" in stages:
+        parser = ExcelTemplateParser(xlsx_path)
+        worksheet = parser.workbook[sheet_name]
+        sample = _sample(coordinates, MAX_POSITIONS)
+
+        def positions():
+            parser._column_width_cache.clear()
+            parser._row_height_cache.clear()
+            parser._geometries.clear()
+            return [parser.get_cell_position(worksheet, coord) for coord in sample]
+
+        results["positions"], _ = measure(positions, repeat)
+        parser.close()
+
+    if ("export" in stages or "export_patch" in stages) and fields:
+        service = TemplateDataService(data_dir=workdir / "data")
+        service.schemas_dir = workdir / "schemas"
+        service.schemas_dir.mkdir(parents=True, exist_ok=True)
+        service.save_schema(TemplateSchema(
+            template_key=label,
+            sheet_name=sheet_name,
+            sheet_width=0,
+            sheet_height=0,
+            fields=[FieldMetadata(key=k, cell=c, type=FieldType.TEXT) for k, c in fields.items()],
+        ))
+        service.save_template_data("bench", label, {k: f"Resposta {k}" for k in fields})
+
+        for stage, use_pool in (("export", False), ("export_patch", True)):
+            if stage in stages:
+                results[stage], _ = measure(
+                    lambda: service.export_to_excel(
+                        "bench", label, xlsx_path, workdir / f"{label}.out.xlsx",
+                        use_template_pool=use_pool,
+                    ),
+                    repeat,
+                )
+
+    return results
+
+
+def run_suite(sizes: List[int], stages: List[str], include_q1: bool = True,
+              repeat: int = 3) -> Dict:
+    report = {
+        "calibration_s": round(calibrate(), 5),
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "node": platform.node(),
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="tr4ction-bench-") as tmp:
+        workdir = Path(tmp)
+
+        for size in sizes:
+            file_bytes = workbooks.generate_workbook(size)
+            stage_results = bench_workbook(
+                label=f"synthetic_{size}",
+                file_bytes=file_bytes,
+                sheet_name="Etapa 1",
+                fields=workbooks.answer_cells(size),
+                coordinates=workbooks.all_coordinates(size),
+                stages=stages,
+                # workbooks grandes: uma execução basta (e economiza minutos)
+                repeat=repeat if size <= 10_000 else 1,
+                workdir=workdir,
+            )
+            for stage, stats in stage_results.items():
+                report["results"][f"{stage}@{size}"] = stats
+                print(f"  {stage:<10} {size:>7} células  {stats['time_s']:>9.4f}s  {stats['peak_mb']:>8.2f} MB")
+
+        if include_q1 and Q1_TEMPLATE.exists():
+            from openpyxl import load_workbook
+
+            wb = load_workbook(Q1_TEMPLATE, read_only=True)
+            first_sheet = wb.sheetnames[0]
+            wb.close()
+
+            stage_results = bench_workbook(
+                label="q1",
+                file_bytes=Q1_TEMPLATE.read_bytes(),
+                sheet_name=first_sheet,
+                fields={},
+                coordinates=[f"{c}{r}" for r in range(1, 200, 7) for c in "ABCDEFGHIJKLMNOP"],
+                stages=[s for s in stages if not s.startswith("export")],
+                repeat=repeat,
+                workdir=workdir,
+            )
+            for stage, stats in stage_results.items():
+                report["results"][f"{stage}@q1"] = stats
+                print(f"  {stage:<10} {'Q1':>7}          {stats['time_s']:>9.4f}s  {stats['peak_mb']:>8.2f} MB")
+
+    return report
+
+
+# ======================================================
+# Comparação com baseline
+# ======================================================
+def compare(current: Dict, baseline: Dict, time_threshold: float = 0.5,
+            memory_threshold: float = 0.25) -> List[str]:
+    """
+    Compara com o baseline; retorna a lista de regressões (vazia = OK).
+
+    Tempos do baseline são escalados pela razão entre as calibrações.
+    """
+    scale = 1.0
+    if baseline.get("calibration_s") and current.get("calibration_s"):
+        scale = current["calibration_s"] / baseline["calibration_s"]
+
+    regressions = []
+    for key, base in baseline.get("results", {}).items():
+        cur = current.get("results", {}).get(key)
+        if cur is None:
+            continue
+
+        allowed_time = base["time_s"] * scale * (1 + time_threshold)
+        if cur["time_s"] > allowed_time and cur["time_s"] - base["time_s"] * scale > MIN_TIME_DELTA_S:
+            regressions.append(
+                f"{key}: tempo {cur['time_s']:.4f}s > {allowed_time:.4f}s "
+                f"(baseline {base['time_s']:.4f}s × escala {scale:.2f})"
+            )
+
+        allowed_mem = base["peak_mb"] * (1 + memory_threshold)
+        if cur["peak_mb"] > allowed_mem and cur["peak_mb"] - base["peak_mb"] > MIN_MEMORY_DELTA_MB:
+            regressions.append(f"{key}: memória {cur['peak_mb']:.2f}MB > {allowed_mem:.2f}MB")
+
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[Dict]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos hot paths de XLSX")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Tamanhos (células) separados por vírgula")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-q1", action="store_true", help="Não incluir Template Q1.xlsx")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Grava o relatório JSON neste caminho")
+    parser.add_argument("--time-threshold", type=float, default=0.5)
+    parser.add_argument("--memory-threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.ERROR)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    stages = [s for s in args.stages.split(",") if s in STAGES]
+
+    print("⏱️  Benchmarks XLSX")
+    report = run_suite(sizes, stages, include_q1=not args.no_q1, repeat=args.repeat)
+    print(f"  calibração: {report['calibration_s']:.4f}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"💾 Baseline atualizado: {baseline_path}")
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    if baseline is None:
+        print("⚠️  Sem baseline para comparar (use --update-baseline)")
+        return 0
+
+    regressions = compare(report, baseline, args.time_threshold, args.memory_threshold)
+    if regressions:
+        print("❌ Regressões:")
+        for line in regressions:
+            print(f"   - {line}")
+        return 1
+
+    print("✅ Dentro do baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
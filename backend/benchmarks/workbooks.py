@@ -0,0 +1,131 @@
+# backend/benchmarks/workbooks.py
+"""
+Gerador de workbooks sintéticos para benchmarks
+
+Reproduz a estrutura dos templates FCJ: seções coloridas, perguntas em
+negrito, blocos de resposta mesclados com borda e validações de lista.
+O tamanho é controlado pelo número aproximado de células com conteúdo
+ou estilo.
+"""
+
+import io
+from typing import Dict, List
+
+from openpyxl import Workbook
+from openpyxl.styles import Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+# Cada bloco ocupa 4 linhas × BLOCK_WIDTH colunas:
+#   linha 1: pergunta (negrito)
+#   linha 2-3: resposta mesclada (borda + preenchimento)
+#   linha 4: exemplo
+BLOCK_ROWS = 4
+BLOCK_WIDTH = 4
+BLOCKS_PER_ROW = 5
+
+_THIN = Side(style="thin")
+_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+_ANSWER_FILL = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
+_SECTION_FILL = PatternFill(start_color="1F4E78", end_color="1F4E78", fill_type="solid")
+
+QUESTIONS = [
+    "Qual é o perfil do cliente ideal?",
+    "Descreva a principal dor do cliente",
+    "Quais canais de aquisição você usa?",
+    "Como você mede o sucesso?",
+    "Liste seus principais concorrentes",
+]
+
+
+def cells_per_block() -> int:
+    return BLOCK_ROWS * BLOCK_WIDTH
+
+
+def generate_workbook(target_cells: int, sheets: int = 1) -> bytes:
+    """
+    Gera um .xlsx com ~target_cells células (somando todas as abas).
+
+    Returns:
+        Conteúdo binário do arquivo
+    """
+    wb = Workbook()
+    wb.remove(wb.active)
+
+    per_sheet = max(cells_per_block(), target_cells // max(1, sheets))
+    for sheet_index in range(sheets):
+        _fill_sheet(wb.create_sheet(f"Etapa {sheet_index + 1}"), per_sheet)
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _fill_sheet(ws, target_cells: int) -> None:
+    blocks = max(1, target_cells // cells_per_block())
+    band_rows = BLOCK_ROWS + 1  # +1 linha de título de seção por faixa
+
+    choice_validation = DataValidation(type="list", formula1='"Sim,Não,Parcial"', allow_blank=True)
+    ws.add_data_validation(choice_validation)
+
+    for block in range(blocks):
+        band, slot = divmod(block, BLOCKS_PER_ROW)
+        top = band * band_rows + 1
+        left = slot * BLOCK_WIDTH + 1
+
+        if slot == 0:
+            section = ws.cell(row=top, column=1, value=f"Fase {band + 1} - Diagnóstico")
+            section.font = Font(bold=True, size=14, color="FFFFFF")
+            section.fill = _SECTION_FILL
+
+        question_row = top + 1
+        answer_row = top + 2
+        example_row = top + 4
+
+        question = ws.cell(row=question_row, column=left, value=QUESTIONS[block % len(QUESTIONS)])
+        question.font = Font(bold=True, size=11)
+
+        # Resposta: área mesclada com borda e preenchimento
+        for r in (answer_row, answer_row + 1):
+            for c in range(left, left + BLOCK_WIDTH):
+                cell = ws.cell(row=r, column=c)
+                cell.border = _BORDER
+                cell.fill = _ANSWER_FILL
+        answer_range = (
+            f"{get_column_letter(left)}{answer_row}:"
+            f"{get_column_letter(left + BLOCK_WIDTH - 1)}{answer_row + 1}"
+        )
+        ws.merge_cells(answer_range)
+
+        # Um a cada três blocos tem validação de lista
+        if block % 3 == 0:
+            choice_validation.add(answer_range)
+
+        for c in range(left, left + BLOCK_WIDTH - 1):
+            ws.cell(row=example_row, column=c).border = _BORDER
+        ws.cell(row=example_row, column=left + BLOCK_WIDTH - 1, value="Exemplo: varejo B2B")
+
+    for c in range(1, BLOCKS_PER_ROW * BLOCK_WIDTH + 1):
+        ws.column_dimensions[get_column_letter(c)].width = 12 + (c % 4)
+    for r in range(1, (blocks // BLOCKS_PER_ROW + 1) * band_rows + 1, 3):
+        ws.row_dimensions[r].height = 18
+
+
+def answer_cells(target_cells: int, sheet_name: str = "Etapa 1") -> Dict[str, str]:
+    """Coordenadas das células de resposta (canto superior esquerdo) → field_key."""
+    blocks = max(1, target_cells // cells_per_block())
+    fields: Dict[str, str] = {}
+    for block in range(blocks):
+        band, slot = divmod(block, BLOCKS_PER_ROW)
+        top = band * (BLOCK_ROWS + 1) + 1
+        left = slot * BLOCK_WIDTH + 1
+        fields[f"field_{block}"] = f"{get_column_letter(left)}{top + 2}"
+    return fields
+
+
+def all_coordinates(target_cells: int) -> List[str]:
+    """Todas as coordenadas da grade gerada (para get_cell_position)."""
+    blocks = max(1, target_cells // cells_per_block())
+    rows = (blocks // BLOCKS_PER_ROW + 1) * (BLOCK_ROWS + 1)
+    cols = min(blocks, BLOCKS_PER_ROW) * BLOCK_WIDTH
+    return [f"{get_column_letter(c)}{r}" for r in range(1, rows + 1) for c in range(1, cols + 1)]
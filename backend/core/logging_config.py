@@ -1,10 +1,41 @@
 # backend/core/logging_config.py
 
+import atexit
+import copy
 import logging
+import logging.handlers
 import json
-import sys
 import os
-from typing import Any, Dict
+import queue
+import random
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+# ======================================================
+# Configurações via ENV
+# ======================================================
+# LOG_ASYNC: escreve logs numa thread dedicada (QueueHandler/QueueListener)
+# LOG_BATCH_SIZE: máximo de registros por write() no stdout
+# LOG_FLUSH_INTERVAL: tempo máximo (s) que um registro fica no buffer
+# LOG_SAMPLE_RATE: fração de logs INFO/DEBUG mantidos nos loggers de alto volume
+# LOG_SAMPLED_LOGGERS: loggers sujeitos a sampling (separados por vírgula)
+DEFAULT_SAMPLED_LOGGERS = "tr4ction.middleware"
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    """Serializa JSON com orjson quando disponível (fallback: json)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass  # ex.: inteiros > 64 bits; cai no encoder padrão
+    return json.dumps(data, ensure_ascii=False, default=str)
 
 
 class JsonFormatter(logging.Formatter):
@@ -21,37 +52,198 @@ class JsonFormatter(logging.Formatter):
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             log_record.update(record.extra)
 
-        return json.dumps(log_record, ensure_ascii=False)
+        if hasattr(record, "sample_rate"):
+            log_record["sample_rate"] = record.sample_rate
+
+        return _dumps(log_record)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Mantém apenas uma fração dos logs INFO/DEBUG dos loggers de alto volume.
+
+    WARNING e acima nunca são descartados. Registros mantidos recebem
+    `sample_rate` para que contagens possam ser reescaladas na análise.
+    """
+
+    def __init__(self, rate: float, logger_names: Iterable[str]):
+        super().__init__()
+        self.rate = max(0.0, min(1.0, rate))
+        self.logger_names = tuple(name for name in logger_names if name)
+
+    def _is_sampled_logger(self, name: str) -> bool:
+        return any(
+            name == prefix or name.startswith(prefix + ".")
+            for prefix in self.logger_names
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if not self._is_sampled_logger(record.name):
+            return True
+        if random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler que agrupa registros formatados em um único write().
+
+    O buffer é descarregado quando atinge `batch_size`, em registros de
+    ERROR ou acima, ou quando o listener fica ocioso (ver AsyncLogListener).
+    """
+
+    def __init__(self, stream=None, batch_size: int = 100):
+        super().__init__(stream)
+        self.batch_size = max(1, batch_size)
+        self.buffer: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.buffer.append(self.format(record))
+            if len(self.buffer) >= self.batch_size or record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self.buffer and self.stream:
+                self.stream.write(self.terminator.join(self.buffer) + self.terminator)
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+        except (OSError, ValueError):
+            # stream fechado (ex.: shutdown do interpretador) - descarta o lote
+            pass
+        finally:
+            self.buffer.clear()
+            self.release()
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que só resolve a mensagem (%-args) na thread chamadora.
+
+    Serialização JSON, formatação de traceback e I/O ficam na thread do
+    listener. O registro é copiado para não alterar o original.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class AsyncLogListener(logging.handlers.QueueListener):
+    """
+    QueueListener que descarrega os handlers quando a fila esvazia ou após
+    `flush_interval` segundos sem novos registros.
+
+    Sob carga os registros se acumulam e são escritos em lote; com pouco
+    tráfego cada registro sai imediatamente.
+    """
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = 0.5):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def _flush_handlers(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def _monitor(self) -> None:
+        q = self.queue
+        has_task_done = hasattr(q, "task_done")
+        while True:
+            try:
+                record = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_handlers()
+                continue
+
+            if record is self._sentinel:
+                if has_task_done:
+                    q.task_done()
+                self._flush_handlers()
+                break
+
+            self.handle(record)
+            if has_task_done:
+                q.task_done()
+            if q.empty():
+                self._flush_handlers()
+
+
+_listener: Optional[AsyncLogListener] = None
+
+
+def shutdown_logging() -> None:
+    """Para o listener assíncrono e descarrega os logs pendentes."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
 
 
 def setup_logging(level: int = None) -> None:
     """
     Setup structured logging for the application.
-    
+
     Args:
         level: Optional log level. If not provided, reads from LOG_LEVEL env var.
                Defaults to INFO if neither is set.
     """
+    global _listener
+
     # Get log level from env if not provided
     if level is None:
         log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
         level = getattr(logging, log_level_str, logging.INFO)
-    
+
+    use_async = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    batch_size = int(os.getenv("LOG_BATCH_SIZE", "100"))
+    flush_interval = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+    sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    sampled_loggers = os.getenv("LOG_SAMPLED_LOGGERS", DEFAULT_SAMPLED_LOGGERS).split(",")
+
     root = logging.getLogger()
     root.setLevel(level)
 
-    # limpa handlers antigos
+    # limpa handlers antigos (e o listener de uma configuração anterior)
+    shutdown_logging()
     for h in list(root.handlers):
         root.removeHandler(h)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JsonFormatter())
+    sampling_filter = SamplingFilter(sample_rate, [name.strip() for name in sampled_loggers])
+
+    if use_async:
+        stream_handler = BatchingStreamHandler(sys.stdout, batch_size=batch_size)
+        stream_handler.setFormatter(JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        handler = AsyncQueueHandler(log_queue)
+        _listener = AsyncLogListener(log_queue, stream_handler, flush_interval=flush_interval)
+        _listener.start()
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+
+    # sampling na thread chamadora: registros descartados nem entram na fila
+    handler.addFilter(sampling_filter)
     root.addHandler(handler)
 
     # reduz ruído do uvicorn / fastapi
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
     logging.getLogger("uvicorn.error").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
-    
+
     # Log the configured level
-    root.info(f"Logging configured at level: {logging.getLevelName(level)}")
+    root.info("Logging configured at level: %s", logging.getLevelName(level))
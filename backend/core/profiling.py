@@ -0,0 +1,500 @@
+# backend/core/profiling.py
+"""
+Profiling em produção - Sampler estatístico + cProfile por requisição
+
+Dois modos, ambos restritos a administradores:
+
+1. Sampler estatístico (todas as threads, todos os workers)
+   - Um admin dispara POST /diagnostics/profiling/sample?seconds=N
+   - O worker que recebe a requisição grava um "trigger" em PROFILES_DIR
+   - Cada worker (gunicorn/uvicorn) tem uma thread watcher que observa o
+     trigger e amostra as stacks das próprias threads até o deadline
+   - Cada worker grava {session_id}/{pid}.folded (formato "collapsed",
+     pronto para flamegraph.pl / speedscope)
+   - O endpoint agrega os arquivos de todos os workers
+
+2. cProfile por requisição (opt-in via header)
+   - Header `X-Profile: cprofile` + token JWT de admin
+   - Perfila o trabalho da requisição nas threads que o executam:
+     chamadas via run_in_threadpool deste módulo e funções envolvidas
+     com profiled() (ex.: RAG em /chat, thread produtora do XLSX em streaming)
+   - Perfil salvo em PROFILES_DIR/requests/{profile_id}.prof (pstats)
+     quando a resposta termina (inclusive o corpo de StreamingResponse)
+   - Resposta recebe o header `X-Profile-Id`
+   - Fora do perfil: código async no event loop (misturaria corrotinas de
+     outras requisições), endpoints/dependências `def` que o FastAPI manda
+     ao threadpool por conta própria, pools de processos e jobs em
+     background. Para esses, use o sampler (1)
+
+Configuração via ENV:
+- PROFILING_ENABLED (default: true)
+- PROFILES_DIR (default: DATA_DIR/profiles)
+- PROFILING_MAX_SECONDS (default: 60)
+- PROFILING_KEEP_REQUESTS (default: 50)
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from config import DATA_DIR
+
+logger = logging.getLogger("tr4ction.profiling")
+
+# ======================================================
+# Configurações via ENV
+# ======================================================
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+PROFILES_DIR = Path(os.getenv("PROFILES_DIR", str(Path(DATA_DIR) / "profiles")))
+PROFILING_MAX_SECONDS = int(os.getenv("PROFILING_MAX_SECONDS", "60"))
+PROFILING_KEEP_REQUESTS = int(os.getenv("PROFILING_KEEP_REQUESTS", "50"))
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+DEFAULT_SAMPLING_INTERVAL = 0.005  # 5ms
+WATCHER_POLL_SECONDS = 1.0
+
+_TRIGGER_FILE = "sampling.trigger.json"
+
+
+# ======================================================
+# Sampler estatístico
+# ======================================================
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Amostra periodicamente as stacks de todas as threads do processo.
+
+    Não depende de extensões nativas: usa sys._current_frames(), então o
+    custo é proporcional ao número de threads × profundidade das stacks.
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLING_INTERVAL):
+        self.interval = max(0.001, interval)
+        self.samples: Counter = Counter()
+        self.total_samples = 0
+
+    def sample_once(self, skip_thread_id: Optional[int] = None) -> None:
+        """Captura uma amostra de todas as threads (exceto a do sampler)."""
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread_id:
+                continue
+
+            stack: List[str] = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+
+            stack.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            stack.reverse()
+            self.samples[";".join(stack)] += 1
+
+        self.total_samples += 1
+
+    def run(self, duration: float) -> Counter:
+        """Amostra durante `duration` segundos (bloqueante)."""
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            self.sample_once(skip_thread_id=own_id)
+            time.sleep(self.interval)
+
+        return self.samples
+
+
+def format_collapsed(samples: Dict[str, int]) -> str:
+    """Formata amostras como "frame;frame;frame count" (uma stack por linha)."""
+    ordered = sorted(samples.items(), key=lambda item: (-item[1], item[0]))
+    return "\n".join(f"{stack} {count}" for stack, count in ordered)
+
+
+def parse_collapsed(text: str) -> Counter:
+    """Inverso de format_collapsed."""
+    samples: Counter = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            samples[stack] += int(count)
+    return samples
+
+
+# ======================================================
+# Coordenação entre workers (via filesystem compartilhado)
+# ======================================================
+class SamplingCoordinator:
+    """
+    Coordena sessões de sampling entre workers do mesmo host.
+
+    O trigger é um arquivo JSON; cada worker roda uma thread watcher que
+    verifica o mtime do trigger a cada segundo (um os.stat por segundo).
+    """
+
+    def __init__(self, base_dir: Path = PROFILES_DIR):
+        self.base_dir = Path(base_dir)
+        self._handled_sessions: set = set()
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_pid: Optional[int] = None
+        self._last_trigger_mtime = 0.0
+
+    @property
+    def trigger_path(self) -> Path:
+        return self.base_dir / _TRIGGER_FILE
+
+    def session_dir(self, session_id: str) -> Path:
+        return self.base_dir / "sessions" / session_id
+
+    def request_session(self, seconds: float, interval: float) -> Dict:
+        """Publica um trigger para todos os workers e inicia localmente."""
+        seconds = max(1.0, min(float(seconds), PROFILING_MAX_SECONDS))
+        session = {
+            "session_id": uuid.uuid4().hex[:12],
+            "seconds": seconds,
+            "interval": interval,
+            "deadline": time.time() + seconds,
+            "requested_by_pid": os.getpid(),
+        }
+
+        self.session_dir(session["session_id"]).mkdir(parents=True, exist_ok=True)
+        tmp_path = self.trigger_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(session, f)
+        os.replace(tmp_path, self.trigger_path)
+
+        self._start_session(session)
+        return session
+
+    def _start_session(self, session: Dict) -> bool:
+        """Inicia a thread de sampling deste worker (uma vez por sessão)."""
+        with self._lock:
+            if session["session_id"] in self._handled_sessions:
+                return False
+            self._handled_sessions.add(session["session_id"])
+
+        remaining = session["deadline"] - time.time()
+        if remaining <= 0:
+            return False
+
+        thread = threading.Thread(
+            target=self._run_session,
+            args=(session, remaining),
+            name=f"profiling-sampler-{session['session_id']}",
+            daemon=True,
+        )
+        thread.start()
+        return True
+
+    def _run_session(self, session: Dict, seconds: float) -> None:
+        sampler = StackSampler(interval=session.get("interval", DEFAULT_SAMPLING_INTERVAL))
+        try:
+            samples = sampler.run(seconds)
+            out_dir = self.session_dir(session["session_id"])
+            out_dir.mkdir(parents=True, exist_ok=True)
+            with open(out_dir / f"{os.getpid()}.folded", "w", encoding="utf-8") as f:
+                f.write(format_collapsed(samples))
+            logger.info(
+                "Sampling session finished",
+                extra={"extra": {
+                    "session_id": session["session_id"],
+                    "pid": os.getpid(),
+                    "samples": sampler.total_samples,
+                }},
+            )
+        except Exception:
+            logger.exception("Sampling session failed")
+
+    def poll_trigger(self) -> bool:
+        """Verifica se há um trigger novo; retorna True se iniciou uma sessão."""
+        try:
+            mtime = self.trigger_path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+        if mtime <= self._last_trigger_mtime:
+            return False
+        self._last_trigger_mtime = mtime
+
+        try:
+            with open(self.trigger_path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        return self._start_session(session)
+
+    def ensure_watcher(self) -> None:
+        """Inicia a thread watcher deste processo (idempotente, fork-safe)."""
+        pid = os.getpid()
+        if self._watcher is not None and self._watcher_pid == pid and self._watcher.is_alive():
+            return
+
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        # Ignora triggers antigos ao iniciar o worker
+        try:
+            self._last_trigger_mtime = self.trigger_path.stat().st_mtime
+        except FileNotFoundError:
+            self._last_trigger_mtime = 0.0
+
+        self._watcher_pid = pid
+        self._watcher = threading.Thread(
+            target=self._watch_loop, name="profiling-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch_loop(self) -> None:
+        while True:
+            try:
+                self.poll_trigger()
+            except Exception:
+                logger.exception("Profiling watcher error")
+            time.sleep(WATCHER_POLL_SECONDS)
+
+    def collect(self, session_id: str) -> Dict:
+        """Agrega os arquivos .folded de todos os workers de uma sessão."""
+        merged: Counter = Counter()
+        workers: List[int] = []
+
+        session_dir = self.session_dir(session_id)
+        if session_dir.exists():
+            for folded in sorted(session_dir.glob("*.folded")):
+                merged.update(parse_collapsed(folded.read_text(encoding="utf-8")))
+                if folded.stem.isdigit():
+                    workers.append(int(folded.stem))
+
+        return {"session_id": session_id, "workers": workers, "samples": merged}
+
+
+coordinator = SamplingCoordinator()
+
+
+# ======================================================
+# cProfile por requisição
+# ======================================================
+class RequestProfile:
+    """
+    Junta os perfis cProfile de todas as threads que trabalharam para
+    uma requisição (cada thread tem o próprio profiler).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats: Optional[pstats.Stats] = None
+        self.threads = 0
+
+    def add(self, profiler: cProfile.Profile) -> None:
+        profiler.create_stats()
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+            self.threads += 1
+
+    def dump(self, path: Path) -> None:
+        with self._lock:
+            if self.stats is None:
+                # Nada rodou fora do event loop: perfil vazio, ainda legível
+                cProfile.Profile().dump_stats(str(path))
+            else:
+                self.stats.dump_stats(str(path))
+
+
+# Perfil da requisição corrente; propagado às threads do anyio com o contexto
+_active_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Envolve `func` para rodar sob cProfile na thread que a executar quando
+    a requisição corrente está sendo perfilada (senão chama direto).
+
+    Threads criadas à mão precisam do contexto da requisição:
+    `threading.Thread(target=contextvars.copy_context().run, args=(profiled(f),))`.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profile.add(profiler)
+
+    return wrapper
+
+
+async def run_in_threadpool(func: Callable, *args, **kwargs):
+    """starlette.concurrency.run_in_threadpool com o trabalho perfilado (ver profiled)."""
+    return await _run_in_threadpool(profiled(func), *args, **kwargs)
+
+
+def _requests_dir() -> Path:
+    return PROFILES_DIR / "requests"
+
+
+def _is_admin_request(request: Request) -> bool:
+    """Valida o token JWT do header Authorization (sem ir ao banco)."""
+    from services.auth import decode_token
+
+    auth = request.headers.get("Authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return False
+    token_data = decode_token(auth.split(" ", 1)[1].strip())
+    return bool(token_data and token_data.role == "admin")
+
+
+def _prune_request_profiles(keep: int = PROFILING_KEEP_REQUESTS) -> None:
+    profiles = sorted(_requests_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime)
+    for old in profiles[:-keep] if keep > 0 else profiles:
+        old.unlink(missing_ok=True)
+
+
+def load_request_profile(profile_id: str, sort_by: str = "cumulative", limit: int = 50) -> Optional[str]:
+    """Retorna o relatório pstats (texto) de um perfil salvo."""
+    path = request_profile_path(profile_id)
+    if path is None:
+        return None
+
+    out = io.StringIO()
+    try:
+        stats = pstats.Stats(str(path), stream=out)
+    except TypeError:
+        # pstats recusa perfis vazios (nenhum trabalho em threads)
+        return "0 function calls: nenhum trabalho perfilado fora do event loop\n"
+    stats.strip_dirs().sort_stats(sort_by).print_stats(limit)
+    return out.getvalue()
+
+
+def request_profile_path(profile_id: str) -> Optional[Path]:
+    # profile_id é gerado por nós (hex); evita path traversal
+    if not profile_id.isalnum():
+        return None
+    path = _requests_dir() / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def list_request_profiles() -> List[Dict]:
+    if not _requests_dir().exists():
+        return []
+
+    profiles = []
+    for path in sorted(_requests_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True):
+        meta_path = path.with_suffix(".json")
+        meta = {}
+        if meta_path.exists():
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            except ValueError:
+                meta = {}
+        profiles.append({"profile_id": path.stem, **meta})
+    return profiles
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Ativa cProfile para requisições com `X-Profile: cprofile` de admins.
+
+    A requisição roda com um RequestProfile no contexto; o trabalho em
+    threads (run_in_threadpool / profiled) é perfilado na própria thread.
+    O perfil é gravado quando o corpo da resposta termina (o corpo de um
+    StreamingResponse é gerado depois de call_next).
+
+    Apenas um handler é perfilado por vez por worker; se outro já estiver
+    em andamento, a requisição segue sem profiling.
+    """
+
+    def __init__(self, app, enabled: bool = PROFILING_ENABLED):
+        super().__init__(app)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    async def dispatch(self, request: Request, call_next):
+        if (
+            not self.enabled
+            or request.headers.get(PROFILE_HEADER, "").lower() != "cprofile"
+            or not _is_admin_request(request)
+            or not self._lock.acquire(blocking=False)
+        ):
+            return await call_next(request)
+
+        profile_id = uuid.uuid4().hex
+        profile = RequestProfile()
+        start = time.perf_counter()
+        token = _active_profile.set(profile)
+        try:
+            response = await call_next(request)
+        finally:
+            _active_profile.reset(token)
+            self._lock.release()
+
+        def finish():
+            duration = round(time.perf_counter() - start, 4)
+            self._save(profile_id, profile, request, response.status_code, duration)
+
+        response.body_iterator = self._finish_after_body(response.body_iterator, finish)
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    @staticmethod
+    async def _finish_after_body(body_iterator, finish: Callable[[], None]):
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            finish()
+
+    def _save(self, profile_id: str, profile: RequestProfile, request: Request,
+              status_code: int, duration: float) -> None:
+        requests_dir = _requests_dir()
+        requests_dir.mkdir(parents=True, exist_ok=True)
+
+        profile.dump(requests_dir / f"{profile_id}.prof")
+        with open(requests_dir / f"{profile_id}.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "method": request.method,
+                "path": request.url.path,
+                "status": status_code,
+                "duration": duration,
+                "threads": profile.threads,
+                "pid": os.getpid(),
+                "created_at": time.time(),
+            }, f)
+
+        _prune_request_profiles()
+        for meta in requests_dir.glob("*.json"):
+            if not meta.with_suffix(".prof").exists():
+                meta.unlink(missing_ok=True)
+
+        logger.info(
+            "Request profiled",
+            extra={"extra": {"profile_id": profile_id, "path": request.url.path, "duration": duration}},
+        )
@@ -7,6 +7,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from .instrumentation import QUERY_INSTRUMENTATION, install_query_instrumentation
+
 # Prioriza variável de ambiente (PostgreSQL/SQLite)
 # Em desenvolvimento, usa um banco local
 if os.getenv("DATABASE_URL"):
@@ -32,6 +34,10 @@ engine = create_engine(
     echo=False
 )
 
+# Contagem de queries / detecção de N+1 (ver db/instrumentation.py)
+if QUERY_INSTRUMENTATION:
+    install_query_instrumentation(engine)
+
 # Session factory
 SessionLocal = sessionmaker(
     autocommit=False,
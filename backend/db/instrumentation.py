@@ -0,0 +1,224 @@
+"""
+Instrumentação de queries SQLAlchemy
+
+- Conta statements e tempo de banco por requisição (contextvar)
+- Registra os statements mais lentos com o "shape" dos bind parameters
+- Detecta N+1: o mesmo statement (mesmo SQL, mesmos tipos de parâmetros)
+  executado repetidas vezes na mesma requisição
+- Em DEBUG_MODE, expõe os números em headers da resposta (X-DB-*)
+
+Configuração via ENV:
+- QUERY_INSTRUMENTATION (default: true)
+- QUERY_N1_THRESHOLD (default: 5) - repetições para sinalizar N+1
+- QUERY_SLOW_MS (default: 100) - statements acima disso vão para o log
+- QUERY_TOP_SLOWEST (default: 5)
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+
+logger = logging.getLogger("tr4ction.db")
+
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "true").lower() == "true"
+QUERY_N1_THRESHOLD = int(os.getenv("QUERY_N1_THRESHOLD", "5"))
+QUERY_SLOW_MS = float(os.getenv("QUERY_SLOW_MS", "100"))
+QUERY_TOP_SLOWEST = int(os.getenv("QUERY_TOP_SLOWEST", "5"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+_current_stats: contextvars.ContextVar[Optional["QueryStats"]] = contextvars.ContextVar(
+    "query_stats", default=None
+)
+_global_collectors: List["QueryStats"] = []
+_global_lock = threading.Lock()
+
+
+def _param_shape(parameters: Any) -> Tuple:
+    """Shape dos bind parameters: só os tipos, nunca os valores."""
+    if isinstance(parameters, dict):
+        return tuple(sorted((k, type(v).__name__) for k, v in parameters.items()))
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany
+            return ("many", len(parameters), _param_shape(parameters[0]))
+        return tuple(type(v).__name__ for v in parameters)
+    return ()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    params_shape: Tuple
+    duration_ms: float
+
+
+@dataclass
+class QueryStats:
+    """Estatísticas de queries de um escopo (requisição, teste...)."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    slowest: List[QueryRecord] = field(default_factory=list)
+
+    def record(self, statement: str, parameters: Any, duration_ms: float) -> None:
+        shape = (_WHITESPACE.sub(" ", statement).strip(), _param_shape(parameters))
+
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[shape] += 1
+
+        if len(self.slowest) < QUERY_TOP_SLOWEST or duration_ms > self.slowest[-1].duration_ms:
+            self.slowest.append(QueryRecord(shape[0], shape[1], round(duration_ms, 3)))
+            self.slowest.sort(key=lambda r: r.duration_ms, reverse=True)
+            del self.slowest[QUERY_TOP_SLOWEST:]
+
+    def repeated_shapes(self, threshold: int = None) -> List[Dict]:
+        """Statements repetidos >= threshold vezes (suspeita de N+1)."""
+        threshold = QUERY_N1_THRESHOLD if threshold is None else threshold
+        return [
+            {"statement": statement, "params_shape": params, "count": count}
+            for (statement, params), count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "n_plus_one": self.repeated_shapes(),
+            "slowest": [r.__dict__ for r in self.slowest],
+        }
+
+
+# ======================================================
+# Event listeners
+# ======================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_stack = conn.info.get("query_start_time")
+    if not start_stack:
+        return
+    duration_ms = (time.perf_counter() - start_stack.pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, parameters, duration_ms)
+
+    if _global_collectors:
+        with _global_lock:
+            for collector in _global_collectors:
+                collector.record(statement, parameters, duration_ms)
+
+
+def install_query_instrumentation(engine) -> None:
+    """Registra os listeners no engine (idempotente)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Coleta queries executadas no contexto atual (task/thread)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def collect_all_queries() -> Iterator[QueryStats]:
+    """
+    Coleta todas as queries do processo, de qualquer thread.
+
+    Útil em testes, onde o TestClient executa o app em outra thread.
+    """
+    stats = QueryStats()
+    with _global_lock:
+        _global_collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _global_lock:
+            _global_collectors.remove(stats)
+
+
+# ======================================================
+# Middleware
+# ======================================================
+class QueryInstrumentationMiddleware(BaseHTTPMiddleware):
+    """
+    Conta queries por requisição, loga N+1 e statements lentos.
+
+    Com `expose_headers=True` (DEBUG_MODE), adiciona:
+    - X-DB-Query-Count
+    - X-DB-Query-Time-Ms
+    - X-DB-N-Plus-One (ex.: "2 shapes; max 12x")
+    """
+
+    def __init__(self, app, expose_headers: bool = False):
+        super().__init__(app)
+        self.expose_headers = expose_headers
+
+    async def dispatch(self, request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+
+        repeated = stats.repeated_shapes()
+        if repeated:
+            logger.warning(
+                "Possible N+1 queries",
+                extra={"extra": {
+                    "path": request.url.path,
+                    "method": request.method,
+                    "query_count": stats.count,
+                    "repeated": [
+                        {"statement": r["statement"][:300], "count": r["count"]}
+                        for r in repeated
+                    ],
+                }},
+            )
+
+        slow = [r for r in stats.slowest if r.duration_ms >= QUERY_SLOW_MS]
+        if slow:
+            logger.warning(
+                "Slow queries",
+                extra={"extra": {
+                    "path": request.url.path,
+                    "slowest": [
+                        {
+                            "statement": r.statement[:300],
+                            "params_shape": repr(r.params_shape),
+                            "duration_ms": r.duration_ms,
+                        }
+                        for r in slow
+                    ],
+                }},
+            )
+
+        if self.expose_headers:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_ms:.2f}"
+            if repeated:
+                response.headers["X-DB-N-Plus-One"] = (
+                    f"{len(repeated)} shapes; max {repeated[0]['count']}x"
+                )
+
+        return response
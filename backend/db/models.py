@@ -1,7 +1,7 @@
 """
 Modelos do banco de dados - SQLAlchemy ORM
 """
-from sqlalchemy import Column, String, Integer, Boolean, JSON, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Integer, Boolean, JSON, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -71,7 +71,11 @@ class StepAnswer(Base):
     Respostas do founder para uma etapa
     """
     __tablename__ = "step_answers"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Respostas do founder por etapa/pergunta (trail_endpoints, founder)
+        Index("ix_step_answers_user_step", "user_id", "step_id"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     trail_id = Column(String(100), nullable=False)
@@ -99,6 +103,35 @@ class UserProgress(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class ProgressSummary(Base):
+    """
+    Resumo materializado do progresso de um founder em uma trilha/template
+
+    Mantido na mesma transação que grava respostas/progresso
+    (services/progress_summary); as telas do founder e o dashboard admin
+    leem uma linha por trilha em vez de recalcular.
+    """
+    __tablename__ = "progress_summaries"
+    __table_args__ = (
+        # trail_id guarda Trail.id ou template_id: kind faz parte da chave
+        Index("uq_progress_summary_user_kind_trail", "user_id", "kind", "trail_id", unique=True),
+        {"extend_existing": True},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(100), nullable=False)
+    trail_id = Column(String(100), nullable=False)  # Trail.id ou template_id (trail_endpoints)
+    kind = Column(String(20), nullable=False, default="trail")  # trail | template
+    answered_count = Column(Integer, nullable=False, default=0)
+    completed_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    progress_percent = Column(Integer, nullable=False, default=0)
+    current_step_id = Column(String(100), nullable=True)  # Primeira etapa/pergunta pendente
+    step_states = Column(JSON, nullable=False, default=dict)  # step_id → {locked, completed, progress}
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class TemplateDefinition(Base):
     """
     Definição de template Excel - gerado dinamicamente por admin
@@ -0,0 +1,12 @@
+# backend/loadtest/__init__.py
+"""
+Harness de teste de carga do TR4CTION
+
+Uso rápido (sobe o servidor com LLM/embeddings stubados e compara com o baseline):
+
+    cd backend
+    python -m loadtest.runner --spawn-server --workers 2 --founders 30 --admins 2 \\
+        --duration 60 --compare loadtest/baselines/dev-container-2w-30f.json
+
+Ver loadtest/README.md.
+"""
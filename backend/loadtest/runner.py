@@ -0,0 +1,367 @@
+# backend/loadtest/runner.py
+"""
+Runner do teste de carga
+
+- Usuários virtuais assíncronos (httpx.AsyncClient) com mix founder/admin
+- Opcionalmente sobe o próprio servidor (uvicorn, N workers) com LLM,
+  embeddings e RAG stubados (TESTING=1) e banco SQLite descartável
+- Reporta throughput, p50/p95/p99, taxa de erro e RSS por worker
+- Compara com um baseline JSON e falha (exit 1) em regressões
+
+Exemplos:
+    python -m loadtest.runner --spawn-server --workers 2 --founders 50 --duration 60
+    python -m loadtest.runner --host http://localhost:8000 --founders 30 \\
+        --compare loadtest/baselines/dev-container-2w-30f.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.scenarios import SCENARIOS, VirtualUser, pick_task
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+# ======================================================
+# Métricas
+# ======================================================
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por interpolação linear (valores já ordenados)."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class Metrics:
+    """Latências e erros por endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started_at = time.perf_counter()
+        self.recording = True
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    @staticmethod
+    def _summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+        values = sorted(latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(values[-1] * 1000, 1) if values else 0.0,
+        }
+
+    def summary(self, elapsed: float) -> Dict:
+        all_latencies = [v for values in self.latencies.values() for v in values]
+        return {
+            "total": self._summarize(all_latencies, sum(self.errors.values()), elapsed),
+            "endpoints": {
+                name: self._summarize(values, self.errors.get(name, 0), elapsed)
+                for name, values in sorted(self.latencies.items())
+            },
+        }
+
+
+# ======================================================
+# RSS dos workers (Linux /proc - sem psutil)
+# ======================================================
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # formato: pid (comm) state ppid ...
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid:
+            children.append(int(entry.name))
+    return children
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler:
+    """Amostra o RSS do processo do servidor e de seus workers"""
+
+    def __init__(self, server_pid: Optional[int]):
+        self.server_pid = server_pid
+        self.samples: Dict[int, List[float]] = defaultdict(list)
+
+    def sample(self) -> None:
+        if self.server_pid is None or not Path("/proc").exists():
+            return
+        for pid in [self.server_pid, *_children(self.server_pid)]:
+            rss = _rss_mb(pid)
+            if rss is not None:
+                self.samples[pid].append(rss)
+
+    async def run(self, stop: asyncio.Event, interval: float = 1.0) -> None:
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def summary(self) -> Dict:
+        return {
+            str(pid): {"avg_mb": round(sum(v) / len(v), 1), "peak_mb": max(v)}
+            for pid, v in self.samples.items() if v
+        }
+
+
+# ======================================================
+# Servidor stubado
+# ======================================================
+def spawn_server(port: int, workers: int, db_path: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "TESTING": "1",                       # LLM, embeddings e RAG stubados
+        "ENVIRONMENT": "loadtest",
+        "JWT_SECRET_KEY": env.get("JWT_SECRET_KEY", "loadtest-secret"),
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "RATE_LIMIT_REQUESTS": "1000000",     # não medir o rate limiter
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+    })
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(cmd, cwd=str(BACKEND_DIR), env=env, start_new_session=True)
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Servidor não respondeu /health a tempo")
+
+
+# ======================================================
+# Execução
+# ======================================================
+async def run_user(role: str, client: httpx.AsyncClient, metrics: Metrics,
+                   deadline: float, think_time: float) -> None:
+    setup, tasks = SCENARIOS[role]
+    user = VirtualUser(client=client, record=metrics.record, role=role)
+    if not await setup(user):
+        return
+
+    while time.monotonic() < deadline:
+        await pick_task(tasks)(user)
+        if think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+
+
+async def run_load(args) -> Dict:
+    server = None
+    tmp_dir = None
+    host = args.host
+
+    if args.spawn_server:
+        tmp_dir = tempfile.TemporaryDirectory(prefix="tr4ction-loadtest-")
+        server = spawn_server(args.port, args.workers, os.path.join(tmp_dir.name, "loadtest.db"))
+        host = f"http://127.0.0.1:{args.port}"
+
+    limits = httpx.Limits(max_connections=args.founders + args.admins + 10)
+    try:
+        async with httpx.AsyncClient(base_url=host, timeout=args.timeout, limits=limits) as client:
+            await wait_until_ready(client)
+
+            metrics = Metrics()
+            rss = RssSampler(server.pid if server else args.server_pid)
+            stop = asyncio.Event()
+            rss_task = asyncio.create_task(rss.run(stop))
+
+            # ramp-up linear: usuários entram ao longo de `ramp_up` segundos
+            start = time.monotonic()
+            deadline = start + args.ramp_up + args.duration
+            roles = ["founder"] * args.founders + ["admin"] * args.admins
+            random.shuffle(roles)
+
+            user_tasks = []
+            for i, role in enumerate(roles):
+                delay = args.ramp_up * i / max(1, len(roles))
+                user_tasks.append(asyncio.create_task(
+                    _delayed(delay, run_user(role, client, metrics, deadline, args.think_time))
+                ))
+
+            # só mede a fase estável (após o ramp-up)
+            metrics.recording = False
+            await asyncio.sleep(args.ramp_up)
+            metrics.recording = True
+            measure_start = time.perf_counter()
+
+            await asyncio.gather(*user_tasks)
+            elapsed = time.perf_counter() - measure_start
+
+            stop.set()
+            await rss_task
+    finally:
+        if server is not None:
+            os.killpg(server.pid, signal.SIGTERM)
+            server.wait(timeout=30)
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    return {
+        "config": {
+            "founders": args.founders,
+            "admins": args.admins,
+            "duration_s": args.duration,
+            "ramp_up_s": args.ramp_up,
+            "think_time_s": args.think_time,
+            "workers": args.workers if args.spawn_server else None,
+            "stubbed_providers": bool(args.spawn_server),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "label": args.label,
+        },
+        "results": metrics.summary(elapsed),
+        "rss_per_worker": rss.summary(),
+    }
+
+
+async def _delayed(delay: float, coro):
+    await asyncio.sleep(delay)
+    return await coro
+
+
+# ======================================================
+# Comparação com baseline
+# ======================================================
+def compare(current: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Retorna a lista de regressões (vazia = OK)."""
+    regressions = []
+    cur, base = current["results"]["total"], baseline["results"]["total"]
+
+    for metric in ("p95_ms", "p99_ms"):
+        if base[metric] and cur[metric] > base[metric] * (1 + max_regression):
+            regressions.append(f"{metric}: {base[metric]} -> {cur[metric]}")
+
+    if base["rps"] and cur["rps"] < base["rps"] * (1 - max_regression):
+        regressions.append(f"rps: {base['rps']} -> {cur['rps']}")
+
+    if cur["error_rate"] > base["error_rate"] + 0.01:
+        regressions.append(f"error_rate: {base['error_rate']} -> {cur['error_rate']}")
+
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    total = report["results"]["total"]
+    print("\n📊 Resultado do teste de carga")
+    print(f"   Requisições: {total['requests']}  |  {total['rps']} req/s  |  erros: {total['error_rate']:.2%}")
+    print(f"   Latência: p50={total['p50_ms']}ms  p95={total['p95_ms']}ms  p99={total['p99_ms']}ms")
+    print()
+    print(f"   {'endpoint':<55} {'req':>6} {'err%':>6} {'p95':>8} {'p99':>8}")
+    for name, stats in report["results"]["endpoints"].items():
+        print(f"   {name:<55} {stats['requests']:>6} {stats['error_rate']:>6.1%} "
+              f"{stats['p95_ms']:>8} {stats['p99_ms']:>8}")
+    if report["rss_per_worker"]:
+        print("\n   RSS por processo (MB):")
+        for pid, rss in report["rss_per_worker"].items():
+            print(f"   pid {pid}: avg={rss['avg_mb']} peak={rss['peak_mb']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga TR4CTION")
+    parser.add_argument("--host", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="Sobe uvicorn local com providers stubados")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--server-pid", type=int, default=None,
+                        help="PID do servidor externo (para medir RSS)")
+    parser.add_argument("--founders", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--ramp-up", type=float, default=5)
+    parser.add_argument("--think-time", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--label", default=platform.node())
+    parser.add_argument("--output", help="Grava o relatório JSON neste caminho")
+    parser.add_argument("--compare", help="Baseline JSON para comparação")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Regressão tolerada (fração) em p95/p99/rps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    random.seed(args.seed)
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\n💾 Relatório salvo em {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print("\n❌ Regressões em relação ao baseline:")
+            for line in regressions:
+                print(f"   - {line}")
+            return 1
+        print("\n✅ Dentro do baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# backend/loadtest/scenarios.py
+"""
+Cenários de carga: mix de tráfego de founders e admins
+
+Cada usuário virtual (VU) faz login uma vez e depois executa tarefas
+sorteadas por peso, com um "think time" entre elas. Os pesos refletem o
+uso real: founders passam a maior parte do tempo listando trilhas e
+salvando progresso; chat e export são menos frequentes.
+"""
+
+import io
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_FOUNDER_PASSWORD = "LoadTest#2024"
+ADMIN_EMAIL = "admin@tr4ction.com"
+ADMIN_PASSWORD = "admin123"
+
+# Respostas de exemplo (campos típicos das etapas do Q1)
+SAMPLE_ANSWERS = {
+    "empresa": "Startup de Carga Ltda",
+    "segmento": "SaaS B2B",
+    "publico_alvo": "PMEs do varejo com 10 a 200 funcionários",
+    "dor_principal": "Controle de estoque manual e rupturas frequentes",
+    "proposta_valor": "Reposição automática com previsão de demanda",
+    "canais": "Inside sales + parcerias com ERPs",
+}
+
+CHAT_QUESTIONS = [
+    "Como definir meu ICP?",
+    "Qual a diferença entre persona e ICP?",
+    "Como priorizar canais de aquisição no primeiro trimestre?",
+    "O que colocar na matriz SWOT?",
+]
+
+KNOWLEDGE_DOC = (
+    "Material de apoio - teste de carga.\n"
+    "O ICP descreve a empresa ideal para o produto.\n" * 40
+)
+
+
+Recorder = Callable[[str, float, bool], None]
+
+
+@dataclass
+class VirtualUser:
+    """Estado de um usuário virtual"""
+
+    client: httpx.AsyncClient
+    record: Recorder
+    role: str
+    token: Optional[str] = None
+    trails: List[Dict] = field(default_factory=list)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Executa uma requisição e registra latência/erro sob `name`."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.record(name, time.perf_counter() - start, ok)
+        return response
+
+    def pick_step(self) -> Optional[Tuple[str, str]]:
+        steps = [(t["id"], s["id"]) for t in self.trails for s in t.get("steps", [])]
+        return random.choice(steps) if steps else None
+
+
+# ======================================================
+# Setup (login)
+# ======================================================
+async def login(user: VirtualUser, email: str, password: str) -> bool:
+    response = await user.request("POST /auth/login", "POST", "/auth/login",
+                                  json={"email": email, "password": password})
+    if response is None or response.status_code != 200:
+        return False
+    user.token = response.json()["access_token"]
+    return True
+
+
+async def setup_founder(user: VirtualUser) -> bool:
+    """Registra um founder novo (e-mail único) e faz login."""
+    email = f"loadtest-{uuid.uuid4().hex[:12]}@tr4ction.test"
+    await user.request("POST /auth/register", "POST", "/auth/register", json={
+        "email": email,
+        "password": DEFAULT_FOUNDER_PASSWORD,
+        "name": "Founder Load Test",
+        "company_name": "Startup de Carga",
+    })
+    if not await login(user, email, DEFAULT_FOUNDER_PASSWORD):
+        return False
+    await list_trails(user)
+    return True
+
+
+async def setup_admin(user: VirtualUser) -> bool:
+    return await login(user, ADMIN_EMAIL, ADMIN_PASSWORD)
+
+
+# ======================================================
+# Tarefas de founder
+# ======================================================
+async def list_trails(user: VirtualUser) -> None:
+    response = await user.request("GET /founder/trails", "GET", "/founder/trails")
+    if response is not None and response.status_code == 200:
+        user.trails = response.json()
+
+
+async def save_step_progress(user: VirtualUser) -> None:
+    step = user.pick_step()
+    if step is None:
+        return
+    trail_id, step_id = step
+    keys = random.sample(list(SAMPLE_ANSWERS), k=random.randint(1, len(SAMPLE_ANSWERS)))
+    await user.request(
+        "POST /founder/trails/{trail}/steps/{step}/progress", "POST",
+        f"/founder/trails/{trail_id}/steps/{step_id}/progress",
+        json={"formData": {k: SAMPLE_ANSWERS[k] for k in keys}},
+    )
+
+
+async def get_step_progress(user: VirtualUser) -> None:
+    step = user.pick_step()
+    if step is None:
+        return
+    trail_id, step_id = step
+    await user.request(
+        "GET /founder/trails/{trail}/steps/{step}/progress", "GET",
+        f"/founder/trails/{trail_id}/steps/{step_id}/progress",
+    )
+
+
+async def chat(user: VirtualUser) -> None:
+    step = user.pick_step()
+    payload = {"question": random.choice(CHAT_QUESTIONS)}
+    if step:
+        payload["trail_id"], payload["step_id"] = step
+    await user.request("POST /chat/", "POST", "/chat/", json=payload)
+
+
+async def template_discovery(user: VirtualUser) -> None:
+    response = await user.request("GET /api/templates/cycles", "GET", "/api/templates/cycles")
+    if response is None or response.status_code != 200:
+        return
+    cycles = (response.json().get("data") or {}).get("cycles") or []
+    if cycles:
+        cycle = random.choice(cycles)
+        await user.request("GET /api/templates/{cycle}", "GET", f"/api/templates/{cycle}")
+    else:
+        await user.request("GET /api/templates", "GET", "/api/templates")
+
+
+async def export_xlsx(user: VirtualUser) -> None:
+    if not user.trails:
+        return
+    trail_id = random.choice(user.trails)["id"]
+    await user.request(
+        "GET /founder/trails/{trail}/export/xlsx", "GET",
+        f"/founder/trails/{trail_id}/export/xlsx",
+    )
+
+
+# ======================================================
+# Tarefas de admin
+# ======================================================
+async def admin_founders_progress(user: VirtualUser) -> None:
+    await user.request("GET /admin/founders/progress", "GET", "/admin/founders/progress")
+
+
+async def admin_list_trails(user: VirtualUser) -> None:
+    await user.request("GET /admin/trails", "GET", "/admin/trails")
+
+
+async def admin_knowledge_upload(user: VirtualUser) -> None:
+    files = {"file": (f"loadtest-{uuid.uuid4().hex[:8]}.txt", io.BytesIO(KNOWLEDGE_DOC.encode()), "text/plain")}
+    response = await user.request(
+        "POST /admin/knowledge/upload", "POST", "/admin/knowledge/upload",
+        files=files, data={"trail_id": "geral", "step_id": "geral"},
+    )
+    if response is None or response.status_code != 200:
+        return
+
+    # Remove o documento para não acumular material de teste na base
+    document_id = response.json()["data"]["document_id"]
+    await user.request(
+        "DELETE /admin/knowledge/documents/{id}", "DELETE",
+        f"/admin/knowledge/documents/{document_id}",
+    )
+
+
+Task = Callable[[VirtualUser], Awaitable[None]]
+
+# (tarefa, peso)
+FOUNDER_TASKS: List[Tuple[Task, int]] = [
+    (list_trails, 30),
+    (save_step_progress, 25),
+    (get_step_progress, 20),
+    (chat, 10),
+    (template_discovery, 10),
+    (export_xlsx, 5),
+]
+
+ADMIN_TASKS: List[Tuple[Task, int]] = [
+    (admin_founders_progress, 50),
+    (admin_list_trails, 35),
+    (admin_knowledge_upload, 15),
+]
+
+SCENARIOS = {
+    "founder": (setup_founder, FOUNDER_TASKS),
+    "admin": (setup_admin, ADMIN_TASKS),
+}
+
+
+def pick_task(tasks: List[Tuple[Task, int]]) -> Task:
+    funcs, weights = zip(*tasks)
+    return random.choices(funcs, weights=weights, k=1)[0]
@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from config import APP_NAME, APP_VERSION, DEBUG_MODE
 from core.middleware import logging_middleware
+from core.profiling import ProfilingMiddleware, PROFILING_ENABLED, coordinator as profiling_coordinator
 from core.models import ErrorResponse
 from core.security import (
     RateLimitMiddleware,
@@ -32,7 +33,13 @@ from routers import (
 
 # Database
 from db.database import init_db
+from db.instrumentation import QueryInstrumentationMiddleware, QUERY_INSTRUMENTATION
 from services.auth import seed_default_users
+from routers.founder import seed_default_data
+from services.progress_summary import ensure_trail_summaries
+from services.template_manager import TemplateDataService
+from services.template_registry import get_registry
+from services.template_catalog import get_template_catalog
 from db.database import SessionLocal
 
 
@@ -74,8 +81,17 @@ def create_app():
     
     # 3. Request Size Limit
     app.add_middleware(RequestSizeLimitMiddleware)
+
+    # 4. Profiling por requisição (header X-Profile + token admin)
+    if PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware)
+        profiling_coordinator.ensure_watcher()
+
+    # 5. Contagem de queries por requisição (headers X-DB-* apenas em debug)
+    if QUERY_INSTRUMENTATION:
+        app.add_middleware(QueryInstrumentationMiddleware, expose_headers=DEBUG_MODE)
     
-    # 4. CORS - Configurado via ENV com fallbacks
+    # 6. CORS - Configurado via ENV com fallbacks
     cors_origins = get_cors_origins()
     import logging
     logger = logging.getLogger(__name__)
@@ -86,13 +102,17 @@ def create_app():
         allow_origins=cors_origins,
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-        allow_headers=["Content-Type", "Authorization", "Accept", "X-Requested-With"],
+        allow_headers=["Content-Type", "Authorization", "Accept", "X-Requested-With", "X-Profile"],
         expose_headers=[
             "X-RateLimit-Limit", 
             "X-RateLimit-Remaining", 
             "X-RateLimit-Reset",
             "Content-Type",
-            "X-Total-Count"
+            "X-Total-Count",
+            "X-Profile-Id",
+            "X-DB-Query-Count",
+            "X-DB-Query-Time-Ms",
+            "X-DB-N-Plus-One",
         ],
         max_age=3600,  # Preflight cache duration
     )
@@ -161,6 +181,41 @@ def create_app():
     except Exception as e:
         print(f"Aviso: Não foi possível criar usuários padrão: {e}")
 
+    # Seed trilhas padrão (antes feito a cada GET /founder/trails)
+    try:
+        db = SessionLocal()
+        seed_default_data(db)
+        db.close()
+    except Exception as e:
+        print(f"Aviso: Não foi possível criar trilhas padrão: {e}")
+
+    # Resumos de progresso (services/progress_summary) para bancos anteriores
+    try:
+        db = SessionLocal()
+        ensure_trail_summaries(db)
+        db.close()
+    except Exception as e:
+        print(f"Aviso: Não foi possível recalcular resumos de progresso: {e}")
+
+    # Respostas de templates salvas como JSON antes do store SQLite
+    # (services/template_data_store): importadas uma vez, com o store vazio
+    try:
+        TemplateDataService().import_legacy_files()
+    except Exception as e:
+        print(f"Aviso: Não foi possível migrar respostas de templates: {e}")
+
+    # Pré-carrega os schemas dos templates ativos e os do TemplateDataService
+    # (services/schema_cache)
+    # e monta o catálogo de descoberta (services/template_catalog)
+    try:
+        db = SessionLocal()
+        get_registry(db).warm_schema_cache()
+        TemplateDataService().warm_schema_cache()
+        get_template_catalog().build(db)
+        db.close()
+    except Exception as e:
+        print(f"Aviso: Não foi possível pré-carregar schemas/catálogo: {e}")
+
     # ======================================================
     # Health Check e Rota Raiz
     # ======================================================
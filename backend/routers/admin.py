@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -23,7 +23,11 @@ from usecases.admin_templates_usecase import (
 from core.models import SuccessResponse, ErrorResponse
 from db.database import get_db
 from db.models import Trail, StepSchema, StepAnswer, UserProgress, User
-from services.xlsx_exporter import generate_xlsx
+from services.progress_summary import refresh_trail_summary, refresh_trail_summaries, step_view, summaries_by_user
+from services.xlsx_exporter import stream_xlsx
+from app.services.cohort_export import (
+    CohortExportJobManager, get_cohort_export_manager, iter_cohort_zip
+)
 from services.xlsx_parser import parse_template_xlsx
 from services.auth import get_current_admin, get_current_user_id
 
@@ -191,6 +195,9 @@ async def upload_template(
             )
             db.add(step)
         
+        # Resumos de progresso dos founders passam a refletir as novas etapas
+        refresh_trail_summaries(db, trail_id)
+        
         db.commit()
         
         return SuccessResponse(data={
@@ -278,6 +285,9 @@ async def upload_xlsx_template(
         trail.status = "active"
         trail.updated_at = datetime.utcnow()
         
+        # Resumos de progresso dos founders passam a refletir as novas etapas
+        refresh_trail_summaries(db, trail_id)
+        
         db.commit()
         
         return SuccessResponse(data={
@@ -370,6 +380,8 @@ async def update_step_schema(trail_id: str, step_id: str, body: UpdateSchemaBody
                 schema={"fields": body.fields}
             )
             db.add(step)
+            # Etapa nova muda o total da trilha para todos os founders
+            refresh_trail_summaries(db, trail_id)
         
         db.commit()
         
@@ -452,6 +464,7 @@ async def toggle_step_lock(user_id: str, trail_id: str, step_id: str, body: Lock
             )
             db.add(progress)
         
+        refresh_trail_summary(db, user_id, trail_id)
         db.commit()
         
         return SuccessResponse(data={
@@ -499,13 +512,10 @@ async def export_user_trail_xlsx(
         # Organiza respostas por step_id
         answers_by_step = {a.step_id: a.answers for a in answers}
         
-        # Gera o XLSX
-        stream = generate_xlsx(trail, steps, answers_by_step)
-        
-        # Retorna como streaming response
+        # Gera o XLSX em blocos, direto na resposta (write-only)
         filename = f"{user_id}_{trail_id}.xlsx"
         return StreamingResponse(
-            stream,
+            stream_xlsx(trail, steps, answers_by_step),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
@@ -517,6 +527,95 @@ async def export_user_trail_xlsx(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ======================================================
+# EXPORT POR COHORT (todos os founders de um ciclo)
+# ======================================================
+
+# Limite do long-poll em GET /cohort-exports/{job_id}
+MAX_COHORT_EXPORT_WAIT_SECONDS = 30
+
+
+class CohortExportBody(BaseModel):
+    organization_id: int
+    cycle_id: int
+    trail_id: str
+
+
+@router.post("/cohort-exports", status_code=202)
+async def start_cohort_export(
+    body: CohortExportBody,
+    current_admin: User = Depends(get_current_admin),
+    exports: CohortExportJobManager = Depends(get_cohort_export_manager),
+):
+    """
+    Exporta a trilha de todos os founders ativos de uma organização/ciclo.
+    
+    **ADMIN ONLY**
+    
+    Roda em background (app/services/cohort_export.py): respostas em lote,
+    workbooks renderizados em pool de processos. Repetir a chamada para o
+    mesmo cohort retoma o job e só renderiza founders novos ou alterados.
+    
+    Returns:
+        job_id, status, poll_url e download_url
+    """
+    job = exports.submit(body.organization_id, body.cycle_id, body.trail_id)
+    logger.info(
+        f"⏳ Export do cohort enfileirado: job_id={job.job_id} "
+        f"(org={body.organization_id}, cycle={body.cycle_id}, trail={body.trail_id})"
+    )
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "poll_url": f"{router.prefix}/cohort-exports/{job.job_id}",
+        "download_url": f"{router.prefix}/cohort-exports/{job.job_id}/download",
+    }
+
+
+@router.get("/cohort-exports/{job_id}")
+async def get_cohort_export(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_COHORT_EXPORT_WAIT_SECONDS),
+    current_admin: User = Depends(get_current_admin),
+    exports: CohortExportJobManager = Depends(get_cohort_export_manager),
+):
+    """
+    Status/progresso de um export por cohort
+    
+    `wait` (segundos) faz long-poll até o fim do job.
+    """
+    job = await exports.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job.to_dict()
+
+
+@router.get("/cohort-exports/{job_id}/download")
+async def download_cohort_export(
+    job_id: str,
+    current_admin: User = Depends(get_current_admin),
+    exports: CohortExportJobManager = Depends(get_cohort_export_manager),
+):
+    """
+    .zip com um XLSX por founder, montado em streaming a partir dos
+    arquivos já renderizados pelo job
+    """
+    job = exports.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Export ainda não concluído (status: {job.status})")
+    
+    filename = f"cohort_{job.organization_id}_{job.cycle_id}_{job.trail_id}.zip"
+    return StreamingResponse(
+        iter_cohort_zip(job.files),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+    )
+
+
 # ======================================================
 # Endpoints de Dashboard - Progresso dos Founders
 # ======================================================
@@ -535,56 +634,54 @@ async def get_founders_progress(db: Session = Depends(get_db)):
         if not founders:
             return []
         
-        # Busca todos os progresses e agrupa por user_id
-        user_progresses = db.query(UserProgress).all()
+        # Resumos de progresso dos founders (uma linha por trilha)
+        summaries = summaries_by_user(db, [f.id for f in founders])
         
-        # Agrupa progresso por user_id
-        progress_by_user = {}
-        for progress in user_progresses:
-            if progress.user_id not in progress_by_user:
-                progress_by_user[progress.user_id] = []
-            progress_by_user[progress.user_id].append(progress)
+        # Etapas com UserProgress: estado completo (com "locked") em step_states
+        def tracked_states(summary):
+            return {
+                step_id: state for step_id, state in (summary.step_states or {}).items()
+                if "locked" in state
+            }
         
-        # Busca nomes dos steps
-        all_steps = db.query(StepSchema).all()
-        step_names = {s.step_id: s.step_name for s in all_steps}
+        # Etapas das trilhas exibidas (primeira trilha com progresso de cada founder)
+        shown = {}
+        for user_id, items in summaries.items():
+            first = next((s for s in items if tracked_states(s)), None)
+            if first is not None:
+                shown[user_id] = first
+        steps_by_trail = {}
+        if shown:
+            for step in db.query(StepSchema).filter(
+                StepSchema.trail_id.in_({s.trail_id for s in shown.values()})
+            ).order_by(StepSchema.trail_id, StepSchema.order, StepSchema.id).all():
+                steps_by_trail.setdefault(step.trail_id, []).append(step)
         
         # Formata resultado para cada founder
         result = []
         for founder in founders:
             user_id = founder.id
-            user_progress_list = progress_by_user.get(user_id, [])
-            
-            # Agrupa por trilha
-            trails = {}
-            total_progress = 0
-            step_count = 0
-            
-            for progress in user_progress_list:
-                trail_id = progress.trail_id
-                if trail_id not in trails:
-                    trails[trail_id] = []
-                
-                trails[trail_id].append({
-                    "id": progress.step_id,
-                    "name": step_names.get(progress.step_id, progress.step_id),
-                    "progress": progress.progress_percent or 0,
-                    "completed": progress.is_completed,
-                    "locked": progress.is_locked
-                })
-                
-                total_progress += progress.progress_percent or 0
-                step_count += 1
             
-            # Calcula progresso médio
-            avg_progress = total_progress // step_count if step_count > 0 else 0
+            # Calcula progresso médio (etapas com UserProgress de todas as trilhas)
+            progresses = [
+                state["progress"]
+                for summary in summaries.get(user_id, [])
+                for state in tracked_states(summary).values()
+            ]
+            avg_progress = sum(progresses) // len(progresses) if progresses else 0
             
             # Determina risco baseado no progresso
             risk = "low" if avg_progress >= 60 else "medium" if avg_progress >= 30 else "high"
             
             # Pega a primeira trilha e seus steps
-            first_trail_id = list(trails.keys())[0] if trails else None
-            steps = trails.get(first_trail_id, []) if first_trail_id else []
+            first = shown.get(user_id)
+            first_trail_id = first.trail_id if first else None
+            states = tracked_states(first) if first else {}
+            steps = [
+                step_view(step.step_id, step.step_name, idx, states[step.step_id])
+                for idx, step in enumerate(steps_by_trail.get(first_trail_id, []))
+                if step.step_id in states
+            ]
             
             # Determina step atual
             current_step = "Não iniciado"
@@ -667,6 +764,7 @@ async def unlock_step_for_founder(
             )
             db.add(progress)
         
+        refresh_trail_summary(db, user_id, trail_id)
         db.commit()
         
         return SuccessResponse(data={
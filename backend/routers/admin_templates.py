@@ -17,6 +17,7 @@ PIPELINE COMPLETO (POST /upload):
 
 ENDPOINTS:
 - POST   /admin/templates/upload
+- GET    /admin/templates/jobs/{job_id}
 - GET    /admin/templates
 - GET    /admin/templates/{template_id}
 - GET    /admin/templates/{template_id}/snapshot
@@ -28,17 +29,19 @@ import gzip
 import json
 from typing import Optional
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from core.profiling import run_in_threadpool
 
 from services.auth import get_current_admin
+from services.export_cache import etag_matches
 from db.database import get_db
 from db.models import User
 
 # ✅ AJUSTE 4: Import do handler de arquivos grandes
 from app.services.large_file_handler import (
-    LargeFileConfig, FileValidator, MemoryEfficientSnapshot
+    LargeFileConfig, FileValidator, MemoryEfficientSnapshot, StreamingFileProcessor
 )
 
 # Import do core FCJ pipeline
@@ -46,14 +49,18 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
 
-from app.services.template_snapshot import TemplateSnapshotService, validate_snapshot, SnapshotLoadError, SnapshotValidationError
-from app.services.fillable_detector import FillableAreaDetector
+from app.services.ingestion_jobs import (
+    IngestionError, IngestionJobManager, SYNC_MAX_BYTES, find_ingested, get_job_manager
+)
 from app.services.template_storage import TemplateStorageService
 from app.services.template_registry import TemplateRegistry
 
 router = APIRouter(prefix="/admin/templates", tags=["admin-templates"])
 logger = logging.getLogger(__name__)
 
+# Limite do long-poll em GET /jobs/{job_id}
+MAX_JOB_WAIT_SECONDS = 30
+
 
 class UploadTemplateQuery(BaseModel):
     cycle: str
@@ -65,10 +72,14 @@ class UploadTemplateQuery(BaseModel):
 @router.post("/upload")
 async def upload_template(
     cycle: str,
+    response: Response,
     file: UploadFile = File(...),
     description: Optional[str] = None,
+    mode: Optional[str] = Query(None, pattern="^(sync|async)$"),
+    force: bool = False,
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin),
+    jobs: IngestionJobManager = Depends(get_job_manager),
 ):
     """
     Pipeline completo de ingestão FCJ
@@ -81,6 +92,15 @@ async def upload_template(
     5. Registrar no DB
     6. Retornar relatório
     
+    As etapas 2-4 são CPU-bound e rodam fora do event loop
+    (app/services/ingestion_jobs.py). Arquivos até TEMPLATE_SYNC_MAX_BYTES
+    respondem na hora; maiores viram um job (202 + job_id) consultado em
+    GET /admin/templates/jobs/{job_id}. `mode=sync|async` força o caminho.
+    
+    Dedup: se (template_key, cycle, SHA-256) já foi ingerido, devolve o
+    registro existente (deduplicated=true + fields) sem reprocessar.
+    `force=true` reprocessa mesmo assim.
+    
     Returns:
         Dict com:
         - template_id
@@ -91,6 +111,8 @@ async def upload_template(
         - stats (sheets, cells, fields, etc.)
         - validation_report
         - fields_count
+        
+        Ou, no caminho assíncrono: job_id, status e poll_url
     """
     try:
         logger.info(f"📥 Iniciando ingestão: {file.filename} | cycle={cycle}")
@@ -102,104 +124,49 @@ async def upload_template(
         if not is_valid:
             raise HTTPException(status_code=413, detail=error_msg)
         
-        # 1. Ler arquivo
-        content = await file.read()
+        # 1. Ler arquivo em blocos (SHA-256 calculado durante a leitura)
+        content, file_hash = await StreamingFileProcessor.read_upload_hashed(
+            file, LargeFileConfig.MAX_XLSX_SIZE_BYTES
+        )
         
         # ✅ AJUSTE 4: Validar tamanho APÓS ler
         is_valid, error_msg = FileValidator.validate_file_size(content, file.filename)
         if not is_valid:
             raise HTTPException(status_code=413, detail=error_msg)
         
-        # 2. Extrair snapshot
-        logger.info("📊 Extraindo snapshot completo...")
-        try:
-            snapshot_service = TemplateSnapshotService()
-            snapshot, assets = snapshot_service.extract(content)
-        except SnapshotLoadError as e:
-            logger.error(f"❌ Falha ao carregar arquivo Excel: {e}")
-            raise HTTPException(status_code=400, detail=f"Arquivo Excel inválido: {str(e)}")
-        except SnapshotValidationError as e:
-            logger.error(f"❌ Snapshot inválido: {e}")
-            raise HTTPException(status_code=422, detail=f"Snapshot incompleto: {str(e)}")
-        
-        logger.info(
-            f"✓ Snapshot extraído: {len(snapshot['sheets'])} sheets, "
-            f"{sum(len(s['cells']) for s in snapshot['sheets'])} células"
-        )
-        
-        # 4. Validar snapshot (auto-check)
-        validation_report = validate_snapshot(snapshot)
-        if not validation_report["valid"]:
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "message": "Snapshot INVÁLIDO - extração incompleta",
-                    "errors": validation_report["errors"]
-                }
-            )
-        
-        # 5. Detectar fillable areas
-        logger.info("🔍 Detectando áreas preenchíveis...")
-        detector = FillableAreaDetector()
-        candidates = detector.detect(snapshot)
-        
-        logger.info(f"✓ Detectados {len(candidates)} campos preenchíveis")
-        
-        # 6. Persistir storage
-        logger.info("💾 Salvando storage...")
-        registry = TemplateRegistry()
-        file_hash = registry.compute_file_hash(content)
-        template_key = registry.compute_template_key(file.filename, cycle)
-        
-        storage = TemplateStorageService()
-        save_result = storage.save(
-            file_name=file.filename,
-            file_bytes=content,
-            snapshot_dict=snapshot,
-            assets=assets,
-            template_key=template_key,
-            cycle=cycle,
-        )
-        
-        logger.info(f"✓ Storage salvo: {template_key}/{cycle}/{file_hash[:8]}")
-        
-        # 7. Computar stats
-        fields_payload = [c.to_dict(template_id="pending") for c in candidates]
-        stats = registry.compute_stats(snapshot, fields_payload)
+        # Dedup: mesma versão já ingerida → nada de extração/detecção/storage
+        if not force:
+            template_key = TemplateRegistry().compute_template_key(file.filename, cycle)
+            existing = await run_in_threadpool(find_ingested, db, template_key, cycle, file_hash)
+            if existing is not None:
+                logger.info(
+                    f"♻️ Template já ingerido: {template_key}/{cycle}/{file_hash[:8]} "
+                    f"(template_id={existing['template_id']})"
+                )
+                return existing
         
-        # 8. Persistir DB
-        logger.info("🗄️ Registrando no banco...")
-        td = registry.upsert_template_definition(
-            db=db,
-            template_key=template_key,
-            cycle=cycle,
-            file_hash=file_hash,
-            original_path=save_result["paths"]["original_path"],
-            snapshot_path=save_result["paths"]["snapshot_path"],
-            assets_manifest_path=save_result["paths"].get("assets_manifest_path"),
-            stats=stats,
-        )
-        
-        # 9. Salvar fields
-        fields_final = [c.to_dict(template_id=str(td.id)) for c in candidates]
-        registry.replace_fields_for_template(db=db, template_id=td.id, fields=fields_final)
+        run_async = mode == "async" or (mode is None and len(content) > SYNC_MAX_BYTES)
         
-        db.commit()
+        if run_async:
+            job = jobs.submit(content, file.filename, cycle, file_hash=file_hash)
+            logger.info(f"⏳ Ingestão enfileirada: job_id={job.job_id} ({len(content)} bytes)")
+            response.status_code = 202
+            return {
+                "message": "Template FCJ ingestion queued",
+                "job_id": job.job_id,
+                "status": job.status,
+                "poll_url": f"{router.prefix}/jobs/{job.job_id}",
+            }
         
-        logger.info(f"✅ Ingestão completa: template_id={td.id}")
+        # 2-8. Pipeline fora do event loop + registro no DB
+        try:
+            report = await jobs.ingest(content, file.filename, cycle, db=db, file_hash=file_hash)
+        except IngestionError as e:
+            logger.error(f"❌ Falha na ingestão: {e.detail}")
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
         
-        # 10. Retornar relatório
-        return {
-            "message": "Template FCJ ingested successfully",
-            "template_id": td.id,
-            "template_key": template_key,
-            "cycle": cycle,
-            "file_hash_sha256": file_hash,
-            "paths": save_result["paths"],
-            "stats": stats,
-            "validation_report": validation_report,
-            "fields_count": len(fields_final),
-        }
+        logger.info(f"✅ Ingestão completa: template_id={report['template_id']}")
+        return report
         
     except HTTPException:
         raise
@@ -209,6 +176,23 @@ async def upload_template(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT_SECONDS),
+    admin: User = Depends(get_current_admin),
+    jobs: IngestionJobManager = Depends(get_job_manager),
+):
+    """
+    Status de um job de ingestão
+    
+    `wait` (segundos) faz long-poll: responde assim que o job terminar
+    ou quando o tempo acabar, o que vier primeiro.
+    """
+    job = await jobs.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 
 @router.get("")
@@ -268,13 +252,38 @@ async def get_template(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Accept-Encoding aceita gzip (respeitando q=0)?"""
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if coding.lower() not in ("gzip", "*"):
+            continue
+        q = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            return float(q) > 0
+        except ValueError:
+            return False
+    return False
+
+
 @router.get("/{template_id}/snapshot")
 async def get_snapshot(
     template_id: int,
+    request: Request,
+    format: str = Query("cells", pattern="^(cells|columnar)$"),
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin)
 ):
-    """Retorna snapshot JSON descompactado"""
+    """
+    Retorna snapshot JSON descompactado
+    
+    format=cells (default): uma entrada por célula
+    format=columnar: formato colunar v2 (tabela de estilos + arrays), bem menor
+    
+    ETag = file_hash_sha256 + formato (+ "-gzip"), If-None-Match → 304.
+    Com Accept-Encoding: gzip o corpo gzip em cache é enviado direto
+    (Content-Encoding: gzip).
+    """
     import sys
     from pathlib import Path
     sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
@@ -285,10 +294,23 @@ async def get_snapshot(
         if not td:
             raise HTTPException(status_code=404, detail="Template não encontrado")
         
+        # Uma representação por (formato, encoding): ETags fortes distintos
+        use_gzip = _accepts_gzip(request.headers.get("accept-encoding"))
+        etag = f'"{td.file_hash_sha256}-{format}{"-gzip" if use_gzip else ""}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        
         storage = TemplateStorageService()
-        snapshot = storage.load_snapshot(td.snapshot_path)
+        body = storage.load_snapshot_gzip(
+            td.snapshot_path, columnar=format == "columnar", file_hash=td.file_hash_sha256
+        )
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
         
-        return snapshot
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
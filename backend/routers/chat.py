@@ -6,6 +6,7 @@ from typing import Optional
 
 from usecases.chat_usecase import handle_chat_question
 from core.models import SuccessResponse, ErrorResponse
+from core.profiling import run_in_threadpool
 
 # ============================================================
 # Router
@@ -42,7 +43,9 @@ async def chat_with_agent(payload: ChatRequest):
     os materiais relevantes antes de gerar a resposta.
     """
     try:
-        result = handle_chat_question(
+        # RAG + LLM são bloqueantes: fora do event loop (e no perfil X-Profile)
+        result = await run_in_threadpool(
+            handle_chat_question,
             payload.question,
             trail_id=payload.trail_id,
             step_id=payload.step_id
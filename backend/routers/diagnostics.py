@@ -1,6 +1,13 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
 from core.models import SuccessResponse
+from core import profiling
 from config import LLM_PROVIDER, ACTIVE_MODEL, KNOWLEDGE_DIR, UPLOADS_DIR, CHROMA_DB_DIR
+from services.auth import get_current_admin
+from services.export_cache import get_export_cache
+from services.schema_cache import get_schema_cache
+from services.template_catalog import get_template_catalog
+import asyncio
 import os
 import time
 
@@ -29,6 +36,11 @@ async def status():
             "uploads_dir": check_dir(UPLOADS_DIR),
             "chroma_db_dir": check_dir(CHROMA_DB_DIR),
         },
+        "caches": {
+            "schemas": get_schema_cache().stats(),
+            "exports": get_export_cache().stats(),
+            "template_catalog": get_template_catalog().stats(),
+        },
     }
 
     return SuccessResponse(data=diagnostics)
@@ -55,3 +67,83 @@ async def test_embedding():
             "error": str(e),
             "success": False
         })
+
+
+# ======================================================
+# Profiling (apenas admin)
+# ======================================================
+
+def _require_profiling_enabled():
+    if not profiling.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling desabilitado")
+
+
+@router.post("/profiling/sample")
+async def sample_profile(
+    seconds: float = Query(10, gt=0, le=profiling.PROFILING_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    admin=Depends(get_current_admin),
+):
+    """
+    Amostra as stacks de todos os workers durante `seconds` segundos.
+
+    Retorna stacks no formato "collapsed" (flamegraph.pl / speedscope)
+    ou JSON com as stacks agregadas.
+    """
+    _require_profiling_enabled()
+
+    session = profiling.coordinator.request_session(seconds, interval_ms / 1000.0)
+    # Aguarda o fim da sessão + margem para os workers gravarem os resultados
+    await asyncio.sleep(session["seconds"] + profiling.WATCHER_POLL_SECONDS + 0.5)
+
+    result = profiling.coordinator.collect(session["session_id"])
+    workers = ",".join(str(pid) for pid in result["workers"])
+
+    if format == "json":
+        return SuccessResponse(data={
+            "session_id": session["session_id"],
+            "seconds": session["seconds"],
+            "workers": result["workers"],
+            "stacks": dict(result["samples"].most_common()),
+        })
+
+    return PlainTextResponse(
+        profiling.format_collapsed(result["samples"]),
+        headers={
+            "X-Profile-Session": session["session_id"],
+            "X-Profile-Workers": workers,
+        },
+    )
+
+
+@router.get("/profiling/requests", response_model=SuccessResponse)
+async def list_request_profiles(admin=Depends(get_current_admin)):
+    """Lista perfis cProfile gravados via header `X-Profile: cprofile`."""
+    _require_profiling_enabled()
+    return SuccessResponse(data=profiling.list_request_profiles())
+
+
+@router.get("/profiling/requests/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    raw: bool = False,
+    sort_by: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+    limit: int = Query(50, ge=1, le=500),
+    admin=Depends(get_current_admin),
+):
+    """
+    Retorna o relatório pstats de uma requisição perfilada.
+
+    Com `raw=true`, retorna o arquivo .prof (para snakeviz / pstats).
+    """
+    _require_profiling_enabled()
+
+    path = profiling.request_profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+
+    if raw:
+        return FileResponse(str(path), media_type="application/octet-stream", filename=path.name)
+
+    return PlainTextResponse(profiling.load_request_profile(profile_id, sort_by=sort_by, limit=limit))
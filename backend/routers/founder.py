@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from core.profiling import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
@@ -9,8 +10,10 @@ import os
 
 from core.models import SuccessResponse
 from db.database import get_db
-from db.models import Trail, StepSchema, StepAnswer, UserProgress
-from services.xlsx_exporter import generate_xlsx
+from db.models import Trail, StepSchema, StepAnswer, UserProgress, ProgressSummary
+from services.xlsx_exporter import stream_xlsx
+from services.export_cache import etag_matches, get_export_cache, trail_export_key, trail_owner
+from services.progress_summary import refresh_trail_summary, step_view
 from services.auth import get_current_user_id, get_current_user, get_current_founder
 from db.models import User
 
@@ -223,65 +226,63 @@ def compute_cognitive_signals(
     return cognitive_signals, risk_result_dict
 
 
+def load_trails_overview(db: Session, user_id: str) -> list:
+    """
+    Trilhas ativas com o progresso do founder em cada etapa
+
+    Duas queries, independente do nº de trilhas/etapas: trilhas + etapas
+    num único JOIN e os resumos de progresso do founder
+    (services/progress_summary), montados em memória.
+    """
+    rows = db.query(Trail, StepSchema).outerjoin(
+        StepSchema, StepSchema.trail_id == Trail.id
+    ).filter(
+        Trail.status == "active"
+    ).order_by(Trail.created_at, Trail.id, StepSchema.order, StepSchema.id).all()
+
+    trails = {}
+    for trail, step in rows:
+        _, steps = trails.setdefault(trail.id, (trail, []))
+        if step is not None:
+            steps.append(step)
+
+    if not trails:
+        return []
+
+    states_by_trail = {
+        summary.trail_id: summary.step_states or {}
+        for summary in db.query(ProgressSummary).filter(
+            ProgressSummary.user_id == user_id,
+            ProgressSummary.kind == "trail",
+            ProgressSummary.trail_id.in_(list(trails))
+        ).all()
+    }
+
+    result = []
+    for trail, steps in trails.values():
+        states = states_by_trail.get(trail.id, {})
+        result.append({
+            "id": trail.id,
+            "name": trail.name,
+            "description": trail.description or "",
+            "steps": [
+                step_view(step.step_id, step.step_name, idx, states.get(step.step_id))
+                for idx, step in enumerate(steps)
+            ]
+        })
+
+    return result
+
+
 @router.get("/trails")
 async def list_trails(db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)):
     """
     Lista todas as trilhas disponíveis para o founder com progresso
+
+    Os dados padrão são semeados no startup (seed_default_data em main.py).
     """
     try:
-        # Seed dados padrão se necessário
-        seed_default_data(db)
-        
-        # Busca trilhas do banco
-        trails = db.query(Trail).filter(Trail.status == "active").all()
-        
-        result = []
-        for trail in trails:
-            # Busca steps dessa trilha
-            steps = db.query(StepSchema).filter(
-                StepSchema.trail_id == trail.id
-            ).order_by(StepSchema.order).all()
-            
-            steps_with_progress = []
-            for idx, step in enumerate(steps):
-                # Busca progresso salvo
-                progress = db.query(UserProgress).filter(
-                    UserProgress.user_id == user_id,
-                    UserProgress.trail_id == trail.id,
-                    UserProgress.step_id == step.step_id
-                ).first()
-                
-                # Busca respostas salvas
-                answer = db.query(StepAnswer).filter(
-                    StepAnswer.user_id == user_id,
-                    StepAnswer.trail_id == trail.id,
-                    StepAnswer.step_id == step.step_id
-                ).first()
-                
-                # Calcula progresso baseado nas respostas
-                calc_progress = 0
-                if answer and answer.answers:
-                    calc_progress = min(100, len(answer.answers) * 25)
-                
-                is_locked = progress.is_locked if progress else (idx > 0)  # Primeiro desbloqueado
-                is_completed = progress.is_completed if progress else False
-                
-                steps_with_progress.append({
-                    "id": step.step_id,
-                    "name": step.step_name,
-                    "locked": is_locked,
-                    "completed": is_completed,
-                    "progress": progress.progress_percent if progress else calc_progress
-                })
-            
-            result.append({
-                "id": trail.id,
-                "name": trail.name,
-                "description": trail.description or "",
-                "steps": steps_with_progress
-            })
-        
-        return result
+        return load_trails_overview(db, user_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -411,7 +412,11 @@ async def save_step_progress(trail_id: str, step_id: str, body: SaveProgressBody
             )
             db.add(progress)
         
+        # Resumo de progresso na mesma transação
+        refresh_trail_summary(db, user_id, trail_id)
+        
         db.commit()
+        get_export_cache().invalidate(trail_owner(user_id, trail_id))
 
         cognitive_signals = None
         risk_result = None
@@ -441,19 +446,23 @@ async def save_step_progress(trail_id: str, step_id: str, body: SaveProgressBody
 
 
 @router.get("/trails/{trail_id}/download")
-async def download_trail(trail_id: str, db: Session = Depends(get_db)):
+async def download_trail(trail_id: str, request: Request, db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)):
     """
     Gera e retorna o Excel preenchido com os dados do founder (LEGADO)
     Redireciona para o novo endpoint de export
     """
-    return await export_trail_xlsx(trail_id, db)
+    return await export_trail_xlsx(trail_id, request, db, user_id)
 
 
 @router.get("/trails/{trail_id}/export/xlsx")
-async def export_trail_xlsx(trail_id: str, db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)):
+async def export_trail_xlsx(trail_id: str, request: Request, db: Session = Depends(get_db), user_id: str = Depends(get_current_user_id)):
     """
     Gera e retorna o Excel (XLSX) preenchido com os dados do founder.
-    Streaming response - não grava arquivo em disco.
+    Não grava arquivo em disco.
+    
+    ETag = hash do schema das etapas + respostas: If-None-Match → 304.
+    O XLSX fica no cache de exports até as respostas mudarem; com o cache
+    desligado (EXPORT_CACHE_MB=0) é gerado em streaming.
     """
     try:
         # Busca a trilha
@@ -477,17 +486,30 @@ async def export_trail_xlsx(trail_id: str, db: Session = Depends(get_db), user_i
         # Organiza respostas por step_id
         answers_by_step = {a.step_id: a.answers for a in answers}
         
-        # Gera o XLSX
-        stream = generate_xlsx(trail, steps, answers_by_step)
+        etag = f'"{trail_export_key(trail, steps, answers_by_step)}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
         
-        # Retorna como streaming response
         filename = f"{trail_id}_preenchido.xlsx"
+        headers = {
+            **cache_headers,
+            "Content-Disposition": f"attachment; filename={filename}"
+        }
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        
+        cache = get_export_cache()
+        owner = trail_owner(user_id, trail_id)
+        body = cache.get(owner, etag)
+        if body is not None:
+            return Response(content=body, media_type=media_type, headers=headers)
+        
+        # Gera o XLSX em blocos, direto na resposta (write-only); o cache
+        # guarda uma cópia quando o arquivo cabe no orçamento
         return StreamingResponse(
-            stream,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+            cache.tee(owner, etag, stream_xlsx(trail, steps, answers_by_step)),
+            media_type=media_type,
+            headers=headers
         )
     except HTTPException:
         raise
@@ -2,41 +2,67 @@
 Template Discovery Router - Endpoints públicos para descobrir templates dinamicamente
 
 100% genérico - sem hardcode de cycles (Q1, Q2, Q3...)
+
+As listagens vêm do catálogo materializado (services/template_catalog)
+e respondem com ETag (If-None-Match → 304).
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from core.models import SuccessResponse
 from db.database import get_db
+from services.export_cache import etag_matches
+from services.template_catalog import get_template_catalog
 from services.template_registry import get_registry
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
 
+def _catalog_response(request: Request, response: Response, db: Session, build):
+    """
+    Monta a resposta de listagem a partir do catálogo
+
+    `build(catalog)` devolve o `data` da resposta; se o cliente já tem o
+    ETag atual, responde 304 sem montar nada.
+    """
+    catalog = get_template_catalog()
+    catalog.ensure_built(db)
+    etag = f'"{catalog.etag}"'
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return SuccessResponse(data=build(catalog))
+
+
 @router.get("/cycles", response_model=SuccessResponse)
-async def list_cycles(db: Session = Depends(get_db)):
+async def list_cycles(request: Request, response: Response, db: Session = Depends(get_db)):
     """
-    Lista todos os cycles disponíveis
+    Lista todos os cycles com templates ativos
     
     Returns:
         Lista de cycles (Q1, Q2, Q3, etc.)
     """
     try:
-        registry = get_registry(db)
-        cycles = registry.list_available_cycles()
+        def build(catalog):
+            cycles = catalog.cycles()
+            return {
+                "cycles": cycles,
+                "total": len(cycles)
+            }
         
-        return SuccessResponse(data={
-            "cycles": cycles,
-            "total": len(cycles)
-        })
+        return _catalog_response(request, response, db, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("", response_model=SuccessResponse)
 async def list_all_templates(
+    request: Request,
+    response: Response,
     cycle: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
@@ -47,21 +73,18 @@ async def list_all_templates(
         cycle: Filtrar por cycle específico (opcional)
     
     Returns:
-        Lista de templates com metadados
+        Lista de templates com metadados (+ schema_hash)
     """
     try:
-        registry = get_registry(db)
+        def build(catalog):
+            templates = catalog.list(cycle)
+            return {
+                "templates": templates,
+                "total": len(templates),
+                "cycle": cycle
+            }
         
-        if cycle:
-            templates = registry.list_templates_by_cycle(cycle)
-        else:
-            templates = registry.list_all_templates()
-        
-        return SuccessResponse(data={
-            "templates": templates,
-            "total": len(templates),
-            "cycle": cycle
-        })
+        return _catalog_response(request, response, db, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -69,6 +92,8 @@ async def list_all_templates(
 @router.get("/{cycle}", response_model=SuccessResponse)
 async def list_templates_by_cycle_path(
     cycle: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
@@ -81,20 +106,22 @@ async def list_templates_by_cycle_path(
         Lista de templates do cycle
     """
     try:
-        registry = get_registry(db)
-        templates = registry.list_templates_by_cycle(cycle)
-        
-        if not templates:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No templates found for cycle '{cycle}'"
-            )
+        def build(catalog):
+            templates = catalog.list(cycle)
+            
+            if not templates:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No templates found for cycle '{cycle}'"
+                )
+            
+            return {
+                "cycle": cycle,
+                "templates": templates,
+                "total": len(templates)
+            }
         
-        return SuccessResponse(data={
-            "cycle": cycle,
-            "templates": templates,
-            "total": len(templates)
-        })
+        return _catalog_response(request, response, db, build)
     except HTTPException:
         raise
     except Exception as e:
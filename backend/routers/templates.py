@@ -13,8 +13,14 @@ Routes:
 - POST /founder/templates/{template_key}/export
   → Export filled template to Excel
   
+- GET  /founder/templates/{template_key}/export/xlsx
+  → Stream filled template as .xlsx download (no file in exports/)
+  
 - GET  /founder/templates/{template_key}/versions
-  → List all saved versions of a template
+  → List saved versions of a template (metadata, paginated)
+  
+- GET  /founder/templates/{template_key}/versions/{version}
+  → Load one saved version
   
 - POST /founder/templates/{template_key}/ai-mentor
   → Send template context to AI mentor chat
@@ -27,13 +33,15 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from core.profiling import run_in_threadpool
 from pydantic import BaseModel, Field
 
 from services.auth import get_current_user_required
 from db.models import User
 from services.template_manager import TemplateManager, TemplateDataService
+from services.export_cache import etag_matches, get_export_cache, template_owner
 
 logger = logging.getLogger(__name__)
 
@@ -84,11 +92,20 @@ class TemplateSavedDataResponse(BaseModel):
     version: int
 
 
+class TemplateVersionResponse(BaseModel):
+    """Saved version metadata (answers via GET /versions/{version})."""
+    template_key: str
+    startup_id: str
+    created_at: str
+    updated_at: str
+    version: int
+
+
 class TemplateResponse(BaseModel):
     """Combined template schema + saved data."""
     template_schema: TemplateSchemaResponse = Field(..., alias="schema")
     saved_data: Optional[TemplateSavedDataResponse] = None
-    versions: list[TemplateSavedDataResponse] = []
+    versions: list[TemplateVersionResponse] = []
     
     model_config = {"populate_by_name": True}
 
@@ -159,6 +176,17 @@ def get_user_startup_id(user: User = Depends(get_current_founder)) -> str:
     return str(user.id)
 
 
+def _original_excel_path() -> Path:
+    """Master Excel the founder templates are exported into."""
+    # TODO: This should come from config
+    EXCEL_TEMPLATES_DIR = Path("data/excel_templates")
+    original_excel = EXCEL_TEMPLATES_DIR / "Template Q1.xlsx"
+    
+    if not original_excel.exists():
+        raise FileNotFoundError(f"Template file not found: {original_excel}")
+    return original_excel
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -272,18 +300,22 @@ async def save_template(
 
 @router.get(
     "/{template_key}/versions",
-    response_model=list[TemplateSavedDataResponse],
+    response_model=list[TemplateVersionResponse],
     summary="List Template Versions",
-    description="Get all saved versions of a template for the founder"
+    description="Get saved versions (metadata) of a template for the founder"
 )
 async def list_versions(
     template_key: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     startup_id: str = Depends(get_user_startup_id),
     user: User = Depends(get_current_founder),
 ):
-    """List all versions of a template for history/comparison."""
+    """List one page of version metadata for history/comparison."""
     try:
-        versions = template_data_service.list_template_versions(startup_id, template_key)
+        versions = template_data_service.list_template_versions(
+            startup_id, template_key, limit=limit, offset=offset
+        )
         return versions
     except Exception as e:
         logger.error(f"Error listing versions: {e}")
@@ -293,6 +325,28 @@ async def list_versions(
         )
 
 
+@router.get(
+    "/{template_key}/versions/{version}",
+    response_model=TemplateSavedDataResponse,
+    summary="Get Template Version",
+    description="Get the answers saved in one version"
+)
+async def get_version(
+    template_key: str,
+    version: int,
+    startup_id: str = Depends(get_user_startup_id),
+    user: User = Depends(get_current_founder),
+):
+    """Load a single saved version."""
+    saved = template_data_service.load_template_data(startup_id, template_key, version)
+    if saved is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Version {version} not found"
+        )
+    return saved
+
+
 @router.post(
     "/{template_key}/export",
     response_model=ExportResponse,
@@ -313,12 +367,7 @@ async def export_template(
     - Metadata sheet with export info
     """
     try:
-        # TODO: This should come from config
-        EXCEL_TEMPLATES_DIR = Path("data/excel_templates")
-        original_excel = EXCEL_TEMPLATES_DIR / "Template Q1.xlsx"
-        
-        if not original_excel.exists():
-            raise FileNotFoundError(f"Template file not found: {original_excel}")
+        original_excel = _original_excel_path()
         
         # Export
         excel_path = template_manager.export_founder_template(
@@ -354,6 +403,79 @@ async def export_template(
         )
 
 
+@router.get(
+    "/{template_key}/export/xlsx",
+    summary="Download Excel",
+    description="Stream filled template as an .xlsx download"
+)
+async def download_template_xlsx(
+    template_key: str,
+    request: Request,
+    startup_id: str = Depends(get_user_startup_id),
+    user: User = Depends(get_current_founder),
+):
+    """
+    Serve the filled template straight into the response.
+    
+    Same workbook as POST /export, but nothing is written to exports/.
+    The ETag is the content key (template file + schema + answers):
+    If-None-Match answers 304, and the rendered bytes stay in the export
+    cache until the founder saves new data. A cache miss streams the
+    package with Content-Length and copies the chunks into the cache.
+    """
+    try:
+        original_excel = _original_excel_path()
+        content_key = await run_in_threadpool(
+            template_manager.data_service.export_key,
+            startup_id,
+            template_key,
+            original_excel,
+        )
+        if content_key is None:
+            raise ValueError(f"No data found for {startup_id}/{template_key}")
+        
+        etag = f'"{content_key}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+        
+        headers = {
+            **cache_headers,
+            "Content-Disposition": f"attachment; filename={startup_id}_{template_key}.xlsx",
+        }
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        
+        cache = get_export_cache()
+        owner = template_owner(startup_id, template_key)
+        body = cache.get(owner, etag)
+        if body is not None:
+            return Response(content=body, media_type=media_type, headers=headers)
+        
+        filled = await run_in_threadpool(
+            template_manager.stream_founder_template,
+            startup_id,
+            template_key,
+            original_excel,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error exporting template: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        cache.tee(owner, etag, iter(filled)),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(filled.size)}
+    )
+
+
 @router.post(
     "/{template_key}/ai-mentor",
     response_model=AIMentorPayload,
@@ -15,22 +15,65 @@ GARANTIAS:
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime
 
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
 from db.database import get_db
 from db.models import User, StepAnswer
 from app.models.template_definition import TemplateDefinition, FillableField
 from services.auth import get_current_user
+from services.progress_summary import get_summary, record_template_summary
 
 router = APIRouter(prefix="/api/v1/trails", tags=["trails"])
 logger = logging.getLogger(__name__)
 
 
+def _answered_field_ids(template_id: str, founder_id: str, db: Session) -> Set[str]:
+    """
+    field_ids do template que o founder já respondeu
+    
+    Uma única query (semi-join StepAnswer × FillableField), apoiada no
+    índice (user_id, step_id) de step_answers.
+    """
+    template_fields = select(FillableField.field_id).where(
+        FillableField.template_id == template_id
+    )
+    rows = db.query(StepAnswer.step_id).filter(
+        and_(
+            StepAnswer.user_id == founder_id,
+            StepAnswer.step_id.in_(template_fields),  # field_id mapeia para step_id
+        )
+    ).distinct().all()
+    return {row[0] for row in rows}
+
+
+def _first_unanswered(
+    questions: List[FillableField],
+    answered: Set[str],
+    template_id: str,
+) -> Optional[Dict[str, Any]]:
+    """Primeira pergunta (na ordem dada) fora de `answered`, ou None"""
+    for question in questions:
+        if question.field_id not in answered:
+            return {
+                "id": question.id,
+                "field_id": question.field_id,
+                "template_id": template_id,
+                "sheet_name": question.sheet_name,
+                "cell_range": question.cell_range,
+                "label": question.label,
+                "inferred_type": question.inferred_type,
+                "required": question.required,
+                "example_value": question.example_value,
+                "order_index": question.order_index,
+            }
+    return None
+
+
 def get_next_unanswered_question(
     template_id: str,
     founder_id: str,
@@ -42,6 +85,9 @@ def get_next_unanswered_question(
     Retorna a próxima pergunta não respondida em ordem de sequência.
     Usa backend como autoridade absoluta.
     
+    Duas queries, independente do nº de perguntas: perguntas em ordem
+    e conjunto de field_ids respondidos.
+    
     Args:
         template_id: ID do template
         founder_id: ID do founder
@@ -58,33 +104,9 @@ def get_next_unanswered_question(
     if not questions:
         return None
     
-    # 2. Verificar qual é a próxima não respondida
-    for question in questions:
-        # Buscar se founder respondeu essa pergunta
-        answer = db.query(StepAnswer).filter(
-            and_(
-                StepAnswer.user_id == founder_id,
-                StepAnswer.step_id == question.field_id,  # field_id mapeia para step_id
-            )
-        ).first()
-        
-        if not answer:
-            # Encontrou uma não respondida
-            return {
-                "id": question.id,
-                "field_id": question.field_id,
-                "template_id": template_id,
-                "sheet_name": question.sheet_name,
-                "cell_range": question.cell_range,
-                "label": question.label,
-                "inferred_type": question.inferred_type,
-                "required": question.required,
-                "example_value": question.example_value,
-                "order_index": question.order_index,
-            }
-    
-    # Todas respondidas
-    return None
+    # 2. Primeira fora do conjunto de respondidas (None = todas respondidas)
+    answered = _answered_field_ids(template_id, founder_id, db)
+    return _first_unanswered(questions, answered, template_id)
 
 
 def validate_sequence(
@@ -99,6 +121,8 @@ def validate_sequence(
     Verifica se founder pode responder essa pergunta.
     Precisa ter respondido TODAS as anteriores.
     
+    Três queries, independente do nº de perguntas anteriores.
+    
     Args:
         template_id: ID do template
         field_id: ID do campo
@@ -119,29 +143,28 @@ def validate_sequence(
     if not question:
         return False, "Pergunta não encontrada"
     
-    # 2. Buscar todas as perguntas anteriores (ordem menor)
-    previous_questions = db.query(FillableField).filter(
-        and_(
-            FillableField.template_id == template_id,
-            FillableField.order_index < question.order_index,
-        )
-    ).order_by(FillableField.order_index.asc()).all()
-    
-    # 3. Verificar se todas foram respondidas
-    for prev_q in previous_questions:
-        answer = db.query(StepAnswer).filter(
+    # 2. Buscar os field_ids das perguntas anteriores (ordem menor)
+    previous_ids = {
+        row[0]
+        for row in db.query(FillableField.field_id).filter(
             and_(
-                StepAnswer.user_id == founder_id,
-                StepAnswer.step_id == prev_q.field_id,
-            )
-        ).first()
-        
-        if not answer:
-            return False, (
-                f"Você precisa responder as perguntas anteriores. "
-                f"Respondidas: {len([q for q in previous_questions if db.query(StepAnswer).filter(and_(StepAnswer.user_id == founder_id, StepAnswer.step_id == q.field_id)).first()])}/"
-                f"{len(previous_questions)}"
+                FillableField.template_id == template_id,
+                FillableField.order_index < question.order_index,
             )
+        ).all()
+    }
+    
+    if not previous_ids:
+        return True, None
+    
+    # 3. Verificar se todas foram respondidas
+    answered_previous = previous_ids & _answered_field_ids(template_id, founder_id, db)
+    
+    if len(answered_previous) < len(previous_ids):
+        return False, (
+            f"Você precisa responder as perguntas anteriores. "
+            f"Respondidas: {len(answered_previous)}/{len(previous_ids)}"
+        )
     
     return True, None
 
@@ -344,6 +367,15 @@ async def submit_answer(
             )
             db.add(step_answer)
         
+        # 5. Resumo de progresso na mesma transação
+        questions = db.query(FillableField).filter_by(
+            template_id=template_id
+        ).order_by(FillableField.order_index.asc()).all()
+        answered = _answered_field_ids(template_id, current_user.id, db) | {field_id}
+        record_template_summary(
+            db, current_user.id, template_id, [q.field_id for q in questions], answered
+        )
+        
         db.commit()
         
         logger.info(
@@ -351,8 +383,8 @@ async def submit_answer(
             f"user={current_user.id}, field_id={field_id}, template_id={template_id}"
         )
         
-        # 5. Retornar próxima pergunta
-        next_question = get_next_unanswered_question(template_id, current_user.id, db)
+        # 6. Retornar próxima pergunta (mesmos dados, sem novas queries)
+        next_question = _first_unanswered(questions, answered, template_id)
         
         return {
             "status": "✅ Resposta salva",
@@ -396,28 +428,34 @@ async def get_progress(
     if not template:
         raise HTTPException(status_code=404, detail="Template não encontrado")
     
-    # Contar respostas
-    all_questions = db.query(FillableField).filter_by(
-        template_id=template_id
-    ).order_by(FillableField.order_index.asc()).all()
-    
-    answered_count = 0
-    for question in all_questions:
-        answer = db.query(StepAnswer).filter(
-            and_(
-                StepAnswer.user_id == founder_id,
-                StepAnswer.step_id == question.field_id,
-            )
-        ).first()
-        if answer:
-            answered_count += 1
+    # Resumo materializado (atualizado a cada resposta)
+    summary = get_summary(db, founder_id, template_id, kind="template")
+    
+    if summary is not None:
+        answered_count = summary.answered_count
+        total_count = summary.total_count
+        next_question = None
+        if summary.current_step_id:
+            question = db.query(FillableField).filter(
+                and_(
+                    FillableField.template_id == template_id,
+                    FillableField.field_id == summary.current_step_id,
+                )
+            ).first()
+            next_question = _first_unanswered([question], set(), template_id) if question else None
+    else:
+        # Founder ainda sem respostas neste template
+        all_questions = db.query(FillableField).filter_by(
+            template_id=template_id
+        ).order_by(FillableField.order_index.asc()).all()
+        
+        answered = _answered_field_ids(template_id, founder_id, db) if all_questions else set()
+        answered_count = sum(1 for question in all_questions if question.field_id in answered)
+        total_count = len(all_questions)
+        next_question = _first_unanswered(all_questions, answered, template_id)
     
-    total_count = len(all_questions)
     is_complete = answered_count == total_count and total_count > 0
     
-    # Próxima pergunta
-    next_question = get_next_unanswered_question(template_id, founder_id, db)
-    
     return {
         "progress_percent": int((answered_count / total_count) * 100) if total_count > 0 else 0,
         "answered": answered_count,
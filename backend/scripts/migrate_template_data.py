@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+TEMPLATE DATA MIGRATION
+=======================
+
+Imports founder template responses stored as
+`{data_dir}/{startup_id}/{template_key}/v{n}.json` into the indexed
+SQLite store used by TemplateDataService (services/template_data_store).
+
+Idempotent: versions already imported are skipped. JSON files are left
+in place (delete them manually once the new store is verified).
+
+Run: python backend/scripts/migrate_template_data.py [--data-dir data/templates]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from services.template_data_store import (
+    SQLITE_FILENAME,
+    TEMPLATE_DATA_DIR,
+    SQLiteTemplateDataStore,
+    migrate_json_files,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description="Migrate template data JSON files to SQLite")
+    parser.add_argument(
+        "--data-dir",
+        default=TEMPLATE_DATA_DIR,
+        help="TemplateDataService data directory (default: TEMPLATE_DATA_DIR or data/templates)"
+    )
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.exists():
+        logger.error(f"Data directory not found: {data_dir}")
+        return False
+
+    store = SQLiteTemplateDataStore(data_dir / SQLITE_FILENAME)
+    stats = migrate_json_files(data_dir, store)
+    logger.info(
+        f"Imported {stats['imported']} versions, skipped {stats['skipped']}, errors {stats['errors']} "
+        f"→ {store.path}"
+    )
+    return stats["errors"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+REBUILD PROGRESS SUMMARIES
+==========================
+
+Recalcula a tabela progress_summaries (services/progress_summary) a
+partir de UserProgress/StepAnswer para todas as trilhas.
+
+O startup já faz isso quando a tabela está vazia; use este script para
+forçar o recálculo (ex.: após importar dados direto no banco).
+
+Run: python backend/scripts/rebuild_progress_summaries.py
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from db.database import SessionLocal, init_db
+from services.progress_summary import rebuild_trail_summaries
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> bool:
+    init_db()
+    db = SessionLocal()
+    try:
+        count = rebuild_trail_summaries(db)
+        logger.info(f"✅ {count} resumos de progresso recalculados")
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Falha ao recalcular resumos: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
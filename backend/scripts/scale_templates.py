@@ -31,6 +31,9 @@ from openpyxl.drawing.image import Image as XLImage
 from PIL import Image as PILImage, ImageDraw, ImageFont
 import io
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from services.sheet_geometry import SheetGeometry
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -131,6 +134,7 @@ class ExcelTemplateScaler:
         self.workbook = openpyxl.load_workbook(excel_path)
         self._column_width_cache = {}
         self._row_height_cache = {}
+        self._geometries: Dict[str, SheetGeometry] = {}
         
         logger.info(f"Loaded workbook: {excel_path}")
         logger.info(f"Sheets found: {self.workbook.sheetnames}")
@@ -161,27 +165,23 @@ class ExcelTemplateScaler:
         self._row_height_cache[row_num] = pixels
         return pixels
 
+    def get_geometry(self, worksheet) -> SheetGeometry:
+        """Prefix-sum geometry for a worksheet (built once per sheet)."""
+        geometry = self._geometries.get(worksheet.title)
+        if geometry is None:
+            geometry = SheetGeometry(
+                column_width=lambda col: self.get_column_width_pixels(worksheet, get_column_letter(col)),
+                row_height=lambda row: self.get_row_height_pixels(worksheet, row),
+            )
+            self._geometries[worksheet.title] = geometry
+        return geometry
+
     def get_cell_position(self, worksheet, cell_address: str) -> CellPosition:
         """Calculate exact pixel position of a cell."""
         col_index = column_index_from_string(cell_address.rstrip('0123456789'))
         row_num = int(cell_address.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
         
-        col_letter = get_column_letter(col_index)
-        
-        # Calculate cumulative left
-        left = 0.0
-        for col in range(1, col_index):
-            left += self.get_column_width_pixels(worksheet, get_column_letter(col))
-        
-        # Calculate cumulative top
-        top = 0.0
-        for row in range(1, row_num):
-            top += self.get_row_height_pixels(worksheet, row)
-        
-        # Get cell dimensions
-        width = self.get_column_width_pixels(worksheet, col_letter)
-        height = self.get_row_height_pixels(worksheet, row_num)
-        
+        top, left, width, height = self.get_geometry(worksheet).cell_box(row_num, col_index)
         return CellPosition(top=top, left=left, width=width, height=height)
 
     def discover_editable_cells(self, worksheet) -> List[Tuple[str, str]]:
@@ -238,14 +238,7 @@ class ExcelTemplateScaler:
         max_col = worksheet.max_column
         
         # Calculate sheet dimensions in pixels
-        sheet_width = sum(
-            self.get_column_width_pixels(worksheet, get_column_letter(col))
-            for col in range(1, max_col + 1)
-        )
-        sheet_height = sum(
-            self.get_row_height_pixels(worksheet, row)
-            for row in range(1, max_row + 1)
-        )
+        sheet_width, sheet_height = self.get_geometry(worksheet).sheet_size(max_col, max_row)
         
         logger.info(f"  Sheet dimensions: {sheet_width:.1f} × {sheet_height:.1f} px")
         
@@ -23,6 +23,8 @@ import openpyxl
 from openpyxl.utils import get_column_letter, column_index_from_string
 from openpyxl.worksheet.worksheet import Worksheet
 
+from services.sheet_geometry import SheetGeometry
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -166,6 +168,18 @@ class ExcelTemplateParser:
         self.workbook = openpyxl.load_workbook(str(self.excel_path))
         self._column_width_cache: Dict[str, float] = {}
         self._row_height_cache: Dict[int, float] = {}
+        self._geometries: Dict[str, SheetGeometry] = {}
+    
+    def _geometry(self, worksheet: Worksheet) -> SheetGeometry:
+        """Prefix-sum geometry for a worksheet (built once, extended on demand)."""
+        geometry = self._geometries.get(worksheet.title)
+        if geometry is None:
+            geometry = SheetGeometry(
+                column_width=lambda col: self._get_column_width_pixels(worksheet, get_column_letter(col)),
+                row_height=lambda row: self._get_row_height_pixels(worksheet, row),
+            )
+            self._geometries[worksheet.title] = geometry
+        return geometry
     
     def _get_column_width_pixels(self, worksheet: Worksheet, col_letter: str) -> float:
         """
@@ -231,23 +245,10 @@ class ExcelTemplateParser:
         col_index = column_index_from_string(cell_address.rstrip('0123456789'))
         row_num = int(cell_address.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
         
-        col_letter = get_column_letter(col_index)
-        
-        # Calculate cumulative left position
-        left = 0.0
-        for col in range(1, col_index):
-            left += self._get_column_width_pixels(worksheet, get_column_letter(col))
+        # Cumulative left/top come from the sheet's prefix sums (O(1))
+        top, left, width, height = self._geometry(worksheet).cell_box(row_num, col_index)
         
-        # Calculate cumulative top position
-        top = 0.0
-        for row in range(1, row_num):
-            top += self._get_row_height_pixels(worksheet, row)
-        
-        # Get this cell's dimensions
-        width = self._get_column_width_pixels(worksheet, col_letter)
-        height = self._get_row_height_pixels(worksheet, row_num)
-        
-        logger.debug(f"Cell {cell_address}: top={top}, left={left}, width={width}, height={height}")
+        logger.debug("Cell %s: top=%s, left=%s, width=%s, height=%s", cell_address, top, left, width, height)
         
         return CellPosition(top=top, left=left, width=width, height=height)
     
@@ -331,13 +332,7 @@ class ExcelTemplateParser:
         max_row = worksheet.max_row or 1
         max_col = worksheet.max_column or 1
         
-        sheet_width = 0.0
-        for col in range(1, max_col + 1):
-            sheet_width += self._get_column_width_pixels(worksheet, get_column_letter(col))
-        
-        sheet_height = 0.0
-        for row in range(1, max_row + 1):
-            sheet_height += self._get_row_height_pixels(worksheet, row)
+        sheet_width, sheet_height = self._geometry(worksheet).sheet_size(max_col, max_row)
         
         logger.info(f"Parsing sheet '{sheet_name}': {max_row} rows × {max_col} cols")
         logger.info(f"Sheet dimensions: {sheet_width}px × {sheet_height}px")
@@ -384,7 +379,7 @@ class ExcelTemplateParser:
             )
             
             field_list.append(metadata)
-            logger.debug(f"Field {field_key}: cell={cell_address}, type={field_type.value}")
+            logger.debug("Field %s: cell=%s, type=%s", field_key, cell_address, field_type.value)
         
         # Build template schema
         schema = TemplateSchema(
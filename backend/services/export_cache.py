@@ -0,0 +1,134 @@
+"""
+Cache de exports XLSX endereçado por conteúdo
+=============================================
+
+Founders baixam o mesmo export várias vezes sem mudar as respostas;
+aqui o XLSX renderizado fica em memória, identificado pelo hash de
+(template, trilha/template_key, respostas). No primeiro download o
+export sai em streaming e os blocos são copiados para o cache (tee).
+O mesmo hash vira o ETag da resposta (If-None-Match → 304).
+
+Cada entrada pertence a um "dono" (founder + trilha ou startup +
+template): save_step_progress / save_template_data invalidam o dono e
+as versões antigas saem do cache na hora, sem esperar o LRU.
+
+CONFIGURAÇÃO (ENV):
+- EXPORT_CACHE_MB: orçamento de memória (default: 32; 0 desliga)
+"""
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.services.snapshot_cache import SnapshotCache
+
+EXPORT_CACHE_MB = float(os.getenv("EXPORT_CACHE_MB", "32"))
+
+
+def export_key(*parts: Any) -> str:
+    """Hash estável (sha256) das partes que determinam o conteúdo do export"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match (lista, W/ e *) contém o ETag?"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in tags)
+
+
+def trail_export_key(trail, steps, answers_by_step: Dict[str, Dict]) -> str:
+    """Chave do XLSX da trilha: schema das etapas + respostas do founder"""
+    return export_key(
+        "trail",
+        trail.id,
+        trail.name,
+        [(s.step_id, s.step_name, s.description, s.schema) for s in steps],
+        answers_by_step,
+    )
+
+
+def trail_owner(user_id: str, trail_id: str) -> str:
+    return f"trail:{user_id}:{trail_id}"
+
+
+def template_owner(startup_id: str, template_key: str) -> str:
+    return f"template:{startup_id}:{template_key}"
+
+
+class ExportCache:
+    """Bytes de export por (dono, chave de conteúdo) com LRU limitado em bytes"""
+
+    def __init__(self, max_bytes: int):
+        self._lru = SnapshotCache(max_bytes=max_bytes)
+
+    @property
+    def enabled(self) -> bool:
+        return self._lru.max_bytes > 0
+
+    def get_or_render(self, owner: str, key: str, render: Callable[[], bytes]) -> bytes:
+        """
+        Export em cache ou renderizado agora
+
+        Exports maiores que o orçamento são devolvidos sem ficar em cache.
+        """
+        def load():
+            body = render()
+            return body, len(body)
+
+        return self._lru.get_or_load(owner, key, load)
+
+    def get(self, owner: str, key: str) -> Optional[bytes]:
+        """Export em cache ou None"""
+        return self._lru.get(owner, key)
+
+    def tee(self, owner: str, key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Repassa os blocos do export (streaming) e guarda o arquivo completo
+
+        Só acumula enquanto o total cabe no orçamento: exports maiores
+        seguem em streaming sem ficar inteiros em memória. Se o consumidor
+        parar antes do fim, nada é guardado.
+        """
+        parts: List[bytes] = []
+        size = 0
+        keep = self.enabled
+        try:
+            for chunk in chunks:
+                if keep:
+                    size += len(chunk)
+                    keep = size <= self._lru.max_bytes
+                    if keep:
+                        parts.append(chunk)
+                    else:
+                        parts.clear()
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        if keep:
+            self._lru.put(owner, key, b"".join(parts), size)
+
+    def invalidate(self, owner: str) -> None:
+        """Descarta todos os exports do dono (respostas mudaram)"""
+        self._lru.invalidate(owner)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._lru.stats()
+
+
+_cache: Optional[ExportCache] = None
+
+
+def get_export_cache() -> ExportCache:
+    """Cache singleton por processo"""
+    global _cache
+    if _cache is None:
+        _cache = ExportCache(max_bytes=EXPORT_CACHE_MB * 1024 * 1024)
+    return _cache
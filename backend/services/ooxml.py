@@ -0,0 +1,23 @@
+"""
+OOXML - Helpers para reescrever partes XML de pacotes .xlsx
+===========================================================
+
+Usado por quem edita o XML do pacote com ElementTree em vez de passar
+pelo openpyxl:
+- services/template_ingestion_service.py (split de sheets)
+- app/services/template_snapshot.py (sheet sem células)
+"""
+
+import io
+import xml.etree.ElementTree as ET
+
+
+def register_namespaces(xml_bytes: bytes) -> None:
+    """
+    Preserva os prefixos originais ao reescrever o XML com ElementTree
+
+    O registro de namespaces do ElementTree é global ao processo: os
+    prefixos registrados aqui valem para qualquer serialização posterior.
+    """
+    for _, (prefix, uri) in ET.iterparse(io.BytesIO(xml_bytes), events=("start-ns",)):
+        ET.register_namespace(prefix, uri)
@@ -0,0 +1,211 @@
+"""
+Resumo materializado de progresso (ProgressSummary)
+===================================================
+
+RESPONSABILIDADE:
+Manter uma linha por (founder, tipo, trilha/template) com respondidas, total,
+concluídas, % e etapa atual, para que GET /founder/trails, o dashboard
+admin e /api/v1/trails/.../progress leiam o resumo em vez de varrer
+UserProgress/StepAnswer.
+
+TRANSAÇÃO:
+Quem grava respostas/progresso chama refresh_trail_summary ou
+record_template_summary ANTES do commit: o resumo é gravado na mesma
+transação (sem commit aqui) e nunca fica à frente/atrás dos dados.
+
+ESTADO POR ETAPA (trilhas):
+step_states guarda só o que veio do banco - {locked, completed, progress}
+quando existe UserProgress, {progress} quando só há respostas. Etapas
+ausentes usam o padrão da tela (primeira desbloqueada, progresso 0), então
+renomear/reordenar etapas não invalida o resumo.
+
+Backfill de bancos existentes: automático no startup quando a tabela está
+vazia (ensure_trail_summaries) ou python backend/scripts/rebuild_progress_summaries.py
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from db.models import ProgressSummary, StepAnswer, StepSchema, UserProgress
+
+logger = logging.getLogger(__name__)
+
+
+def step_view(step_id: str, step_name: str, idx: int, state: Optional[Dict]) -> Dict:
+    """Etapa como as telas exibem (padrões para etapas sem estado)"""
+    state = state or {}
+    return {
+        "id": step_id,
+        "name": step_name,
+        "locked": state.get("locked", idx > 0),  # Primeiro desbloqueado
+        "completed": state.get("completed", False),
+        "progress": state.get("progress", 0),
+    }
+
+
+def _get_or_create(db: Session, user_id: str, trail_id: str, kind: str) -> ProgressSummary:
+    summary = get_summary(db, user_id, trail_id, kind)
+    if summary is None:
+        summary = ProgressSummary(user_id=user_id, trail_id=trail_id, kind=kind)
+        db.add(summary)
+    return summary
+
+
+def refresh_trail_summary(db: Session, user_id: str, trail_id: str) -> ProgressSummary:
+    """
+    Recalcula o resumo do founder em uma trilha (sem commit)
+
+    Lê apenas as etapas da trilha e as linhas desse founder nela.
+    """
+    # Sessões com autoflush=False: o recálculo precisa ver o que foi gravado
+    db.flush()
+
+    steps = db.query(StepSchema).filter(
+        StepSchema.trail_id == trail_id
+    ).order_by(StepSchema.order, StepSchema.id).all()
+
+    states: Dict[str, Dict] = {}
+    answered: Set[str] = set()
+
+    # Primeira linha por etapa, como as telas faziam com .first()
+    for answer in db.query(StepAnswer).filter(
+        StepAnswer.user_id == user_id,
+        StepAnswer.trail_id == trail_id
+    ).order_by(StepAnswer.id.desc()).all():
+        if answer.answers:
+            answered.add(answer.step_id)
+            states[answer.step_id] = {"progress": min(100, len(answer.answers) * 25)}
+        else:
+            states.pop(answer.step_id, None)
+            answered.discard(answer.step_id)
+
+    for progress in db.query(UserProgress).filter(
+        UserProgress.user_id == user_id,
+        UserProgress.trail_id == trail_id
+    ).order_by(UserProgress.id.desc()).all():
+        states[progress.step_id] = {
+            "locked": progress.is_locked,
+            "completed": progress.is_completed,
+            "progress": progress.progress_percent or 0,
+        }
+
+    views = [step_view(s.step_id, s.step_name, idx, states.get(s.step_id)) for idx, s in enumerate(steps)]
+    total = len(views)
+
+    summary = _get_or_create(db, user_id, trail_id, "trail")
+    summary.total_count = total
+    summary.answered_count = sum(1 for s in steps if s.step_id in answered)
+    summary.completed_count = sum(1 for v in views if v["completed"])
+    summary.progress_percent = sum(v["progress"] for v in views) // total if total else 0
+    summary.current_step_id = next((v["id"] for v in views if not v["completed"]), None)
+    summary.step_states = {s.step_id: states[s.step_id] for s in steps if s.step_id in states}
+    return summary
+
+
+def refresh_trail_summaries(db: Session, trail_id: str) -> int:
+    """
+    Recalcula os resumos de todos os founders de uma trilha (sem commit),
+    para quando as etapas da trilha são substituídas
+    """
+    user_ids = [row[0] for row in db.query(ProgressSummary.user_id).filter(
+        ProgressSummary.trail_id == trail_id,
+        ProgressSummary.kind == "trail"
+    ).order_by(ProgressSummary.id).all()]
+    for user_id in user_ids:
+        refresh_trail_summary(db, user_id, trail_id)
+    return len(user_ids)
+
+
+def record_template_summary(
+    db: Session,
+    user_id: str,
+    template_id: str,
+    question_ids: List[str],
+    answered: Set[str],
+) -> ProgressSummary:
+    """
+    Grava o resumo de um template (trail_endpoints) a partir do que o
+    chamador já carregou: field_ids em ordem e conjunto respondido (sem commit)
+    """
+    answered_count = sum(1 for field_id in question_ids if field_id in answered)
+    total = len(question_ids)
+
+    summary = _get_or_create(db, user_id, str(template_id), "template")
+    summary.total_count = total
+    summary.answered_count = answered_count
+    summary.completed_count = answered_count
+    summary.progress_percent = int((answered_count / total) * 100) if total > 0 else 0
+    summary.current_step_id = next((f for f in question_ids if f not in answered), None)
+    summary.step_states = {}
+    return summary
+
+
+def delete_template_summaries(db: Session, template_id) -> int:
+    """
+    Remove os resumos de um template cujas perguntas foram substituídas
+    (sem commit); get_progress volta ao cálculo por conjunto até a próxima resposta
+    """
+    return db.query(ProgressSummary).filter(
+        ProgressSummary.trail_id == str(template_id),
+        ProgressSummary.kind == "template"
+    ).delete(synchronize_session=False)
+
+
+def get_summary(db: Session, user_id: str, trail_id: str, kind: str = "trail") -> Optional[ProgressSummary]:
+    """Resumo de uma trilha (kind="trail") ou template (kind="template")"""
+    return db.query(ProgressSummary).filter(
+        ProgressSummary.user_id == user_id,
+        ProgressSummary.kind == kind,
+        ProgressSummary.trail_id == str(trail_id)
+    ).first()
+
+
+def summaries_by_user(
+    db: Session,
+    user_ids: Iterable[str],
+    kind: str = "trail",
+) -> Dict[str, List[ProgressSummary]]:
+    """Resumos de vários founders em uma query, na ordem de criação"""
+    user_ids = list(user_ids)
+    grouped: Dict[str, List[ProgressSummary]] = {}
+    if not user_ids:
+        return grouped
+    for summary in db.query(ProgressSummary).filter(
+        ProgressSummary.user_id.in_(user_ids),
+        ProgressSummary.kind == kind
+    ).order_by(ProgressSummary.id).all():
+        grouped.setdefault(summary.user_id, []).append(summary)
+    return grouped
+
+
+def rebuild_trail_summaries(db: Session) -> int:
+    """
+    Recria os resumos de trilha a partir de UserProgress/StepAnswer
+    (backfill); faz commit e retorna quantos resumos foram gravados
+    """
+    trail_ids = {row[0] for row in db.query(StepSchema.trail_id).distinct().all()}
+    pairs = set()
+    for model in (UserProgress, StepAnswer):
+        for user_id, trail_id in db.query(model.user_id, model.trail_id).distinct().all():
+            if trail_id in trail_ids:
+                pairs.add((user_id, trail_id))
+
+    for user_id, trail_id in sorted(pairs):
+        refresh_trail_summary(db, user_id, trail_id)
+    db.commit()
+
+    logger.info(f"📊 Resumos de progresso recalculados: {len(pairs)}")
+    return len(pairs)
+
+
+def ensure_trail_summaries(db: Session) -> int:
+    """
+    Backfill automático no startup: recria os resumos só quando a tabela
+    está vazia e já existem respostas/progresso (primeiro deploy)
+    """
+    if db.query(ProgressSummary.id).first() is not None:
+        return 0
+    if db.query(UserProgress.id).first() is None and db.query(StepAnswer.id).first() is None:
+        return 0
+    return rebuild_trail_summaries(db)
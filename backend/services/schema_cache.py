@@ -0,0 +1,101 @@
+"""
+Cache de schemas JSON de templates
+==================================
+
+Um cache por processo, compartilhado por TemplateDataService e
+TemplateRegistry, para não reler e reparsear o mesmo schema a cada
+requisição.
+
+INVALIDAÇÃO:
+Cada leitura faz um stat() do arquivo; a entrada vale enquanto
+(mtime_ns, tamanho) não mudar. Schemas regravados por outro worker ou
+por um deploy são relidos na próxima leitura, sem limpar o cache todo.
+
+MEMÓRIA:
+LRU limitado em bytes (app.services.snapshot_cache): cada schema conta
+como tamanho do arquivo × PARSED_OVERHEAD.
+
+Os objetos devolvidos são compartilhados entre requisições: não modificar.
+
+CONFIGURAÇÃO (ENV):
+- SCHEMA_CACHE_MB: orçamento de memória (default: 16; 0 desliga)
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.services.snapshot_cache import PARSED_OVERHEAD, SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CACHE_MB = float(os.getenv("SCHEMA_CACHE_MB", "16"))
+
+
+class SchemaCache:
+    """Schemas parseados por caminho, validados pelo stat do arquivo"""
+
+    def __init__(self, max_bytes: int):
+        self._lru = SnapshotCache(max_bytes=max_bytes)
+        self.reloads = 0
+
+    def load(self, path: str | Path, parse: Optional[Callable[[Dict], Any]] = None) -> Any:
+        """
+        Schema de `path` (dict do JSON, ou parse(dict) quando informado)
+
+        Raises:
+            FileNotFoundError: arquivo não existe
+            ValueError: JSON inválido
+        """
+        path = str(path)
+        stat = os.stat(path)
+        variant = (
+            getattr(parse, "__qualname__", "json"),
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+        def loader():
+            # Versões antigas do mesmo arquivo saem do cache na hora; a outra
+            # variante de parse da versão atual continua
+            if self._lru.invalidate(path, lambda cached: cached[1:] != variant[1:]):
+                self.reloads += 1
+            with open(path, 'r', encoding='utf-8') as f:
+                schema = json.load(f)
+            value = parse(schema) if parse else schema
+            return value, stat.st_size * PARSED_OVERHEAD
+
+        return self._lru.get_or_load(path, variant, loader)
+
+    def invalidate(self, path: str | Path) -> None:
+        """Descarta o schema (chamado por quem regrava o arquivo)"""
+        self._lru.invalidate(str(path))
+
+    def warm(self, paths: Iterable[str | Path], parse: Optional[Callable[[Dict], Any]] = None) -> int:
+        """Carrega os schemas de antemão; retorna quantos foram carregados"""
+        loaded = 0
+        for path in paths:
+            try:
+                self.load(path, parse)
+                loaded += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Schema não pré-carregado {path}: {e}")
+        return loaded
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._lru.stats(), "reloads": self.reloads}
+
+
+_cache: Optional[SchemaCache] = None
+
+
+def get_schema_cache() -> SchemaCache:
+    """Cache singleton por processo"""
+    global _cache
+    if _cache is None:
+        _cache = SchemaCache(max_bytes=SCHEMA_CACHE_MB * 1024 * 1024)
+    return _cache
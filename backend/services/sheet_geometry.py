@@ -0,0 +1,144 @@
+"""
+Sheet Geometry - Posições pixel das células por soma de prefixos
+================================================================
+
+Cada worksheet ganha dois arrays cumulativos (bordas das colunas e das
+linhas), construídos uma vez e estendidos sob demanda. Posição, tamanho,
+dimensões da sheet e bounds de ranges mesclados saem em O(1).
+
+As larguras/alturas de cada coluna/linha continuam vindo de quem usa o
+engine (callbacks), porque os parsers têm regras próprias de default:
+- services/excel_template_parser.py
+- services/template_ingestion_service.py
+- scripts/scale_templates.py
+
+As bordas são acumuladas na mesma ordem das somas antigas (coluna 1 em
+diante), então left/top, tamanhos de célula e dimensões da sheet são bit
+a bit iguais; só o tamanho de ranges mesclados (diferença de prefixos)
+pode variar na última casa de ponto flutuante.
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+# (top, left, width, height) em pixels
+Box = Tuple[float, float, float, float]
+# (min_row, min_col, max_row, max_col)
+Bounds = Tuple[int, int, int, int]
+
+
+class SheetGeometry:
+    """
+    Geometria pixel de uma worksheet
+
+    Args:
+        column_width: coluna (1-based) → largura em pixels
+        row_height: linha (1-based) → altura em pixels
+        merged_ranges: ranges mesclados (objetos com min/max_row/col,
+            ex.: worksheet.merged_cells.ranges); indexados sob demanda
+    """
+
+    def __init__(
+        self,
+        column_width: Callable[[int], float],
+        row_height: Callable[[int], float],
+        merged_ranges: Iterable = (),
+    ):
+        self._column_width = column_width
+        self._row_height = row_height
+        # _col_edges[i] = left da coluna i+1 = soma das larguras 1..i
+        self._col_edges = array("d", [0.0])
+        self._row_edges = array("d", [0.0])
+        # Tamanhos individuais (índice 0 sem uso), para width/height exatos
+        self._col_widths = array("d", [0.0])
+        self._row_heights = array("d", [0.0])
+        self._merged_ranges = merged_ranges
+        self._merged_index: Optional[Dict[Tuple[int, int], Bounds]] = None
+
+    # ------------------------------------------------------------------
+    # Prefixos
+    # ------------------------------------------------------------------
+    def _ensure_columns(self, col: int) -> None:
+        edges, widths = self._col_edges, self._col_widths
+        for c in range(len(edges), col + 1):
+            width = self._column_width(c)
+            widths.append(width)
+            edges.append(edges[-1] + width)
+
+    def _ensure_rows(self, row: int) -> None:
+        edges, heights = self._row_edges, self._row_heights
+        for r in range(len(edges), row + 1):
+            height = self._row_height(r)
+            heights.append(height)
+            edges.append(edges[-1] + height)
+
+    def left(self, col: int) -> float:
+        self._ensure_columns(col - 1)
+        return self._col_edges[col - 1]
+
+    def top(self, row: int) -> float:
+        self._ensure_rows(row - 1)
+        return self._row_edges[row - 1]
+
+    def columns_width(self, min_col: int, max_col: int) -> float:
+        """Largura somada das colunas min_col..max_col"""
+        self._ensure_columns(max_col)
+        return self._col_edges[max_col] - self._col_edges[min_col - 1]
+
+    def rows_height(self, min_row: int, max_row: int) -> float:
+        """Altura somada das linhas min_row..max_row"""
+        self._ensure_rows(max_row)
+        return self._row_edges[max_row] - self._row_edges[min_row - 1]
+
+    def sheet_size(self, max_col: int, max_row: int) -> Tuple[float, float]:
+        """(largura, altura) das colunas 1..max_col e linhas 1..max_row"""
+        self._ensure_columns(max_col)
+        self._ensure_rows(max_row)
+        return self._col_edges[max_col], self._row_edges[max_row]
+
+    # ------------------------------------------------------------------
+    # Células
+    # ------------------------------------------------------------------
+    def cell_box(self, row: int, col: int) -> Box:
+        """Posição e tamanho de uma célula isolada"""
+        self._ensure_columns(col)
+        self._ensure_rows(row)
+        return (
+            self._row_edges[row - 1],
+            self._col_edges[col - 1],
+            self._col_widths[col],
+            self._row_heights[row],
+        )
+
+    def merged_bounds(self, row: int, col: int) -> Optional[Bounds]:
+        """Bounds do range mesclado que contém a célula (primeiro na ordem dos ranges)"""
+        if self._merged_index is None:
+            index: Dict[Tuple[int, int], Bounds] = {}
+            for rng in self._merged_ranges:
+                bounds = (rng.min_row, rng.min_col, rng.max_row, rng.max_col)
+                for r in range(rng.min_row, rng.max_row + 1):
+                    for c in range(rng.min_col, rng.max_col + 1):
+                        index.setdefault((r, c), bounds)
+            self._merged_index = index
+        return self._merged_index.get((row, col))
+
+    def merged_box(self, row: int, col: int) -> Box:
+        """Posição da célula com o tamanho do range mesclado que a contém (se houver)"""
+        bounds = self.merged_bounds(row, col)
+        if bounds is None:
+            return self.cell_box(row, col)
+        min_row, min_col, max_row, max_col = bounds
+        return (
+            self.top(row),
+            self.left(col),
+            self.columns_width(min_col, max_col),
+            self.rows_height(min_row, max_row),
+        )
+
+
+def parse_cell_address(cell_address: str) -> Tuple[int, int]:
+    """'B12' / '$b$12' → (row=12, col=2)"""
+    col_letters, row = coordinate_from_string(cell_address.upper())
+    return row, column_index_from_string(col_letters)
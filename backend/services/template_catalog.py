@@ -0,0 +1,165 @@
+"""
+Catálogo materializado de templates (/api/templates)
+====================================================
+
+RESPONSABILIDADE:
+Manter em memória cycle → template_key → metadados (os mesmos do
+TemplateRegistry + schema_hash), para que as listagens de descoberta
+não consultem o banco nem varram/parseiem os schemas a cada requisição.
+
+CICLO DE VIDA:
+- build(db): carga completa via TemplateRegistry (startup ou primeira
+  requisição)
+- refresh(db, cycle, template_key): atualiza uma entrada; chamado pela
+  TemplateIngestionService ao registrar/atualizar um template e quando o
+  status muda (templates inativos saem do catálogo)
+- Outros workers enxergam essas mudanças na próxima reconstrução
+  completa (TEMPLATE_CATALOG_TTL)
+
+ETAG:
+Hash das entradas, recalculado a cada mudança; as listagens respondem
+304 para If-None-Match igual.
+
+Os dicts devolvidos são compartilhados entre requisições: não modificar.
+
+CONFIGURAÇÃO (ENV):
+- TEMPLATE_CATALOG_TTL: segundos até uma reconstrução completa
+  (default: 300; 0 = só reconstrói por ingestão)
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from services import template_registry
+from services.template_registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CATALOG_TTL = float(os.getenv("TEMPLATE_CATALOG_TTL", "300"))
+
+
+def _schema_hash(cycle: str, template_key: str) -> Optional[str]:
+    """SHA-256 do schema JSON gerado (None se o arquivo não existe)"""
+    try:
+        with open(template_registry.TEMPLATES_GENERATED_DIR / cycle / f"{template_key}.json", "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _entry(template: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {k: v for k, v in template.items() if k != "schema"}
+    entry["schema_hash"] = _schema_hash(template["cycle"], template["template_key"])
+    return entry
+
+
+class TemplateCatalog:
+    """cycle → template_key → metadados, com ETag do conteúdo"""
+
+    def __init__(self, ttl: float = TEMPLATE_CATALOG_TTL):
+        self.ttl = ttl
+        self._cycles: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._etag = ""
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.refreshes = 0
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+    def _expired(self) -> bool:
+        if self._built_at is None:
+            return True
+        return self.ttl > 0 and time.monotonic() - self._built_at > self.ttl
+
+    def _update_etag(self) -> None:
+        payload = json.dumps(self._cycles, sort_keys=True, default=str, separators=(",", ":"))
+        self._etag = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def build(self, db: Optional[Session]) -> int:
+        """Carga completa; retorna o total de templates"""
+        cycles: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for template in get_registry(db).list_all_templates():
+            cycles.setdefault(template["cycle"], {})[template["template_key"]] = _entry(template)
+
+        with self._lock:
+            self._cycles = cycles
+            self._update_etag()
+            self._built_at = time.monotonic()
+            self.builds += 1
+
+        total = sum(len(templates) for templates in cycles.values())
+        logger.info(f"📚 Catálogo de templates: {total} templates em {len(cycles)} cycles")
+        return total
+
+    def ensure_built(self, db: Optional[Session]) -> None:
+        if self._expired():
+            self.build(db)
+
+    def refresh(self, db: Optional[Session], cycle: str, template_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Recarrega um template (ou remove, se não está mais ativo)
+
+        Sem catálogo construído não faz nada: a próxima leitura já faz a
+        carga completa.
+        """
+        if self._built_at is None:
+            return None
+
+        template = get_registry(db).get_template(cycle, template_key)
+        entry = _entry(template) if template else None
+
+        with self._lock:
+            templates = self._cycles.setdefault(cycle, {})
+            if entry:
+                templates[template_key] = entry
+            else:
+                templates.pop(template_key, None)
+                if not templates:
+                    del self._cycles[cycle]
+            self._update_etag()
+            self.refreshes += 1
+        return entry
+
+    def cycles(self) -> List[str]:
+        with self._lock:
+            return sorted(self._cycles)
+
+    def list(self, cycle: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Templates (ordenados por cycle, template_key), opcionalmente de um cycle"""
+        with self._lock:
+            names = [cycle] if cycle else sorted(self._cycles)
+            return [
+                entry
+                for name in names
+                for _, entry in sorted(self._cycles.get(name, {}).items())
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cycles": len(self._cycles),
+                "templates": sum(len(t) for t in self._cycles.values()),
+                "etag": self._etag,
+                "builds": self.builds,
+                "refreshes": self.refreshes,
+            }
+
+
+_catalog: Optional[TemplateCatalog] = None
+
+
+def get_template_catalog() -> TemplateCatalog:
+    """Catálogo singleton por processo"""
+    global _catalog
+    if _catalog is None:
+        _catalog = TemplateCatalog()
+    return _catalog
@@ -0,0 +1,355 @@
+"""
+Template Data Store
+===================
+Storage backends for founder template responses (TemplateDataService).
+
+Backends:
+- SQLiteTemplateDataStore (default): one indexed table with every version
+  plus a latest-version pointer per (startup, template). Loading the latest
+  version is a primary-key lookup and listing history reads one page of
+  metadata, without touching the answer payloads.
+- JsonFileTemplateDataStore (legacy): `{data_dir}/{startup_id}/{template_key}/v{n}.json`.
+
+Existing JSON trees are imported once at startup while the SQLite store is
+empty (`migrate_json_files_if_empty`), or on demand with `migrate_json_files`
+(CLI: `python backend/scripts/migrate_template_data.py`).
+
+Configuration (ENV):
+- TEMPLATE_DATA_BACKEND: sqlite | files (default: sqlite)
+- TEMPLATE_DATA_DIR: default data_dir of TemplateDataService; holds the JSON
+  tree and `template_data.sqlite3` (default: data/templates)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DATA_BACKEND = os.getenv("TEMPLATE_DATA_BACKEND", "sqlite")
+TEMPLATE_DATA_DIR = os.getenv("TEMPLATE_DATA_DIR", "data/templates")
+SQLITE_FILENAME = "template_data.sqlite3"
+
+
+def _record(startup_id, template_key, version, created_at, updated_at, data=None) -> Dict[str, Any]:
+    record = {
+        "template_key": template_key,
+        "startup_id": startup_id,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "version": version,
+    }
+    if data is not None:
+        record["data"] = data
+    return record
+
+
+class SQLiteTemplateDataStore:
+    """Versions in an indexed SQLite table with a latest pointer."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS template_data_versions (
+            startup_id TEXT NOT NULL,
+            template_key TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (startup_id, template_key, version)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS template_data_latest (
+            startup_id TEXT NOT NULL,
+            template_key TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (startup_id, template_key)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        One connection per thread (sqlite3 connections are not shareable).
+        The database file is created on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, startup_id: str, template_key: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Version `version` (latest when None) or None."""
+        conn = self._connect()
+        if version is None:
+            row = conn.execute(
+                """
+                SELECT v.version, v.created_at, v.updated_at, v.data
+                FROM template_data_latest l
+                JOIN template_data_versions v
+                  ON v.startup_id = l.startup_id AND v.template_key = l.template_key AND v.version = l.version
+                WHERE l.startup_id = ? AND l.template_key = ?
+                """,
+                (startup_id, template_key),
+            ).fetchone()
+        else:
+            row = conn.execute(
+                """
+                SELECT version, created_at, updated_at, data
+                FROM template_data_versions
+                WHERE startup_id = ? AND template_key = ? AND version = ?
+                """,
+                (startup_id, template_key, version),
+            ).fetchone()
+
+        if row is None:
+            return None
+        return _record(startup_id, template_key, row[0], row[1], row[2], json.loads(row[3]))
+
+    def save(
+        self,
+        startup_id: str,
+        template_key: str,
+        data: Dict[str, Any],
+        auto_version: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Append a new version (auto_version) or overwrite v1.
+
+        Version allocation and the pointer update share one write
+        transaction, so concurrent saves never reuse a version number.
+        """
+        now = datetime.utcnow().isoformat()
+        payload = json.dumps(data, ensure_ascii=False)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if auto_version:
+                row = conn.execute(
+                    "SELECT version FROM template_data_latest WHERE startup_id = ? AND template_key = ?",
+                    (startup_id, template_key),
+                ).fetchone()
+                version = (row[0] + 1) if row else 1
+                created_at = now
+            else:
+                version = 1
+                row = conn.execute(
+                    """
+                    SELECT created_at FROM template_data_versions
+                    WHERE startup_id = ? AND template_key = ? AND version = 1
+                    """,
+                    (startup_id, template_key),
+                ).fetchone()
+                created_at = row[0] if row else now
+
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO template_data_versions
+                    (startup_id, template_key, version, created_at, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (startup_id, template_key, version, created_at, now, payload),
+            )
+            self._point_latest(conn, startup_id, template_key, version)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        return _record(startup_id, template_key, version, created_at, now, data)
+
+    def import_record(self, record: Dict[str, Any]) -> bool:
+        """Insert an existing version as-is (migration). False if already present."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO template_data_versions
+                    (startup_id, template_key, version, created_at, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    record["startup_id"],
+                    record["template_key"],
+                    int(record["version"]),
+                    record.get("created_at") or record.get("updated_at") or "",
+                    record.get("updated_at") or record.get("created_at") or "",
+                    json.dumps(record.get("data", {}), ensure_ascii=False),
+                ),
+            )
+            self._point_latest(conn, record["startup_id"], record["template_key"], int(record["version"]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _point_latest(conn: sqlite3.Connection, startup_id: str, template_key: str, version: int) -> None:
+        conn.execute(
+            """
+            INSERT INTO template_data_latest (startup_id, template_key, version)
+            VALUES (?, ?, ?)
+            ON CONFLICT (startup_id, template_key)
+            DO UPDATE SET version = MAX(version, excluded.version)
+            """,
+            (startup_id, template_key, version),
+        )
+
+    def is_empty(self) -> bool:
+        """True when no version has been stored yet."""
+        return self._connect().execute("SELECT 1 FROM template_data_latest LIMIT 1").fetchone() is None
+
+    def list_versions(
+        self,
+        startup_id: str,
+        template_key: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Version metadata (no `data`), oldest first, one page at a time."""
+        rows = self._connect().execute(
+            """
+            SELECT version, created_at, updated_at
+            FROM template_data_versions
+            WHERE startup_id = ? AND template_key = ?
+            ORDER BY version
+            LIMIT ? OFFSET ?
+            """,
+            (startup_id, template_key, -1 if limit is None else limit, offset),
+        ).fetchall()
+        return [_record(startup_id, template_key, *row) for row in rows]
+
+
+class JsonFileTemplateDataStore:
+    """Legacy layout: one JSON file per version."""
+
+    def __init__(self, data_dir: str | Path):
+        self.data_dir = Path(data_dir)
+
+    def _path(self, startup_id: str, template_key: str, version: int) -> Path:
+        return self.data_dir / startup_id / template_key / f"v{version}.json"
+
+    def _versions(self, startup_id: str, template_key: str) -> List[int]:
+        template_dir = self.data_dir / startup_id / template_key
+        if not template_dir.exists():
+            return []
+        return sorted(
+            int(path.stem[1:]) for path in template_dir.glob("v*.json") if path.stem[1:].isdigit()
+        )
+
+    def get(self, startup_id: str, template_key: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if version is None:
+            versions = self._versions(startup_id, template_key)
+            if not versions:
+                return None
+            version = versions[-1]
+
+        path = self._path(startup_id, template_key, version)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(
+        self,
+        startup_id: str,
+        template_key: str,
+        data: Dict[str, Any],
+        auto_version: bool = True,
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow().isoformat()
+        if auto_version:
+            versions = self._versions(startup_id, template_key)
+            version = (versions[-1] + 1) if versions else 1
+            created_at = now
+        else:
+            version = 1
+            existing = self.get(startup_id, template_key, 1)
+            created_at = existing.get("created_at", now) if existing else now
+
+        saved = _record(startup_id, template_key, version, created_at, now, data)
+        path = self._path(startup_id, template_key, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2, ensure_ascii=False)
+        return saved
+
+    def list_versions(
+        self,
+        startup_id: str,
+        template_key: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        versions = self._versions(startup_id, template_key)
+        page = versions[offset:] if limit is None else versions[offset:offset + limit]
+        listed = []
+        for version in page:
+            record = self.get(startup_id, template_key, version)
+            record.pop("data", None)
+            listed.append(record)
+        return listed
+
+
+def resolve_store(data_dir: str | Path, backend: Optional[str] = None):
+    """Store for `backend` (TEMPLATE_DATA_BACKEND when None) rooted at data_dir."""
+    backend = (backend or TEMPLATE_DATA_BACKEND).lower()
+    if backend == "sqlite":
+        return SQLiteTemplateDataStore(Path(data_dir) / SQLITE_FILENAME)
+    if backend == "files":
+        return JsonFileTemplateDataStore(data_dir)
+    raise ValueError(f"Unknown template data backend: {backend}")
+
+
+def migrate_json_files(data_dir: str | Path, store: SQLiteTemplateDataStore) -> Dict[str, int]:
+    """
+    Import every `{startup_id}/{template_key}/v{n}.json` under data_dir.
+
+    Idempotent: versions already in the store are skipped, the latest
+    pointer ends at the highest version of each template.
+
+    Returns:
+        {"imported": n, "skipped": n, "errors": n}
+    """
+    stats = {"imported": 0, "skipped": 0, "errors": 0}
+    for path in sorted(Path(data_dir).glob("*/*/v*.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            record.setdefault("startup_id", path.parent.parent.name)
+            record.setdefault("template_key", path.parent.name)
+            record.setdefault("version", int(path.stem[1:]))
+            imported = store.import_record(record)
+        except (OSError, ValueError, KeyError) as e:
+            stats["errors"] += 1
+            logger.warning(f"Skipping {path}: {e}")
+            continue
+        stats["imported" if imported else "skipped"] += 1
+
+    logger.info(f"Template data migration: {stats}")
+    return stats
+
+
+def migrate_json_files_if_empty(data_dir: str | Path, store: SQLiteTemplateDataStore) -> Optional[Dict[str, int]]:
+    """
+    One-time import for deployments upgrading from the JSON backend: runs
+    `migrate_json_files` only while the store is empty and JSON versions exist.
+
+    Returns the migration stats, or None when nothing had to be imported.
+    """
+    if next(Path(data_dir).glob("*/*/v*.json"), None) is None or not store.is_empty():
+        return None
+    return migrate_json_files(data_dir, store)
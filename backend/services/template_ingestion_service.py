@@ -12,10 +12,15 @@ IMPORTANTE: Totalmente genérico - não hardcoda cycles (Q1, Q2, Q3...)
 """
 
 import os
+import io
 import shutil
 import json
 import logging
-from typing import List, Dict, Optional, Tuple
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -27,6 +32,8 @@ from PIL import Image, ImageDraw, ImageFont
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config import DATA_DIR, TEMPLATES_IMAGES_DIR
+from services.ooxml import register_namespaces
+from services.sheet_geometry import SheetGeometry, parse_cell_address
 
 logger = logging.getLogger(__name__)
 
@@ -118,6 +125,12 @@ class ExcelDimensionCalculator:
         self.ws = worksheet
         self._col_width_cache = {}
         self._row_height_cache = {}
+        merged = worksheet.merged_cells.ranges if hasattr(worksheet, "merged_cells") else ()
+        self.geometry = SheetGeometry(
+            column_width=self.get_column_width_pixels,
+            row_height=self.get_row_height_pixels,
+            merged_ranges=merged,
+        )
     
     def get_column_width_pixels(self, col_idx: int) -> float:
         """Retorna largura de uma coluna em pixels (com cache)"""
@@ -151,37 +164,13 @@ class ExcelDimensionCalculator:
         return height_px
     
     def get_cell_position(self, cell_address: str) -> CellPosition:
-        """Calcula posição pixel-perfect de uma célula"""
-        cell = self.ws[cell_address]
-        
-        # Obter índices da célula
-        col_idx = cell.column
-        row_idx = cell.row
-        
-        # Calcular posição cumulativa
-        left = sum(self.get_column_width_pixels(c) for c in range(1, col_idx))
-        top = sum(self.get_row_height_pixels(r) for r in range(1, row_idx))
-        
-        # Se for merged cell, calcular dimensões totais
-        if isinstance(cell, type(cell)) and hasattr(self.ws, 'merged_cells'):
-            for merged_range in self.ws.merged_cells.ranges:
-                if cell.coordinate in merged_range:
-                    # Calcular largura total das colunas mescladas
-                    width = sum(
-                        self.get_column_width_pixels(c)
-                        for c in range(merged_range.min_col, merged_range.max_col + 1)
-                    )
-                    # Calcular altura total das linhas mescladas
-                    height = sum(
-                        self.get_row_height_pixels(r)
-                        for r in range(merged_range.min_row, merged_range.max_row + 1)
-                    )
-                    return CellPosition(top=top, left=left, width=width, height=height)
-        
-        # Célula normal (não mesclada)
-        width = self.get_column_width_pixels(col_idx)
-        height = self.get_row_height_pixels(row_idx)
+        """
+        Calcula posição pixel-perfect de uma célula
         
+        Merged cells recebem largura/altura totais do range mesclado.
+        """
+        row_idx, col_idx = parse_cell_address(cell_address)
+        top, left, width, height = self.geometry.merged_box(row_idx, col_idx)
         return CellPosition(top=top, left=left, width=width, height=height)
     
     def get_sheet_dimensions(self) -> Tuple[float, float]:
@@ -189,10 +178,7 @@ class ExcelDimensionCalculator:
         max_col = self.ws.max_column or 1
         max_row = self.ws.max_row or 1
         
-        width = sum(self.get_column_width_pixels(c) for c in range(1, max_col + 1))
-        height = sum(self.get_row_height_pixels(r) for r in range(1, max_row + 1))
-        
-        return width, height
+        return self.geometry.sheet_size(max_col, max_row)
 
 
 # ============================================================
@@ -441,6 +427,127 @@ class TemplateSchemaGenerator:
         return schema, warnings
 
 
+# ============================================================
+# ✂️ PRE-SPLIT POR SHEET (MODO PARALELO)
+# ============================================================
+
+_SPREADSHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_OFFICE_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_WORKBOOK_PART = "xl/workbook.xml"
+
+
+def _rels_path(part: str) -> str:
+    """xl/worksheets/sheet1.xml → xl/worksheets/_rels/sheet1.xml.rels"""
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _rel_targets(archive: zipfile.ZipFile, part: str) -> Dict[str, str]:
+    """rId → part de destino (relationships internas de um part)"""
+    rels = _rels_path(part)
+    if rels not in archive.namelist():
+        return {}
+    targets = {}
+    for rel in ET.fromstring(archive.read(rels)).iter(f"{{{_PACKAGE_REL_NS}}}Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+        targets[rel.get("Id")] = target
+    return targets
+
+
+def _part_closure(archive: zipfile.ZipFile, part: str) -> Set[str]:
+    """Part + rels + tudo que ele referencia (drawings, mídia, charts...)"""
+    closure: Set[str] = set()
+    pending = [part]
+    while pending:
+        current = pending.pop()
+        if current in closure:
+            continue
+        closure.add(current)
+        closure.add(_rels_path(current))
+        pending.extend(_rel_targets(archive, current).values())
+    return closure
+
+
+def split_workbook_sheets(file_path: str) -> List[Tuple[str, bytes]]:
+    """
+    Divide um .xlsx em pacotes de uma sheet cada, sem parsear células
+    
+    Cada pacote mantém styles, sharedStrings e theme, mas o workbook.xml
+    só lista a própria sheet e os parts exclusivos das outras sheets
+    (worksheets, drawings, mídia) são removidos. Um worker carrega o pacote
+    com openpyxl e vê exatamente a worksheet original.
+    
+    Returns:
+        [(sheet_name, bytes do .xlsx)] na ordem do workbook
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        workbook_xml = archive.read(_WORKBOOK_PART)
+        register_namespaces(workbook_xml)
+        workbook_rels = _rel_targets(archive, _WORKBOOK_PART)
+        
+        root = ET.fromstring(workbook_xml)
+        sheets_el = root.find(f"{{{_SPREADSHEET_NS}}}sheets")
+        sheet_els = list(sheets_el)
+        sheet_parts = [workbook_rels.get(el.get(f"{{{_OFFICE_REL_NS}}}id")) for el in sheet_els]
+        closures = [_part_closure(archive, part) if part else set() for part in sheet_parts]
+        
+        # Nomes definidos por sheet (localSheetId) apontariam para índices inexistentes
+        defined_names = root.find(f"{{{_SPREADSHEET_NS}}}definedNames")
+        if defined_names is not None:
+            for name_el in [el for el in defined_names if el.get("localSheetId") is not None]:
+                defined_names.remove(name_el)
+        for view in root.iter(f"{{{_SPREADSHEET_NS}}}workbookView"):
+            view.attrib.pop("activeTab", None)
+            view.attrib.pop("firstSheet", None)
+        
+        entries = {info.filename: archive.read(info.filename) for info in archive.infolist()}
+    
+    packages: List[Tuple[str, bytes]] = []
+    for index, sheet_el in enumerate(sheet_els):
+        # Apenas esta sheet no workbook.xml
+        for el in list(sheets_el):
+            sheets_el.remove(el)
+        kept = ET.fromstring(ET.tostring(sheet_el))
+        kept.attrib.pop("state", None)
+        sheets_el.append(kept)
+        
+        dropped: Set[str] = set()
+        for other, closure in enumerate(closures):
+            if other != index:
+                dropped |= closure
+        dropped -= closures[index]
+        
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+            for name, data in entries.items():
+                if name in dropped:
+                    continue
+                if name == _WORKBOOK_PART:
+                    data = ET.tostring(root, xml_declaration=True, encoding="UTF-8")
+                package.writestr(name, data)
+        packages.append((sheet_el.get("name"), buffer.getvalue()))
+    
+    return packages
+
+
+def _process_sheet_package(package: bytes, sheet_name: str, cycle: str) -> "IngestionResult":
+    """Worker do modo paralelo: processa uma sheet a partir do pacote pré-dividido"""
+    wb = load_workbook(io.BytesIO(package), data_only=False)
+    try:
+        return TemplateIngestionService(db_session=None).process_template(
+            workbook_path=None, sheet_name=sheet_name, cycle=cycle, workbook=wb
+        )
+    finally:
+        wb.close()
+
+
 # ============================================================
 # 🚀 TEMPLATE INGESTION SERVICE (MAIN)
 # ============================================================
@@ -511,13 +618,18 @@ class TemplateIngestionService:
     
     def process_template(
         self,
-        workbook_path: str,
+        workbook_path: Optional[str],
         sheet_name: str,
-        cycle: str
+        cycle: str,
+        workbook=None
     ) -> IngestionResult:
         """
         Processa uma sheet individual do Excel
         
+        Args:
+            workbook: Workbook já carregado (ingest_excel_file parseia o arquivo
+                uma única vez); se None, carrega de workbook_path
+        
         Returns:
             IngestionResult com status e paths gerados
         """
@@ -525,8 +637,8 @@ class TemplateIngestionService:
         warnings = []
         
         try:
-            # Carregar workbook
-            wb = load_workbook(workbook_path, data_only=False)
+            # Carregar workbook (somente se não foi compartilhado)
+            wb = workbook if workbook is not None else load_workbook(workbook_path, data_only=False)
             ws = wb[sheet_name]
             
             # Gerar template_key normalizado
@@ -585,11 +697,61 @@ class TemplateIngestionService:
                 errors=errors
             )
     
+    def _process_sheets_shared(self, file_path: str, cycle: str) -> Tuple[List[str], List[IngestionResult]]:
+        """Modo padrão: parseia o workbook uma vez e processa as sheets dele"""
+        wb = load_workbook(file_path, data_only=False)
+        try:
+            sheet_names = wb.sheetnames
+            logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
+            results = [
+                self.process_template(file_path, sheet_name, cycle, workbook=wb)
+                for sheet_name in sheet_names
+            ]
+        finally:
+            wb.close()
+        return sheet_names, results
+    
+    def _process_sheets_parallel(
+        self,
+        file_path: str,
+        cycle: str,
+        max_workers: Optional[int]
+    ) -> Tuple[List[str], List[IngestionResult]]:
+        """Modo paralelo: cada worker parseia só o pacote da sua sheet"""
+        packages = split_workbook_sheets(file_path)
+        sheet_names = [name for name, _ in packages]
+        logger.info(f"Found {len(sheet_names)} sheets: {sheet_names} (parallel, workers={max_workers or 'auto'})")
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_process_sheet_package, package, sheet_name, cycle)
+                for sheet_name, package in packages
+            ]
+            results = []
+            for (sheet_name, _), future in zip(packages, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"❌ Error processing sheet '{sheet_name}': {e}", exc_info=True)
+                    results.append(IngestionResult(
+                        template_key=self.normalize_template_key(sheet_name),
+                        sheet_name=sheet_name,
+                        success=False,
+                        field_count=0,
+                        schema_path="",
+                        image_path="",
+                        warnings=[],
+                        errors=[str(e)],
+                    ))
+        return sheet_names, results
+    
     def ingest_excel_file(
         self,
         file_path: str,
         cycle: str,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        parallel: bool = False,
+        max_workers: Optional[int] = None
     ) -> Dict:
         """
         Pipeline completo de ingestão de um arquivo Excel
@@ -598,6 +760,9 @@ class TemplateIngestionService:
             file_path: Path do arquivo Excel
             cycle: Identificador do cycle (Q1, Q2, Q3...)
             description: Descrição opcional do batch de templates
+            parallel: Processa as sheets em processos separados, a partir de
+                pacotes de uma sheet cada (split_workbook_sheets)
+            max_workers: Tamanho do pool no modo paralelo (default: nº de CPUs)
         
         Returns:
             Dict com estatísticas e relatório
@@ -606,18 +771,11 @@ class TemplateIngestionService:
         
         logger.info(f"🚀 Starting ingestion for cycle '{cycle}' - file: {file_path}")
         
-        # Carregar workbook para enumerar sheets
-        wb = load_workbook(file_path, data_only=False, read_only=True)
-        sheet_names = wb.sheetnames
-        wb.close()
-        
-        logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
-        
-        # Processar cada sheet
-        results: List[IngestionResult] = []
-        for sheet_name in sheet_names:
-            result = self.process_template(file_path, sheet_name, cycle)
-            results.append(result)
+        # Processar cada sheet (o arquivo é parseado uma única vez)
+        if parallel:
+            sheet_names, results = self._process_sheets_parallel(file_path, cycle, max_workers)
+        else:
+            sheet_names, results = self._process_sheets_shared(file_path, cycle)
         
         # Registrar templates no banco
         registered_count = 0
@@ -659,6 +817,13 @@ class TemplateIngestionService:
         
         self.db.commit()
         
+        # Atualizar catálogo de descoberta (só os templates registrados)
+        from services.template_catalog import get_template_catalog
+        catalog = get_template_catalog()
+        for result in results:
+            if result.success:
+                catalog.refresh(self.db, cycle, result.template_key)
+        
         # Gerar relatório
         report = self._generate_ingestion_report(cycle, results, file_path)
         
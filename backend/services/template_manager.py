@@ -7,15 +7,19 @@ Provides persistence layer for founder template responses.
 Features:
 - Load template schemas from JSON
 - Persist user input per startup + template
-- Export filled templates back to Excel
+- Export filled templates back to Excel (xlsx patching via
+  services/xlsx_template_pool, openpyxl as fallback)
 - Validation against schema
 - History/versioning support
 """
 
+import hashlib
+import io
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, BinaryIO, Iterator
 from datetime import datetime
 from functools import lru_cache
 
@@ -24,16 +28,96 @@ from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter, column_index_from_string
 
 from services.excel_template_parser import TemplateSchema, FieldMetadata
+from services.xlsx_template_pool import TemplatePatchError, get_template_pool
+from services.export_cache import export_key, get_export_cache, template_owner
+from services.template_data_store import (
+    TEMPLATE_DATA_DIR,
+    SQLiteTemplateDataStore,
+    migrate_json_files_if_empty,
+    resolve_store,
+)
+from services.schema_cache import get_schema_cache
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=32)
+def _file_sha256(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a template file (keyed by stat, so edits re-hash)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_sha256(path: str | Path) -> str:
+    stat = os.stat(path)
+    return _file_sha256(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _schema_from_dict(schema_dict: Dict[str, Any]) -> TemplateSchema:
+    """Reconstruct TemplateSchema from its JSON dict."""
+    schema = TemplateSchema(
+        template_key=schema_dict["template_key"],
+        sheet_name=schema_dict["sheet_name"],
+        sheet_width=schema_dict["sheet_width"],
+        sheet_height=schema_dict["sheet_height"],
+        fields=[
+            FieldMetadata(
+                key=field["key"],
+                cell=field["cell"],
+                type=field["type"],
+                label=field.get("label"),
+                placeholder=field.get("placeholder"),
+                required=field.get("required", False),
+                validation_rules=field.get("validation_rules", {}),
+                help_text=field.get("help_text"),
+                section=field.get("section"),
+                original_value=field.get("original_value"),
+            )
+            for field in schema_dict.get("fields", [])
+        ],
+        title=schema_dict.get("title"),
+        description=schema_dict.get("description"),
+        version=schema_dict.get("version", "1.0"),
+    )
+    
+    logger.info(f"Loaded schema: {schema.template_key}")
+    return schema
+
+
+class BufferedWorkbook:
+    """In-memory export with the same interface as FilledWorkbook."""
+    
+    CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, data: bytes):
+        self._data = data
+        self.size = len(data)
+    
+    def __iter__(self) -> Iterator[bytes]:
+        view = memoryview(self._data)
+        for start in range(0, self.size, self.CHUNK_SIZE):
+            yield bytes(view[start:start + self.CHUNK_SIZE])
+    
+    def write(self, fileobj: BinaryIO) -> int:
+        fileobj.write(self._data)
+        return self.size
+    
+    def getvalue(self) -> bytes:
+        return self._data
+
+
 class TemplateDataService:
     """
     Service for managing template data persistence and export.
     
-    Data is stored in:
-    - JSON files: `data/templates/{startup_id}/{template_key}/{version}.json`
+    Data is stored under data_dir (TEMPLATE_DATA_DIR, default
+    `data/templates`; see services/template_data_store):
+    - SQLite (default): `{data_dir}/template_data.sqlite3`, one row per
+      version plus a latest-version pointer
+    - JSON files (TEMPLATE_DATA_BACKEND=files): `{data_dir}/{startup_id}/{template_key}/v{version}.json`
     
     Structure:
     {
@@ -50,56 +134,27 @@ class TemplateDataService:
     }
     """
     
-    def __init__(self, data_dir: str | Path = "data/templates"):
-        """Initialize service with data directory."""
+    def __init__(self, data_dir: str | Path = TEMPLATE_DATA_DIR, backend: Optional[str] = None):
+        """Initialize service with data directory and storage backend (see template_data_store)."""
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.store = resolve_store(self.data_dir, backend)
         
         self.schemas_dir = Path("data/schemas")
         self.schemas_dir.mkdir(parents=True, exist_ok=True)
     
-    @lru_cache(maxsize=128)
     def load_schema(self, template_key: str) -> TemplateSchema:
         """
         Load template schema from JSON file.
-        Results are cached for performance.
+        Results are cached in the shared schema cache (services/schema_cache)
+        and reloaded when the file changes on disk.
         """
         schema_path = self.schemas_dir / f"{template_key}.json"
         
         if not schema_path.exists():
             raise FileNotFoundError(f"Schema not found: {schema_path}")
         
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema_dict = json.load(f)
-        
-        # Reconstruct TemplateSchema from dict
-        schema = TemplateSchema(
-            template_key=schema_dict["template_key"],
-            sheet_name=schema_dict["sheet_name"],
-            sheet_width=schema_dict["sheet_width"],
-            sheet_height=schema_dict["sheet_height"],
-            fields=[
-                FieldMetadata(
-                    key=field["key"],
-                    cell=field["cell"],
-                    type=field["type"],
-                    label=field.get("label"),
-                    placeholder=field.get("placeholder"),
-                    required=field.get("required", False),
-                    validation_rules=field.get("validation_rules", {}),
-                    help_text=field.get("help_text"),
-                    section=field.get("section"),
-                    original_value=field.get("original_value"),
-                )
-                for field in schema_dict.get("fields", [])
-            ],
-            title=schema_dict.get("title"),
-            description=schema_dict.get("description"),
-            version=schema_dict.get("version", "1.0"),
-        )
-        
-        logger.info(f"Loaded schema: {template_key}")
-        return schema
+        return get_schema_cache().load(schema_path, _schema_from_dict)
     
     def save_schema(self, schema: TemplateSchema) -> None:
         """Save template schema to JSON file."""
@@ -108,39 +163,39 @@ class TemplateDataService:
         with open(schema_path, 'w', encoding='utf-8') as f:
             json.dump(schema.to_dict(), f, indent=2, ensure_ascii=False)
         
-        # Clear cache
-        self.load_schema.cache_clear()
+        get_schema_cache().invalidate(schema_path)
         
         logger.info(f"Saved schema: {schema.template_key}")
     
-    def _get_data_path(self, startup_id: str, template_key: str, version: int = 1) -> Path:
-        """Get path for template data file."""
-        path = self.data_dir / startup_id / template_key / f"v{version}.json"
-        path.parent.mkdir(parents=True, exist_ok=True)
-        return path
+    def import_legacy_files(self) -> Optional[Dict[str, int]]:
+        """Import JSON version files into an empty SQLite store (startup)."""
+        if not isinstance(self.store, SQLiteTemplateDataStore):
+            return None
+        return migrate_json_files_if_empty(self.data_dir, self.store)
+    
+    def warm_schema_cache(self) -> int:
+        """Preload every schema in schemas_dir into the shared schema cache."""
+        return get_schema_cache().warm(sorted(self.schemas_dir.glob("*.json")), _schema_from_dict)
     
     def load_template_data(
         self,
         startup_id: str,
         template_key: str,
-        version: int = 1
+        version: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Load saved template data for a startup.
+        Load saved template data for a startup (latest version by default).
         
         Returns:
             Dict with structure {template_key, startup_id, data, created_at, updated_at, version}
             or None if no data exists
         """
-        data_path = self._get_data_path(startup_id, template_key, version)
+        data = self.store.get(startup_id, template_key, version)
         
-        if not data_path.exists():
-            logger.info(f"No saved data for {startup_id}/{template_key}/v{version}")
+        if data is None:
+            logger.info(f"No saved data for {startup_id}/{template_key}/v{version or 'latest'}")
             return None
         
-        with open(data_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         logger.info(f"Loaded template data: {startup_id}/{template_key}")
         return data
     
@@ -158,54 +213,31 @@ class TemplateDataService:
             startup_id: Unique startup identifier
             template_key: Template identifier
             data: Form data (field_key → value)
-            auto_version: If True, auto-increment version, else use v1
+            auto_version: If True, append a new version, else overwrite v1
         
         Returns:
             Saved data object with metadata
         """
-        # Load existing to determine next version
-        if auto_version:
-            existing = self.load_template_data(startup_id, template_key)
-            version = (existing.get("version", 0) + 1) if existing else 1
-        else:
-            version = 1
-        
-        # Create data object
-        now = datetime.utcnow().isoformat()
-        saved_data = {
-            "template_key": template_key,
-            "startup_id": startup_id,
-            "data": data,
-            "created_at": existing.get("created_at", now) if not auto_version else now,
-            "updated_at": now,
-            "version": version,
-        }
+        saved_data = self.store.save(startup_id, template_key, data, auto_version=auto_version)
         
-        # Write to file
-        data_path = self._get_data_path(startup_id, template_key, version)
-        with open(data_path, 'w', encoding='utf-8') as f:
-            json.dump(saved_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Saved template data v{version}: {startup_id}/{template_key}")
+        get_export_cache().invalidate(template_owner(startup_id, template_key))
+        logger.info(f"Saved template data v{saved_data['version']}: {startup_id}/{template_key}")
         return saved_data
     
     def list_template_versions(
         self,
         startup_id: str,
-        template_key: str
+        template_key: str,
+        limit: Optional[int] = None,
+        offset: int = 0
     ) -> List[Dict[str, Any]]:
-        """List all versions of a template for a startup."""
-        template_dir = self.data_dir / startup_id / template_key
-        
-        if not template_dir.exists():
-            return []
-        
-        versions = []
-        for version_file in sorted(template_dir.glob("v*.json")):
-            with open(version_file, 'r', encoding='utf-8') as f:
-                versions.append(json.load(f))
+        """
+        List versions of a template for a startup (oldest first).
         
-        return versions
+        Metadata only (version, created_at, updated_at); load a version's
+        answers with load_template_data(..., version=n).
+        """
+        return self.store.list_versions(startup_id, template_key, limit=limit, offset=offset)
     
     def validate_data(
         self,
@@ -281,68 +313,148 @@ class TemplateDataService:
         template_key: str,
         original_excel_path: str | Path,
         output_excel_path: str | Path,
-        version: int = 1
+        version: Optional[int] = None,
+        use_template_pool: bool = True,
     ) -> Path:
         """
         Export template data back to Excel file.
         Writes values into the exact same cells they came from.
         
+        The master template is parsed once and kept in the template pool;
+        each export patches only the target sheet inside the xlsx package.
+        Templates the patcher cannot handle go through openpyxl.
+        
         Args:
             startup_id: Startup identifier
             template_key: Template identifier
             original_excel_path: Path to original Excel file
             output_excel_path: Where to save the filled Excel
-            version: Data version to export
+            version: Data version to export (latest when None)
+            use_template_pool: Patch the pooled template (False forces openpyxl)
         
         Returns:
             Path to exported Excel file
         """
-        # Load schema and data
+        filled = self.render_excel(
+            startup_id, template_key, original_excel_path, version, use_template_pool
+        )
+        
+        output_path = Path(output_excel_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as f:
+            filled.write(f)
+        
+        logger.info(f"Exported to Excel: {output_path}")
+        return output_path
+    
+    def export_key(
+        self,
+        startup_id: str,
+        template_key: str,
+        original_excel_path: str | Path,
+        version: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Content key of the workbook render_excel would produce.
+        
+        Hash of the master template file, the schema and the saved answers;
+        used as export cache key and ETag. None when there is no saved data.
+        """
+        data = self.load_template_data(startup_id, template_key, version)
+        if not data:
+            return None
+        
+        return export_key(
+            "template",
+            _stat_sha256(original_excel_path),
+            _stat_sha256(self.schemas_dir / f"{template_key}.json"),
+            startup_id,
+            data["version"],
+            data["data"],
+        )
+    
+    def render_excel(
+        self,
+        startup_id: str,
+        template_key: str,
+        original_excel_path: str | Path,
+        version: Optional[int] = None,
+        use_template_pool: bool = True,
+    ):
+        """
+        Build the filled workbook without touching disk.
+        
+        Returns an object with `size` (bytes, known up front) that yields
+        the xlsx in chunks when iterated and has `write(fileobj)`; suitable
+        for a StreamingResponse with Content-Length.
+        """
         schema = self.load_schema(template_key)
         data = self.load_template_data(startup_id, template_key, version)
         
         if not data:
-            raise ValueError(f"No data found for {startup_id}/{template_key}/v{version}")
+            raise ValueError(f"No data found for {startup_id}/{template_key}/v{version or 'latest'}")
         
-        # Load original Excel
+        values = {
+            field.cell: data["data"][field.key]
+            for field in schema.fields
+            if field.key in data["data"]
+        }
+        metadata = [
+            "Export Info",
+            f"Template: {template_key}",
+            f"Startup: {startup_id}",
+            f"Version: {data['version']}",
+            f"Exported: {datetime.utcnow().isoformat()}",
+        ]
+        
+        if use_template_pool:
+            try:
+                package = get_template_pool().get(original_excel_path)
+                return package.render(schema.sheet_name, values, metadata=metadata)
+            except TemplatePatchError as e:
+                logger.warning(f"Template patch unavailable for {template_key} ({e}); using openpyxl")
+        
+        buffer = io.BytesIO()
+        self._export_with_openpyxl(schema, values, metadata, original_excel_path, buffer)
+        return BufferedWorkbook(buffer.getvalue())
+    
+    def _export_with_openpyxl(
+        self,
+        schema: TemplateSchema,
+        values: Dict[str, Any],
+        metadata: List[str],
+        original_excel_path: str | Path,
+        output: Path | BinaryIO,
+    ) -> None:
+        """Full load/save export (loads every sheet of the template)."""
         workbook = openpyxl.load_workbook(str(original_excel_path))
         worksheet = workbook[schema.sheet_name]
         
         # Write field values into cells
-        for field in schema.fields:
-            if field.key in data["data"]:
-                value = data["data"][field.key]
-                cell = worksheet[field.cell]
-                cell.value = value
-                
-                # Add light background to indicate filled cells (optional UX hint)
-                cell.fill = PatternFill(
-                    start_color="FFFACD",  # Light yellow
-                    end_color="FFFACD",
-                    fill_type="solid"
-                )
-                
-                logger.debug(f"Wrote {field.key} = {value} to cell {field.cell}")
+        for coordinate, value in values.items():
+            cell = worksheet[coordinate]
+            cell.value = value
+            
+            # Add light background to indicate filled cells (optional UX hint)
+            cell.fill = PatternFill(
+                start_color="FFFACD",  # Light yellow
+                end_color="FFFACD",
+                fill_type="solid"
+            )
+            
+            logger.debug("Wrote %s to cell %s", value, coordinate)
         
         # Add metadata sheet
         if "Metadata" in workbook.sheetnames:
             del workbook["Metadata"]
         
         metadata_sheet = workbook.create_sheet("Metadata", 0)
-        metadata_sheet["A1"] = "Export Info"
-        metadata_sheet["A2"] = f"Template: {template_key}"
-        metadata_sheet["A3"] = f"Startup: {startup_id}"
-        metadata_sheet["A4"] = f"Version: {version}"
-        metadata_sheet["A5"] = f"Exported: {datetime.utcnow().isoformat()}"
+        for row, line in enumerate(metadata, start=1):
+            metadata_sheet.cell(row=row, column=1, value=line)
         
         # Save
-        output_path = Path(output_excel_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        workbook.save(str(output_path))
+        workbook.save(output if hasattr(output, "write") else str(output))
         workbook.close()
-        
-        logger.info(f"Exported to Excel: {output_path}")
-        return output_path
 
 
 class TemplateManager:
@@ -411,3 +523,16 @@ class TemplateManager:
             original_excel_path=original_excel_path,
             output_excel_path=output_path
         )
+    
+    def stream_founder_template(
+        self,
+        startup_id: str,
+        template_key: str,
+        original_excel_path: str | Path,
+    ):
+        """Render founder's template response for streaming (nothing written to exports/)."""
+        return self.data_service.render_excel(
+            startup_id=startup_id,
+            template_key=template_key,
+            original_excel_path=original_excel_path,
+        )
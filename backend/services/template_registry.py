@@ -4,18 +4,18 @@ Template Registry Service - Descoberta automática de templates
 Responsabilidades:
 - Descobrir templates disponíveis sem hardcode
 - Listar templates por cycle
-- Carregar schemas JSON dinamicamente
+- Carregar schemas JSON dinamicamente (cache compartilhado em services/schema_cache)
 - Integrar com sistema existente de forma transparente
 """
 
 import os
-import json
 import logging
 from typing import List, Dict, Optional
 from pathlib import Path
 from sqlalchemy.orm import Session
 
 from db.models import TemplateDefinition
+from services.schema_cache import get_schema_cache
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -110,12 +110,26 @@ class TemplateRegistry:
             return None
         
         try:
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return get_schema_cache().load(schema_path)
         except Exception as e:
             logger.error(f"Error loading schema {schema_path}: {e}")
             return None
     
+    def warm_schema_cache(self) -> int:
+        """
+        Pré-carrega no cache os schemas dos templates ativos
+        
+        Returns:
+            Quantidade de schemas carregados
+        """
+        paths = [
+            TEMPLATES_GENERATED_DIR / t["cycle"] / f"{t['template_key']}.json"
+            for t in self.list_all_templates()
+        ]
+        loaded = get_schema_cache().warm(path for path in paths if path.exists())
+        logger.info(f"🔥 Schemas pré-carregados: {loaded}")
+        return loaded
+    
     def list_available_cycles(self) -> List[str]:
         """
         Lista todos os cycles disponíveis
@@ -241,8 +255,7 @@ class TemplateRegistry:
                 continue  # Skip arquivos especiais
             
             try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    schema = json.load(f)
+                schema = get_schema_cache().load(json_file)
                 
                 template_key = json_file.stem
                 
@@ -269,8 +282,7 @@ class TemplateRegistry:
             return None
         
         try:
-            with open(schema_path, 'r', encoding='utf-8') as f:
-                schema = json.load(f)
+            schema = get_schema_cache().load(schema_path)
             
             return {
                 "cycle": cycle,
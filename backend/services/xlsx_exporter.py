@@ -2,27 +2,28 @@
 Serviço de exportação para Excel (XLSX)
 Gera arquivos Excel a partir dos dados do banco
 """
+import contextvars
+import queue
+import threading
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
 from io import BytesIO
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterator, List, Any
 
+from core.profiling import profiled
 
-def generate_xlsx(trail, steps: List, answers_by_step: Dict[str, Dict]) -> BytesIO:
+STREAM_CHUNK_SIZE = 64 * 1024
+_DONE = object()
+
+
+def _build_trail_workbook(trail, steps: List, answers_by_step: Dict[str, Dict]) -> Workbook:
     """
-    Gera um arquivo XLSX com os dados da trilha.
-    
-    Args:
-        trail: Objeto Trail com id e name
-        steps: Lista de StepSchema ordenada
-        answers_by_step: Dict {step_id: {campo: valor}}
-    
-    Returns:
-        BytesIO stream com o arquivo XLSX
+    Monta o workbook da trilha em modo write-only: as linhas vão direto
+    para o XML de cada aba, sem manter as células em memória.
     """
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove aba default
+    wb = Workbook(write_only=True)
     
     # Estilos
     header_font = Font(bold=True, size=14, color="FFFFFF")
@@ -35,22 +36,24 @@ def generate_xlsx(trail, steps: List, answers_by_step: Dict[str, Dict]) -> Bytes
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    wrap_top = Alignment(vertical='top', wrap_text=True)
+    
+    def cell(ws, value, **style):
+        c = WriteOnlyCell(ws, value=value)
+        for name, attr in style.items():
+            setattr(c, name, attr)
+        return c
     
     # Cria aba de resumo primeiro
     ws_summary = wb.create_sheet(title="Resumo")
-    ws_summary["A1"] = f"Trilha: {trail.name if trail else 'N/A'}"
-    ws_summary["A1"].font = Font(bold=True, size=16)
-    ws_summary["A3"] = "Etapas:"
-    ws_summary["A3"].font = label_font
-    
-    row_summary = 4
+    ws_summary.column_dimensions['A'].width = 50
+    ws_summary.append([cell(ws_summary, f"Trilha: {trail.name if trail else 'N/A'}", font=Font(bold=True, size=16))])
+    ws_summary.append([])
+    ws_summary.append([cell(ws_summary, "Etapas:", font=label_font)])
     for step in steps:
         step_answers = answers_by_step.get(step.step_id, {})
         status = "✓ Preenchido" if step_answers else "○ Pendente"
-        ws_summary[f"A{row_summary}"] = f"  • {step.step_name}: {status}"
-        row_summary += 1
-    
-    ws_summary.column_dimensions['A'].width = 50
+        ws_summary.append([f"  • {step.step_name}: {status}"])
     
     # Cria uma aba para cada etapa
     for step in steps:
@@ -58,28 +61,29 @@ def generate_xlsx(trail, steps: List, answers_by_step: Dict[str, Dict]) -> Bytes
         sheet_name = step.step_name[:31] if step.step_name else f"Step {step.step_id}"
         ws = wb.create_sheet(title=sheet_name)
         
+        # Ajusta largura das colunas
+        ws.column_dimensions['A'].width = 35
+        ws.column_dimensions['B'].width = 60
+        
         # Header da etapa
-        ws.merge_cells('A1:B1')
-        ws["A1"] = f"Etapa: {step.step_name}"
-        ws["A1"].font = header_font
-        ws["A1"].fill = header_fill
-        ws["A1"].alignment = Alignment(horizontal='center')
+        ws.append([cell(
+            ws, f"Etapa: {step.step_name}",
+            font=header_font, fill=header_fill, alignment=Alignment(horizontal='center'),
+        )])
+        ws.merged_cells.add('A1:B1')
         
         # Descrição se existir
         if step.description:
-            ws["A2"] = step.description
-            ws["A2"].font = Font(italic=True, size=10)
-            ws.merge_cells('A2:B2')
-        
-        row = 4
+            ws.append([cell(ws, step.description, font=Font(italic=True, size=10))])
+            ws.merged_cells.add('A2:B2')
+        else:
+            ws.append([])
         
         # Headers das colunas
-        ws["A3"] = "Campo"
-        ws["B3"] = "Resposta"
-        ws["A3"].font = label_font
-        ws["B3"].font = label_font
-        ws["A3"].border = thin_border
-        ws["B3"].border = thin_border
+        ws.append([
+            cell(ws, "Campo", font=label_font, border=thin_border),
+            cell(ws, "Resposta", font=label_font, border=thin_border),
+        ])
         
         # Pega o schema de campos
         schema_fields = []
@@ -93,47 +97,141 @@ def generate_xlsx(trail, steps: List, answers_by_step: Dict[str, Dict]) -> Bytes
             # Pega a chave do campo (pode ser "key", "name" ou "id")
             key = field.get("key") or field.get("name") or field.get("id", "")
             label = field.get("label", key)
-            
-            # Campo (coluna A)
-            ws[f"A{row}"] = label
-            ws[f"A{row}"].font = label_font
-            ws[f"A{row}"].border = thin_border
-            ws[f"A{row}"].alignment = Alignment(vertical='top', wrap_text=True)
-            
-            # Valor (coluna B)
             value = step_answers.get(key, "")
-            ws[f"B{row}"] = str(value) if value else ""
-            ws[f"B{row}"].font = value_font
-            ws[f"B{row}"].border = thin_border
-            ws[f"B{row}"].alignment = Alignment(vertical='top', wrap_text=True)
             
-            row += 1
+            ws.append([
+                cell(ws, label, font=label_font, border=thin_border, alignment=wrap_top),
+                cell(ws, str(value) if value else "", font=value_font, border=thin_border, alignment=wrap_top),
+            ])
         
         # Se não tem fields no schema, mas tem respostas, mostra as respostas
         if not schema_fields and step_answers:
             for key, value in step_answers.items():
-                ws[f"A{row}"] = key
-                ws[f"A{row}"].font = label_font
-                ws[f"A{row}"].border = thin_border
-                
-                ws[f"B{row}"] = str(value) if value else ""
-                ws[f"B{row}"].font = value_font
-                ws[f"B{row}"].border = thin_border
-                
-                row += 1
-        
-        # Ajusta largura das colunas
-        ws.column_dimensions['A'].width = 35
-        ws.column_dimensions['B'].width = 60
+                ws.append([
+                    cell(ws, key, font=label_font, border=thin_border),
+                    cell(ws, str(value) if value else "", font=value_font, border=thin_border),
+                ])
     
-    # Salva em memória
+    return wb
+
+
+def generate_xlsx(trail, steps: List, answers_by_step: Dict[str, Dict]) -> BytesIO:
+    """
+    Gera um arquivo XLSX com os dados da trilha.
+    
+    Args:
+        trail: Objeto Trail com id e name
+        steps: Lista de StepSchema ordenada
+        answers_by_step: Dict {step_id: {campo: valor}}
+    
+    Returns:
+        BytesIO stream com o arquivo XLSX
+    """
     stream = BytesIO()
-    wb.save(stream)
+    _build_trail_workbook(trail, steps, answers_by_step).save(stream)
     stream.seek(0)
     
     return stream
 
 
+class _ChunkPipe:
+    """
+    Arquivo só-escrita que entrega blocos para uma fila limitada
+    (o writer bloqueia enquanto o leitor não consome: memória constante)
+    
+    Se o leitor desistir, as escritas seguintes são descartadas: abortar
+    o save no meio deixa os geradores do openpyxl/lxml em estado inválido.
+    """
+    
+    def __init__(self, chunk_size: int, max_chunks: int = 8):
+        self.chunk_size = chunk_size
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_chunks)
+        self.cancelled = threading.Event()
+        self._buffer = bytearray()
+    
+    def _put(self, item) -> None:
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+    
+    def write(self, data) -> int:
+        if self.cancelled.is_set():
+            return len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+        return len(data)
+    
+    def flush(self) -> None:
+        pass
+    
+    def finish(self, error: BaseException = None) -> None:
+        if error is None and self._buffer:
+            self._put(bytes(self._buffer))
+        self._put(error if error is not None else _DONE)
+
+
+def iter_workbook_bytes(build: Callable[[], Workbook], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Salva o workbook de `build()` em blocos de `chunk_size` bytes
+    
+    O save roda numa thread escrevendo num pipe limitado; os blocos saem
+    conforme o zip é gerado (nada é gravado no destino final em disco e
+    o arquivo inteiro nunca fica em memória). Se o consumidor parar de
+    ler (cliente desconectou), o restante do save é descartado em
+    segundo plano, sem bloquear quem fechou o gerador.
+    """
+    pipe = _ChunkPipe(chunk_size)
+    
+    def produce():
+        try:
+            build().save(pipe)
+        except BaseException as e:
+            pipe.finish(e)
+        else:
+            pipe.finish()
+    
+    # Contexto da requisição: o save entra no perfil de X-Profile (core/profiling)
+    thread = threading.Thread(
+        target=contextvars.copy_context().run, args=(profiled(produce),),
+        name="xlsx-stream", daemon=True
+    )
+    thread.start()
+    try:
+        while True:
+            item = pipe.queue.get()
+            if item is _DONE:
+                # Save concluído: a thread só falta fechar o perfil (profiled)
+                thread.join()
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Sem join: o gerador é fechado no event loop quando o cliente
+        # desconecta; a thread (daemon) descarta o resto do save e termina
+        pipe.cancelled.set()
+
+
+def stream_xlsx(
+    trail,
+    steps: List,
+    answers_by_step: Dict[str, Dict],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Mesmo XLSX de generate_xlsx, entregue em blocos para StreamingResponse
+    
+    Memória não cresce com o número de etapas/respostas (modo write-only
+    + pipe limitado).
+    """
+    return iter_workbook_bytes(lambda: _build_trail_workbook(trail, steps, answers_by_step), chunk_size)
+
+
 def generate_simple_xlsx(data: List[Dict[str, Any]], sheet_name: str = "Dados") -> BytesIO:
     """
     Gera um XLSX simples a partir de uma lista de dicionários.
@@ -0,0 +1,616 @@
+"""
+XLSX Template Pool - Exportação por patch do pacote xlsx
+========================================================
+
+Cada template mestre é lido uma vez para um TemplatePackage imutável:
+os membros do zip ainda comprimidos + índices (offsets em bytes) das
+worksheets preenchidas, construídos sob demanda. Uma exportação então:
+
+- insere os novos `<c>` direto no XML da sheet alvo;
+- aponta as células preenchidas para estilos de destaque pré-montados
+  (styles.xml é alterado uma vez por template, não por export);
+- adiciona a sheet Metadata como uma parte nova;
+- copia os bytes comprimidos de todos os outros membros (imagens,
+  drawings, sheets intocadas) sem descomprimir/recomprimir;
+
+e escreve o zip em streaming, com tamanho final conhecido antes do
+primeiro byte. Custo e memória por export dependem só da sheet alvo.
+
+Layouts não suportados (células sem `r`, master de fórmula compartilhada
+entre os alvos, sheet Metadata já existente) levantam TemplatePatchError;
+quem chama volta para o openpyxl.
+
+CONFIGURAÇÃO (ENV):
+- TEMPLATE_EXPORT_POOL_SIZE: templates mantidos em memória (default: 8)
+"""
+
+import bisect
+import math
+import os
+import posixpath
+import re
+import struct
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, unescape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+EXPORT_POOL_SIZE = int(os.getenv("TEMPLATE_EXPORT_POOL_SIZE", "8"))
+
+HIGHLIGHT_COLOR = "FFFACD"
+METADATA_SHEET = "Metadata"
+
+_WORKSHEET_CT = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+_RELATIONSHIPS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_WORKSHEET_REL = f"{_RELATIONSHIPS_NS}/worksheet"
+
+_ATTR_RE = re.compile(rb'([\w:.-]+)="([^"]*)"')
+_SHEET_TAG_RE = re.compile(rb"<sheet\b[^>]*/>")
+_REL_TAG_RE = re.compile(rb"<Relationship\b[^>]*/>")
+_ROW_RE = re.compile(rb"<row\b([^>]*?)(/?)>")
+_CELL_RE = re.compile(rb"<c\b([^>]*?)(/?)>")
+_CELL_REF_RE = re.compile(rb'\br="([A-Z]{1,3})(\d+)"')
+_ROW_REF_RE = re.compile(rb'\br="(\d+)"')
+_STYLE_RE = re.compile(rb'\bs="(\d+)"')
+_SPANS_RE = re.compile(rb'\sspans="[^"]*"')
+_XF_RE = re.compile(rb"<xf\b[^>]*?(?:/>|>.*?</xf>)", re.S)
+
+
+class TemplatePatchError(Exception):
+    """Template (ou export) fora do que o patch direto suporta"""
+
+
+def _attrs(tag: bytes) -> Dict[str, str]:
+    return {
+        k.decode(): unescape(v.decode("utf-8"), {"&quot;": '"', "&apos;": "'"})
+        for k, v in _ATTR_RE.findall(tag)
+    }
+
+
+def _inflate(member: "_Member") -> bytes:
+    if member.compress_type == zipfile.ZIP_STORED:
+        return member.data
+    if member.compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.decompress(member.data, -15)
+    raise TemplatePatchError(f"Compressão não suportada em {member.name}: {member.compress_type}")
+
+
+def _parse_coordinate(coordinate: str) -> Tuple[int, int]:
+    """'B3', '$B$3' ou 'B3:D4' (usa a âncora) → (row, col)"""
+    column, row = coordinate_from_string(coordinate.split(":")[0].replace("$", ""))
+    return row, column_index_from_string(column)
+
+
+# ======================================================
+# Zip: membros crus + escrita em streaming
+# ======================================================
+@dataclass(frozen=True)
+class _Member:
+    name: str
+    data: bytes              # bytes comprimidos, copiados como estão
+    compress_type: int
+    crc: int
+    file_size: int
+    date_time: Tuple[int, int, int, int, int, int]
+    external_attr: int = 0
+
+    @classmethod
+    def deflate(cls, name: str, payload: bytes, date_time) -> "_Member":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        data = compressor.compress(payload) + compressor.flush()
+        return cls(name, data, zipfile.ZIP_DEFLATED, zlib.crc32(payload), len(payload), date_time)
+
+    @property
+    def _name_bytes(self) -> bytes:
+        return self.name.encode("utf-8")
+
+    @property
+    def _flags(self) -> int:
+        return 0 if self.name.isascii() else 0x800
+
+    @property
+    def _dos_time(self) -> Tuple[int, int]:
+        y, mo, d, h, mi, s = self.date_time
+        return (h << 11) | (mi << 5) | (s // 2), ((max(y, 1980) - 1980) << 9) | (mo << 5) | d
+
+    def local_header(self) -> bytes:
+        dos_time, dos_date = self._dos_time
+        return struct.pack(
+            "<4s5H3L2H", b"PK\x03\x04", 20, self._flags, self.compress_type, dos_time, dos_date,
+            self.crc, len(self.data), self.file_size, len(self._name_bytes), 0,
+        ) + self._name_bytes
+
+    def central_header(self, offset: int) -> bytes:
+        dos_time, dos_date = self._dos_time
+        return struct.pack(
+            "<4s6H3L5H2L", b"PK\x01\x02", 20, 20, self._flags, self.compress_type, dos_time,
+            dos_date, self.crc, len(self.data), self.file_size, len(self._name_bytes),
+            0, 0, 0, 0, self.external_attr, offset,
+        ) + self._name_bytes
+
+
+def _read_members(path: Path) -> List[_Member]:
+    members = []
+    with open(path, "rb") as f, zipfile.ZipFile(f) as zf:
+        for info in zf.infolist():
+            if info.flag_bits & 0x1:
+                raise TemplatePatchError(f"Membro criptografado: {info.filename}")
+            f.seek(info.header_offset)
+            header = f.read(30)
+            if header[:4] != b"PK\x03\x04":
+                raise TemplatePatchError(f"Cabeçalho local inválido: {info.filename}")
+            name_len, extra_len = struct.unpack("<HH", header[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            members.append(_Member(
+                name=info.filename,
+                data=f.read(info.compress_size),
+                compress_type=info.compress_type,
+                crc=info.CRC,
+                file_size=info.file_size,
+                date_time=info.date_time,
+                external_attr=info.external_attr,
+            ))
+    return members
+
+
+class FilledWorkbook:
+    """
+    Export pronto para escrita: tamanho conhecido, bytes gerados em streaming
+    (cabeçalhos + dados de cada membro, depois o diretório central)
+    """
+
+    def __init__(self, members: Sequence[_Member]):
+        if len(members) >= 0xFFFF:
+            raise TemplatePatchError("Zip com membros demais (zip64 não suportado)")
+        self._members = members
+        self.size = sum(
+            30 + 46 + 2 * len(m._name_bytes) + len(m.data) for m in members
+        ) + 22
+        if self.size >= 0xFFFFFFFF:
+            raise TemplatePatchError("Zip grande demais (zip64 não suportado)")
+
+    def __iter__(self) -> Iterator[bytes]:
+        offsets = []
+        offset = 0
+        for member in self._members:
+            header = member.local_header()
+            offsets.append(offset)
+            offset += len(header) + len(member.data)
+            yield header
+            yield member.data
+
+        central = b"".join(m.central_header(o) for m, o in zip(self._members, offsets))
+        yield central + struct.pack(
+            "<4s4H2LH", b"PK\x05\x06", 0, 0, len(self._members), len(self._members),
+            len(central), offset, 0,
+        )
+
+    def write(self, fileobj: BinaryIO) -> int:
+        for chunk in self:
+            fileobj.write(chunk)
+        return self.size
+
+    def getvalue(self) -> bytes:
+        return b"".join(self)
+
+
+# ======================================================
+# Índice de worksheet
+# ======================================================
+@dataclass(frozen=True)
+class _SheetIndex:
+    xml: bytes
+    cells: Dict[Tuple[int, int], Tuple[int, int, int]]   # (row, col) → (start, end, style)
+    shared_masters: frozenset                            # células com <f t="shared" ref=...>
+    rows: Dict[int, Tuple[int, int, bool]]               # row → (open_start, open_end, self_closing)
+    row_closes: Dict[int, int]                           # row → início de </row>
+    row_cells: Dict[int, Tuple[Tuple[int, ...], Tuple[int, ...]]]  # row → (cols, starts)
+    row_numbers: Tuple[int, ...]
+    data_end: int                                        # início de </sheetData>
+    data_empty: Optional[Tuple[int, int]]                # span de <sheetData/>
+
+    @classmethod
+    def build(cls, xml: bytes) -> "_SheetIndex":
+        cells, shared, rows, row_closes, row_cells = {}, set(), {}, {}, {}
+
+        empty = re.search(rb"<sheetData\s*/>", xml)
+        if empty:
+            return cls(xml, cells, frozenset(), rows, row_closes, row_cells, (), -1, empty.span())
+
+        start = xml.find(b"<sheetData")
+        if start < 0:
+            raise TemplatePatchError("Worksheet sem <sheetData>")
+        pos = xml.find(b">", start) + 1
+        data_end = xml.find(b"</sheetData>", pos)
+
+        while True:
+            row_match = _ROW_RE.search(xml, pos, data_end)
+            if row_match is None:
+                break
+            ref = _ROW_REF_RE.search(row_match.group(1))
+            if ref is None:
+                raise TemplatePatchError("Linha sem atributo r")
+            row = int(ref.group(1))
+            self_closing = bool(row_match.group(2))
+            rows[row] = (row_match.start(), row_match.end(), self_closing)
+            if self_closing:
+                pos = row_match.end()
+                continue
+
+            close = xml.find(b"</row>", row_match.end(), data_end)
+            cols, starts = [], []
+            cell_pos = row_match.end()
+            while True:
+                cell_match = _CELL_RE.search(xml, cell_pos, close)
+                if cell_match is None:
+                    break
+                cell_ref = _CELL_REF_RE.search(cell_match.group(1))
+                if cell_ref is None:
+                    raise TemplatePatchError("Célula sem atributo r")
+                col = column_index_from_string(cell_ref.group(1).decode())
+                if cell_match.group(2):
+                    cell_end = cell_match.end()
+                else:
+                    cell_end = xml.find(b"</c>", cell_match.end(), close) + 4
+                    body = xml[cell_match.end():cell_end]
+                    if b't="shared"' in body and b"ref=" in body:
+                        shared.add((row, col))
+                style = _STYLE_RE.search(cell_match.group(1))
+                cells[(row, col)] = (cell_match.start(), cell_end, int(style.group(1)) if style else 0)
+                cols.append(col)
+                starts.append(cell_match.start())
+                cell_pos = cell_end
+
+            row_closes[row] = close
+            row_cells[row] = (tuple(cols), tuple(starts))
+            pos = close + len(b"</row>")
+
+        return cls(
+            xml, cells, frozenset(shared), rows, row_closes, row_cells,
+            tuple(sorted(rows)), data_end, None,
+        )
+
+
+def _cell_xml(row: int, col: int, style: int, value: Any) -> bytes:
+    ref = f"{get_column_letter(col)}{row}"
+    s = f' s="{style}"' if style else ""
+    if value is None:
+        xml = f'<c r="{ref}"{s}/>'
+    elif isinstance(value, bool):
+        xml = f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    elif isinstance(value, (int, float)) and math.isfinite(value):
+        xml = f'<c r="{ref}"{s}><v>{value!r}</v></c>'
+    else:
+        text = escape(ILLEGAL_CHARACTERS_RE.sub("", str(value)))
+        xml = f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return xml.encode("utf-8")
+
+
+def _patch_sheet(index: _SheetIndex, values: Mapping[Tuple[int, int], Any], style_for) -> bytes:
+    """XML da sheet com `values` gravados; só as regiões tocadas mudam"""
+    edits: List[Tuple[int, int, int, bytes]] = []   # (start, end, seq, bytes)
+    new_rows: Dict[int, List[Tuple[int, bytes]]] = {}
+
+    def edit(start: int, end: int, data: bytes) -> None:
+        edits.append((start, end, len(edits), data))
+
+    for (row, col), value in values.items():
+        span = index.cells.get((row, col))
+        if span is None:
+            new_rows.setdefault(row, []).append((col, _cell_xml(row, col, style_for(0), value)))
+            continue
+        if (row, col) in index.shared_masters:
+            raise TemplatePatchError(f"Célula {get_column_letter(col)}{row} é master de fórmula compartilhada")
+        start, end, style = span
+        edit(start, end, _cell_xml(row, col, style_for(style), value))
+
+    missing_rows = []
+    for row in sorted(new_rows):
+        cells = sorted(new_rows[row])
+        if row not in index.rows:
+            missing_rows.append((row, b"".join(xml for _, xml in cells)))
+            continue
+
+        open_start, open_end, self_closing = index.rows[row]
+        open_tag = _SPANS_RE.sub(b"", index.xml[open_start:open_end])
+        if self_closing:
+            body = b"".join(xml for _, xml in cells)
+            edit(open_start, open_end, open_tag[:-2].rstrip() + b">" + body + b"</row>")
+            continue
+
+        edit(open_start, open_end, open_tag)
+        cols, starts = index.row_cells[row]
+        for col, xml in cells:
+            i = bisect.bisect_right(cols, col)
+            pos = starts[i] if i < len(starts) else index.row_closes[row]
+            edit(pos, pos, xml)
+
+    if missing_rows:
+        if index.data_empty is not None:
+            body = b"".join(b'<row r="%d">%s</row>' % (row, xml) for row, xml in missing_rows)
+            edit(*index.data_empty, b"<sheetData>" + body + b"</sheetData>")
+        else:
+            for row, xml in missing_rows:
+                i = bisect.bisect_right(index.row_numbers, row)
+                pos = index.rows[index.row_numbers[i]][0] if i < len(index.row_numbers) else index.data_end
+                edit(pos, pos, b'<row r="%d">%s</row>' % (row, xml))
+
+    edits.sort()
+    chunks, pos = [], 0
+    for start, end, _, data in edits:
+        chunks.append(index.xml[pos:start])
+        chunks.append(data)
+        pos = end
+    chunks.append(index.xml[pos:])
+    return b"".join(chunks)
+
+
+# ======================================================
+# Template
+# ======================================================
+class TemplatePackage:
+    """
+    Template mestre pré-processado (imutável, compartilhável entre threads)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        members = _read_members(self.path)
+        self._members: Dict[str, _Member] = OrderedDict((m.name, m) for m in members)
+
+        root_rels = self._read("_rels/.rels")
+        workbook_part = next(
+            (_attrs(tag)["Target"].lstrip("/") for tag in _REL_TAG_RE.findall(root_rels)
+             if _attrs(tag).get("Type", "").endswith("/officeDocument")),
+            "xl/workbook.xml",
+        )
+        self._workbook_part = workbook_part
+        self._rels_part = posixpath.join(
+            posixpath.dirname(workbook_part), "_rels", posixpath.basename(workbook_part) + ".rels"
+        )
+        workbook = self._read(workbook_part)
+        rels = self._read(self._rels_part)
+        content_types = self._read("[Content_Types].xml")
+
+        targets = {}
+        calc_chain = None
+        for tag in _REL_TAG_RE.findall(rels):
+            attrs = _attrs(tag)
+            target = attrs["Target"]
+            part = target.lstrip("/") if target.startswith("/") else posixpath.normpath(
+                posixpath.join(posixpath.dirname(workbook_part), target)
+            )
+            targets[attrs["Id"]] = part
+            if attrs.get("Type", "").endswith("/calcChain"):
+                calc_chain = (tag, part)
+
+        self.sheet_parts: Dict[str, str] = {}
+        for tag in _SHEET_TAG_RE.findall(workbook):
+            attrs = _attrs(tag)
+            rid = next(v for k, v in attrs.items() if k.endswith(":id"))
+            self.sheet_parts[attrs["name"]] = targets[rid]
+
+        # calcChain é descartado: Excel reconstrói, e células com fórmula
+        # sobrescritas deixariam entradas órfãs
+        if calc_chain is not None:
+            tag, part = calc_chain
+            rels = rels.replace(tag, b"")
+            content_types = re.sub(
+                rb'<Override\b[^>]*PartName="/%s"[^>]*/>' % re.escape(part.encode()), b"", content_types
+            )
+            self._members.pop(part, None)
+
+        self._base_parts = {self._rels_part: rels, "[Content_Types].xml": content_types}
+        self._metadata_parts = self._build_metadata_parts(workbook, rels, content_types, targets)
+        self._styles, self._highlight_offset = self._build_highlight_styles()
+
+        self._indexes: Dict[str, _SheetIndex] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, name: str) -> bytes:
+        member = self._members.get(name)
+        if member is None:
+            raise TemplatePatchError(f"Parte ausente no pacote: {name}")
+        return _inflate(member)
+
+    def _build_metadata_parts(self, workbook: bytes, rels: bytes, content_types: bytes,
+                              targets: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """workbook.xml/rels/content types com a sheet Metadata na posição 0"""
+        if METADATA_SHEET in self.sheet_parts:
+            return None
+
+        workbook_dir = posixpath.dirname(self._workbook_part)
+        numbers = [
+            int(match.group(1)) for name in self._members
+            if (match := re.fullmatch(r".*/worksheets/sheet(\d+)\.xml", name))
+        ]
+        part = posixpath.join(workbook_dir, f"worksheets/sheet{max(numbers, default=0) + 1}.xml")
+        rid_numbers = [int(m) for rid in targets for m in re.findall(r"^rId(\d+)$", rid)]
+        rid = f"rId{max(rid_numbers, default=0) + 1}"
+        sheet_ids = [int(_attrs(tag)["sheetId"]) for tag in _SHEET_TAG_RE.findall(workbook)]
+
+        sheet_tag = (
+            f'<sheet xmlns:r="{_RELATIONSHIPS_NS}" name="{METADATA_SHEET}" '
+            f'sheetId="{max(sheet_ids, default=0) + 1}" r:id="{rid}"/>'
+        )
+        sheets_open = re.search(rb"<sheets\b[^>]*>", workbook)
+        if sheets_open is None:
+            return None
+        workbook = workbook[:sheets_open.end()] + sheet_tag.encode() + workbook[sheets_open.end():]
+
+        # Índices de sheet deslocam 1 (nomes locais, aba ativa)
+        def shift(match):
+            return b'%s="%d"' % (match.group(1), int(match.group(2)) + 1)
+
+        workbook = re.sub(rb'\b(localSheetId|activeTab)="(\d+)"', shift, workbook)
+
+        target = posixpath.relpath(part, workbook_dir)
+        rels = rels.replace(
+            b"</Relationships>",
+            f'<Relationship Id="{rid}" Type="{_WORKSHEET_REL}" Target="{target}"/></Relationships>'.encode(),
+        )
+        content_types = content_types.replace(
+            b"</Types>", f'<Override PartName="/{part}" ContentType="{_WORKSHEET_CT}"/></Types>'.encode()
+        )
+        return {
+            "part": part,
+            "parts": {self._workbook_part: workbook, self._rels_part: rels, "[Content_Types].xml": content_types},
+        }
+
+    def _build_highlight_styles(self) -> Tuple[Optional[bytes], int]:
+        """styles.xml + um fill de destaque e uma cópia destacada de cada xf"""
+        if "xl/styles.xml" not in self._members:
+            return None, 0
+        styles = self._read("xl/styles.xml")
+        fills = re.search(rb'<fills\b[^>]*count="(\d+)"[^>]*>(.*?)</fills>', styles, re.S)
+        xfs = re.search(rb'<cellXfs\b[^>]*count="(\d+)"[^>]*>(.*?)</cellXfs>', styles, re.S)
+        if fills is None or xfs is None:
+            return None, 0
+
+        fill_id = len(re.findall(rb"<fill\b", fills.group(2)))
+        fill = (
+            b'<fill><patternFill patternType="solid"><fgColor rgb="00%s"/>'
+            b'<bgColor rgb="00%s"/></patternFill></fill>' % (HIGHLIGHT_COLOR.encode(), HIGHLIGHT_COLOR.encode())
+        )
+        base = _XF_RE.findall(xfs.group(2))
+
+        def highlighted(xf: bytes) -> bytes:
+            tag_end = xf.find(b">")
+            tag = re.sub(rb'\s(fillId|applyFill)="[^"]*"', b"", xf[:tag_end].rstrip(b"/"))
+            tag += b' fillId="%d" applyFill="1"' % fill_id
+            return tag + (b"/>" if xf[tag_end - 1:tag_end] == b"/" else xf[tag_end:])
+
+        new_fills = b'<fills count="%d">%s%s</fills>' % (fill_id + 1, fills.group(2), fill)
+        new_xfs = b'<cellXfs count="%d">%s%s</cellXfs>' % (
+            2 * len(base), b"".join(base), b"".join(highlighted(xf) for xf in base)
+        )
+        styles = (
+            styles[:fills.start()] + new_fills + styles[fills.end():xfs.start()]
+            + new_xfs + styles[xfs.end():]
+        )
+        return styles, len(base)
+
+    def _index(self, part: str) -> _SheetIndex:
+        index = self._indexes.get(part)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(part)
+                if index is None:
+                    index = _SheetIndex.build(self._read(part))
+                    self._indexes[part] = index
+        return index
+
+    def render(
+        self,
+        sheet_name: str,
+        values: Mapping[str, Any],
+        highlight: bool = True,
+        metadata: Optional[Sequence[str]] = None,
+    ) -> FilledWorkbook:
+        """
+        Cópia preenchida do template
+
+        Args:
+            sheet_name: Sheet que recebe os valores
+            values: {coordenada: valor} ('B3'; ranges usam a âncora)
+            highlight: Fundo amarelo claro nas células preenchidas
+            metadata: Linhas da sheet Metadata (inserida na posição 0)
+
+        Raises:
+            KeyError: sheet inexistente
+            TemplatePatchError: layout não suportado pelo patch direto
+        """
+        part = self.sheet_parts.get(sheet_name)
+        if part is None:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        if metadata is not None and self._metadata_parts is None:
+            raise TemplatePatchError("Template já tem sheet Metadata")
+        if highlight and self._styles is None:
+            raise TemplatePatchError("styles.xml sem fills/cellXfs reconhecíveis")
+
+        offset = self._highlight_offset
+        style_for = (lambda s: offset + s if s < offset else s) if highlight else (lambda s: s)
+        cells = {_parse_coordinate(coord): value for coord, value in values.items()}
+
+        date_time = self._members[self._workbook_part].date_time
+        replaced = {part: _patch_sheet(self._index(part), cells, style_for)}
+        replaced.update(self._base_parts)
+        if highlight:
+            replaced["xl/styles.xml"] = self._styles
+        extra = []
+        if metadata is not None:
+            replaced.update(self._metadata_parts["parts"])
+            extra.append(_Member.deflate(self._metadata_parts["part"], _metadata_xml(metadata), date_time))
+
+        members = [
+            _Member.deflate(name, replaced[name], member.date_time) if name in replaced else member
+            for name, member in self._members.items()
+        ]
+        return FilledWorkbook(members + extra)
+
+
+def _metadata_xml(lines: Sequence[str]) -> bytes:
+    rows = "".join(
+        f'<row r="{i}"><c r="A{i}" t="inlineStr"><is><t xml:space="preserve">'
+        f'{escape(ILLEGAL_CHARACTERS_RE.sub("", str(line)))}</t></is></c></row>'
+        for i, line in enumerate(lines, start=1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f"<sheetData>{rows}</sheetData></worksheet>"
+    ).encode("utf-8")
+
+
+# ======================================================
+# Pool
+# ======================================================
+class TemplatePackagePool:
+    """LRU de TemplatePackage por (caminho, mtime, tamanho)"""
+
+    def __init__(self, max_templates: int = EXPORT_POOL_SIZE):
+        self.max_templates = max(1, max_templates)
+        self._packages: "OrderedDict[Tuple[str, int, int], TemplatePackage]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path) -> TemplatePackage:
+        path = Path(path).resolve()
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            package = self._packages.get(key)
+            if package is not None:
+                self._packages.move_to_end(key)
+                return package
+
+        package = TemplatePackage(path)
+        with self._lock:
+            for stale in [k for k in self._packages if k[0] == key[0]]:
+                del self._packages[stale]
+            self._packages[key] = package
+            while len(self._packages) > self.max_templates:
+                self._packages.popitem(last=False)
+        return package
+
+    def clear(self) -> None:
+        with self._lock:
+            self._packages.clear()
+
+
+_pool: Optional[TemplatePackagePool] = None
+
+
+def get_template_pool() -> TemplatePackagePool:
+    """Pool singleton por processo"""
+    global _pool
+    if _pool is None:
+        _pool = TemplatePackagePool()
+    return _pool
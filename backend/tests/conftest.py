@@ -7,7 +7,12 @@ import os
 # ====================================================================
 os.environ["TESTING"] = "1"
 
+# Respostas de templates (SQLite + JSON) fora da árvore do repositório
+import tempfile
+os.environ.setdefault("TEMPLATE_DATA_DIR", tempfile.mkdtemp(prefix="template-data-"))
+
 import pytest
+from contextlib import contextmanager
 from unittest.mock import Mock, MagicMock
 from fastapi.testclient import TestClient
 from main import create_app
@@ -36,3 +41,34 @@ def mock_db():
     db.rollback = MagicMock()
     db.flush = MagicMock()
     return db
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Garante um orçamento máximo de queries SQL por bloco.
+
+    Uso:
+        def test_endpoint(client, query_budget):
+            with query_budget(5):
+                client.get("/founder/trails")
+
+    Falha se o bloco executar mais de `max_queries` statements ou se algum
+    statement se repetir `max_repeats` vezes ou mais (N+1).
+    """
+    from db.instrumentation import collect_all_queries
+
+    @contextmanager
+    def _budget(max_queries: int, max_repeats: int = None):
+        with collect_all_queries() as stats:
+            yield stats
+
+        assert stats.count <= max_queries, (
+            f"Orçamento de queries excedido: {stats.count} > {max_queries}\n"
+            + "\n".join(f"{count}x {stmt}" for (stmt, _), count in stats.shapes.most_common(10))
+        )
+        if max_repeats is not None:
+            repeated = stats.repeated_shapes(threshold=max_repeats)
+            assert not repeated, f"Possível N+1: {repeated}"
+
+    return _budget
@@ -365,8 +365,8 @@ class TestAdminExportEndpoints:
         """GET /admin/users/{user_id}/trails/{trail_id}/export/xlsx"""
         mock_db.query.return_value.filter.return_value.first.return_value = mock_user
         
-        with patch('routers.admin.generate_xlsx') as mock_export:
-            mock_export.return_value = b"xlsx_data"
+        with patch('routers.admin.stream_xlsx') as mock_export:
+            mock_export.return_value = iter([b"xlsx_data"])
             
             response = client.get("/admin/users/user-001/trails/tr-001/export/xlsx")
             # Pode ser 200 ou erro se usuário/trilha não existe
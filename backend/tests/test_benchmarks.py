@@ -0,0 +1,110 @@
+"""
+Testes de performance dos hot paths de XLSX (benchmarks/)
+Cobre o gerador de workbooks, a comparação com baseline e orçamentos de tempo/memória
+
+Gerador e comparação com baseline (determinísticos) rodam sempre; os
+orçamentos medidos de verdade (tamanhos pequenos e a suíte completa, até
+100k células e Template Q1) só rodam com RUN_BENCHMARKS=1.
+"""
+import io
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks import suite, workbooks
+
+RUN_BENCHMARKS = os.getenv("RUN_BENCHMARKS") == "1"
+# Tolerância mais larga que a do CLI: a suíte de testes roda em máquinas variadas
+TIME_THRESHOLD = float(os.getenv("BENCHMARK_TIME_THRESHOLD", "1.0"))
+MEMORY_THRESHOLD = float(os.getenv("BENCHMARK_MEMORY_THRESHOLD", "0.25"))
+
+
+class TestWorkbookGenerator:
+    """Testes do gerador de workbooks sintéticos"""
+
+    def test_generated_structure(self):
+        wb = load_workbook(io.BytesIO(workbooks.generate_workbook(1000)))
+        ws = wb["Etapa 1"]
+
+        blocks = 1000 // workbooks.cells_per_block()
+        assert len(ws.merged_cells.ranges) == blocks
+        assert len(ws.data_validations.dataValidation[0].sqref.ranges) == (blocks + 2) // 3
+        assert ws["A2"].value == workbooks.QUESTIONS[0]
+
+    def test_answer_cells_are_merged_origins(self):
+        wb = load_workbook(io.BytesIO(workbooks.generate_workbook(500)))
+        origins = {str(r).split(":")[0] for r in wb["Etapa 1"].merged_cells.ranges}
+        assert set(workbooks.answer_cells(500).values()) == origins
+
+
+class TestSnapshotCodecs:
+    """Comparação dos codecs de snapshot com o gzip JSON antigo"""
+
+    def test_compare_codecs(self):
+        from app.services.template_snapshot import TemplateSnapshotService
+        from benchmarks.snapshot_codecs import compare_codecs
+
+        snapshot, _ = TemplateSnapshotService().extract(workbooks.generate_workbook(500), streaming=False)
+        report = compare_codecs(snapshot, repeat=1)
+
+        assert report["legacy"]["size_ratio"] == 1.0
+        assert "json+gzip:6" in report
+        assert all(entry["size_bytes"] < report["legacy"]["size_bytes"]
+                   for name, entry in report.items() if name != "legacy")
+
+
+class TestCompare:
+    """Testes da comparação com baseline"""
+
+    def _report(self, calibration=0.1, **results):
+        return {"calibration_s": calibration, "results": results}
+
+    def test_no_regression(self):
+        base = self._report(**{"detect@100": {"time_s": 1.0, "peak_mb": 10.0}})
+        cur = self._report(**{"detect@100": {"time_s": 1.2, "peak_mb": 11.0}})
+        assert suite.compare(cur, base) == []
+
+    def test_time_regression(self):
+        base = self._report(**{"detect@100": {"time_s": 1.0, "peak_mb": 10.0}})
+        cur = self._report(**{"detect@100": {"time_s": 2.0, "peak_mb": 10.0}})
+        assert suite.compare(cur, base)[0].startswith("detect@100: tempo")
+
+    def test_slower_machine_is_scaled(self):
+        """Máquina 2x mais lenta na calibração tolera 2x no tempo"""
+        base = self._report(calibration=0.1, **{"detect@100": {"time_s": 1.0, "peak_mb": 10.0}})
+        cur = self._report(calibration=0.2, **{"detect@100": {"time_s": 2.2, "peak_mb": 10.0}})
+        assert suite.compare(cur, base) == []
+
+    def test_memory_regression(self):
+        base = self._report(**{"snapshot@100": {"time_s": 1.0, "peak_mb": 10.0}})
+        cur = self._report(**{"snapshot@100": {"time_s": 1.0, "peak_mb": 20.0}})
+        assert "memória" in suite.compare(cur, base)[0]
+
+    def test_noise_floor(self):
+        """Diferenças de poucos milissegundos não contam como regressão"""
+        base = self._report(**{"detect@100": {"time_s": 0.001, "peak_mb": 0.01}})
+        cur = self._report(**{"detect@100": {"time_s": 0.004, "peak_mb": 0.5}})
+        assert suite.compare(cur, base) == []
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason="orçamentos medidos: RUN_BENCHMARKS=1")
+class TestHotPathBudgets:
+    """Orçamentos de tempo/memória contra benchmarks/baseline.json"""
+
+    def _check(self, sizes, include_q1):
+        baseline = suite.load_baseline()
+        assert baseline is not None, "benchmarks/baseline.json ausente"
+
+        report = suite.run_suite(sizes, suite.STAGES, include_q1=include_q1, repeat=3)
+        regressions = suite.compare(report, baseline, TIME_THRESHOLD, MEMORY_THRESHOLD)
+        assert not regressions, "\n".join(regressions)
+        return report
+
+    def test_small_workbooks_within_budget(self):
+        report = self._check([100, 1_000], include_q1=False)
+        for stage in suite.STAGES:
+            assert f"{stage}@1000" in report["results"]
+
+    def test_full_suite_within_budget(self):
+        self._check(suite.DEFAULT_SIZES, include_q1=True)
@@ -0,0 +1,217 @@
+"""
+Testes do export por cohort (app/services/cohort_export)
+========================================================
+
+Valida a carga em lote (número fixo de queries), o job com progresso,
+a retomada pela chave de conteúdo (etapas + respostas) e o .zip gerado em streaming
+"""
+
+import asyncio
+import io
+import zipfile
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import configure_mappers, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.services import cohort_export
+from app.services.cohort_export import (
+    CohortExportError,
+    CohortExportJobManager,
+    get_cohort_export_manager,
+    iter_cohort_zip,
+    load_cohort,
+)
+from db.database import Base
+from db.models import Cycle, Membership, Organization, StepAnswer, StepSchema, Trail, User
+from routers.admin import router
+from services.auth import get_current_admin
+
+FOUNDERS = 5
+
+
+@pytest.fixture
+def db():
+    try:
+        configure_mappers()
+    except Exception as exc:  # registry poluído por outros testes (models duplicados)
+        pytest.skip(f"Mappers SQLAlchemy inválidos neste processo: {type(exc).__name__}")
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine, tables=[
+        m.__table__ for m in (User, Organization, Cycle, Membership, Trail, StepSchema, StepAnswer)
+    ])
+    session = sessionmaker(bind=engine)()
+
+    session.add(Organization(id=1, name="FCJ"))
+    session.add(Cycle(id=1, organization_id=1, name="Q1"))
+    session.add(Trail(id="tr-1", name="Marketing"))
+    for order in range(2):
+        session.add(StepSchema(
+            trail_id="tr-1", step_id=f"s{order}", step_name=f"Etapa {order}", order=order,
+            schema={"fields": [{"key": "nome", "label": "Nome"}]},
+        ))
+    for i in range(FOUNDERS):
+        session.add(User(id=f"u{i}", email=f"u{i}@x.com", hashed_password="x", name=f"Founder {i}",
+                         company_name=f"Startup/{i}"))
+        session.add(Membership(user_id=f"u{i}", organization_id=1, cycle_id=1, role="founder"))
+        session.add(StepAnswer(trail_id="tr-1", step_id="s0", user_id=f"u{i}", answers={"nome": f"Resp {i}"}))
+    # Fora do cohort: membership revogada
+    session.add(User(id="revoked", email="r@x.com", hashed_password="x", name="R"))
+    session.add(Membership(user_id="revoked", organization_id=1, cycle_id=1, role="founder", status="revoked"))
+    session.commit()
+
+    session.queries = []
+    event.listen(engine, "before_cursor_execute", lambda *args: session.queries.append(args[2]))
+    yield session
+    session.close()
+
+
+class TestLoadCohort:
+    """Carga em lote"""
+
+    def test_bulk_queries(self, db):
+        cohort = load_cohort(db, 1, 1, "tr-1")
+
+        assert len(db.queries) == 4
+        assert [f["user_id"] for f in cohort["founders"]] == [f"u{i}" for i in range(FOUNDERS)]
+        assert cohort["founders"][2]["answers_by_step"] == {"s0": {"nome": "Resp 2"}}
+        assert [s["step_id"] for s in cohort["steps"]] == ["s0", "s1"]
+
+    def test_unknown_trail(self, db):
+        with pytest.raises(CohortExportError) as exc:
+            load_cohort(db, 1, 1, "inexistente")
+        assert exc.value.status_code == 404
+
+    def test_cycle_without_founders(self, db):
+        with pytest.raises(CohortExportError):
+            load_cohort(db, 1, 99, "tr-1")
+
+
+@pytest.fixture
+def manager(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(cohort_export, "_load_with_new_session", lambda *args: load_cohort(db, *args))
+    manager = CohortExportJobManager(base_dir=tmp_path, executor_kind="thread", max_workers=2)
+    yield manager
+    manager.shutdown()
+
+
+def _run(manager, *cohort):
+    async def go():
+        job = manager.submit(*cohort)
+        await job.done.wait()
+        return job
+
+    return asyncio.run(go())
+
+
+class TestCohortExportJob:
+    """Job com progresso e retomada"""
+
+    def test_renders_every_founder(self, manager):
+        job = _run(manager, 1, 1, "tr-1")
+
+        progress = job.to_dict()["progress"]
+        assert job.status == "succeeded"
+        assert progress["total"] == progress["completed"] == progress["rendered"] == FOUNDERS
+        assert progress["percent"] == 100.0
+        assert len(job.files) == FOUNDERS
+        assert (job.work_dir / "manifest.json").exists()
+
+    def test_resume_only_renders_changed_founders(self, manager, db):
+        first = _run(manager, 1, 1, "tr-1")
+
+        answer = db.query(StepAnswer).filter_by(user_id="u3").one()
+        answer.answers = {"nome": "Mudou"}
+        db.commit()
+        second = _run(manager, 1, 1, "tr-1")
+
+        assert second.job_id == first.job_id
+        assert second.rendered == 1
+        assert second.reused == FOUNDERS - 1
+
+    def test_step_schema_change_renders_again(self, manager, db):
+        first = _run(manager, 1, 1, "tr-1")
+
+        step = db.query(StepSchema).filter_by(step_id="s0").one()
+        step.schema = {"fields": [{"key": "nome", "label": "Nome completo"}]}
+        db.commit()
+        second = _run(manager, 1, 1, "tr-1")
+
+        assert second.job_id == first.job_id
+        assert (second.rendered, second.reused) == (FOUNDERS, 0)
+        path = next(f["path"] for f in second.files if f["arcname"].endswith("_u3.xlsx"))
+        assert "Nome completo" in [c.value for row in load_workbook(path)["Etapa 0"].iter_rows() for c in row]
+
+    def test_failed_founder_is_reported(self, manager, monkeypatch):
+        render = cohort_export.render_founder_workbook
+
+        def flaky(trail, steps, answers_by_step, output_path):
+            if answers_by_step["s0"]["nome"] == "Resp 1":
+                raise RuntimeError("falhou")
+            return render(trail, steps, answers_by_step, output_path)
+
+        monkeypatch.setattr(cohort_export, "render_founder_workbook", flaky)
+        job = _run(manager, 1, 1, "tr-1")
+
+        assert job.status == "succeeded"
+        assert job.failed == [{"user_id": "u1", "detail": "falhou"}]
+        assert len(job.files) == FOUNDERS - 1
+
+    def test_missing_cohort_fails_job(self, manager):
+        job = _run(manager, 1, 1, "inexistente")
+
+        assert job.status == "failed"
+        assert job.error["status_code"] == 404
+
+
+class TestCohortZip:
+    """Zip em streaming"""
+
+    def test_zip_contains_workbooks(self, manager):
+        job = _run(manager, 1, 1, "tr-1")
+
+        chunks = list(iter_cohort_zip(job.files, chunk_size=1024))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+        assert len(chunks) > FOUNDERS
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == sorted(f["arcname"] for f in job.files)
+        name = next(n for n in archive.namelist() if n.endswith("_u2.xlsx"))
+        assert name == "Startup_2_u2.xlsx"
+        wb = load_workbook(io.BytesIO(archive.read(name)))
+        assert wb["Etapa 0"]["B4"].value == "Resp 2"
+
+
+class TestCohortEndpoints:
+    """POST/GET /admin/cohort-exports"""
+
+    def test_submit_poll_and_download(self, manager):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_admin] = lambda: Mock(spec=User)
+        app.dependency_overrides[get_cohort_export_manager] = lambda: manager
+
+        with TestClient(app) as client:
+            started = client.post(
+                "/admin/cohort-exports", json={"organization_id": 1, "cycle_id": 1, "trail_id": "tr-1"}
+            )
+            assert started.status_code == 202
+            job_id = started.json()["job_id"]
+
+            status = client.get(f"/admin/cohort-exports/{job_id}", params={"wait": 10})
+            assert status.json()["status"] == "succeeded"
+
+            download = client.get(f"/admin/cohort-exports/{job_id}/download")
+            assert download.status_code == 200
+            assert download.headers["content-type"] == "application/zip"
+            assert len(zipfile.ZipFile(io.BytesIO(download.content)).namelist()) == FOUNDERS
+
+            assert client.get("/admin/cohort-exports/desconhecido/download").status_code == 404
@@ -0,0 +1,221 @@
+"""
+Testes do cache de exports XLSX (services/export_cache)
+=======================================================
+
+Valida chave por conteúdo, ETag/If-None-Match (304), reaproveitamento
+do XLSX renderizado e invalidação quando as respostas são salvas
+"""
+
+import io
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import Workbook, load_workbook
+
+from db.database import get_db
+from db.models import StepAnswer, StepSchema, Trail
+from routers import founder as founder_router
+from routers import templates as templates_router
+from services import export_cache
+from services.auth import get_current_user_id
+from services.excel_template_parser import FieldMetadata, FieldType, TemplateSchema
+from services.export_cache import ExportCache, trail_export_key
+from services.template_manager import TemplateDataService, TemplateManager
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    fresh = ExportCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(export_cache, "_cache", fresh)
+    return fresh
+
+
+class TestExportCache:
+    """Testes do ExportCache"""
+
+    def test_hit_skips_render(self, cache):
+        render = Mock(return_value=b"xlsx")
+
+        assert cache.get_or_render("trail:u1:t1", "k1", render) == b"xlsx"
+        assert cache.get_or_render("trail:u1:t1", "k1", render) == b"xlsx"
+        assert render.call_count == 1
+
+    def test_invalidate_only_drops_owner(self, cache):
+        cache.get_or_render("trail:u1:t1", "k1", lambda: b"a")
+        cache.get_or_render("trail:u2:t1", "k2", lambda: b"b")
+
+        cache.invalidate("trail:u1:t1")
+
+        assert cache.stats()["entries"] == 1
+        assert cache.get_or_render("trail:u2:t1", "k2", lambda: b"novo") == b"b"
+
+    def test_size_bounded(self):
+        cache = ExportCache(max_bytes=10)
+        for i in range(4):
+            cache.get_or_render(f"o{i}", "k", lambda: b"12345")
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 10
+        assert stats["evictions"] == 2
+
+    def test_tee_streams_and_stores_complete_export(self, cache):
+        produced = []
+
+        def chunks():
+            for part in (b"ab", b"cd"):
+                produced.append(part)
+                yield part
+
+        stream = cache.tee("trail:u1:t1", "k1", chunks())
+
+        assert next(stream) == b"ab"
+        assert produced == [b"ab"]
+        assert cache.stats()["entries"] == 0
+        assert list(stream) == [b"cd"]
+        assert cache.get("trail:u1:t1", "k1") == b"abcd"
+
+    def test_tee_skips_oversized_and_unfinished(self):
+        cache = ExportCache(max_bytes=3)
+        assert b"".join(cache.tee("o", "k", iter([b"ab", b"cd"]))) == b"abcd"
+
+        stream = cache.tee("o", "k2", iter([b"a", b"b"]))
+        next(stream)
+        stream.close()
+
+        assert cache.stats()["entries"] == 0
+
+    def test_trail_key_follows_answers_and_schema(self):
+        trail = SimpleNamespace(id="t1", name="Trilha")
+        steps = [SimpleNamespace(step_id="s1", step_name="S", description=None, schema={"fields": []})]
+
+        key = trail_export_key(trail, steps, {"s1": {"a": 1}})
+
+        assert key == trail_export_key(trail, steps, {"s1": {"a": 1}})
+        assert key != trail_export_key(trail, steps, {"s1": {"a": 2}})
+        steps[0].schema = {"fields": [{"key": "a"}]}
+        assert key != trail_export_key(trail, steps, {"s1": {"a": 1}})
+
+
+@pytest.fixture
+def trail_client():
+    trail = SimpleNamespace(id="t1", name="Trilha")
+    steps = [SimpleNamespace(step_id="s1", step_name="Etapa", description=None,
+                             schema={"fields": [{"key": "a", "label": "A"}]})]
+    answers = [SimpleNamespace(step_id="s1", answers={"a": "valor"})]
+
+    def query(model):
+        q = Mock()
+        if model is Trail:
+            q.filter.return_value.first.return_value = trail
+        elif model is StepSchema:
+            q.filter.return_value.order_by.return_value.all.return_value = steps
+        elif model is StepAnswer:
+            q.filter.return_value.all.return_value = answers
+        return q
+
+    db = Mock()
+    db.query.side_effect = query
+
+    app = FastAPI()
+    app.include_router(founder_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user_id] = lambda: "u1"
+    with TestClient(app) as client:
+        yield client, answers
+
+
+class TestTrailExport:
+    """GET /founder/trails/{trail_id}/export/xlsx"""
+
+    def test_etag_304_and_cached_render(self, trail_client):
+        client, _ = trail_client
+        with patch.object(founder_router, "stream_xlsx", wraps=founder_router.stream_xlsx) as render:
+            first = client.get("/founder/trails/t1/export/xlsx")
+            second = client.get("/founder/trails/t1/export/xlsx")
+            cached = client.get("/founder/trails/t1/export/xlsx", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content
+        assert render.call_count == 1
+        assert cached.status_code == 304
+        assert load_workbook(io.BytesIO(first.content))["Etapa"]["B4"].value == "valor"
+
+    def test_miss_streams_with_cache_enabled(self, trail_client, cache):
+        client, _ = trail_client
+        with patch("services.xlsx_exporter.generate_xlsx", side_effect=AssertionError("buffered render")), \
+                patch.object(cache, "tee", wraps=cache.tee) as tee:
+            with client.stream("GET", "/founder/trails/t1/export/xlsx") as response:
+                assert "content-length" not in response.headers
+                body = b"".join(response.iter_bytes())
+
+        assert tee.call_count == 1
+        assert body[:2] == b"PK"
+        assert cache.get("trail:u1:t1", response.headers["etag"]) == body
+
+    def test_new_answers_new_etag(self, trail_client):
+        client, answers = trail_client
+        first = client.get("/founder/trails/t1/export/xlsx")
+
+        answers[0].answers = {"a": "outro"}
+        second = client.get("/founder/trails/t1/export/xlsx", headers={"If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 200
+        assert second.headers["etag"] != first.headers["etag"]
+
+
+@pytest.fixture
+def template_client(tmp_path, monkeypatch):
+    wb = Workbook()
+    wb.active.title = "Persona"
+    excel = tmp_path / "Template Q1.xlsx"
+    wb.save(excel)
+
+    service = TemplateDataService(data_dir=tmp_path / "data")
+    service.schemas_dir = tmp_path / "schemas"
+    service.schemas_dir.mkdir()
+    service.save_schema(TemplateSchema(
+        template_key="persona", sheet_name="Persona", sheet_width=0, sheet_height=0,
+        fields=[FieldMetadata(key="nome", cell="B1", type=FieldType.TEXT)],
+    ))
+    service.save_template_data("startup-1", "persona", {"nome": "Ana"})
+
+    manager = TemplateManager(service)
+    monkeypatch.setattr(templates_router, "template_manager", manager)
+    monkeypatch.setattr(templates_router, "_original_excel_path", lambda: excel)
+
+    app = FastAPI()
+    app.include_router(templates_router.router)
+    app.dependency_overrides[templates_router.get_user_startup_id] = lambda: "startup-1"
+    app.dependency_overrides[templates_router.get_current_founder] = lambda: Mock()
+    with TestClient(app) as client:
+        yield client, service
+
+
+class TestTemplateExport:
+    """GET /templates/{template_key}/export/xlsx"""
+
+    def test_cached_until_data_is_saved(self, template_client, cache):
+        client, service = template_client
+        first = client.get("/templates/persona/export/xlsx")
+        etag = first.headers["etag"]
+
+        assert client.get("/templates/persona/export/xlsx", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/templates/persona/export/xlsx").content == first.content
+        assert cache.stats()["entries"] == 1
+
+        service.save_template_data("startup-1", "persona", {"nome": "Bia"})
+        assert cache.stats()["entries"] == 0
+
+    def test_etag_follows_saved_answers(self, template_client):
+        client, service = template_client
+        etag = client.get("/templates/persona/export/xlsx").headers["etag"]
+
+        service.save_template_data("startup-1", "persona", {"nome": "Bia"})
+        updated = client.get("/templates/persona/export/xlsx", headers={"If-None-Match": etag})
+
+        assert updated.status_code == 200
+        assert updated.headers["etag"] != etag
+        assert load_workbook(io.BytesIO(updated.content))["Persona"]["B1"].value == "Bia"
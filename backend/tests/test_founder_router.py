@@ -19,6 +19,7 @@ def mock_db():
     """Fixture para mockar banco de dados"""
     db = MagicMock(spec=Session)
     db.query = MagicMock(return_value=db)
+    db.outerjoin = MagicMock(return_value=db)
     db.filter = MagicMock(return_value=db)
     db.order_by = MagicMock(return_value=db)
     db.first = MagicMock()
@@ -31,6 +32,13 @@ def mock_db():
     return db
 
 
+@pytest.fixture(autouse=True)
+def mock_summary_refresh():
+    """Resumo de progresso coberto em test_progress_summary (SQLite real)"""
+    with patch("routers.founder.refresh_trail_summary") as refresh:
+        yield refresh
+
+
 @pytest.fixture
 def app(mock_db):
     """Cria app FastAPI com router founder"""
@@ -135,62 +143,57 @@ class TestFounderTrailsEndpoints:
     
     def test_list_trails_with_data(self, client, mock_db, mock_trail, mock_step):
         """GET /founder/trails - Listar com trilhas"""
-        # Mock para seed_default_data
-        mock_db.query.return_value.first.return_value = mock_trail  # Já tem dados
-        
-        # Mock para buscar trails
-        call_count = 0
-        def side_effect_all():
-            return [mock_trail]
-        
-        def side_effect_first():
-            return None  # No progress
-        
-        mock_db.query.return_value.filter.return_value.all.side_effect = [
-            [mock_trail],  # trails query
-            [mock_step]    # steps query
-        ]
-        mock_db.query.return_value.filter.return_value.first.return_value = None
-        mock_db.query.return_value.order_by.return_value.all.return_value = [mock_step]
+        # trilhas + etapas (JOIN), depois resumos de progresso do founder
+        mock_db.all.side_effect = [[(mock_trail, mock_step)], []]
         
         response = client.get("/founder/trails")
         assert response.status_code == 200
         data = response.json()
-        assert isinstance(data, list)
+        assert data == [{
+            "id": "tr-marketing",
+            "name": "Marketing Q1",
+            "description": "Marketing template",
+            "steps": [{"id": "icp", "name": "ICP", "locked": False, "completed": False, "progress": 0}]
+        }]
     
-    def test_list_trails_with_progress(self, client, mock_db, mock_trail, mock_step, mock_progress, mock_answer):
-        """GET /founder/trails - Listar com progresso salvo"""
-        mock_db.query.return_value.first.return_value = mock_trail
-        
-        # Configurar múltiplas queries
-        def query_side_effect(model):
-            q = MagicMock()
-            q.filter.return_value = q
-            q.order_by.return_value = q
-            q.all.return_value = [mock_trail] if model == Trail else [mock_step]
-            q.first.side_effect = [mock_progress, mock_answer]  # Para cada chamada filter().first()
-            return q
-        
-        mock_db.query.side_effect = query_side_effect
+    def test_list_trails_with_progress(self, client, mock_db, mock_trail, mock_step):
+        """GET /founder/trails - Listar com progresso salvo (ProgressSummary)"""
+        summary = Mock(trail_id="tr-marketing", step_states={
+            "icp": {"locked": False, "completed": False, "progress": 50}
+        })
+        mock_db.all.side_effect = [[(mock_trail, mock_step)], [summary]]
         
         response = client.get("/founder/trails")
-        assert response.status_code in [200, 500]
+        assert response.status_code == 200
+        step = response.json()[0]["steps"][0]
+        assert step["progress"] == 50
+        assert step["locked"] is False
     
     def test_list_trails_error(self, client, mock_db):
         """GET /founder/trails - Erro ao listar"""
-        mock_db.query.return_value.first.side_effect = Exception("Database error")
+        mock_db.query.side_effect = Exception("Database error")
         
         response = client.get("/founder/trails")
         assert response.status_code == 500
     
-    def test_list_trails_seed_initial_data(self, client, mock_db):
-        """GET /founder/trails - Seed com dados padrão"""
+    def test_seed_initial_data(self, mock_db):
+        """seed_default_data (startup) - Seed com dados padrão"""
+        from routers.founder import seed_default_data
+        from sqlalchemy.orm import configure_mappers
+        
+        try:
+            configure_mappers()
+        except Exception as exc:  # registry poluído por outros testes (models duplicados)
+            pytest.skip(f"Mappers SQLAlchemy inválidos neste processo: {type(exc).__name__}")
+        
         # Simula primeiro acesso sem dados
-        mock_db.query.return_value.first.return_value = None
+        mock_db.first.return_value = None
         
-        response = client.get("/founder/trails")
-        # Pode falhar se seed não conseguir criar dados
-        assert response.status_code in [200, 500]
+        seed_default_data(mock_db)
+        
+        added = [call.args[0] for call in mock_db.add.call_args_list]
+        assert any(isinstance(obj, Trail) for obj in added)
+        mock_db.commit.assert_called_once()
 
 
 class TestFounderStepSchemaEndpoints:
@@ -331,8 +334,8 @@ class TestFounderExportEndpoints:
         """GET /founder/trails/{trail_id}/export/xlsx - Export Excel"""
         mock_db.query.return_value.filter.return_value.first.return_value = None
         
-        with patch('routers.founder.generate_xlsx') as mock_export:
-            mock_export.return_value = b"xlsx_data"
+        with patch('routers.founder.stream_xlsx') as mock_export:
+            mock_export.return_value = iter([b"xlsx_data"])
             
             response = client.get("/founder/trails/tr-marketing/export/xlsx")
             assert response.status_code in [200, 404, 500]
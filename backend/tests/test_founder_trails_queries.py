@@ -0,0 +1,114 @@
+"""
+Testes de GET /founder/trails contra SQLite real
+================================================
+
+Garante a carga em lote (load_trails_overview): mesma resposta da
+implementação anterior (queries por trilha/etapa) e nº fixo de queries,
+independente de quantas trilhas e etapas existem. O progresso vem de
+progress_summaries, preenchida pelo backfill (rebuild_trail_summaries)
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import configure_mappers, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base, get_db
+from db.instrumentation import install_query_instrumentation
+from db.models import ProgressSummary, StepAnswer, StepSchema, Trail, UserProgress
+from routers import founder as founder_router
+from services.auth import get_current_user_id
+from services.progress_summary import rebuild_trail_summaries
+
+
+@pytest.fixture
+def session():
+    try:
+        configure_mappers()
+    except Exception as exc:  # registry poluído por outros testes (models duplicados)
+        pytest.skip(f"Mappers SQLAlchemy inválidos neste processo: {type(exc).__name__}")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_instrumentation(engine)
+    Base.metadata.create_all(engine, tables=[
+        Trail.__table__, StepSchema.__table__, StepAnswer.__table__, UserProgress.__table__,
+        ProgressSummary.__table__,
+    ])
+    db = sessionmaker(bind=engine)()
+
+    for t in range(3):
+        trail_id = f"t{t}"
+        db.add(Trail(id=trail_id, name=f"Trilha {t}", description=None if t else "Desc", status="active"))
+        for s in range(5):
+            db.add(StepSchema(trail_id=trail_id, step_id=f"s{s}", step_name=f"Etapa {s}", order=5 - s, schema={}))
+        db.add(UserProgress(user_id="u1", trail_id=trail_id, step_id="s1", is_locked=False,
+                            is_completed=True, progress_percent=100))
+        db.add(StepAnswer(user_id="u1", trail_id=trail_id, step_id="s3", answers={"a": 1, "b": 2}))
+        db.add(StepAnswer(user_id="u2", trail_id=trail_id, step_id="s2", answers={"a": 1}))
+    db.add(Trail(id="vazia", name="Sem etapas", status="active"))
+    db.add(Trail(id="arquivada", name="Arquivada", status="archived"))
+    db.commit()
+    rebuild_trail_summaries(db)
+
+    yield db
+    db.close()
+
+
+def _legacy_overview(db, user_id):
+    """Implementação anterior (1 + T + 2·S queries), como referência"""
+    result = []
+    for trail in db.query(Trail).filter(Trail.status == "active").all():
+        steps = db.query(StepSchema).filter(StepSchema.trail_id == trail.id).order_by(StepSchema.order).all()
+        steps_with_progress = []
+        for idx, step in enumerate(steps):
+            progress = db.query(UserProgress).filter(
+                UserProgress.user_id == user_id,
+                UserProgress.trail_id == trail.id,
+                UserProgress.step_id == step.step_id,
+            ).first()
+            answer = db.query(StepAnswer).filter(
+                StepAnswer.user_id == user_id,
+                StepAnswer.trail_id == trail.id,
+                StepAnswer.step_id == step.step_id,
+            ).first()
+            calc_progress = min(100, len(answer.answers) * 25) if answer and answer.answers else 0
+            steps_with_progress.append({
+                "id": step.step_id,
+                "name": step.step_name,
+                "locked": progress.is_locked if progress else (idx > 0),
+                "completed": progress.is_completed if progress else False,
+                "progress": progress.progress_percent if progress else calc_progress,
+            })
+        result.append({
+            "id": trail.id,
+            "name": trail.name,
+            "description": trail.description or "",
+            "steps": steps_with_progress,
+        })
+    return result
+
+
+class TestTrailsOverview:
+    """load_trails_overview / GET /founder/trails"""
+
+    def test_same_response_as_per_step_queries(self, session):
+        overview = founder_router.load_trails_overview(session, "u1")
+
+        assert overview == _legacy_overview(session, "u1")
+        assert [t["id"] for t in overview] == ["t0", "t1", "t2", "vazia"]
+        assert overview[0]["steps"][0]["id"] == "s4"
+
+    def test_constant_query_count(self, session, query_budget):
+        app = FastAPI()
+        app.include_router(founder_router.router)
+        app.dependency_overrides[get_db] = lambda: session
+        app.dependency_overrides[get_current_user_id] = lambda: "u1"
+        client = TestClient(app)
+
+        with query_budget(2):
+            response = client.get("/founder/trails")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 4
@@ -0,0 +1,207 @@
+"""
+Testes da ingestão de templates fora do event loop (app/services/ingestion_jobs.py)
+Cobre o pipeline picklable, limite de concorrência, jobs assíncronos e o endpoint de upload
+"""
+import asyncio
+import pickle
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+
+from app.services import ingestion_jobs, snapshot_cache
+from app.services.ingestion_jobs import IngestionError, IngestionJobManager, process_workbook
+from app.services.snapshot_cache import SnapshotCache
+from benchmarks import workbooks
+from db.database import get_db
+from db.models import User
+from routers.admin_templates import router
+from services.auth import get_current_admin
+
+
+def _fake_result(filename="t.xlsx", cycle="2025"):
+    return {
+        "template_key": "t",
+        "cycle": cycle,
+        "file_hash_sha256": "abc",
+        "paths": {"original_path": "o", "snapshot_path": "s"},
+        "stats": {"sheets": 1},
+        "validation_report": {"valid": True},
+        "fields": [],
+        "processing_seconds": 0.0,
+    }
+
+
+def _fake_report(result):
+    return {"message": "Template FCJ ingested successfully", "template_id": "tpl-1", **result}
+
+
+@pytest.fixture
+def manager():
+    mgr = IngestionJobManager(executor_kind="thread", max_workers=2, max_concurrent=2)
+    yield mgr
+    mgr.shutdown()
+
+
+@pytest.fixture
+def client(manager):
+    app = FastAPI()
+    app.include_router(router)
+
+    admin = Mock(spec=User)
+    admin.id = "admin-001"
+    admin.role = "admin"
+
+    db = Mock()
+    app.dependency_overrides[get_current_admin] = lambda: admin
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[ingestion_jobs.get_job_manager] = lambda: manager
+
+    with patch.object(ingestion_jobs, "_register_with_new_session", side_effect=_fake_report), \
+         patch.object(ingestion_jobs, "register_result", side_effect=lambda db, r: _fake_report(r)), \
+         TestClient(app) as test_client:
+        # Context manager: um único event loop, para os jobs em background sobreviverem
+        yield test_client
+
+
+def _upload(client, content=b"PK-fake", **params):
+    return client.post(
+        "/admin/templates/upload",
+        params={"cycle": "2025", **params},
+        files={"file": ("t.xlsx", content, "application/octet-stream")},
+    )
+
+
+class TestProcessWorkbook:
+    """Testes do pipeline CPU-bound"""
+
+    def test_result_is_picklable(self, tmp_path, monkeypatch):
+        """O resultado atravessa o ProcessPoolExecutor"""
+        monkeypatch.setenv("TEMPLATE_STORAGE_PATH", str(tmp_path))
+        result = process_workbook(workbooks.generate_workbook(200), "bench.xlsx", "2025")
+
+        assert pickle.loads(pickle.dumps(result)) == result
+        assert result["fields"]
+        assert all(f["template_id"] == "pending" for f in result["fields"])
+
+    def test_invalid_file_maps_to_400(self):
+        with pytest.raises(IngestionError) as exc:
+            process_workbook(b"not a zip", "bad.xlsx", "2025")
+        assert exc.value.status_code == 400
+
+    def test_error_is_picklable(self):
+        err = pickle.loads(pickle.dumps(IngestionError(422, "x")))
+        assert (err.status_code, err.detail) == (422, "x")
+
+
+class TestJobManager:
+    """Testes do IngestionJobManager"""
+
+    def test_event_loop_stays_responsive(self, manager):
+        """Parse lento não bloqueia outras corrotinas"""
+        def slow(*args):
+            time.sleep(0.3)
+            return _fake_result()
+
+        async def scenario():
+            with patch.object(ingestion_jobs, "process_workbook", side_effect=slow):
+                task = asyncio.create_task(manager.run_pipeline(b"x", "t.xlsx", "2025"))
+                ticks = 0
+                while not task.done():
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+                await task
+            return ticks
+
+        assert asyncio.run(scenario()) >= 10
+
+    def test_concurrency_cap(self):
+        mgr = IngestionJobManager(executor_kind="thread", max_workers=4, max_concurrent=1)
+        active = {"now": 0, "max": 0}
+
+        def tracked(*args):
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            time.sleep(0.05)
+            active["now"] -= 1
+            return _fake_result()
+
+        async def scenario():
+            with patch.object(ingestion_jobs, "process_workbook", side_effect=tracked):
+                await asyncio.gather(*(mgr.run_pipeline(b"x", "t.xlsx", "2025") for _ in range(3)))
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            mgr.shutdown()
+        assert active["max"] == 1
+
+    def test_failed_job_keeps_status_code(self, manager):
+        async def scenario():
+            with patch.object(ingestion_jobs, "process_workbook", side_effect=IngestionError(422, "incompleto")):
+                job = manager.submit(b"x", "t.xlsx", "2025")
+                return await manager.wait(job.job_id, timeout=5)
+
+        job = asyncio.run(scenario())
+        assert job.status == "failed"
+        assert job.error == {"status_code": 422, "detail": "incompleto"}
+
+    def test_job_invalidates_api_snapshot_cache(self, manager, monkeypatch):
+        """O worker regrava o snapshot; quem invalida o cache é o processo da API"""
+        cache = SnapshotCache(max_bytes=1024)
+        monkeypatch.setattr(snapshot_cache, "_cache", cache)
+        cache.get_or_load("abc", "cells", lambda: ("snapshot antigo", 10))
+        monkeypatch.setattr(ingestion_jobs, "_register_with_new_session",
+                            lambda result: ingestion_jobs.register_result(Mock(), result))
+
+        async def scenario():
+            with patch.object(ingestion_jobs, "process_workbook", return_value=_fake_result()), \
+                 patch("app.services.template_registry.TemplateRegistry"):
+                job = manager.submit(b"x", "t.xlsx", "2025")
+                return await manager.wait(job.job_id, timeout=5)
+
+        job = asyncio.run(scenario())
+        assert job.status == "succeeded"
+        assert cache.stats()["entries"] == 0
+
+
+class TestUploadEndpoint:
+    """Testes do POST /admin/templates/upload e GET /admin/templates/jobs/{id}"""
+
+    def test_small_file_is_synchronous(self, client):
+        with patch.object(ingestion_jobs, "process_workbook", return_value=_fake_result()):
+            response = _upload(client)
+
+        assert response.status_code == 200
+        assert response.json()["template_id"] == "tpl-1"
+
+    def test_sync_error_maps_status(self, client):
+        with patch.object(ingestion_jobs, "process_workbook", side_effect=IngestionError(400, "inválido")):
+            response = _upload(client)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "inválido"
+
+    def test_large_file_returns_job(self, client):
+        with patch.object(ingestion_jobs, "SYNC_MAX_BYTES", 4), \
+             patch("routers.admin_templates.SYNC_MAX_BYTES", 4), \
+             patch.object(ingestion_jobs, "process_workbook", return_value=_fake_result()):
+            response = _upload(client, content=b"0123456789")
+            assert response.status_code == 202
+            body = response.json()
+            assert body["poll_url"] == f"/admin/templates/jobs/{body['job_id']}"
+
+            job = client.get(body["poll_url"], params={"wait": 5}).json()
+
+        assert job["status"] == "succeeded"
+        assert job["result"]["template_id"] == "tpl-1"
+
+    def test_mode_async_forces_job(self, client):
+        with patch.object(ingestion_jobs, "process_workbook", return_value=_fake_result()):
+            response = _upload(client, mode="async")
+        assert response.status_code == 202
+
+    def test_unknown_job_returns_404(self, client):
+        assert client.get("/admin/templates/jobs/nope").status_code == 404
@@ -0,0 +1,106 @@
+"""
+Testes do harness de carga (loadtest/)
+Cobre métricas, comparação com baseline e os cenários contra o app em processo
+"""
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from loadtest.runner import Metrics, compare, percentile
+from loadtest.scenarios import SCENARIOS, VirtualUser, FOUNDER_TASKS, ADMIN_TASKS
+
+BASELINES_DIR = Path(__file__).resolve().parent.parent / "loadtest" / "baselines"
+
+
+class TestMetrics:
+    """Testes de percentis e resumo"""
+
+    def test_percentile_interpolates(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile([], 95) == 0.0
+        assert percentile([3.0], 95) == 3.0
+
+    def test_summary_counts_errors_per_endpoint(self):
+        metrics = Metrics()
+        for i in range(10):
+            metrics.record("GET /a", 0.01 * (i + 1), ok=i != 0)
+        metrics.record("GET /b", 0.5, ok=True)
+
+        summary = metrics.summary(elapsed=2.0)
+        assert summary["total"]["requests"] == 11
+        assert summary["total"]["rps"] == 5.5
+        assert summary["endpoints"]["GET /a"]["errors"] == 1
+        assert summary["endpoints"]["GET /a"]["error_rate"] == 0.1
+
+    def test_recording_can_be_paused(self):
+        metrics = Metrics()
+        metrics.recording = False
+        metrics.record("GET /a", 0.1, ok=True)
+        assert metrics.summary(1.0)["total"]["requests"] == 0
+
+
+class TestCompare:
+    """Testes da comparação com baseline"""
+
+    def _report(self, p95=100.0, p99=200.0, rps=50.0, error_rate=0.0):
+        return {"results": {"total": {"p95_ms": p95, "p99_ms": p99, "rps": rps, "error_rate": error_rate}}}
+
+    def test_within_tolerance(self):
+        assert compare(self._report(p95=115), self._report(), max_regression=0.2) == []
+
+    def test_latency_and_throughput_regressions(self):
+        regressions = compare(self._report(p95=130, rps=30), self._report(), max_regression=0.2)
+        assert any(r.startswith("p95_ms") for r in regressions)
+        assert any(r.startswith("rps") for r in regressions)
+
+    def test_error_rate_regression(self):
+        assert compare(self._report(error_rate=0.05), self._report(), max_regression=0.2)
+
+    def test_checked_in_baselines_are_valid(self):
+        baselines = list(BASELINES_DIR.glob("*.json"))
+        assert baselines
+        for path in baselines:
+            report = json.loads(path.read_text())
+            assert compare(report, report, max_regression=0.0) == []
+            assert report["results"]["endpoints"]
+
+
+class TestScenarios:
+    """Executa cada tarefa uma vez contra o app em processo (providers stubados)"""
+
+    def test_all_tasks_run_without_errors(self, monkeypatch):
+        import main
+        from core.security import RateLimiter
+        from sqlalchemy.orm import configure_mappers
+
+        try:
+            configure_mappers()
+        except Exception as exc:  # registry poluído por outros testes (models duplicados)
+            pytest.skip(f"Mappers SQLAlchemy inválidos neste processo: {type(exc).__name__}")
+
+        # Limiter próprio: o global é compartilhado (e preso ao event loop) com outros testes
+        monkeypatch.setattr(main, "rate_limiter", RateLimiter(requests=10000, window=60))
+
+        async def scenario():
+            metrics = Metrics()
+            transport = httpx.ASGITransport(app=main.create_app())
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                for role, tasks in (("founder", FOUNDER_TASKS), ("admin", ADMIN_TASKS)):
+                    setup, _ = SCENARIOS[role]
+                    user = VirtualUser(client=client, record=metrics.record, role=role)
+                    assert await setup(user)
+                    for task, _weight in tasks:
+                        await task(user)
+            return metrics
+
+        metrics = asyncio.run(scenario())
+        summary = metrics.summary(elapsed=1.0)
+        assert "GET /founder/trails" in summary["endpoints"]
+        assert "POST /founder/trails/{trail}/steps/{step}/progress" in summary["endpoints"]
+        failing = {name: s for name, s in summary["endpoints"].items() if s["errors"]}
+        assert not failing
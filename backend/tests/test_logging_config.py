@@ -0,0 +1,152 @@
+"""
+Testes do pipeline de logging assíncrono (core/logging_config.py)
+Cobre QueueHandler/QueueListener, escrita em lote, sampling e encoder JSON
+"""
+import io
+import json
+import logging
+import queue
+
+from core.logging_config import (
+    AsyncLogListener,
+    AsyncQueueHandler,
+    BatchingStreamHandler,
+    JsonFormatter,
+    SamplingFilter,
+)
+
+
+class CountingStream(io.StringIO):
+    """StringIO que conta chamadas de write()"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def _record(msg="hello %s", args=("world",), level=logging.INFO, name="tr4ction.test", **attrs):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in attrs.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestJsonFormatter:
+    """Testes do formatter JSON"""
+
+    def test_format_includes_extra_and_message(self):
+        line = JsonFormatter().format(_record(extra={"path": "/health", "duration": 0.01}))
+        data = json.loads(line)
+        assert data["message"] == "hello world"
+        assert data["level"] == "INFO"
+        assert data["path"] == "/health"
+
+    def test_format_non_serializable_extra(self):
+        """Valores não serializáveis não devem quebrar o log"""
+        data = json.loads(JsonFormatter().format(_record(extra={"obj": object()})))
+        assert "object" in data["obj"]
+
+    def test_format_unicode(self):
+        data = json.loads(JsonFormatter().format(_record(msg="Configuração ✅", args=None)))
+        assert data["message"] == "Configuração ✅"
+
+
+class TestBatchingStreamHandler:
+    """Testes da escrita em lote"""
+
+    def test_records_are_buffered_until_flush(self):
+        stream = CountingStream()
+        handler = BatchingStreamHandler(stream, batch_size=10)
+        handler.setFormatter(JsonFormatter())
+
+        for _ in range(5):
+            handler.handle(_record())
+        assert stream.writes == 0
+
+        handler.flush()
+        assert stream.writes == 1
+        assert len(stream.getvalue().splitlines()) == 5
+
+    def test_batch_size_triggers_write(self):
+        stream = CountingStream()
+        handler = BatchingStreamHandler(stream, batch_size=3)
+        handler.setFormatter(JsonFormatter())
+
+        for _ in range(7):
+            handler.handle(_record())
+
+        assert stream.writes == 2
+        assert len(handler.buffer) == 1
+
+    def test_error_flushes_immediately(self):
+        stream = CountingStream()
+        handler = BatchingStreamHandler(stream, batch_size=100)
+        handler.setFormatter(JsonFormatter())
+
+        handler.handle(_record(level=logging.ERROR))
+        assert "hello world" in stream.getvalue()
+
+
+class TestAsyncPipeline:
+    """Testes do QueueHandler + listener"""
+
+    def test_records_reach_stream_through_listener(self):
+        stream = io.StringIO()
+        handler = BatchingStreamHandler(stream, batch_size=50)
+        handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.SimpleQueue()
+        listener = AsyncLogListener(log_queue, handler, flush_interval=0.05)
+        listener.start()
+
+        logger = logging.getLogger("tr4ction.test.async")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        queue_handler = AsyncQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        try:
+            for i in range(20):
+                logger.info("item %d", i, extra={"extra": {"i": i}})
+        finally:
+            logger.removeHandler(queue_handler)
+            listener.stop()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == [f"item {i}" for i in range(20)]
+        assert lines[3]["i"] == 3
+
+    def test_prepare_resolves_args_without_mutating_record(self):
+        record = _record()
+        prepared = AsyncQueueHandler(queue.SimpleQueue()).prepare(record)
+
+        assert prepared.msg == "hello world"
+        assert prepared.args is None
+        assert record.args == ("world",)
+
+
+class TestSamplingFilter:
+    """Testes do sampling de logs de alto volume"""
+
+    def test_rate_zero_drops_info_of_sampled_logger(self):
+        sampling = SamplingFilter(0.0, ["tr4ction.middleware"])
+        assert sampling.filter(_record(name="tr4ction.middleware")) is False
+
+    def test_warnings_are_never_sampled(self):
+        sampling = SamplingFilter(0.0, ["tr4ction.middleware"])
+        assert sampling.filter(_record(name="tr4ction.middleware", level=logging.WARNING)) is True
+
+    def test_other_loggers_are_not_sampled(self):
+        sampling = SamplingFilter(0.0, ["tr4ction.middleware"])
+        assert sampling.filter(_record(name="tr4ction.middlewarex")) is True
+        assert sampling.filter(_record(name="services.auth")) is True
+
+    def test_kept_records_carry_sample_rate(self):
+        sampling = SamplingFilter(0.999999, ["tr4ction.middleware"])
+        record = _record(name="tr4ction.middleware.sub")
+        if sampling.filter(record):
+            data = json.loads(JsonFormatter().format(record))
+            assert data["sample_rate"] == sampling.rate
@@ -0,0 +1,249 @@
+"""
+Testes do profiling em produção (core/profiling.py)
+Cobre sampler estatístico, formato collapsed, endpoints admin e cProfile por requisição
+(trabalho em threads, corpo de StreamingResponse, event loop fora do perfil)
+"""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+
+from core import profiling
+from core.profiling import (
+    ProfilingMiddleware,
+    SamplingCoordinator,
+    StackSampler,
+    format_collapsed,
+    parse_collapsed,
+)
+from db.models import User
+from routers.diagnostics import router
+from services.auth import create_access_token, get_current_admin
+from services.xlsx_exporter import iter_workbook_bytes
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _threadpool_work():
+    return sum(range(10000))
+
+
+def _loop_work():
+    return sum(range(10000))
+
+
+def _build_workbook():
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Dados")
+    for i in range(200):
+        ws.append([i, f"linha {i}"])
+    return wb
+
+
+@pytest.fixture
+def profiles_dir(tmp_path, monkeypatch):
+    """Isola PROFILES_DIR em diretório temporário"""
+    monkeypatch.setattr(profiling, "PROFILES_DIR", tmp_path)
+    monkeypatch.setattr(profiling, "coordinator", SamplingCoordinator(base_dir=tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def mock_admin_user():
+    user = Mock(spec=User)
+    user.id = "admin-001"
+    user.role = "admin"
+    return user
+
+
+class TestStackSampler:
+    """Testes do sampler de stacks"""
+
+    def test_sampler_captures_busy_thread(self):
+        """Thread ocupada deve aparecer nas stacks amostradas"""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        try:
+            sampler = StackSampler(interval=0.001)
+            samples = sampler.run(0.2)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert sampler.total_samples > 0
+        busy = [stack for stack in samples if stack.startswith("busy-worker;")]
+        assert busy
+        assert any("_busy_loop" in stack for stack in busy)
+
+    def test_sampler_skips_own_thread(self):
+        """O sampler não deve amostrar a própria thread"""
+        sampler = StackSampler()
+        sampler.sample_once(skip_thread_id=threading.get_ident())
+        assert not any("test_sampler_skips_own_thread" in stack for stack in sampler.samples)
+
+    def test_collapsed_roundtrip(self):
+        """format_collapsed / parse_collapsed são inversos"""
+        samples = {"main;a;b": 3, "main;a": 1}
+        text = format_collapsed(samples)
+        assert text.splitlines()[0] == "main;a;b 3"
+        assert parse_collapsed(text) == samples
+
+
+class TestSamplingCoordinator:
+    """Testes da coordenação entre workers"""
+
+    def test_session_writes_and_collects_worker_file(self, tmp_path):
+        coordinator = SamplingCoordinator(base_dir=tmp_path)
+        session = coordinator.request_session(seconds=1, interval=0.01)
+
+        assert (tmp_path / "sampling.trigger.json").exists()
+        time.sleep(session["seconds"] + 0.5)
+
+        result = coordinator.collect(session["session_id"])
+        assert result["workers"]
+        assert sum(result["samples"].values()) > 0
+
+    def test_trigger_started_only_once(self, tmp_path):
+        """Mesma sessão não deve iniciar duas vezes no mesmo worker"""
+        coordinator = SamplingCoordinator(base_dir=tmp_path)
+        session = coordinator.request_session(seconds=1, interval=0.05)
+        assert coordinator.poll_trigger() is False
+        assert coordinator._start_session(session) is False
+
+
+class TestProfilingEndpoints:
+    """Testes dos endpoints /diagnostics/profiling"""
+
+    def test_sample_requires_admin(self, profiles_dir):
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+
+        response = client.post("/diagnostics/profiling/sample?seconds=1")
+        assert response.status_code == 401
+
+    def test_sample_returns_collapsed_stacks(self, profiles_dir, mock_admin_user):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_admin] = lambda: mock_admin_user
+        client = TestClient(app)
+
+        with patch.object(profiling, "WATCHER_POLL_SECONDS", 0):
+            response = client.post("/diagnostics/profiling/sample?seconds=1&interval_ms=10")
+
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Workers"]
+        lines = response.text.splitlines()
+        assert lines
+        assert lines[0].rsplit(" ", 1)[1].isdigit()
+
+
+class TestProfilingMiddleware:
+    """Testes do cProfile por requisição"""
+
+    def _app(self):
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, enabled=True)
+
+        @app.get("/work")
+        async def work():
+            _loop_work()
+            return {"total": await profiling.run_in_threadpool(_threadpool_work)}
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(iter_workbook_bytes(_build_workbook, chunk_size=1024))
+
+        return app
+
+    def _get(self, client, path):
+        token = create_access_token({"sub": "admin-001", "role": "admin"})
+        return client.get(path, headers={"X-Profile": "cprofile", "Authorization": f"Bearer {token}"})
+
+    def test_admin_request_is_profiled(self, profiles_dir):
+        client = TestClient(self._app())
+
+        response = self._get(client, "/work")
+
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        assert (profiles_dir / "requests" / f"{profile_id}.prof").exists()
+        report = profiling.load_request_profile(profile_id)
+        assert "function calls" in report
+        # Trabalho no threadpool entra; código no event loop não
+        assert "_threadpool_work" in report
+        assert "_loop_work" not in report
+        meta = profiling.list_request_profiles()[0]
+        assert (meta["path"], meta["threads"]) == ("/work", 1)
+
+    def test_streaming_body_is_profiled(self, profiles_dir):
+        client = TestClient(self._app())
+
+        response = self._get(client, "/stream")
+
+        assert response.status_code == 200
+        assert response.content[:2] == b"PK"
+        report = profiling.load_request_profile(response.headers["X-Profile-Id"])
+        assert "_build_workbook" in report
+        assert "save" in report
+
+    def test_chat_request_profiles_rag_path(self, profiles_dir):
+        from routers import chat
+
+        def handle_chat_question(question, trail_id=None, step_id=None):
+            return {"answer": str(_threadpool_work())}
+
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, enabled=True)
+        app.include_router(chat.router)
+        token = create_access_token({"sub": "admin-001", "role": "admin"})
+
+        with patch.object(chat, "handle_chat_question", handle_chat_question):
+            response = TestClient(app).post(
+                "/chat/",
+                json={"question": "Como validar meu ICP?"},
+                headers={"X-Profile": "cprofile", "Authorization": f"Bearer {token}"},
+            )
+
+        assert response.status_code == 200
+        report = profiling.load_request_profile(response.headers["X-Profile-Id"])
+        assert "handle_chat_question" in report
+        assert "_threadpool_work" in report
+
+    def test_loop_only_request_has_empty_profile(self, profiles_dir):
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, enabled=True)
+
+        @app.get("/loop")
+        async def loop():
+            return {"total": _loop_work()}
+
+        response = self._get(TestClient(app), "/loop")
+
+        assert "nenhum trabalho" in profiling.load_request_profile(response.headers["X-Profile-Id"])
+
+    def test_non_admin_request_is_not_profiled(self, profiles_dir):
+        client = TestClient(self._app())
+        token = create_access_token({"sub": "user-001", "role": "founder"})
+
+        response = client.get(
+            "/work",
+            headers={"X-Profile": "cprofile", "Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+        assert not (profiles_dir / "requests").exists()
+
+    def test_invalid_profile_id_rejected(self, profiles_dir):
+        assert profiling.request_profile_path("../etc/passwd") is None
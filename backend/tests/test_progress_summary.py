@@ -0,0 +1,215 @@
+"""
+Testes do resumo materializado de progresso (services/progress_summary)
+======================================================================
+
+Valida o recálculo por trilha contra SQLite real, a gravação na mesma
+transação das respostas, o backfill e a leitura em lote do dashboard
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import configure_mappers, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from db.database import Base
+from db.models import ProgressSummary, StepAnswer, StepSchema, Trail, User, UserProgress
+from routers.admin import UpdateSchemaBody, get_founders_progress, update_step_schema
+from services.progress_summary import (
+    delete_template_summaries,
+    ensure_trail_summaries,
+    get_summary,
+    rebuild_trail_summaries,
+    record_template_summary,
+    refresh_trail_summaries,
+    refresh_trail_summary,
+    step_view,
+    summaries_by_user,
+)
+
+
+@pytest.fixture
+def session():
+    try:
+        configure_mappers()
+    except Exception as exc:  # registry poluído por outros testes (models duplicados)
+        pytest.skip(f"Mappers SQLAlchemy inválidos neste processo: {type(exc).__name__}")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        Trail.__table__, StepSchema.__table__, StepAnswer.__table__, UserProgress.__table__,
+        ProgressSummary.__table__, User.__table__,
+    ])
+    db = sessionmaker(bind=engine, autoflush=False)()
+
+    db.add(Trail(id="t1", name="Trilha", status="active"))
+    for s in range(4):
+        db.add(StepSchema(trail_id="t1", step_id=f"s{s}", step_name=f"Etapa {s}", order=s, schema={}))
+    db.commit()
+
+    yield db
+    db.close()
+
+
+class TestRefreshTrailSummary:
+    """refresh_trail_summary"""
+
+    def test_counts_and_current_step(self, session):
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s0", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        session.add(StepAnswer(user_id="u1", trail_id="t1", step_id="s0", answers={"a": 1}))
+        session.add(StepAnswer(user_id="u1", trail_id="t1", step_id="s1", answers={"a": 1, "b": 2}))
+        session.add(StepAnswer(user_id="u2", trail_id="t1", step_id="s2", answers={"a": 1}))
+
+        summary = refresh_trail_summary(session, "u1", "t1")
+        session.commit()
+
+        assert (summary.answered_count, summary.completed_count, summary.total_count) == (2, 1, 4)
+        assert summary.progress_percent == (100 + 50) // 4
+        assert summary.current_step_id == "s1"
+        assert summary.step_states == {
+            "s0": {"locked": False, "completed": True, "progress": 100},
+            "s1": {"progress": 50},
+        }
+
+    def test_updates_in_same_transaction(self, session):
+        refresh_trail_summary(session, "u1", "t1")
+        session.commit()
+
+        # Mesmo fluxo de save_step_progress: grava, recalcula, um commit
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s0", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        refresh_trail_summary(session, "u1", "t1")
+        session.rollback()
+
+        assert get_summary(session, "u1", "t1").completed_count == 0
+
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s0", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        refresh_trail_summary(session, "u1", "t1")
+        session.commit()
+
+        assert session.query(ProgressSummary).count() == 1
+        assert get_summary(session, "u1", "t1").completed_count == 1
+
+    def test_steps_replaced_refreshes_every_founder(self, session):
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s3", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        for user_id in ("u1", "u2"):
+            refresh_trail_summary(session, user_id, "t1")
+        session.commit()
+
+        # Mesmo fluxo do upload de template no admin: apaga e recria as etapas
+        session.query(StepSchema).filter(StepSchema.trail_id == "t1").delete()
+        for s in range(2):
+            session.add(StepSchema(trail_id="t1", step_id=f"n{s}", step_name=f"Nova {s}", order=s, schema={}))
+        assert refresh_trail_summaries(session, "t1") == 2
+        session.commit()
+
+        summary = get_summary(session, "u1", "t1")
+        assert (summary.total_count, summary.completed_count, summary.progress_percent) == (2, 0, 0)
+        assert summary.current_step_id == "n0"
+        assert summary.step_states == {}
+
+    def test_step_added_by_schema_update(self, session):
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s0", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        refresh_trail_summary(session, "u1", "t1")
+        session.commit()
+
+        body = UpdateSchemaBody(step_id="s4", step_name="Etapa 4", fields=[])
+        asyncio.run(update_step_schema("t1", "s4", body, session))
+
+        summary = get_summary(session, "u1", "t1")
+        assert (summary.total_count, summary.completed_count, summary.progress_percent) == (5, 1, 20)
+
+    def test_step_view_defaults(self, session):
+        summary = refresh_trail_summary(session, "u1", "t1")
+
+        assert summary.step_states == {}
+        assert summary.current_step_id == "s0"
+        assert step_view("s1", "Etapa 1", 1, summary.step_states.get("s1")) == {
+            "id": "s1", "name": "Etapa 1", "locked": True, "completed": False, "progress": 0,
+        }
+
+
+class TestSummaryReads:
+    """Backfill, leitura em lote e resumo de template"""
+
+    def test_backfill_once_and_batch_read(self, session):
+        session.add(StepAnswer(user_id="u1", trail_id="t1", step_id="s0", answers={"a": 1}))
+        session.add(StepAnswer(user_id="u2", trail_id="t1", step_id="s0", answers={"a": 1, "b": 2}))
+        session.commit()
+
+        assert ensure_trail_summaries(session) == 2
+        assert ensure_trail_summaries(session) == 0
+
+        grouped = summaries_by_user(session, ["u1", "u2", "u3"])
+        assert sorted(grouped) == ["u1", "u2"]
+        assert grouped["u2"][0].progress_percent == 50 // 4
+
+    def test_template_summary(self, session):
+        record_template_summary(session, "u1", "tpl", ["q1", "q2", "q3"], {"q1", "q3"})
+        session.commit()
+
+        summary = get_summary(session, "u1", "tpl", kind="template")
+        assert (summary.kind, summary.answered_count, summary.total_count) == ("template", 2, 3)
+        assert summary.progress_percent == 66
+        assert summary.current_step_id == "q2"
+        assert summaries_by_user(session, ["u1"]) == {}
+
+    def test_template_fields_replaced(self, session):
+        record_template_summary(session, "u1", "7", ["q1", "q2"], {"q1"})
+        refresh_trail_summary(session, "u1", "t1")
+        session.commit()
+
+        assert delete_template_summaries(session, 7) == 1
+        session.commit()
+
+        assert get_summary(session, "u1", "7", kind="template") is None
+        assert get_summary(session, "u1", "t1") is not None
+
+    def test_trail_and_template_with_same_id(self, session):
+        session.add(Trail(id="1", name="Trilha 1", status="active"))
+        session.add(StepSchema(trail_id="1", step_id="s0", step_name="Etapa", order=0, schema={}))
+        session.add(StepAnswer(user_id="u1", trail_id="1", step_id="s0", answers={"a": 1}))
+        refresh_trail_summary(session, "u1", "1")
+        record_template_summary(session, "u1", 1, ["q1", "q2"], {"q1"})
+        session.commit()
+
+        assert session.query(ProgressSummary).count() == 2
+        assert get_summary(session, "u1", "1").total_count == 1
+        assert get_summary(session, "u1", 1, kind="template").total_count == 2
+
+        assert delete_template_summaries(session, 1) == 1
+        assert get_summary(session, "u1", "1") is not None
+
+
+class TestFoundersProgress:
+    """GET /admin/founders/progress lido dos resumos"""
+
+    def test_same_shape_as_user_progress_rows(self, session):
+        for user_id in ("u1", "u2", "u3"):
+            session.add(User(id=user_id, email=f"{user_id}@x", hashed_password="x", name=user_id, role="founder"))
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s0", is_locked=False,
+                                 is_completed=True, progress_percent=100))
+        session.add(UserProgress(user_id="u1", trail_id="t1", step_id="s2", is_locked=False,
+                                 is_completed=False, progress_percent=40))
+        # Só respostas / só template: sem UserProgress, como antes não aparecem
+        session.add(StepAnswer(user_id="u2", trail_id="t1", step_id="s0", answers={"a": 1}))
+        record_template_summary(session, "u3", "tpl", ["q1"], {"q1"})
+        session.commit()
+        rebuild_trail_summaries(session)
+
+        result = {f["id"]: f for f in asyncio.run(get_founders_progress(session))}
+
+        assert result["u1"]["trailId"] == "t1"
+        assert result["u1"]["progress"] == 70
+        assert result["u1"]["currentStep"] == "Etapa 2"
+        assert result["u1"]["steps"] == [
+            {"id": "s0", "name": "Etapa 0", "locked": False, "completed": True, "progress": 100},
+            {"id": "s2", "name": "Etapa 2", "locked": False, "completed": False, "progress": 40},
+        ]
+        for user_id in ("u2", "u3"):
+            assert (result[user_id]["trailId"], result[user_id]["steps"], result[user_id]["progress"]) == (None, [], 0)
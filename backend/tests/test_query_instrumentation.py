@@ -0,0 +1,149 @@
+"""
+Testes da instrumentação de queries (db/instrumentation.py)
+Cobre contagem por requisição, shapes de parâmetros, N+1, headers e o fixture query_budget
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from db.instrumentation import (
+    QueryInstrumentationMiddleware,
+    QueryStats,
+    install_query_instrumentation,
+    track_queries,
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    install_query_instrumentation(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        for i in range(10):
+            conn.execute(text("INSERT INTO items (id, name) VALUES (:id, :name)"), {"id": i, "name": f"item-{i}"})
+    return engine
+
+
+def _n_plus_one(engine, n=10):
+    with engine.connect() as conn:
+        ids = [row[0] for row in conn.execute(text("SELECT id FROM items"))]
+        for item_id in ids[:n]:
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id})
+
+
+class TestQueryStats:
+    """Testes da coleta de estatísticas"""
+
+    def test_track_queries_counts_statements(self, engine):
+        with track_queries() as stats:
+            _n_plus_one(engine, n=3)
+
+        assert stats.count == 4
+        assert stats.total_ms > 0
+
+    def test_queries_outside_scope_are_ignored(self, engine):
+        with track_queries() as stats:
+            pass
+        _n_plus_one(engine, n=3)
+        assert stats.count == 0
+
+    def test_repeated_shapes_flag_n_plus_one(self, engine):
+        with track_queries() as stats:
+            _n_plus_one(engine, n=6)
+
+        repeated = stats.repeated_shapes(threshold=5)
+        assert len(repeated) == 1
+        assert repeated[0]["count"] == 6
+        assert "WHERE id = ?" in repeated[0]["statement"]
+
+    def test_params_shape_hides_values(self):
+        stats = QueryStats()
+        stats.record("SELECT * FROM t WHERE id = ?", (42,), 1.0)
+        stats.record("SELECT * FROM t WHERE id = ?", (43,), 3.0)
+        stats.record("SELECT * FROM t WHERE id = ?", ("x",), 2.0)
+
+        assert len(stats.shapes) == 2
+        assert stats.slowest[0].duration_ms == 3.0
+        assert stats.slowest[0].params_shape == ("int",)
+
+    def test_install_is_idempotent(self, engine):
+        install_query_instrumentation(engine)
+        with track_queries() as stats:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        assert stats.count == 1
+
+
+class TestQueryInstrumentationMiddleware:
+    """Testes do middleware por requisição"""
+
+    def _app(self, engine, expose_headers=True):
+        app = FastAPI()
+        app.add_middleware(QueryInstrumentationMiddleware, expose_headers=expose_headers)
+
+        @app.get("/items")
+        def list_items():
+            _n_plus_one(engine, n=8)
+            return {"ok": True}
+
+        @app.get("/single")
+        async def single():
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return {"ok": True}
+
+        return app
+
+    def test_headers_report_count_and_n_plus_one(self, engine):
+        client = TestClient(self._app(engine))
+
+        response = client.get("/items")
+        assert response.headers["X-DB-Query-Count"] == "9"
+        assert response.headers["X-DB-N-Plus-One"] == "1 shapes; max 8x"
+
+        response = client.get("/single")
+        assert response.headers["X-DB-Query-Count"] == "1"
+        assert "X-DB-N-Plus-One" not in response.headers
+
+    def test_headers_hidden_outside_debug(self, engine):
+        client = TestClient(self._app(engine, expose_headers=False))
+        response = client.get("/items")
+        assert "X-DB-Query-Count" not in response.headers
+
+    def test_n_plus_one_is_logged(self, engine, caplog):
+        client = TestClient(self._app(engine))
+        with caplog.at_level("WARNING", logger="tr4ction.db"):
+            client.get("/items")
+        assert any(r.getMessage() == "Possible N+1 queries" for r in caplog.records)
+
+
+class TestQueryBudgetFixture:
+    """Testes do fixture query_budget"""
+
+    def test_budget_passes_within_limit(self, engine, query_budget):
+        with query_budget(4) as stats:
+            _n_plus_one(engine, n=3)
+        assert stats.count == 4
+
+    def test_budget_fails_when_exceeded(self, engine, query_budget):
+        with pytest.raises(AssertionError, match="Orçamento de queries excedido"):
+            with query_budget(2):
+                _n_plus_one(engine, n=3)
+
+    def test_budget_detects_repeats(self, engine, query_budget):
+        with pytest.raises(AssertionError, match="N\\+1"):
+            with query_budget(100, max_repeats=3):
+                _n_plus_one(engine, n=3)
+
+    def test_budget_sees_queries_from_test_client(self, engine, query_budget):
+        client = TestClient(TestQueryInstrumentationMiddleware()._app(engine))
+        with query_budget(9) as stats:
+            client.get("/items")
+        assert stats.count == 9
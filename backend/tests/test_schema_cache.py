@@ -0,0 +1,143 @@
+"""
+Testes do cache de schemas (services/schema_cache)
+==================================================
+
+Valida reuso entre instâncias, invalidação por mtime/tamanho sem limpar
+as outras chaves, limite de memória, pré-carga e uso pelo TemplateRegistry
+"""
+
+import json
+import os
+
+import pytest
+
+from services import schema_cache, template_registry
+from services.excel_template_parser import FieldMetadata, FieldType, TemplateSchema
+from services.schema_cache import SchemaCache
+from services.template_manager import TemplateDataService
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    fresh = SchemaCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(schema_cache, "_cache", fresh)
+    return fresh
+
+
+def _write(path, schema, mtime_ns=None):
+    path.write_text(json.dumps(schema), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestSchemaCache:
+    """Testes do SchemaCache"""
+
+    def test_reuses_until_file_changes(self, cache, tmp_path):
+        path = tmp_path / "a.json"
+        _write(path, {"fields": [1]}, mtime_ns=1_000_000_000)
+
+        first = cache.load(path)
+        assert cache.load(path) is first
+
+        _write(path, {"fields": [1, 2]}, mtime_ns=2_000_000_000)
+
+        assert cache.load(path) == {"fields": [1, 2]}
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["reloads"], stats["entries"]) == (1, 2, 1, 1)
+
+    def test_raw_and_parsed_variants_coexist(self, cache, tmp_path):
+        path = tmp_path / "a.json"
+        _write(path, {"fields": [1]}, mtime_ns=1_000_000_000)
+
+        for _ in range(3):
+            cache.load(path)
+            cache.load(path, len)
+
+        stats = cache.stats()
+        assert (stats["misses"], stats["reloads"], stats["entries"]) == (2, 0, 2)
+
+        _write(path, {"fields": [1, 2]}, mtime_ns=2_000_000_000)
+        cache.load(path)
+        cache.load(path, len)
+
+        stats = cache.stats()
+        assert (stats["misses"], stats["reloads"], stats["entries"]) == (4, 1, 2)
+
+    def test_invalidate_only_drops_one_key(self, cache, tmp_path):
+        for name in ("a", "b"):
+            _write(tmp_path / f"{name}.json", {"name": name})
+            cache.load(tmp_path / f"{name}.json")
+
+        cache.invalidate(tmp_path / "a.json")
+
+        assert cache.stats()["entries"] == 1
+        cache.load(tmp_path / "b.json")
+        assert cache.stats()["hits"] == 1
+
+    def test_size_bounded(self, tmp_path):
+        cache = SchemaCache(max_bytes=200)
+        for i in range(5):
+            _write(tmp_path / f"{i}.json", {"i": i})
+            cache.load(tmp_path / f"{i}.json")
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 200
+        assert stats["evictions"] > 0
+
+    def test_missing_file_raises(self, cache, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            cache.load(tmp_path / "nada.json")
+
+    def test_warm_skips_broken_files(self, cache, tmp_path):
+        _write(tmp_path / "ok.json", {"ok": True})
+        (tmp_path / "ruim.json").write_text("{", encoding="utf-8")
+
+        assert cache.warm([tmp_path / "ok.json", tmp_path / "ruim.json"]) == 1
+        assert cache.stats()["entries"] == 1
+
+
+class TestTemplateDataServiceSchemas:
+    """load_schema/save_schema sobre o cache compartilhado"""
+
+    def _service(self, tmp_path):
+        service = TemplateDataService(data_dir=tmp_path / "data")
+        service.schemas_dir = tmp_path / "schemas"
+        service.schemas_dir.mkdir(exist_ok=True)
+        return service
+
+    def _schema(self, key, label):
+        return TemplateSchema(
+            template_key=key, sheet_name=key, sheet_width=0, sheet_height=0,
+            fields=[FieldMetadata(key="nome", cell="B1", type=FieldType.TEXT, label=label)],
+        )
+
+    def test_shared_between_instances(self, cache, tmp_path):
+        writer, reader = self._service(tmp_path), self._service(tmp_path)
+        writer.save_schema(self._schema("persona", "Nome"))
+        writer.save_schema(self._schema("icp", "ICP"))
+
+        assert reader.load_schema("persona") is writer.load_schema("persona")
+
+        writer.save_schema(self._schema("persona", "Nome completo"))
+
+        assert reader.load_schema("persona").fields[0].label == "Nome completo"
+        assert cache.stats()["entries"] == 1
+        assert reader.warm_schema_cache() == 2
+
+
+class TestRegistrySchemas:
+    """TemplateRegistry lê schemas pelo cache"""
+
+    def test_discovery_reads_each_schema_once(self, cache, tmp_path, monkeypatch):
+        cycle_dir = tmp_path / "Q1"
+        cycle_dir.mkdir()
+        _write(cycle_dir / "persona.json", {"sheet_name": "Persona", "fields": [{}]})
+        monkeypatch.setattr(template_registry, "TEMPLATES_GENERATED_DIR", tmp_path)
+        monkeypatch.setattr(template_registry, "BASE_DIR", tmp_path)
+        registry = template_registry.TemplateRegistry()
+
+        assert registry.list_templates_by_cycle("Q1")[0]["field_count"] == 1
+        assert registry.get_template_schema("Q1", "persona")["sheet_name"] == "Persona"
+        assert registry.warm_schema_cache() == 1
+        assert cache.stats()["misses"] == 1
@@ -0,0 +1,125 @@
+"""
+Testes do engine de geometria por soma de prefixos (services/sheet_geometry.py)
+Cobre posições/tamanhos, ranges mesclados e a integração com os parsers
+"""
+import pytest
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from services.excel_template_parser import ExcelTemplateParser
+from services.sheet_geometry import SheetGeometry, parse_cell_address
+from services.template_ingestion_service import ExcelDimensionCalculator
+
+WIDTHS = {1: 10.0, 2: 20.5, 3: 7.25, 4: 30.0}
+HEIGHTS = {1: 15.0, 2: 40.0, 3: 19.95}
+
+
+def _geometry(merged=()):
+    return SheetGeometry(
+        column_width=lambda col: WIDTHS.get(col, 5.0),
+        row_height=lambda row: HEIGHTS.get(row, 10.0),
+        merged_ranges=merged,
+    )
+
+
+def _linear_left(col):
+    left = 0.0
+    for c in range(1, col):
+        left += WIDTHS.get(c, 5.0)
+    return left
+
+
+@pytest.fixture
+def worksheet_file(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Persona"
+    for col in range(1, 8):
+        ws.column_dimensions[get_column_letter(col)].width = 8 + col * 1.37
+    for row in range(1, 40, 3):
+        ws.row_dimensions[row].height = 18.7
+    ws["B2"] = "Nome"
+    ws.merge_cells("C4:E6")
+    ws["G30"] = "fim"
+    path = tmp_path / "geometry.xlsx"
+    wb.save(path)
+    return path
+
+
+class TestSheetGeometry:
+    """Testes do SheetGeometry"""
+
+    def test_cell_box_matches_linear_sums(self):
+        geometry = _geometry()
+        for col in range(1, 12):
+            top, left, width, height = geometry.cell_box(2, col)
+            assert left == _linear_left(col)
+            assert width == WIDTHS.get(col, 5.0)
+            assert (top, height) == (15.0, 40.0)
+
+    def test_extends_on_demand(self):
+        geometry = _geometry()
+        assert geometry.left(3) == 30.5
+        assert geometry.left(100) == _linear_left(100)
+
+    def test_sheet_size(self):
+        width, height = _geometry().sheet_size(4, 3)
+        assert width == 10.0 + 20.5 + 7.25 + 30.0
+        assert height == 15.0 + 40.0 + 19.95
+
+    def test_merged_box_uses_range_size(self):
+        class Range:
+            min_row, min_col, max_row, max_col = 1, 2, 3, 4
+
+        geometry = _geometry([Range()])
+        assert geometry.merged_bounds(2, 3) == (1, 2, 3, 4)
+        assert geometry.merged_bounds(4, 3) is None
+
+        top, left, width, height = geometry.merged_box(2, 3)
+        assert (top, left) == (15.0, 30.5)
+        assert width == pytest.approx(20.5 + 7.25 + 30.0)
+        assert height == pytest.approx(15.0 + 40.0 + 19.95)
+
+    def test_parse_cell_address(self):
+        assert parse_cell_address("B12") == (12, 2)
+        assert parse_cell_address("$aa$3") == (3, 27)
+
+
+class TestParsersUseGeometry:
+    """Parsers devolvem as mesmas posições da soma linear"""
+
+    def test_template_parser_positions(self, worksheet_file):
+        parser = ExcelTemplateParser(worksheet_file)
+        worksheet = parser.workbook["Persona"]
+
+        position = parser.get_cell_position(worksheet, "D10")
+        expected_left = 0.0
+        for col in "ABC":
+            expected_left += parser._get_column_width_pixels(worksheet, col)
+        expected_top = 0.0
+        for row in range(1, 10):
+            expected_top += parser._get_row_height_pixels(worksheet, row)
+
+        assert (position.left, position.top) == (expected_left, expected_top)
+        assert position.width == parser._get_column_width_pixels(worksheet, "D")
+
+        schema = parser.parse_sheet("Persona", {"nome": {"cell": "B2"}})
+        assert schema.sheet_width == sum(
+            parser._get_column_width_pixels(worksheet, get_column_letter(c)) for c in range(1, 8)
+        )
+        parser.close()
+
+    def test_dimension_calculator_merged_and_size(self, worksheet_file):
+        from openpyxl import load_workbook
+
+        ws = load_workbook(worksheet_file)["Persona"]
+        calc = ExcelDimensionCalculator(ws)
+
+        merged = calc.get_cell_position("D5")
+        assert merged.left == sum(calc.get_column_width_pixels(c) for c in range(1, 4))
+        assert merged.width == pytest.approx(sum(calc.get_column_width_pixels(c) for c in range(3, 6)))
+        assert merged.height == pytest.approx(sum(calc.get_row_height_pixels(r) for r in range(4, 7)))
+
+        width, height = calc.get_sheet_dimensions()
+        assert width == sum(calc.get_column_width_pixels(c) for c in range(1, ws.max_column + 1))
+        assert height == sum(calc.get_row_height_pixels(r) for r in range(1, ws.max_row + 1))
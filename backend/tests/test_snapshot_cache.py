@@ -0,0 +1,213 @@
+"""
+Testes do cache de snapshots e do GET /admin/templates/{id}/snapshot
+====================================================================
+
+Valida LRU com orçamento de memória, reaproveitamento no storage,
+ETag/If-None-Match (304) e corpo gzip servido direto do cache
+"""
+
+import gzip
+import json
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import snapshot_cache
+from app.services.snapshot_cache import SnapshotCache
+from app.services.snapshot_codec import resolve_codec
+from app.services.snapshot_format import from_columnar, is_columnar
+from app.services.template_storage import TemplateStorageService
+from db.database import get_db
+from db.models import User
+from routers.admin_templates import router
+from services.auth import get_current_admin
+
+
+def _snapshot():
+    cells = [
+        {
+            "coordinate": f"A{row}", "row": row, "column": 1, "column_letter": "A",
+            "value": f"Resposta {row}", "data_type": "s", "formula": None,
+            "number_format": "General", "hyperlink": None, "comment": None,
+            "style": {"font": {"name": "Arial", "size": 11.0}},
+        }
+        for row in range(1, 50)
+    ]
+    return {
+        "schema_version": "2.0",
+        "workbook": {"sheetnames": ["S"], "defined_names": {}},
+        "sheets": [{"name": "S", "merged_cells": [], "cells": cells}],
+    }
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    fresh = SnapshotCache(max_bytes=16 * 1024 * 1024)
+    monkeypatch.setattr(snapshot_cache, "_cache", fresh)
+    return fresh
+
+
+@pytest.fixture
+def saved(tmp_path, monkeypatch):
+    monkeypatch.setenv("TEMPLATE_STORAGE_PATH", str(tmp_path))
+    storage = TemplateStorageService(codec=resolve_codec("json", "gzip"))
+    return storage, storage.save("t.xlsx", b"PK-1", _snapshot(), [], "t", "2025")
+
+
+class TestSnapshotCache:
+    """Testes do LRU"""
+
+    def test_hit_skips_loader(self, cache):
+        loader = Mock(return_value=("valor", 10))
+
+        assert cache.get_or_load("h", "cells", loader) == "valor"
+        assert cache.get_or_load("h", "cells", loader) == "valor"
+        assert loader.call_count == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = SnapshotCache(max_bytes=100)
+        cache.get_or_load("a", "cells", lambda: ("a", 40))
+        cache.get_or_load("b", "cells", lambda: ("b", 40))
+        cache.get_or_load("a", "cells", lambda: ("a", 40))  # "a" vira o mais recente
+        cache.get_or_load("c", "cells", lambda: ("c", 40))
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 80
+        assert stats["evictions"] == 1
+        assert cache.get_or_load("b", "cells", lambda: ("b2", 40)) == "b2"
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = SnapshotCache(max_bytes=10)
+        assert cache.get_or_load("a", "cells", lambda: ("a", 11)) == "a"
+        assert cache.stats()["entries"] == 0
+
+    def test_invalidate_drops_every_variant(self, cache):
+        cache.get_or_load("h", "cells", lambda: ("x", 1))
+        cache.get_or_load("h", "columnar", lambda: ("y", 1))
+        cache.get_or_load("g", "cells", lambda: ("z", 1))
+
+        cache.invalidate("h")
+
+        stats = cache.stats()
+        assert stats["entries"] == 1
+        assert stats["bytes"] == 1
+
+    def test_invalidate_only_stale_variants(self, cache):
+        cache.get_or_load("h", "cells", lambda: ("x", 1))
+        cache.get_or_load("h", "columnar", lambda: ("y", 1))
+
+        assert cache.invalidate("h", lambda variant: variant == "cells") == 1
+        assert cache.get_or_load("h", "columnar", lambda: ("novo", 1)) == "y"
+
+
+class TestStorageCache:
+    """TemplateStorageService lê o snapshot do disco uma vez por hash"""
+
+    def test_load_snapshot_is_cached(self, saved, cache):
+        storage, result = saved
+        path = result["paths"]["snapshot_path"]
+
+        first = storage.load_snapshot(path)
+        second = storage.load_snapshot(path)
+
+        assert first == _snapshot()
+        assert second is first
+        assert is_columnar(storage.load_snapshot(path, columnar=True))
+        assert cache.stats()["entries"] == 2
+
+    def test_columnar_gzip_is_the_stored_file(self, saved):
+        storage, result = saved
+        path = result["paths"]["snapshot_path"]
+
+        body = storage.load_snapshot_gzip(path, columnar=True)
+
+        with open(path, "rb") as f:
+            assert body == f.read()
+        assert from_columnar(json.loads(gzip.decompress(body))) == _snapshot()
+
+    def test_save_invalidates(self, saved, cache):
+        storage, result = saved
+        storage.load_snapshot(result["paths"]["snapshot_path"])
+
+        storage.save("t.xlsx", b"PK-1", _snapshot(), [], "t", "2025")
+
+        assert cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def client(saved):
+    _, result = saved
+    td = Mock(file_hash_sha256=result["hash"], snapshot_path=result["paths"]["snapshot_path"])
+    db = Mock()
+    db.query.return_value.filter_by.return_value.one_or_none.return_value = td
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_admin] = lambda: Mock(spec=User)
+    app.dependency_overrides[get_db] = lambda: db
+    with TestClient(app) as test_client:
+        yield test_client, result["hash"]
+
+
+class TestSnapshotEndpoint:
+    """ETag, 304 e gzip no GET /snapshot"""
+
+    def test_etag_and_304(self, client):
+        client, file_hash = client
+        response = client.get("/admin/templates/1/snapshot")
+
+        etag = f'"{file_hash}-cells-gzip"'
+        assert response.status_code == 200
+        assert response.headers["etag"] == etag
+        assert response.json() == _snapshot()
+
+        for if_none_match in (etag, f"W/{etag}", f'"x", {etag}', "*"):
+            cached = client.get("/admin/templates/1/snapshot", headers={"If-None-Match": if_none_match})
+            assert cached.status_code == 304
+            assert cached.content == b""
+
+        stale = client.get("/admin/templates/1/snapshot", headers={"If-None-Match": '"outro"'})
+        assert stale.status_code == 200
+
+    def test_etag_per_format_and_encoding(self, client):
+        client, file_hash = client
+        cells = client.get("/admin/templates/1/snapshot").headers["etag"]
+
+        columnar = client.get(
+            "/admin/templates/1/snapshot", params={"format": "columnar"}, headers={"If-None-Match": cells}
+        )
+        identity = client.get(
+            "/admin/templates/1/snapshot", headers={"If-None-Match": cells, "Accept-Encoding": "identity"}
+        )
+
+        assert columnar.status_code == 200
+        assert from_columnar(columnar.json()) == _snapshot()
+        assert identity.status_code == 200
+        assert identity.headers["etag"] == f'"{file_hash}-cells"'
+        assert len({cells, columnar.headers["etag"], identity.headers["etag"]}) == 3
+
+    def test_gzip_body_served_directly(self, client):
+        client, _ = client
+        response = client.get(
+            "/admin/templates/1/snapshot",
+            params={"format": "columnar"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert from_columnar(response.json()) == _snapshot()
+
+    def test_identity_when_gzip_not_accepted(self, client):
+        client, _ = client
+        response = client.get(
+            "/admin/templates/1/snapshot",
+            headers={"Accept-Encoding": "gzip;q=0, identity"},
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == _snapshot()
@@ -0,0 +1,113 @@
+"""
+Testes do catálogo de templates (services/template_catalog)
+===========================================================
+
+Valida a carga completa, a atualização incremental por template,
+o ETag e as listagens de /api/templates servidas do catálogo
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from db.database import get_db
+from routers import template_discovery
+from services import template_catalog, template_registry
+from services.template_catalog import TemplateCatalog
+
+
+def _write_schema(root, cycle, key, fields=1):
+    cycle_dir = root / cycle
+    cycle_dir.mkdir(exist_ok=True)
+    (cycle_dir / f"{key}.json").write_text(
+        json.dumps({"sheet_name": key.title(), "fields": [{}] * fields}), encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def generated_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(template_registry, "TEMPLATES_GENERATED_DIR", tmp_path)
+    monkeypatch.setattr(template_registry, "BASE_DIR", tmp_path)
+    _write_schema(tmp_path, "Q1", "persona", fields=3)
+    _write_schema(tmp_path, "Q1", "icp")
+    _write_schema(tmp_path, "Q2", "okrs")
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(generated_dir, monkeypatch):
+    fresh = TemplateCatalog(ttl=0)
+    monkeypatch.setattr(template_catalog, "_catalog", fresh)
+    return fresh
+
+
+class TestTemplateCatalog:
+    """Testes do TemplateCatalog"""
+
+    def test_build(self, catalog):
+        assert catalog.build(None) == 3
+
+        assert catalog.cycles() == ["Q1", "Q2"]
+        assert [t["template_key"] for t in catalog.list("Q1")] == ["icp", "persona"]
+        persona = catalog.list("Q1")[1]
+        assert persona["field_count"] == 3
+        assert len(persona["schema_hash"]) == 64
+        assert "schema" not in persona
+
+    def test_refresh_is_incremental(self, catalog, generated_dir):
+        catalog.build(None)
+        etag = catalog.etag
+
+        _write_schema(generated_dir, "Q3", "briefing", fields=2)
+        assert catalog.refresh(None, "Q3", "briefing")["field_count"] == 2
+        assert catalog.cycles() == ["Q1", "Q2", "Q3"]
+        assert catalog.etag != etag
+
+        (generated_dir / "Q2" / "okrs.json").unlink()
+        assert catalog.refresh(None, "Q2", "okrs") is None
+        assert catalog.cycles() == ["Q1", "Q3"]
+
+        stats = catalog.stats()
+        assert (stats["builds"], stats["refreshes"], stats["templates"]) == (1, 2, 3)
+
+    def test_etag_follows_schema_content(self, catalog, generated_dir):
+        catalog.build(None)
+        etag = catalog.etag
+
+        _write_schema(generated_dir, "Q1", "icp", fields=5)
+        catalog.refresh(None, "Q1", "icp")
+
+        assert catalog.etag != etag
+
+    def test_refresh_before_build_is_noop(self, catalog):
+        assert catalog.refresh(None, "Q1", "persona") is None
+        assert catalog.stats()["templates"] == 0
+
+
+@pytest.fixture
+def client(catalog):
+    app = FastAPI()
+    app.include_router(template_discovery.router)
+    app.dependency_overrides[get_db] = lambda: None
+    with TestClient(app) as client:
+        yield client
+
+
+class TestDiscoveryEndpoints:
+    """GET /api/templates servido pelo catálogo"""
+
+    def test_listing_with_etag(self, client, catalog):
+        response = client.get("/api/templates")
+        etag = response.headers["etag"]
+
+        assert response.json()["data"]["total"] == 3
+        assert client.get("/api/templates", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/api/templates/cycles").json()["data"]["cycles"] == ["Q1", "Q2"]
+        assert client.get("/api/templates?cycle=Q2").json()["data"]["templates"][0]["template_key"] == "okrs"
+        assert catalog.stats()["builds"] == 1
+
+    def test_cycle_path(self, client):
+        assert client.get("/api/templates/Q1").json()["data"]["total"] == 2
+        assert client.get("/api/templates/Q9").status_code == 404
@@ -0,0 +1,174 @@
+"""
+Tests for the template data stores (services/template_data_store)
+=================================================================
+
+Latest pointer, metadata-only paginated listing, v1 overwrite,
+concurrent saves and the JSON → SQLite migration (manual and at startup).
+"""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from services.template_data_store import (
+    JsonFileTemplateDataStore,
+    SQLiteTemplateDataStore,
+    migrate_json_files,
+    resolve_store,
+)
+from services.template_manager import TemplateDataService
+
+
+@pytest.fixture(params=["sqlite", "files"])
+def store(request, tmp_path):
+    return resolve_store(tmp_path, request.param)
+
+
+class TestStores:
+    """Same behaviour for both backends"""
+
+    def test_latest_and_specific_version(self, store):
+        for i in range(1, 4):
+            assert store.save("s1", "persona", {"nome": f"v{i}"})["version"] == i
+
+        assert store.get("s1", "persona")["data"] == {"nome": "v3"}
+        assert store.get("s1", "persona", 2)["data"] == {"nome": "v2"}
+        assert store.get("s1", "persona", 9) is None
+        assert store.get("s1", "outro") is None
+
+    def test_listing_is_metadata_only_and_paginated(self, store):
+        for i in range(12):
+            store.save("s1", "persona", {"nome": i})
+
+        page = store.list_versions("s1", "persona", limit=5, offset=8)
+
+        assert [v["version"] for v in page] == [9, 10, 11, 12]
+        assert all("data" not in v for v in page)
+        assert len(store.list_versions("s1", "persona")) == 12
+
+    def test_overwrite_keeps_created_at(self, store):
+        first = store.save("s1", "persona", {"nome": "a"}, auto_version=False)
+        second = store.save("s1", "persona", {"nome": "b"}, auto_version=False)
+
+        assert second["version"] == 1
+        assert second["created_at"] == first["created_at"]
+        assert store.get("s1", "persona")["data"] == {"nome": "b"}
+
+
+class TestSQLiteStore:
+    """SQLite-specific guarantees"""
+
+    def test_concurrent_saves_get_distinct_versions(self, tmp_path):
+        store = SQLiteTemplateDataStore(tmp_path / "data.sqlite3")
+        versions = []
+
+        def save():
+            for _ in range(10):
+                versions.append(store.save("s1", "persona", {"x": 1})["version"])
+
+        threads = [threading.Thread(target=save) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(versions) == list(range(1, 41))
+        assert store.get("s1", "persona")["version"] == 40
+
+    def test_migration_is_idempotent(self, tmp_path):
+        legacy = JsonFileTemplateDataStore(tmp_path / "legacy")
+        for i in range(3):
+            legacy.save("s1", "persona", {"nome": i})
+        legacy.save("s2", "icp", {"nome": "x"})
+        (tmp_path / "legacy" / "s2" / "icp" / "v2.json").write_text("{corrompido", encoding="utf-8")
+
+        store = SQLiteTemplateDataStore(tmp_path / "data.sqlite3")
+        assert migrate_json_files(tmp_path / "legacy", store) == {"imported": 4, "skipped": 0, "errors": 1}
+        assert migrate_json_files(tmp_path / "legacy", store)["skipped"] == 4
+
+        latest = store.get("s1", "persona")
+        assert latest["version"] == 3
+        assert latest == json.loads((tmp_path / "legacy" / "s1" / "persona" / "v3.json").read_text())
+        assert store.save("s1", "persona", {"nome": "novo"})["version"] == 4
+
+
+class TestTemplateDataService:
+    """TemplateDataService on top of the store"""
+
+    def test_default_backend_is_sqlite(self, tmp_path):
+        service = TemplateDataService(data_dir=tmp_path)
+        service.save_template_data("s1", "persona", {"nome": "a"})
+        service.save_template_data("s1", "persona", {"nome": "b"})
+
+        assert isinstance(service.store, SQLiteTemplateDataStore)
+        assert service.load_template_data("s1", "persona")["data"] == {"nome": "b"}
+        assert service.load_template_data("s1", "persona", version=1)["data"] == {"nome": "a"}
+        assert not list(tmp_path.glob("*/*/v*.json"))
+
+    def test_legacy_files_imported_once(self, tmp_path):
+        legacy = JsonFileTemplateDataStore(tmp_path)
+        legacy.save("s1", "persona", {"nome": "antigo"})
+        legacy.save("s1", "persona", {"nome": "antigo 2"})
+
+        service = TemplateDataService(data_dir=tmp_path)
+        assert service.import_legacy_files() == {"imported": 2, "skipped": 0, "errors": 0}
+        assert service.load_template_data("s1", "persona")["data"] == {"nome": "antigo 2"}
+        assert [v["version"] for v in service.list_template_versions("s1", "persona")] == [1, 2]
+
+        # Store já populado: não reimporta
+        legacy.save("s2", "icp", {"nome": "x"})
+        assert service.import_legacy_files() is None
+        assert service.load_template_data("s2", "icp") is None
+
+    def test_default_data_dir_outside_repo(self):
+        # conftest aponta TEMPLATE_DATA_DIR para um diretório temporário
+        backend_dir = Path(__file__).resolve().parent.parent
+
+        assert backend_dir not in TemplateDataService().data_dir.resolve().parents
+
+    def test_no_legacy_files_is_noop(self, tmp_path):
+        service = TemplateDataService(data_dir=tmp_path)
+
+        assert service.import_legacy_files() is None
+        assert not (tmp_path / "template_data.sqlite3").exists()
+
+
+@pytest.fixture
+def versions_client(tmp_path, monkeypatch):
+    from unittest.mock import Mock
+
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from routers import templates as templates_router
+    from services.template_manager import TemplateManager
+
+    service = TemplateDataService(data_dir=tmp_path / "data")
+    for i in range(5):
+        service.save_template_data("startup-1", "persona", {"nome": i})
+    monkeypatch.setattr(templates_router, "template_data_service", service)
+    monkeypatch.setattr(templates_router, "template_manager", TemplateManager(service))
+
+    app = FastAPI()
+    app.include_router(templates_router.router)
+    app.dependency_overrides[templates_router.get_user_startup_id] = lambda: "startup-1"
+    app.dependency_overrides[templates_router.get_current_founder] = lambda: Mock()
+    with TestClient(app) as client:
+        yield client
+
+
+class TestVersionsEndpoints:
+    """GET /templates/{template_key}/versions[/{version}]"""
+
+    def test_paginated_metadata(self, versions_client):
+        response = versions_client.get("/templates/persona/versions?limit=2&offset=3")
+
+        assert response.status_code == 200
+        assert [v["version"] for v in response.json()] == [4, 5]
+        assert all("data" not in v for v in response.json())
+
+    def test_single_version(self, versions_client):
+        assert versions_client.get("/templates/persona/versions/2").json()["data"] == {"nome": 1}
+        assert versions_client.get("/templates/persona/versions/9").status_code == 404
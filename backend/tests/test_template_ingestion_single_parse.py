@@ -0,0 +1,131 @@
+"""
+Testes da ingestão com parse único do workbook (services/template_ingestion_service.py)
+Cobre o modo compartilhado, o pre-split por sheet e o modo paralelo
+"""
+import json
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from services import template_ingestion_service as ingestion
+from services.template_ingestion_service import TemplateIngestionService, split_workbook_sheets
+
+
+@pytest.fixture
+def workbook_file(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Persona 01"
+    ws["A1"] = "Persona"
+    ws["A3"] = "Nome:"
+    ws.merge_cells("B3:D3")
+
+    ws = wb.create_sheet("Mapa de Empatia")
+    ws["B2"] = "O que pensa?"
+    ws.column_dimensions["B"].width = 30
+
+    ws = wb.create_sheet("Oculta")
+    ws.sheet_state = "hidden"
+    ws["A1"] = "Interna"
+
+    path = tmp_path / "templates.xlsx"
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def output_dirs(tmp_path, monkeypatch):
+    base = tmp_path / "backend"
+    monkeypatch.setattr(ingestion, "BASE_DIR", base)
+    monkeypatch.setattr(ingestion, "TEMPLATES_GENERATED_DIR", base / "templates" / "generated")
+    monkeypatch.setattr(ingestion, "TEMPLATES_IMAGES_DIR", base / "images")
+    return base
+
+
+def _schemas(base):
+    return {
+        path.name: json.loads(path.read_text(encoding="utf-8"))
+        for path in (base / "templates" / "generated" / "Q1").glob("*.json")
+    }
+
+
+class TestSplitWorkbookSheets:
+    """Testes do pre-split por sheet"""
+
+    def test_one_package_per_sheet(self, workbook_file):
+        packages = split_workbook_sheets(workbook_file)
+
+        assert [name for name, _ in packages] == ["Persona 01", "Mapa de Empatia", "Oculta"]
+        for name, package in packages:
+            wb = load_workbook(BytesIO(package))
+            assert wb.sheetnames == [name]
+            assert wb[name].sheet_state == "visible"
+
+    def test_package_keeps_sheet_content(self, workbook_file):
+        _, package = split_workbook_sheets(workbook_file)[1]
+        ws = load_workbook(BytesIO(package))["Mapa de Empatia"]
+
+        assert ws["B2"].value == "O que pensa?"
+        assert ws.column_dimensions["B"].width == 30
+
+    def test_other_worksheets_are_dropped(self, workbook_file):
+        _, package = split_workbook_sheets(workbook_file)[0]
+        names = zipfile.ZipFile(BytesIO(package)).namelist()
+
+        assert "xl/worksheets/sheet1.xml" in names
+        assert "xl/worksheets/sheet2.xml" not in names
+        assert "xl/styles.xml" in names
+
+
+class TestIngestSingleParse:
+    """Testes do ingest_excel_file lendo o arquivo uma única vez"""
+
+    def test_workbook_loaded_once(self, workbook_file, output_dirs, monkeypatch):
+        calls = []
+
+        def counting_load(*args, **kwargs):
+            calls.append(args)
+            return load_workbook(*args, **kwargs)
+
+        monkeypatch.setattr(ingestion, "load_workbook", counting_load)
+        _, results = TemplateIngestionService(db_session=None)._process_sheets_shared(workbook_file, "Q1")
+
+        assert len(calls) == 1
+        assert [r.success for r in results] == [True, True, True]
+
+    def test_shared_matches_per_sheet_load(self, workbook_file, output_dirs):
+        service = TemplateIngestionService(db_session=None)
+        for sheet_name in load_workbook(workbook_file).sheetnames:
+            service.process_template(workbook_file, sheet_name, "Q1")
+        legacy = _schemas(output_dirs)
+
+        service._process_sheets_shared(workbook_file, "Q1")
+
+        assert len(legacy) == 3
+        assert _schemas(output_dirs) == legacy
+
+    def test_parallel_matches_shared(self, workbook_file, output_dirs, monkeypatch):
+        service = TemplateIngestionService(db_session=None)
+        names, results = service._process_sheets_shared(workbook_file, "Q1")
+        shared = _schemas(output_dirs)
+
+        monkeypatch.setattr(ingestion, "ProcessPoolExecutor", ThreadPoolExecutor)
+        parallel_names, parallel_results = service._process_sheets_parallel(workbook_file, "Q1", 2)
+
+        assert parallel_names == names
+        assert [r.template_key for r in parallel_results] == [r.template_key for r in results]
+        assert _schemas(output_dirs) == shared
+
+    def test_parallel_worker_failure_is_reported(self, workbook_file, output_dirs, monkeypatch):
+        def broken(package, sheet_name, cycle):
+            raise RuntimeError("worker morreu")
+
+        monkeypatch.setattr(ingestion, "ProcessPoolExecutor", ThreadPoolExecutor)
+        monkeypatch.setattr(ingestion, "_process_sheet_package", broken)
+        _, results = TemplateIngestionService(db_session=None)._process_sheets_parallel(workbook_file, "Q1", 2)
+
+        assert not any(r.success for r in results)
+        assert results[0].errors == ["worker morreu"]
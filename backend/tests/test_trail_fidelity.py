@@ -274,5 +274,114 @@ def test_trail_coverage_validation(trail_workbook_bytes):
         service.ingest(empty_bytes)
 
 
+# ============================================================
+# TESTES - BUSCA DE RESPOSTAS E SEÇÕES
+# ============================================================
+
+def _question_snapshot(cells, merged):
+    return {"sheets": [{"name": "Etapa", "cells": cells, "merged_cells": merged}]}
+
+
+def _cell(row, col, value=None, **style):
+    return {
+        "coordinate": f"{get_column_letter(col)}{row}",
+        "row": row,
+        "column": col,
+        "value": value,
+        "style": style,
+    }
+
+
+def test_answer_block_uses_merged_geometry():
+    """'A3' não pode casar com 'A38:D39' só porque o texto contém 'A3'"""
+    cells = [
+        _cell(2, 1, "Qual é o perfil do cliente?"),
+        _cell(3, 1),
+        _cell(38, 1),
+    ]
+    questions, _ = QuestionExtractor().extract(_question_snapshot(cells, ["A38:D39", "A3:D4"]))
+    
+    assert questions[0].answer_cell_range == "A3:D4"
+
+
+def test_answer_block_inside_merged_range():
+    """Célula interna (não canto) de um range mesclado resolve para o range"""
+    cells = [
+        _cell(1, 2, "Descreva seu produto em 3 linhas"),
+        _cell(3, 2),
+    ]
+    questions, _ = QuestionExtractor().extract(_question_snapshot(cells, ["A2:D5"]))
+    
+    assert questions[0].answer_cell_range == "A2:D5"
+    assert questions[0].answer_row_start == 3
+
+
+def test_section_lookup_matches_linear_scan():
+    """Bisect nas seções devolve o mesmo que a busca linear"""
+    extractor = QuestionExtractor()
+    sections = [
+        {"index": 0, "name": "A", "row_start": 1, "row_end": 0},
+        {"index": 1, "name": "B", "row_start": 1, "row_end": 9},
+        {"index": 2, "name": "C", "row_start": 10, "row_end": 19},
+        {"index": 3, "name": "D", "row_start": 20, "row_end": 9999},
+    ]
+    
+    def linear(row, sections):
+        for section in sections:
+            if section["row_start"] <= row <= (section["row_end"] or 9999):
+                return section
+        return None
+    
+    open_in_middle = [
+        {"index": 0, "name": "A", "row_start": 1, "row_end": 9},
+        {"index": 1, "name": "B", "row_start": 10, "row_end": 0},
+        {"index": 2, "name": "C", "row_start": 20, "row_end": 29},
+    ]
+    
+    for candidate in (sections, sections[1:], sections[2:], open_in_middle, []):
+        index = extractor._build_section_lookup(candidate)
+        for row in (1, 5, 10, 15, 19, 20, 25, 500, 9999, 10000):
+            expected = linear(row, candidate)
+            assert extractor._find_section_for_cell(row, candidate) is expected
+            assert extractor._find_section_for_cell(row, candidate, index) is expected
+
+
+def test_many_questions_extraction_scales():
+    """Centenas de perguntas: a busca de respostas não reescaneia a aba inteira"""
+    
+    class CountingCell(dict):
+        """Célula que conta os acessos via .get (trabalho por célula)"""
+        reads = 0
+        
+        def get(self, *args):
+            CountingCell.reads += 1
+            return super().get(*args)
+    
+    def build(blocks):
+        cells, merged = [], []
+        for block in range(blocks):
+            top = block * 3 + 1
+            cells.append(_cell(top, 1, f"Qual é a resposta {block}?"))
+            cells.append(_cell(top + 1, 1))
+            merged.append(f"A{top + 1}:D{top + 2}")
+        return _question_snapshot(cells, merged)
+    
+    def extract(blocks):
+        snapshot = build(blocks)
+        for sheet in snapshot["sheets"]:
+            sheet["cells"] = [CountingCell(cell) for cell in sheet["cells"]]
+        CountingCell.reads = 0
+        questions, _ = QuestionExtractor().extract(snapshot)
+        return questions, CountingCell.reads / (blocks * 2)
+    
+    _, small_reads = extract(200)
+    questions, large_reads = extract(2000)
+    
+    assert len(questions) == 2000
+    assert questions[-1].answer_cell_range == "A5999:D6000"
+    # 10x perguntas: trabalho por célula constante (reescanear a aba cresceria 10x)
+    assert large_reads <= small_reads * 1.5
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""
+Testes da sequência das trilhas (routers/trail_endpoints)
+=========================================================
+
+Valida validate_sequence / get_next_unanswered_question baseados em
+conjunto: mesma regra de ordem, nº fixo de queries independente do
+tamanho do template
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from routers import trail_endpoints
+from routers.trail_endpoints import get_next_unanswered_question, validate_sequence
+
+
+def _question(i):
+    return SimpleNamespace(
+        id=i, field_id=f"q{i}", sheet_name="S", cell_range=f"B{i}", label=f"Pergunta {i}",
+        inferred_type="text", required=True, example_value=None, order_index=i,
+    )
+
+
+class FakeQuery:
+    """Query encadeável que devolve o resultado configurado por entidade"""
+
+    def __init__(self, result):
+        self._result = result
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    filter_by = order_by = distinct = filter
+
+    def all(self):
+        return self._result
+
+    def first(self):
+        return self._result[0] if self._result else None
+
+
+class FakeSession:
+    def __init__(self, questions, answered):
+        self.questions = questions
+        self.answered = answered
+        self.queries = 0
+
+    def query(self, entity):
+        self.queries += 1
+        if entity is trail_endpoints.FillableField:
+            return FakeQuery(self.questions)
+        if entity is trail_endpoints.StepAnswer.step_id:
+            return FakeQuery([(field_id,) for field_id in self.answered])
+        return FakeQuery([(q.field_id,) for q in self.questions])
+
+
+@pytest.fixture
+def questions():
+    return [_question(i) for i in range(100)]
+
+
+class TestNextUnanswered:
+    """get_next_unanswered_question"""
+
+    def test_first_gap_in_order(self, questions):
+        db = FakeSession(questions, answered={f"q{i}" for i in range(100) if i != 42})
+
+        question = get_next_unanswered_question("tpl", "f1", db)
+
+        assert question["field_id"] == "q42"
+        assert question["template_id"] == "tpl"
+        assert db.queries == 2
+
+    def test_all_answered(self, questions):
+        db = FakeSession(questions, answered={q.field_id for q in questions})
+
+        assert get_next_unanswered_question("tpl", "f1", db) is None
+
+
+class TestValidateSequence:
+    """validate_sequence"""
+
+    def _db(self, questions, answered, target):
+        db = FakeSession([questions[target]], answered)
+        # perguntas anteriores ao alvo
+        previous = questions[:target]
+        original = db.query
+
+        def query(entity):
+            if entity is trail_endpoints.FillableField.field_id:
+                db.queries += 1
+                return FakeQuery([(q.field_id,) for q in previous])
+            return original(entity)
+
+        db.query = query
+        return db
+
+    def test_valid_when_previous_answered(self, questions):
+        db = self._db(questions, {f"q{i}" for i in range(50)}, target=50)
+
+        assert validate_sequence("tpl", "q50", "f1", db) == (True, None)
+        assert db.queries == 3
+
+    def test_blocks_gap_with_count(self, questions):
+        db = self._db(questions, {"q0", "q2", "q7"}, target=3)
+
+        valid, message = validate_sequence("tpl", "q3", "f1", db)
+
+        assert valid is False
+        assert "Respondidas: 2/3" in message
+        assert db.queries == 3
+
+    def test_first_question_skips_answers_query(self, questions):
+        db = self._db(questions, set(), target=0)
+
+        assert validate_sequence("tpl", "q0", "f1", db) == (True, None)
+        assert db.queries == 2
+
+    def test_unknown_question(self):
+        assert validate_sequence("tpl", "qx", "f1", FakeSession([], set())) == (False, "Pergunta não encontrada")
@@ -0,0 +1,173 @@
+"""
+Testes do export XLSX em streaming
+==================================
+
+Valida o workbook write-only da trilha entregue em blocos (mesmo layout
+do generate_xlsx), propagação de erros e abandono do consumidor, e o
+GET /templates/{template_key}/export/xlsx com Content-Length
+"""
+
+import io
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from openpyxl import Workbook, load_workbook
+
+from routers import templates as templates_router
+from services import export_cache
+from services.export_cache import ExportCache
+from services.excel_template_parser import FieldMetadata, FieldType, TemplateSchema
+from services.template_manager import BufferedWorkbook, TemplateDataService, TemplateManager
+from services.xlsx_exporter import generate_xlsx, iter_workbook_bytes, stream_xlsx
+
+
+def _trail():
+    steps = [
+        SimpleNamespace(
+            step_id=f"s{i}",
+            step_name=f"Etapa {i}",
+            description="Descrição" if i == 0 else None,
+            schema={"fields": [{"key": f"f{j}", "label": f"Campo {j}"} for j in range(3)]},
+        )
+        for i in range(3)
+    ]
+    answers = {"s0": {"f0": "Ana", "f2": 7}, "s2": {"f1": "x"}}
+    return SimpleNamespace(name="Marketing"), steps, answers
+
+
+def _rows(ws):
+    return [[cell.value for cell in row] for row in ws.iter_rows()]
+
+
+class TestStreamXlsx:
+    """Testes de stream_xlsx / iter_workbook_bytes"""
+
+    def test_same_content_as_generate_xlsx(self):
+        trail, steps, answers = _trail()
+
+        chunks = list(stream_xlsx(trail, steps, answers, chunk_size=1024))
+        streamed = load_workbook(io.BytesIO(b"".join(chunks)))
+        buffered = load_workbook(generate_xlsx(trail, steps, answers))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 1024 for chunk in chunks)
+        assert streamed.sheetnames == buffered.sheetnames == ["Resumo", "Etapa 0", "Etapa 1", "Etapa 2"]
+        for name in streamed.sheetnames:
+            assert _rows(streamed[name]) == _rows(buffered[name])
+
+        ws = streamed["Etapa 0"]
+        assert ws["A4"].value == "Campo 0"
+        assert ws["B4"].value == "Ana"
+        assert ws["A1"].font.bold is True
+        assert {str(r) for r in ws.merged_cells.ranges} == {"A1:B1", "A2:B2"}
+        assert ws.column_dimensions["B"].width == 60
+
+    def test_error_is_raised_to_consumer(self):
+        def broken():
+            raise RuntimeError("falhou")
+
+        with pytest.raises(RuntimeError, match="falhou"):
+            list(iter_workbook_bytes(broken))
+
+    def test_closing_early_stops_writer_thread(self):
+        trail, steps, answers = _trail()
+        before = threading.active_count()
+
+        stream = stream_xlsx(trail, steps, answers, chunk_size=64)
+        next(stream)
+        stream.close()
+
+        for thread in threading.enumerate():
+            if thread.name == "xlsx-stream":
+                thread.join(timeout=10)
+        assert threading.active_count() == before
+
+    def test_closing_does_not_wait_for_writer(self):
+        release = threading.Event()
+
+        class SlowWorkbook:
+            def save(self, pipe):
+                pipe.write(b"x" * 64)
+                release.wait(timeout=10)
+                pipe.write(b"y" * 64)
+
+        stream = iter_workbook_bytes(SlowWorkbook, chunk_size=64)
+        assert next(stream) == b"x" * 64
+        stream.close()
+
+        # close() voltou com o save ainda em andamento
+        writers = [t for t in threading.enumerate() if t.name == "xlsx-stream"]
+        assert writers and all(t.is_alive() for t in writers)
+
+        release.set()
+        for thread in writers:
+            thread.join(timeout=10)
+            assert not thread.is_alive()
+
+
+class TestBufferedWorkbook:
+    """Fallback em memória com a mesma interface do FilledWorkbook"""
+
+    def test_chunks_and_size(self, monkeypatch):
+        monkeypatch.setattr(BufferedWorkbook, "CHUNK_SIZE", 4)
+        buffered = BufferedWorkbook(b"0123456789")
+
+        assert list(buffered) == [b"0123", b"4567", b"89"]
+        assert buffered.size == 10
+
+
+@pytest.fixture
+def template_client(tmp_path, monkeypatch):
+    wb = Workbook()
+    wb.active.title = "Persona"
+    wb.active["A1"] = "Nome:"
+    excel = tmp_path / "Template Q1.xlsx"
+    wb.save(excel)
+
+    service = TemplateDataService(data_dir=tmp_path / "data")
+    service.schemas_dir = tmp_path / "schemas"
+    service.schemas_dir.mkdir()
+    service.save_schema(TemplateSchema(
+        template_key="persona",
+        sheet_name="Persona",
+        sheet_width=0,
+        sheet_height=0,
+        fields=[FieldMetadata(key="nome", cell="B1", type=FieldType.TEXT)],
+    ))
+    service.save_template_data("startup-1", "persona", {"nome": "Ana"})
+
+    monkeypatch.setattr(templates_router, "template_manager", TemplateManager(service))
+    # Sem cache de exports: exercita o caminho em streaming
+    monkeypatch.setattr(export_cache, "_cache", ExportCache(max_bytes=0))
+    monkeypatch.setattr(templates_router, "_original_excel_path", lambda: excel)
+
+    app = FastAPI()
+    app.include_router(templates_router.router)
+    app.dependency_overrides[templates_router.get_user_startup_id] = lambda: "startup-1"
+    app.dependency_overrides[templates_router.get_current_founder] = lambda: Mock()
+    with TestClient(app) as client:
+        yield client, tmp_path
+
+
+class TestTemplateDownloadEndpoint:
+    """GET /templates/{template_key}/export/xlsx"""
+
+    def test_streams_with_content_length(self, template_client):
+        client, tmp_path = template_client
+        response = client.get("/templates/persona/export/xlsx")
+
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert "startup-1_persona.xlsx" in response.headers["content-disposition"]
+        assert load_workbook(io.BytesIO(response.content))["Persona"]["B1"].value == "Ana"
+        assert not (tmp_path / "exports").exists()
+
+    def test_missing_data_is_404(self, template_client):
+        client, _ = template_client
+        response = client.get("/templates/inexistente/export/xlsx")
+
+        assert response.status_code == 404
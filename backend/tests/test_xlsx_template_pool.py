@@ -0,0 +1,177 @@
+"""
+Testes do export por patch do pacote xlsx (services/xlsx_template_pool)
+======================================================================
+
+Valida valores/estilos das células preenchidas, inserção de linhas e
+células novas, sheet Metadata, cópia verbatim dos outros membros e o
+fallback para openpyxl em TemplateDataService.export_to_excel
+"""
+
+import io
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+from openpyxl.workbook.defined_name import DefinedName
+
+from services.excel_template_parser import FieldMetadata, FieldType, TemplateSchema
+from services.template_manager import TemplateDataService
+from services.xlsx_template_pool import (
+    TemplatePackage,
+    TemplatePackagePool,
+    TemplatePatchError,
+)
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Capa"
+    ws["A1"] = "Capa"
+    persona = wb.create_sheet("Persona")
+    persona["A1"] = "Nome:"
+    persona["B1"] = "exemplo"
+    persona["B1"].font = Font(bold=True)
+    persona["A3"] = "Idade:"
+    persona["D3"] = "fim"
+    persona["A10"] = "Rodapé"
+    wb.create_sheet("Mapa")["A1"] = "Mapa"
+    wb.defined_names["area"] = DefinedName("area", localSheetId=1, attr_text="Persona!$A$1:$B$3")
+    wb.active = 1
+
+    path = tmp_path / "template.xlsx"
+    wb.save(path)
+    return path
+
+
+def _load(data: bytes):
+    return load_workbook(io.BytesIO(data))
+
+
+class TestTemplatePackage:
+    """Testes de TemplatePackage.render"""
+
+    def test_values_and_highlight(self, template_path):
+        values = {"B1": "Ana & <Bia>", "C3": 42, "B3": True, "E5": 1.5, "B20": "nova linha"}
+        data = TemplatePackage(template_path).render("Persona", values).getvalue()
+
+        ws = _load(data)["Persona"]
+        assert ws["B1"].value == "Ana & <Bia>"
+        assert ws["C3"].value == 42
+        assert ws["B3"].value is True
+        assert ws["E5"].value == 1.5
+        assert ws["B20"].value == "nova linha"
+        # Vizinhos preservados, célula existente mantém a fonte original
+        assert ws["A3"].value == "Idade:"
+        assert ws["D3"].value == "fim"
+        assert ws["A10"].value == "Rodapé"
+        assert ws["B1"].font.bold is True
+        for coordinate in values:
+            assert ws[coordinate].fill.fgColor.rgb == "00FFFACD"
+        assert ws["A1"].fill.fill_type is None
+
+    def test_size_is_known_before_writing(self, template_path):
+        filled = TemplatePackage(template_path).render("Persona", {"B1": "x"}, metadata=["Export Info"])
+        buffer = io.BytesIO()
+
+        assert filled.write(buffer) == filled.size == len(buffer.getvalue())
+        assert zipfile.ZipFile(buffer).testzip() is None
+
+    def test_metadata_sheet_first(self, template_path):
+        data = TemplatePackage(template_path).render(
+            "Persona", {"B1": "x"}, metadata=["Export Info", "Template: persona"]
+        ).getvalue()
+
+        wb = _load(data)
+        assert wb.sheetnames == ["Metadata", "Capa", "Persona", "Mapa"]
+        assert wb["Metadata"]["A2"].value == "Template: persona"
+        # Índices locais e aba ativa continuam apontando para Persona
+        assert wb.active.title == "Persona"
+        assert wb["Persona"].defined_names["area"].attr_text == "Persona!$A$1:$B$3"
+
+    def test_untouched_members_are_copied_verbatim(self, template_path):
+        package = TemplatePackage(template_path)
+        data = package.render("Persona", {"B1": "x"}).getvalue()
+
+        original = zipfile.ZipFile(template_path)
+        output = zipfile.ZipFile(io.BytesIO(data))
+        untouched = package.sheet_parts["Mapa"]
+        assert output.read(untouched) == original.read(untouched)
+        assert output.read(package.sheet_parts["Persona"]) != original.read(package.sheet_parts["Persona"])
+
+    def test_unknown_sheet(self, template_path):
+        with pytest.raises(KeyError):
+            TemplatePackage(template_path).render("Inexistente", {"A1": "x"})
+
+    def test_existing_metadata_sheet_is_unsupported(self, tmp_path):
+        wb = Workbook()
+        wb.active.title = "Metadata"
+        path = tmp_path / "meta.xlsx"
+        wb.save(path)
+
+        with pytest.raises(TemplatePatchError):
+            TemplatePackage(path).render("Metadata", {"A1": "x"}, metadata=["Export Info"])
+
+
+class TestTemplatePackagePool:
+    """Pool reaproveita o template e recarrega quando o arquivo muda"""
+
+    def test_reuses_until_file_changes(self, template_path):
+        pool = TemplatePackagePool(max_templates=2)
+        first = pool.get(template_path)
+
+        assert pool.get(template_path) is first
+
+        wb = load_workbook(template_path)
+        wb["Persona"]["A1"] = "Nome completo:"
+        wb.save(template_path)
+
+        assert pool.get(template_path) is not first
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    service = TemplateDataService(data_dir=tmp_path / "data")
+    service.schemas_dir = tmp_path / "schemas"
+    service.schemas_dir.mkdir()
+    service.save_schema(TemplateSchema(
+        template_key="persona",
+        sheet_name="Persona",
+        sheet_width=0,
+        sheet_height=0,
+        fields=[
+            FieldMetadata(key="nome", cell="B1", type=FieldType.TEXT),
+            FieldMetadata(key="idade", cell="B3", type=FieldType.NUMBER),
+        ],
+    ))
+    service.save_template_data("startup-1", "persona", {"nome": "Ana", "idade": 31})
+    return service
+
+
+class TestExportToExcel:
+    """TemplateDataService.export_to_excel com e sem o pool"""
+
+    @pytest.mark.parametrize("use_template_pool", [True, False])
+    def test_same_cells_either_way(self, data_service, template_path, tmp_path, use_template_pool):
+        output = data_service.export_to_excel(
+            "startup-1", "persona", template_path, tmp_path / "out.xlsx",
+            use_template_pool=use_template_pool,
+        )
+
+        wb = load_workbook(output)
+        assert wb.sheetnames[0] == "Metadata"
+        assert wb["Metadata"]["A3"].value == "Startup: startup-1"
+        assert wb["Persona"]["B1"].value == "Ana"
+        assert wb["Persona"]["B3"].value == 31
+        assert wb["Persona"]["B3"].fill.fgColor.rgb == "00FFFACD"
+
+    def test_falls_back_to_openpyxl(self, data_service, template_path, tmp_path, monkeypatch):
+        def unsupported(*args, **kwargs):
+            raise TemplatePatchError("layout")
+
+        monkeypatch.setattr(TemplatePackage, "render", unsupported)
+        output = data_service.export_to_excel("startup-1", "persona", template_path, tmp_path / "out.xlsx")
+
+        assert load_workbook(output)["Persona"]["B1"].value == "Ana"
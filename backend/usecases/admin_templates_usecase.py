@@ -13,6 +13,7 @@ from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 
 from services.template_ingestion_service import TemplateIngestionService
+from services.template_catalog import get_template_catalog
 from db.models import TemplateDefinition
 
 logger = logging.getLogger(__name__)
@@ -168,6 +169,7 @@ def update_template_status(
         template.status = status
         db.commit()
         db.refresh(template)
+        get_template_catalog().refresh(db, template.cycle, template.template_key)
         
         logger.info(f"Updated template {template_id} status to '{status}'")
         